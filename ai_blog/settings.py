@@ -39,6 +39,15 @@ ENVIRONMENT = os.environ.get('DJANGO_ENV', 'development')
 
 NCBI_EMAIL = os.environ.get('NCBI_EMAIL', 'senin@mailin.com')  # ZORUNLU
 NCBI_API_KEY = os.environ.get('NCBI_API_KEY')                  # opsiyonel (hız)
+# Entrez hız sınırı (blog.ncbi_rate): tüm süreçler NCBI_RATE_STATE_FILE üzerinden
+# tek jeton kovasını paylaşır. Hız boşsa anahtarla 10/sn, anahtarsız 3/sn.
+NCBI_RATE_PER_SEC = float(os.environ.get('NCBI_RATE_PER_SEC', 0)) or None
+NCBI_RATE_BURST = float(os.environ.get('NCBI_RATE_BURST', 1))
+NCBI_RATE_STATE_FILE = BASE_DIR / '.cache' / 'ncbi_rate.json'
+# Yerel PubMed/PMC deposu (blog.pubmed_store) CACHES['pubmed']'tedir (canlıda DB
+# tablosu: manage.py createcachetable). Kayıt türü başına süreler modüldedir;
+# bu değer yalnız alias varsayılanıdır. Ön-doldurma: manage.py prefill_pubmed
+PUBMED_STORE_TTL = 90 * 24 * 3600
 
 # Türkçe locale ayarları
 try:
@@ -203,6 +212,62 @@ LOGGING = {
 
 # FASTQ analiz dosya boyutu limiti (MB)
 FASTQ_MAX_FILE_SIZE_MB = 5
+# Tekrarlayan dizi (overrepresented) özetinde tutulacak en fazla farklı dizi —
+# analiz belleğini okuma sayısından bağımsız sınırlar
+FASTQ_OVERREP_SKETCH_SIZE = 2000
+# FASTQ analiz süreç havuzu işçi sayısı (1 = havuzsuz, tek süreç)
+FASTQ_ANALYSIS_WORKERS = int(os.environ.get('FASTQ_ANALYSIS_WORKERS', min(4, os.cpu_count() or 1)))
+
+# AI anahtar havuzu hız sınırı (anahtar başına, süreç içi jeton kovası):
+# sağlayıcı -> (dakikada istek, ani istek/burst). Bkz. ai_engine.key_scheduler
+AI_KEY_RATE_LIMITS = {
+    'Google Gemini': (60, 10),
+    'OpenAI': (60, 10),
+    'Anthropic': (50, 10),
+}
+
+# Deterministik AI çağrıları için kalıcı yanıt önbelleği (ai_engine.response_cache,
+# çağrı yerinde cache=True ile açılır)
+AI_RESPONSE_CACHE_TTL = 7 * 24 * 3600
+AI_RESPONSE_CACHE_MAX_ENTRIES = 5000
+
+# CrossRef istemcisi (blog.crossref): polite pool sınırları ve kalıcı önbellek süresi.
+# Önbellek CACHES['crossref']'tedir (canlıda DB tablosu: manage.py createcachetable)
+CROSSREF_CONCURRENCY = 3
+CROSSREF_RATE_PER_SEC = 10
+CROSSREF_CACHE_TTL = 30 * 24 * 3600
+
+# Ensembl/ENA dizileri için paylaşımlı disk önbelleği (dash_apps.sequence_cache).
+# Ön-ısıtma listesi: "tür:SEMBOL" (Ensembl) veya "ena:ACCESSION", virgülle ayrılmış;
+# `manage.py warm_cache --sequences` (zamanlanmış görev) ile yüklenir.
+SEQUENCE_CACHE_DIR = BASE_DIR / '.cache' / 'sequences'
+SEQUENCE_CACHE_TTL = 30 * 24 * 3600
+SEQUENCE_CACHE_MAX_MB = int(os.environ.get('SEQUENCE_CACHE_MAX_MB', 512))
+SEQUENCE_CACHE_PREWARM = [
+    ('ena', item[4:]) if item.startswith('ena:') else ('ensembl', *item.split(':', 1))
+    for item in os.environ.get(
+        'SEQUENCE_CACHE_PREWARM',
+        'homo_sapiens:TP53,homo_sapiens:BRCA1,homo_sapiens:BRCA2,homo_sapiens:EGFR,'
+        'homo_sapiens:KRAS,homo_sapiens:CFTR,homo_sapiens:PTEN,homo_sapiens:MYC',
+    ).replace(' ', '').split(',') if ':' in item
+]
+
+# Yerel off-target indeksi (dash_apps.genome_index): <dizin>/<tür>/<enzim>/ altında,
+# `manage.py build_genome_index` ile kurulur. İndeks yoksa uzak NCBI BLAST kullanılır.
+GENOME_INDEX_DIR = Path(os.environ.get('GENOME_INDEX_DIR', BASE_DIR / 'genome_index'))
+OFFTARGET_WORKERS = int(os.environ.get('OFFTARGET_WORKERS', min(4, os.cpu_count() or 1)))
+# Toplu CRISPR tasarımında (bio_tools.tasks.crispr_batch_design) gen başına süreç havuzu
+CRISPR_BATCH_WORKERS = int(os.environ.get('CRISPR_BATCH_WORKERS', os.cpu_count() or 1))
+
+# Kalıcı iş kuyruğu (bio_tools.job_queue) — işler `manage.py run_worker` ile çalışır.
+# Kuyruk başına tüm işçiler genelinde aynı anda çalışabilecek iş sayısı
+JOB_QUEUE_CONCURRENCY = {'fastq': 1, 'article': 2, 'crispr': 1}
+JOB_QUEUE_RETRY_BACKOFF = 30       # ilk yeniden deneme gecikmesi (sn), her denemede 2 katı
+JOB_QUEUE_HEARTBEAT_SECONDS = 15
+JOB_QUEUE_STALE_SECONDS = 120      # bu süre kalp atışı gelmeyen iş yeniden kuyruğa alınır
+# Ayrı işçi çalıştırmayan geliştirme ortamında işleri web sürecinde hemen çalıştır
+JOB_QUEUE_EAGER = os.environ.get(
+    'JOB_QUEUE_EAGER', 'True' if ENVIRONMENT == 'development' else 'False') == 'True'
 
 # ==============================================================================
 # CANLI ORTAM AYARLARI (PRODUCTION)
@@ -258,6 +323,18 @@ if ENVIRONMENT == 'production':
             'LOCATION': 'django_cache_fastq',
             'KEY_PREFIX': 'fastq', 'TIMEOUT': 3600,
         },
+        'crossref': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache_crossref',
+            'KEY_PREFIX': 'crossref', 'TIMEOUT': CROSSREF_CACHE_TTL,
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        },
+        'pubmed': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache_pubmed',
+            'KEY_PREFIX': 'pubmed', 'TIMEOUT': PUBMED_STORE_TTL,
+            'OPTIONS': {'MAX_ENTRIES': 200000},
+        },
     }
     SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 
@@ -296,6 +373,13 @@ else:
     CACHES = {
         'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default-cache'},
         'fastq_analysis': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'fastq-cache'},
+        # Yeniden başlatmalarda kaybolmasın diye diskte
+        'crossref': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                     'LOCATION': BASE_DIR / '.cache' / 'crossref',
+                     'TIMEOUT': CROSSREF_CACHE_TTL, 'OPTIONS': {'MAX_ENTRIES': 50000}},
+        'pubmed': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                   'LOCATION': BASE_DIR / '.cache' / 'pubmed',
+                   'TIMEOUT': PUBMED_STORE_TTL, 'OPTIONS': {'MAX_ENTRIES': 200000}},
     }
     SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Veritabanı session'ları
 
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Provider, AIModel, APIKey
+from .models import Provider, AIModel, APIKey, ResponseCache
 
 
 # ---- Provider altında inline (hızlı toplu ekleme için) ----
@@ -48,4 +48,13 @@ class APIKeyAdmin(admin.ModelAdmin):
     list_editable = ('is_active',)
     readonly_fields = ('created_at', 'usage_count', 'last_used')
     fields = ('provider', 'label', 'key', 'is_active')
-    ordering = ('usage_count',)
\ No newline at end of file
+    ordering = ('usage_count',)
+
+# ---- AI yanıt önbelleği (salt okunur izleme) ----
+@admin.register(ResponseCache)
+class ResponseCacheAdmin(admin.ModelAdmin):
+    list_display = ('service_name', 'model_name', 'hits', 'last_used', 'expires_at', 'created_at')
+    list_filter = ('service_name', 'model_name')
+    search_fields = ('key_hash', 'response')
+    readonly_fields = ('key_hash', 'service_name', 'model_name', 'response', 'hits',
+                       'created_at', 'last_used', 'expires_at')
@@ -5,3 +5,6 @@ class AiEngineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_engine'
     verbose_name = 'Yapay Zeka'
+
+    def ready(self):
+        import ai_engine.signals
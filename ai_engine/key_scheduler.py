@@ -0,0 +1,215 @@
+"""
+ai_engine.key_scheduler — API anahtarı havuzu için süreç içi zamanlayıcı.
+
+generate_with_pool her çağrıda anahtarları DB'den çekip sırayla denemek ve
+her başarıdan sonra usage_count yazmak yerine bu modüldeki `scheduler`
+nesnesine danışır:
+
+  - 429/kota hatası veren anahtar üstel artan bir süre "soğumaya" alınır ve
+    bu sürede hiç denenmez (hata mesajında/başlıkta retry-after varsa o kullanılır).
+  - Her anahtar için jeton kovası (token bucket) hız sınırı: dakikada N istek,
+    en fazla `burst` kadar ani istek. settings.AI_KEY_RATE_LIMITS ile sağlayıcı
+    bazında ayarlanır: {'Google Gemini': (dakikada_istek, burst), ...}
+  - Uçuştaki istek sayısı izlenir; en boş anahtar önce seçilir.
+  - usage_count / last_used DB'ye FLUSH_INTERVAL saniyede bir TOPLU yazılır.
+  - Sağlayıcı + aktif anahtar listesi POOL_TTL saniye önbellekte tutulur
+    (APIKey/Provider değişince sinyalle sıfırlanır).
+
+Durum süreç başınadır; birden fazla web/işçi süreci kendi durumunu tutar.
+"""
+import atexit
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = (60, 10)          # (dakikada istek, burst)
+COOLDOWN_BASE = 30               # ilk 429 sonrası bekleme (sn), her tekrarında 2 katı
+COOLDOWN_MAX = 900
+FLUSH_INTERVAL = 30
+POOL_TTL = 30
+MAX_RATE_WAIT = 20               # tüm anahtarlar hız sınırındaysa en fazla bu kadar bekle
+
+_RATE_LIMIT_RE = re.compile(
+    r'\b429\b|quota|rate.?limit|resource.?exhausted|too many requests', re.IGNORECASE)
+_RETRY_RE = re.compile(r'retry(?:[_ ]?delay|[_ ]?after| in)?["\':= ]+(\d+(?:\.\d+)?)\s*s', re.IGNORECASE)
+
+
+def is_rate_limit_error(exc):
+    """Hata kota/429 kaynaklı mı? (SDK'lar farklı sınıflar kullandığı için metinden de bakar)"""
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    if status == 429:
+        return True
+    return bool(_RATE_LIMIT_RE.search(str(exc)))
+
+
+def _retry_after(exc):
+    """Sağlayıcının önerdiği bekleme süresi (sn) ya da None."""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if headers:
+        try:
+            return float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    m = _RETRY_RE.search(str(exc))
+    return float(m.group(1)) if m else None
+
+
+class _KeyState:
+    __slots__ = ('rate', 'burst', 'tokens', 'stamp', 'cooldown_until', 'strikes',
+                 'inflight', 'pending_uses', 'last_used')
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.cooldown_until = 0.0
+        self.strikes = 0
+        self.inflight = 0
+        self.pending_uses = 0
+        self.last_used = None
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+
+class KeyScheduler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._states = {}        # key id -> _KeyState
+        self._pools = {}         # service_name -> (son geçerlilik, provider, [APIKey])
+        self._last_flush = time.monotonic()
+
+    def _state(self, service_name, key_id):
+        st = self._states.get(key_id)
+        if st is None:
+            limits = getattr(settings, 'AI_KEY_RATE_LIMITS', {})
+            st = self._states[key_id] = _KeyState(*limits.get(service_name, DEFAULT_RATE))
+        return st
+
+    # --- havuz (DB) önbelleği -------------------------------------------------
+    def pool(self, service_name):
+        """(provider, aktif anahtarlar) — POOL_TTL boyunca DB'ye gitmeden."""
+        now = time.monotonic()
+        cached = self._pools.get(service_name)
+        if cached and cached[0] > now:
+            return cached[1], cached[2]
+        from ai_engine.models import Provider
+        try:
+            provider = Provider.objects.get(service_name=service_name, is_active=True)
+        except Provider.DoesNotExist:
+            raise ValueError(f"'{service_name}' adlı aktif bir sağlayıcı yok.")
+        keys = list(provider.api_keys.filter(is_active=True).order_by('usage_count', 'id'))
+        self._pools[service_name] = (now + POOL_TTL, provider, keys)
+        return provider, keys
+
+    def invalidate_pool(self, service_name=None):
+        if service_name is None:
+            self._pools.clear()
+        else:
+            self._pools.pop(service_name, None)
+
+    # --- seçim ----------------------------------------------------------------
+    def candidates(self, service_name, keys):
+        """Soğumada OLMAYAN anahtarlar; uçuşta en az istek, sonra en az kullanılan önce."""
+        now = time.monotonic()
+        with self._lock:
+            ready = []
+            for k in keys:
+                st = self._state(service_name, k.id)
+                if st.cooldown_until <= now:
+                    ready.append((st.inflight, (k.usage_count or 0) + st.pending_uses, k.id, k))
+        ready.sort(key=lambda t: t[:3])
+        return [t[3] for t in ready]
+
+    def try_acquire(self, service_name, key_id):
+        """Kovada jeton varsa alır ve uçuş sayacını artırır; yoksa False."""
+        now = time.monotonic()
+        with self._lock:
+            st = self._state(service_name, key_id)
+            if st.cooldown_until > now:
+                return False
+            st.refill(now)
+            if st.tokens < 1.0:
+                return False
+            st.tokens -= 1.0
+            st.inflight += 1
+            return True
+
+    def wait_time(self, service_name, key_id):
+        """Bu anahtarda bir sonraki jetona kadar kalan süre (sn)."""
+        now = time.monotonic()
+        with self._lock:
+            st = self._state(service_name, key_id)
+            if st.cooldown_until > now:
+                return st.cooldown_until - now
+            st.refill(now)
+            return 0.0 if st.tokens >= 1.0 else (1.0 - st.tokens) / max(st.rate, 1e-9)
+
+    def release(self, key_id, error=None):
+        """Çağrı bitti: başarıyı sayaca ekler, 429/kotada anahtarı soğumaya alır."""
+        from django.utils import timezone
+        with self._lock:
+            st = self._states.get(key_id)
+            if st is None:
+                return
+            st.inflight = max(0, st.inflight - 1)
+            if error is None:
+                st.strikes = 0
+                st.pending_uses += 1
+                st.last_used = timezone.now()
+            elif is_rate_limit_error(error):
+                delay = _retry_after(error) or COOLDOWN_BASE * (2 ** st.strikes)
+                st.strikes += 1
+                st.cooldown_until = time.monotonic() + min(COOLDOWN_MAX, delay)
+                logger.warning(f"API anahtarı #{key_id} {min(COOLDOWN_MAX, delay):.0f}s soğumaya alındı")
+        if time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    # --- DB'ye toplu yazım ------------------------------------------------------
+    def flush(self):
+        """Birikmiş usage_count/last_used değerlerini DB'ye yazar (tek seferde bir thread)."""
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            with self._lock:
+                batch = {kid: (st.pending_uses, st.last_used)
+                         for kid, st in self._states.items() if st.pending_uses}
+                for kid in batch:
+                    self._states[kid].pending_uses = 0
+            if not batch:
+                return
+            from django.db.models import F
+            from ai_engine.models import APIKey
+            for kid, (uses, last_used) in batch.items():
+                try:
+                    APIKey.objects.filter(pk=kid).update(
+                        usage_count=F('usage_count') + uses, last_used=last_used)
+                except Exception as e:
+                    logger.warning(f"Anahtar #{kid} kullanım sayacı yazılamadı: {e}")
+                    with self._lock:
+                        self._states[kid].pending_uses += uses
+        finally:
+            self._flush_lock.release()
+
+
+scheduler = KeyScheduler()
+
+
+def _flush_at_exit():
+    try:
+        scheduler.flush()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_at_exit)
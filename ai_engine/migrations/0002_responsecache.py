@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 04:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key_hash', models.CharField(max_length=64, unique=True)),
+                ('service_name', models.CharField(max_length=100, verbose_name='Sağlayıcı')),
+                ('model_name', models.CharField(max_length=100, verbose_name='Model')),
+                ('response', models.TextField(verbose_name='Yanıt')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='İsabet')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Son Kullanım')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Geçerlilik Sonu')),
+            ],
+            options={
+                'verbose_name': 'AI Yanıt Önbelleği',
+                'verbose_name_plural': 'AI Yanıt Önbelleği',
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Provider(models.Model):
@@ -88,3 +89,27 @@ class APIKey(models.Model):
         verbose_name = "API Anahtarı"
         verbose_name_plural = "API Anahtarları"
         ordering = ['usage_count']  # en az kullanılan önce
+
+
+class ResponseCache(models.Model):
+    """
+    Deterministik AI çağrıları için kalıcı yanıt önbelleği (opt-in).
+    Anahtar: (servis, model, sistem prompt'u, prompt, parametreler) özeti.
+    Bkz. ai_engine.response_cache
+    """
+    key_hash = models.CharField(max_length=64, unique=True)
+    service_name = models.CharField(max_length=100, verbose_name="Sağlayıcı")
+    model_name = models.CharField(max_length=100, verbose_name="Model")
+    response = models.TextField(verbose_name="Yanıt")
+    hits = models.PositiveIntegerField(default=0, verbose_name="İsabet")
+    created_at = models.DateTimeField(auto_now_add=True)
+    # LRU: en uzun süre kullanılmayan kayıt önce silinir
+    last_used = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Son Kullanım")
+    expires_at = models.DateTimeField(db_index=True, verbose_name="Geçerlilik Sonu")
+
+    def __str__(self):
+        return f"{self.service_name}/{self.model_name} — {self.key_hash[:12]}"
+
+    class Meta:
+        verbose_name = "AI Yanıt Önbelleği"
+        verbose_name_plural = "AI Yanıt Önbelleği"
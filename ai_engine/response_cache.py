@@ -0,0 +1,114 @@
+"""
+ai_engine.response_cache — Deterministik AI çağrıları için kalıcı yanıt önbelleği.
+
+Aynı prompt sık tekrar eder (kategori seçimi, konu → anahtar kelime, aynı
+cümle/özet çifti için atıf kontrolü, örnek dizilerde bio-tool yorumları).
+generate_with_pool(..., cache=True) ile çağrı yeri bazında açılır; isabette
+ne ücretli çağrı ne de 2-20 sn gecikme olur.
+
+- Depo: veritabanı (ResponseCache modeli) — tüm süreçler/işçiler paylaşır.
+- TTL: settings.AI_RESPONSE_CACHE_TTL (sn) veya çağrıya özel cache_ttl.
+- Boyut: settings.AI_RESPONSE_CACHE_MAX_ENTRIES; aşılınca en uzun süredir
+  kullanılmayanlar (LRU) silinir.
+- stats(): süreç içi isabet/ıska sayaçları + kayıt sayısı.
+
+Önbellek hataları üretimi asla bozmaz (sessizce ıska sayılır).
+"""
+import hashlib
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = getattr(settings, 'AI_RESPONSE_CACHE_TTL', 7 * 24 * 3600)
+MAX_ENTRIES = getattr(settings, 'AI_RESPONSE_CACHE_MAX_ENTRIES', 5000)
+PRUNE_EVERY = 50                 # bu kadar yazımda bir süresi dolanları/fazlalığı temizle
+
+_stats = {'hits': 0, 'misses': 0, 'writes': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+        return _stats[name]
+
+
+def make_key(service_name, model_name, system_prompt, prompt, **params):
+    """Çağrıyı belirleyen her şeyin SHA-256 özeti."""
+    raw = json.dumps([service_name, model_name, system_prompt or '', prompt, params],
+                     sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get(key):
+    """Geçerli kayıt varsa yanıt metnini döndürür (LRU damgasını günceller), yoksa None."""
+    from ai_engine.models import ResponseCache
+    try:
+        now = timezone.now()
+        row = (ResponseCache.objects.filter(key_hash=key, expires_at__gt=now)
+               .values_list('pk', 'response').first())
+        if row:
+            ResponseCache.objects.filter(pk=row[0]).update(hits=F('hits') + 1, last_used=now)
+            _count('hits')
+            return row[1]
+    except Exception as e:
+        logger.warning(f"AI yanıt önbelleği okunamadı: {e}")
+    _count('misses')
+    return None
+
+
+def put(key, service_name, model_name, response, ttl=None):
+    """Yanıtı kaydeder; PRUNE_EVERY yazımda bir boyut/TTL temizliği yapar."""
+    if not response:
+        return
+    from ai_engine.models import ResponseCache
+    try:
+        now = timezone.now()
+        ResponseCache.objects.update_or_create(
+            key_hash=key,
+            defaults={'service_name': service_name, 'model_name': model_name or '',
+                      'response': response, 'last_used': now,
+                      'expires_at': now + timedelta(seconds=ttl or DEFAULT_TTL)})
+        if _count('writes') % PRUNE_EVERY == 0:
+            prune()
+    except Exception as e:
+        logger.warning(f"AI yanıt önbelleğine yazılamadı: {e}")
+
+
+def prune(max_entries=None):
+    """Süresi dolanları, sonra MAX_ENTRIES üstündeki en eski kullanılanları siler."""
+    from ai_engine.models import ResponseCache
+    limit = max_entries or MAX_ENTRIES
+    removed, _ = ResponseCache.objects.filter(expires_at__lte=timezone.now()).delete()
+    excess = ResponseCache.objects.count() - limit
+    if excess > 0:
+        old_ids = list(ResponseCache.objects.order_by('last_used', 'id')
+                       .values_list('id', flat=True)[:excess])
+        removed += ResponseCache.objects.filter(id__in=old_ids).delete()[0]
+    return removed
+
+
+def clear():
+    from ai_engine.models import ResponseCache
+    return ResponseCache.objects.all().delete()[0]
+
+
+def stats():
+    """{'hits', 'misses', 'writes', 'hit_rate', 'entries'} — sayaçlar bu süreç içindir."""
+    from ai_engine.models import ResponseCache
+    with _stats_lock:
+        out = dict(_stats)
+    total = out['hits'] + out['misses']
+    out['hit_rate'] = round(out['hits'] / total, 3) if total else None
+    try:
+        out['entries'] = ResponseCache.objects.count()
+    except Exception:
+        out['entries'] = None
+    return out
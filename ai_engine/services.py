@@ -16,6 +16,23 @@ Ana giriş noktaları:
   generate_json_with_pool(...) -> (dict, key)
       Yanıtı JSON olarak ayrıştırır.
 
+  generate_with_pool(..., cache=True) -> (str, key | None)
+      Deterministik çağrılar için kalıcı yanıt önbelleği (bkz. response_cache);
+      önbellekten dönen yanıtta anahtar None'dır.
+
+  generate_many(prompts, ...) -> [(str, key) | Exception, ...]
+      Birbirinden bağımsız prompt'ları eşzamanlı çalıştırır (sıra korunur).
+      agenerate_many(...) aynısının asyncio (ASGI) sürümüdür.
+
+  stream_with_pool(prompt, ...) -> GenerationStream
+      Yanıtı parça parça (streaming) verir; uzun üretimlerde ilk içerik
+      saniyeler içinde gelir. Kesilen JSON repair_truncated_json ile onarılır.
+
+İstemciler (genai.Client / openai.OpenAI / anthropic.Anthropic) her çağrıda
+yeniden kurulmaz: get_client() (servis, anahtar) başına tek istemciyi saklar,
+böylece HTTP bağlantı havuzu (keep-alive, TLS oturumu) çağrılar ve thread'ler
+arasında paylaşılır.
+
 Örnek (bio-tool, model sabit):
     from ai_engine.services import generate_with_pool
     text, key = generate_with_pool("Özetle...", service_name="Google Gemini",
@@ -26,9 +43,15 @@ Ana giriş noktaları:
                                    model_name=secilen_model)
 """
 import json
+import logging
 import re
+import threading
+import time
 from datetime import date # Yeni eklendi
 
+from ai_engine import response_cache
+from ai_engine.key_scheduler import MAX_RATE_WAIT, scheduler
+
 try:
     # Yeni resmi SDK (google-genai). Eski 'google-generativeai' kullanimdan kaldirildi.
     from google import genai
@@ -43,9 +66,82 @@ try:
 except Exception:
     anthropic = None
 
+logger = logging.getLogger(__name__)
+
 
 DEFAULT_MAX_TOKENS = 8192
 DEFAULT_TEMPERATURE = 0.7
+# Bu süre kullanılmayan istemci kayıttan düşürülür (bağlantıları GC ile kapanır)
+CLIENT_IDLE_SECONDS = 600
+
+# Süreç genelinde aynı anda uçuşta olabilecek istek sınırı (sağlayıcı / anahtar başına).
+# generate_many ile yapılan fan-out bu sınırlara takılır; sağlayıcıyı 429'a boğmaz.
+PROVIDER_CONCURRENCY = 8
+KEY_CONCURRENCY = 4
+
+# (service_name, api_key) -> [istemci, son kullanım (monotonic)]
+_clients = {}
+_clients_lock = threading.Lock()
+
+_slots = {}       # ('provider', ad) / ('key', id) -> BoundedSemaphore
+_slots_lock = threading.Lock()
+
+
+def _slot(kind, ident):
+    with _slots_lock:
+        sem = _slots.get((kind, ident))
+        if sem is None:
+            limit = PROVIDER_CONCURRENCY if kind == 'provider' else KEY_CONCURRENCY
+            sem = _slots[(kind, ident)] = threading.BoundedSemaphore(limit)
+        return sem
+
+
+def _build_client(service_name, api_key):
+    if service_name == 'Google Gemini':
+        if genai is None:
+            raise RuntimeError("google-genai kurulu degil. Kur: pip install google-genai")
+        return genai.Client(api_key=api_key)
+    elif service_name == 'OpenAI':
+        if openai is None:
+            raise RuntimeError("openai kurulu değil.")
+        return openai.OpenAI(api_key=api_key)
+    elif service_name == 'Anthropic':
+        if anthropic is None:
+            raise RuntimeError("anthropic kurulu değil.")
+        return anthropic.Anthropic(api_key=api_key)
+    raise ValueError(f"Bilinmeyen servis: {service_name}")
+
+
+def get_client(service_name, api_key):
+    """(servis, anahtar) için önbellekteki SDK istemcisini döndürür, yoksa kurar.
+
+    SDK istemcileri thread-safe'tir; aynı istemci paralel çağrılarda paylaşılır.
+    Uzun süre boşta kalanlar her erişimde temizlenir. Düşürülen istemci
+    kapatılmaz, yalnızca referansı bırakılır — o an onu kullanan bir çağrı
+    yarıda kesilmesin.
+    """
+    now = time.monotonic()
+    cache_key = (service_name, api_key)
+    with _clients_lock:
+        for k in [k for k, (_c, used) in _clients.items() if now - used > CLIENT_IDLE_SECONDS]:
+            del _clients[k]
+        entry = _clients.get(cache_key)
+        if entry is None:
+            entry = _clients[cache_key] = [_build_client(service_name, api_key), now]
+        else:
+            entry[1] = now
+        return entry[0]
+
+
+def invalidate_clients(api_key=None):
+    """Anahtara ait (api_key=None ise tüm) istemcileri düşürür.
+
+    APIKey pasifleştirildiğinde/değiştirildiğinde sinyalle çağrılır; anahtar
+    yeniden aktif olursa istemci sıfırdan kurulur.
+    """
+    with _clients_lock:
+        for k in [k for k in _clients if api_key is None or k[1] == api_key]:
+            del _clients[k]
 
 
 def _call_service(service_name, model_name, api_key, prompt,
@@ -57,51 +153,106 @@ def _call_service(service_name, model_name, api_key, prompt,
     thinking_level: yalnizca Gemini 3.x modelleri icin gecerli dusunme seviyesi
         ('minimal' | 'low' | 'medium' | 'high'). None ise model varsayilani.
     """
+    client = get_client(service_name, api_key)
     if service_name == 'Google Gemini':
-        if genai is None:
-            raise RuntimeError("google-genai kurulu degil. Kur: pip install google-genai")
-        client = genai.Client(api_key=api_key)
-        # Gemini 3.x: temperature/top_p/top_k onerilmiyor (varsayilana gore optimize);
-        # dusunme thinking_budget yerine thinking_level ile ayarlanir.
-        is_g3 = bool(model_name) and model_name.startswith("gemini-3")
-        cfg = {"max_output_tokens": max_tokens}
-        if not is_g3:
-            cfg["temperature"] = temperature
-        if system_prompt:
-            cfg["system_instruction"] = system_prompt
-        if safety_settings:
-            cfg["safety_settings"] = safety_settings
-        if is_g3 and thinking_level:
-            cfg["thinking_config"] = {"thinking_level": thinking_level}
         response = client.models.generate_content(
-            model=model_name, contents=prompt, config=cfg)
+            model=model_name, contents=prompt,
+            config=_gemini_config(model_name, system_prompt, max_tokens, temperature,
+                                  safety_settings, thinking_level))
         return response.text
 
     elif service_name == 'OpenAI':
-        if openai is None:
-            raise RuntimeError("openai kurulu değil.")
-        client = openai.OpenAI(api_key=api_key)
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
         response = client.chat.completions.create(
-            model=model_name, messages=messages, max_tokens=max_tokens,
-            temperature=temperature)
+            model=model_name, messages=_openai_messages(prompt, system_prompt),
+            max_tokens=max_tokens, temperature=temperature)
         return response.choices[0].message.content
 
     elif service_name == 'Anthropic':
-        if anthropic is None:
-            raise RuntimeError("anthropic kurulu değil.")
-        client = anthropic.Anthropic(api_key=api_key)
-        kwargs = {"model": model_name, "max_tokens": max_tokens,
-                  "temperature": temperature,
-                  "messages": [{"role": "user", "content": prompt}]}
-        if system_prompt:
-            kwargs["system"] = system_prompt
-        response = client.messages.create(**kwargs)
+        response = client.messages.create(
+            **_anthropic_kwargs(model_name, prompt, system_prompt, max_tokens, temperature))
         return response.content[0].text
 
+
+def _gemini_config(model_name, system_prompt, max_tokens, temperature,
+                   safety_settings, thinking_level):
+    # Gemini 3.x: temperature/top_p/top_k onerilmiyor (varsayilana gore optimize);
+    # dusunme thinking_budget yerine thinking_level ile ayarlanir.
+    is_g3 = bool(model_name) and model_name.startswith("gemini-3")
+    cfg = {"max_output_tokens": max_tokens}
+    if not is_g3:
+        cfg["temperature"] = temperature
+    if system_prompt:
+        cfg["system_instruction"] = system_prompt
+    if safety_settings:
+        cfg["safety_settings"] = safety_settings
+    if is_g3 and thinking_level:
+        cfg["thinking_config"] = {"thinking_level": thinking_level}
+    return cfg
+
+
+def _openai_messages(prompt, system_prompt):
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def _anthropic_kwargs(model_name, prompt, system_prompt, max_tokens, temperature):
+    kwargs = {"model": model_name, "max_tokens": max_tokens,
+              "temperature": temperature,
+              "messages": [{"role": "user", "content": prompt}]}
+    if system_prompt:
+        kwargs["system"] = system_prompt
+    return kwargs
+
+
+def _stream_service(service_name, model_name, api_key, prompt,
+                    system_prompt=None, max_tokens=DEFAULT_MAX_TOKENS,
+                    temperature=DEFAULT_TEMPERATURE, safety_settings=None,
+                    thinking_level=None):
+    """_call_service'in akan (streaming) sürümü: metin parçalarını geldikçe yield eder.
+
+    Üreteç bitince dönüş değeri (StopIteration.value) yanıtın max_tokens
+    sınırında KESİLİP kesilmediğidir (True/False):
+        truncated = yield from _stream_service(...)
+    """
+    client = get_client(service_name, api_key)
+    if service_name == 'Google Gemini':
+        truncated = False
+        for chunk in client.models.generate_content_stream(
+                model=model_name, contents=prompt,
+                config=_gemini_config(model_name, system_prompt, max_tokens, temperature,
+                                      safety_settings, thinking_level)):
+            if chunk.text:
+                yield chunk.text
+            for cand in (chunk.candidates or []):
+                if 'MAX_TOKENS' in str(getattr(cand, 'finish_reason', '') or ''):
+                    truncated = True
+        return truncated
+
+    elif service_name == 'OpenAI':
+        truncated = False
+        with client.chat.completions.create(
+                model=model_name, messages=_openai_messages(prompt, system_prompt),
+                max_tokens=max_tokens, temperature=temperature, stream=True) as stream:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta and choice.delta.content:
+                    yield choice.delta.content
+                if choice.finish_reason == 'length':
+                    truncated = True
+        return truncated
+
+    elif service_name == 'Anthropic':
+        with client.messages.stream(
+                **_anthropic_kwargs(model_name, prompt, system_prompt, max_tokens,
+                                    temperature)) as stream:
+            for text in stream.text_stream:
+                yield text
+            return stream.get_final_message().stop_reason == 'max_tokens'
     raise ValueError(f"Bilinmeyen servis: {service_name}")
 
 
@@ -120,60 +271,191 @@ def _resolve_model_name(provider, model_name=None):
     return first.model_name
 
 
+def _next_key(service_name, pending):
+    """pending'den jeton alınabilen ilk anahtarı çıkarıp döndürür (uçuş sayacı artar).
+
+    Adayların hepsi hız sınırındaysa en erken jetonu bekler; bekleme
+    MAX_RATE_WAIT'i aşacaksa None döner.
+    """
+    while pending:
+        key_obj = next((k for k in pending if scheduler.try_acquire(service_name, k.id)), None)
+        if key_obj is not None:
+            pending.remove(key_obj)
+            return key_obj
+        wait = min(scheduler.wait_time(service_name, k.id) for k in pending)
+        if wait > MAX_RATE_WAIT:
+            return None
+        time.sleep(wait)
+    return None
+
+
 def generate_with_pool(prompt, service_name="Google Gemini", model_name=None,
                        system_prompt=None, max_tokens=DEFAULT_MAX_TOKENS,
                        temperature=DEFAULT_TEMPERATURE, safety_settings=None,
-                       thinking_level=None):
+                       thinking_level=None, cache=False, cache_ttl=None):
     """
     Havuz/fallback ile üretir.
 
-    İlgili sağlayıcının aktif anahtarlarını 'en az kullanılan önce' sırasıyla
-    dener. Bir anahtar hata verirse (kota/429) sıradakine geçer. Başarılı
-    olanın usage_count'u artırılır.
+    İlgili sağlayıcının aktif anahtarlarını key_scheduler'ın önerdiği sırayla
+    (uçuşta en az istek, sonra 'en az kullanılan önce') dener. Kota/429 sonrası
+    soğumadaki anahtarlar hiç denenmez; hız sınırı (jeton kovası) dolan anahtar
+    atlanır. Bir anahtar hata verirse sıradakine geçer. Başarılar sayılır ve
+    usage_count/last_used DB'ye periyodik toplu yazılır.
 
     model_name verilmezse sağlayıcının ilk aktif modeli kullanılır.
 
+    cache=True: aynı (servis, model, sistem prompt'u, prompt, parametreler) için
+    daha önce alınmış yanıt response_cache'ten döner (used_key=None); yoksa
+    üretilen yanıt cache_ttl (sn) boyunca saklanır.
+
     Döner: (text, used_key)
     """
-    from django.utils import timezone
-    from ai_engine.models import Provider
-
-    try:
-        provider = Provider.objects.get(service_name=service_name, is_active=True)
-    except Provider.DoesNotExist:
-        raise ValueError(f"'{service_name}' adlı aktif bir sağlayıcı yok.")
-
+    provider, keys = scheduler.pool(service_name)
     resolved_model = _resolve_model_name(provider, model_name)
 
-    keys = list(provider.api_keys.filter(is_active=True).order_by('usage_count', 'id'))
+    cache_key = None
+    if cache:
+        cache_key = response_cache.make_key(
+            service_name, resolved_model, system_prompt, prompt, max_tokens=max_tokens,
+            temperature=temperature, safety_settings=safety_settings,
+            thinking_level=thinking_level)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached, None
     if not keys:
         raise ValueError(f"'{service_name}' sağlayıcısında hiç aktif anahtar yok.")
 
+    pending = scheduler.candidates(service_name, keys)
+    if not pending:
+        # Hepsi kota sonrası beklemede — boşuna istek atma, fallback zinciri devam etsin
+        raise RuntimeError(
+            f"'{service_name}' havuzundaki {len(keys)} anahtarın tümü kota/429 sonrası beklemede.")
+
     last_error = None
-    for key_obj in keys:
+    tried = 0
+    while pending:
+        key_obj = _next_key(service_name, pending)
+        if key_obj is None:
+            break
+        tried += 1
+        error = None
         try:
-            text = _call_service(
-                service_name, resolved_model, key_obj.key,
-                prompt, system_prompt, max_tokens, temperature, safety_settings,
-                thinking_level)
-            key_obj.usage_count = (key_obj.usage_count or 0) + 1
-            key_obj.last_used = timezone.now()
-            key_obj.save(update_fields=['usage_count', 'last_used'])
-            return text, key_obj
+            with _slot('provider', service_name), _slot('key', key_obj.id):
+                text = _call_service(
+                    service_name, resolved_model, key_obj.key,
+                    prompt, system_prompt, max_tokens, temperature, safety_settings,
+                    thinking_level)
         except Exception as e:
-            last_error = e
+            error = last_error = e
             print(f"[ai_engine] {service_name}/{resolved_model} "
                   f"anahtar #{key_obj.id} başarısız: {e}")
-            continue
+        finally:
+            scheduler.release(key_obj.id, error)
+        if error is None:
+            if cache_key:
+                response_cache.put(cache_key, service_name, resolved_model, text, cache_ttl)
+            return text, key_obj
 
     raise RuntimeError(
-        f"Havuzdaki {len(keys)} anahtarın tümü başarısız oldu. Son hata: {last_error}")
+        f"Havuzdaki {len(keys)} anahtardan denenen {tried} anahtarın tümü başarısız oldu "
+        f"veya hız sınırında. Son hata: {last_error}")
+
+
+class GenerationStream:
+    """stream_with_pool'un döndürdüğü yinelenebilir akış.
+
+    Üzerinde dönüldükçe metin parçalarını verir. Akış bitince (veya yarıda
+    hata ile kesilince):
+        .text       — o ana kadar gelen tüm metin
+        .used_key   — yanıtı üreten APIKey (ilk parça gelince belli olur)
+        .truncated  — yanıt max_tokens sınırında kesildiyse True
+    İlk parça gelmeden başarısız olan anahtar yerine havuzdaki sıradaki
+    denenir; parça geldikten sonraki hata (bağlantı kopması vb.) çağırana
+    iletilir — elindeki kısmi metni koruyup devam ettirebilsin diye.
+    """
+
+    def __init__(self, service_name, model_name, keys, call_args):
+        self.service_name = service_name
+        self.model_name = model_name
+        self.used_key = None
+        self.truncated = False
+        self._keys = keys
+        self._call_args = call_args
+        self._parts = []
+
+    @property
+    def text(self):
+        return ''.join(self._parts)
+
+    def __iter__(self):
+        pending = scheduler.candidates(self.service_name, self._keys)
+        if not pending:
+            raise RuntimeError(
+                f"'{self.service_name}' havuzundaki {len(self._keys)} anahtarın tümü "
+                "kota/429 sonrası beklemede.")
+        last_error = None
+        while pending:
+            key_obj = _next_key(self.service_name, pending)
+            if key_obj is None:
+                break
+            error = None
+            try:
+                with _slot('provider', self.service_name), _slot('key', key_obj.id):
+                    chunks = _stream_service(self.service_name, self.model_name,
+                                             key_obj.key, *self._call_args)
+                    while True:
+                        try:
+                            part = next(chunks)
+                        except StopIteration as stop:
+                            self.truncated = bool(stop.value)
+                            break
+                        self.used_key = key_obj
+                        self._parts.append(part)
+                        yield part
+            except GeneratorExit:
+                raise
+            except Exception as e:
+                error = last_error = e
+                logger.warning(f"{self.service_name}/{self.model_name} "
+                               f"anahtar #{key_obj.id} akış hatası: {e}")
+            finally:
+                scheduler.release(key_obj.id, error)
+            if error is None:
+                return
+            if self._parts:
+                raise error   # kısmi çıktı var: anahtar değiştirip baştan üretme
+        raise RuntimeError(
+            f"'{self.service_name}' havuzunda akış başlatılamadı. Son hata: {last_error}")
+
+
+def stream_with_pool(prompt, service_name="Google Gemini", model_name=None,
+                     system_prompt=None, max_tokens=DEFAULT_MAX_TOKENS,
+                     temperature=DEFAULT_TEMPERATURE, safety_settings=None,
+                     thinking_level=None):
+    """generate_with_pool'un akan sürümü; GenerationStream döndürür.
+
+    Anahtar seçimi, hız sınırı ve eşzamanlılık sınırları generate_with_pool
+    ile aynıdır. Yanıt önbelleğe alınmaz (uzun, deterministik olmayan üretim içindir).
+
+        stream = stream_with_pool(prompt, service_name="OpenAI", model_name="gpt-4o")
+        for part in stream:
+            taslaga_ekle(part)
+        if stream.truncated: ...   # devamını iste (bkz. repair_truncated_json)
+    """
+    provider, keys = scheduler.pool(service_name)
+    resolved_model = _resolve_model_name(provider, model_name)
+    if not keys:
+        raise ValueError(f"'{service_name}' sağlayıcısında hiç aktif anahtar yok.")
+    return GenerationStream(
+        service_name, resolved_model, keys,
+        (prompt, system_prompt, max_tokens, temperature, safety_settings, thinking_level))
 
 
 def generate_with_fallback(prompt, service_name="Google Gemini", model_name=None,
                            system_prompt=None, max_tokens=DEFAULT_MAX_TOKENS,
                            temperature=DEFAULT_TEMPERATURE, safety_settings=None,
-                           thinking_level=None, cross_provider=True):
+                           thinking_level=None, cross_provider=True, cache=False,
+                           cache_ttl=None):
     """generate_with_pool'u MODEL FALLBACK zinciriyle calistirir.
 
     Once tercih edilen (service_name, model_name) denenir; o modelin tum
@@ -195,7 +477,7 @@ def generate_with_fallback(prompt, service_name="Google Gemini", model_name=None
                 prompt, service_name=svc, model_name=mdl,
                 system_prompt=system_prompt, max_tokens=max_tokens,
                 temperature=temperature, safety_settings=safety_settings,
-                thinking_level=thinking_level)
+                thinking_level=thinking_level, cache=cache, cache_ttl=cache_ttl)
         except Exception as e:
             last_error = e
             continue
@@ -203,6 +485,57 @@ def generate_with_fallback(prompt, service_name="Google Gemini", model_name=None
         f"Tum modeller/saglayicilar basarisiz oldu. Son hata: {last_error}")
 
 
+def generate_many(prompts, service_name="Google Gemini", model_name=None,
+                  fallback=False, cross_provider=True, max_workers=None, **kwargs):
+    """Birbirinden bağımsız prompt'ları eşzamanlı üretir, sonuçları SIRAYLA döndürür.
+
+    prompts: str listesi; bir eleman dict ise ({'prompt': ..., 'max_tokens': ...})
+        o prompt için ek/değişen parametreler olarak kullanılır.
+    fallback=True ise her prompt generate_with_fallback ile (model zinciri),
+        değilse generate_with_pool ile (anahtar havuzu) çalışır.
+    Eşzamanlılık PROVIDER_CONCURRENCY / KEY_CONCURRENCY ile sınırlıdır —
+    max_workers yalnızca thread sayısını belirler.
+
+    Döner: [(text, used_key) veya Exception, ...] — hata veren prompt tüm
+    partiyi düşürmez; çağıran isinstance(r, Exception) ile ayırt eder.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import connections
+
+    items = []
+    for p in prompts:
+        params = dict(kwargs)
+        if isinstance(p, dict):
+            params.update(p)
+        else:
+            params['prompt'] = p
+        items.append(params)
+    if not items:
+        return []
+
+    def _one(params):
+        try:
+            if fallback:
+                return generate_with_fallback(
+                    service_name=service_name, model_name=model_name,
+                    cross_provider=cross_provider, **params)
+            return generate_with_pool(service_name=service_name, model_name=model_name, **params)
+        except Exception as e:
+            return e
+        finally:
+            connections.close_all()  # bu thread'in DB bağlantısı sızmasın
+
+    workers = max_workers or min(len(items), PROVIDER_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_one, items))
+
+
+async def agenerate_many(prompts, **kwargs):
+    """generate_many'nin asyncio sürümü (ASGI görünümleri için); olay döngüsünü bloklamaz."""
+    from asgiref.sync import sync_to_async
+    return await sync_to_async(generate_many, thread_sensitive=False)(prompts, **kwargs)
+
+
 def _parse_json(text):
     """```json fence'lerini temizleyip ilk geçerli JSON nesnesini döndürür."""
     cleaned = text.strip()
@@ -214,11 +547,80 @@ def _parse_json(text):
     return json.loads(cleaned)
 
 
+def repair_truncated_json(text):
+    """Yarıda kesilmiş bir JSON nesnesini geçerli hale getirip dict döndürür.
+
+    Akış kesildiğinde (max_tokens, bağlantı kopması) eldeki metni atmamak için:
+      - açık kalan bir DEĞER string'i kapatılır (yarım kaçış dizisi atılır),
+      - yarım anahtar, değersiz "anahtar": ve yarım sayı/literal geri alınır,
+      - açık {} / [] kapatılır.
+    Metin zaten tam bir nesne içeriyorsa o nesne döner. Onarılamazsa ValueError.
+    """
+    s = re.sub(r'^```(?:json)?', '', text.strip()).lstrip()
+    start = s.find('{')
+    if start < 0:
+        raise ValueError("JSON nesnesi başlangıcı yok")
+    s = s[start:]
+
+    stack = []          # açık kapların kapanış karakterleri
+    expect_key = []     # her kap için: sıradaki string bir anahtar mı
+    in_str = esc = str_is_key = False
+    safe = (0, [])      # (kesim noktası, o andaki stack) — buraya kadar kesip kapatmak geçerli
+    for i, ch in enumerate(s):
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == '\\':
+                esc = True
+            elif ch == '"':
+                in_str = False
+                if not str_is_key:
+                    safe = (i + 1, list(stack))
+            continue
+        if ch == '"':
+            in_str = True
+            str_is_key = bool(expect_key) and expect_key[-1]
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            expect_key.append(ch == '{')
+            safe = (i + 1, list(stack))
+        elif ch in '}]':
+            stack.pop()
+            expect_key.pop()
+            if not stack:
+                return json.loads(s[:i + 1])
+            safe = (i + 1, list(stack))
+        elif ch == ':':
+            expect_key[-1] = False
+        elif ch == ',':
+            safe = (i, list(stack))
+            if stack[-1] == '}':
+                expect_key[-1] = True
+
+    if in_str and not str_is_key:
+        body = s[:-1] if esc else re.sub(r'\\u[0-9a-fA-F]{0,3}$', '', s)
+        candidate = body + '"' + ''.join(reversed(stack))
+    else:
+        cut, closers = safe
+        candidate = s[:cut].rstrip().rstrip(',') + ''.join(reversed(closers))
+    data = json.loads(candidate)
+    if not isinstance(data, dict):
+        raise ValueError("Onarılan JSON bir nesne değil")
+    return data
+
+
 def generate_json_with_pool(prompt, service_name="Google Gemini", model_name=None, **kwargs):
-    """generate_with_pool() çağırır, (dict, key) döndürür."""
+    """generate_with_pool() çağırır, (dict, key) döndürür.
+
+    Yanıt max_tokens'ta kesildiği için ayrıştırılamazsa yeniden üretmek yerine
+    repair_truncated_json ile onarılır.
+    """
     text, key_obj = generate_with_pool(
         prompt, service_name=service_name, model_name=model_name, **kwargs)
-    return _parse_json(text), key_obj
+    try:
+        return _parse_json(text), key_obj
+    except ValueError:
+        return repair_truncated_json(text), key_obj
 
 
 def get_fallback_models(preferred_service=None, preferred_model=None, cross_provider=False):
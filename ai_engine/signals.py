@@ -0,0 +1,31 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .key_scheduler import scheduler
+from .models import APIKey, Provider
+from .services import invalidate_clients
+
+
+@receiver(pre_save, sender=APIKey)
+def handle_api_key_change(sender, instance, **kwargs):
+    """Anahtar pasifleştirilir veya değiştirilirse önbellekteki SDK istemcisini düşür."""
+    update_fields = kwargs.get('update_fields')
+    if not instance.pk or (update_fields and not {'key', 'is_active'} & set(update_fields)):
+        return  # usage_count/last_used güncellemesi — ek sorgu yapma
+    old = APIKey.objects.filter(pk=instance.pk).values_list('key', 'is_active').first()
+    if old and (old[0] != instance.key or not instance.is_active):
+        invalidate_clients(old[0])
+
+
+@receiver(post_delete, sender=APIKey)
+def handle_api_key_delete(sender, instance, **kwargs):
+    invalidate_clients(instance.key)
+
+
+@receiver(post_save, sender=APIKey)
+@receiver(post_delete, sender=APIKey)
+@receiver(post_save, sender=Provider)
+@receiver(post_delete, sender=Provider)
+def handle_pool_change(sender, **kwargs):
+    """Anahtar/sağlayıcı eklenince, silinince veya değişince havuz önbelleğini yenile."""
+    scheduler.invalidate_pool()
@@ -1,6 +1,7 @@
 import logging
 import re
 import json
+import time
 
 from django.contrib.auth.models import User
 from django.db import transaction
@@ -10,10 +11,18 @@ from blog.pubmed_sources import collect_pubmed_sources_for_topic
 from blog.reference_check import collect_real_sources_for_topic, remove_orphan_references, clean_article_references
 from blog.models import create_notification
 from billing.services import charge
-from ai_engine.services import generate_with_pool, generate_json_with_pool, get_fallback_models, get_base_prompt
+from ai_engine.services import (generate_with_pool, get_fallback_models, get_base_prompt,
+                                _parse_json, repair_truncated_json, stream_with_pool)
 
 logger = logging.getLogger(__name__)
 
+# Akan üretimde taslak makale en fazla bu sıklıkla (sn) güncellenir
+DRAFT_SAVE_INTERVAL = 5.0
+# Yarıda kesilen JSON için en fazla kaç kez "kaldığın yerden devam et" istenir
+MAX_RESUMES = 2
+# Devam isteğinde modele gösterilen önceki çıktının son kısmı (karakter)
+RESUME_TAIL_CHARS = 4000
+
 def _normalize_json_article(data, real_sources=None):
     """
     AI'dan gelen JSON makale nesnesini, kaydetme akışının beklediği ai_data
@@ -122,21 +131,23 @@ def _filter_sources_by_crossref(real_sources, timeout=10):
     if not real_sources:
         return real_sources
     try:
-        from blog.reference_check import verify_single_reference
+        from blog.reference_check import verify_many
     except Exception:
         return real_sources
+    ref_texts = [(str(s.get('doi') or '').strip() or str(s.get('citation') or '').strip())
+                 for s in real_sources]
+    # Doğrulanacak metni olanlar CrossRef sınırları içinde paralel sorgulanır
+    todo = [t for t in ref_texts if t]
+    try:
+        statuses = dict(zip(todo, (r.get('status') for r in verify_many(todo, timeout=timeout))))
+    except Exception:
+        statuses = {}
     kept = []
-    for s in real_sources:
-        ref_text = (str(s.get('doi') or '').strip()
-                    or str(s.get('citation') or '').strip())
+    for s, ref_text in zip(real_sources, ref_texts):
         if not ref_text:
             kept.append(s)          # doğrulanacak bir şey yok → tut
             continue
-        try:
-            status = verify_single_reference(ref_text, timeout=timeout).get('status')
-        except Exception:
-            status = 'unreachable'
-        if status == 'not_found':
+        if statuses.get(ref_text, 'unreachable') == 'not_found':
             logger.info(f"CrossRef'te bulunamadı, kaynak atıldı: {ref_text[:80]}")
             continue
         kept.append(s)
@@ -228,7 +239,7 @@ def resolve_category(ai_category_name, title="", abstract=""):
                 try:
                     result, _key = generate_with_pool(
                         prompt, service_name=svc, model_name=mdl,
-                        max_tokens=256, temperature=0.2)
+                        max_tokens=256, temperature=0.2, cache=True)
                     if result:
                         break
                 except Exception:
@@ -260,6 +271,139 @@ def resolve_category(ai_category_name, title="", abstract=""):
             or Category.objects.create(name=name))
 
 
+class _DraftWriter:
+    """Akan JSON çıktısını 'beklemede' durumlu taslak GeneratedArticle'a yazar.
+
+    İlk okunabilir içerik gelince taslak oluşturulur, sonra en fazla
+    DRAFT_SAVE_INTERVAL saniyede bir güncellenir (kısmi JSON
+    repair_truncated_json ile onarılarak). Taslak yayınlanmaz; üretim bitince
+    aynı kayıt tamamlanır, başarısız olursa 'hata' durumunda kısmi içerikle kalır.
+    """
+
+    def __init__(self, user, request_text, topic):
+        self.user = user
+        self.request_text = request_text
+        self.topic = topic
+        self.article_id = None
+        self._last_save = 0.0
+
+    def due(self):
+        return time.monotonic() - self._last_save >= DRAFT_SAVE_INTERVAL
+
+    def save(self, text):
+        self._last_save = time.monotonic()
+        try:
+            data = repair_truncated_json(text)
+        except ValueError:
+            return
+        fields = {
+            'title': (str(data.get('title') or '').strip()
+                      or f"Taslak: {self.topic}")[:255],
+            'english_abstract': str(data.get('english_abstract') or ''),
+            'turkish_abstract': str(data.get('turkish_abstract') or ''),
+            'keywords': str(data.get('keywords') or '')[:255],
+            'full_content': str(data.get('content') or ''),
+        }
+        try:
+            if self.article_id:
+                GeneratedArticle.objects.filter(pk=self.article_id).update(**fields)
+            elif fields['full_content'] or data.get('title'):
+                self.article_id = GeneratedArticle.objects.create(
+                    owner=self.user, user_request=self.request_text, status='beklemede',
+                    is_published=False, **fields).id
+        except Exception as e:
+            logger.warning(f"Taslak makale kaydedilemedi: {e}")
+
+    def fail(self):
+        if self.article_id:
+            GeneratedArticle.objects.filter(pk=self.article_id).update(status='hata')
+
+
+def _resume_prompt(prompt, partial):
+    """Kesilen JSON yanıtının devamını isteyen prompt."""
+    return (f"{prompt}\n\n---\nBu isteğe verdiğin JSON yanıtı yarıda kesildi. Yanıtın "
+            "SON kısmı aşağıda. Tam olarak kaldığın karakterden devam et: önceki metni "
+            "TEKRARLAMA, açıklama veya ``` ekleme, yalnızca devamını yaz ve JSON "
+            "nesnesini kapat.\n\n<<<KESİLEN YANITIN SONU>>>\n"
+            f"{partial[-RESUME_TAIL_CHARS:]}")
+
+
+def _merge_continuation(text, cont, max_overlap=400):
+    """Devam metnini ekler; model önceki metnin sonunu tekrarladıysa çakışmayı atar."""
+    cont = re.sub(r'^\s*```(?:json)?\s*', '', cont)
+    cont = re.sub(r'\s*```\s*$', '', cont)
+    for k in range(min(max_overlap, len(cont), len(text)), 7, -1):
+        if text.endswith(cont[:k]):
+            return text + cont[k:]
+    return text + cont
+
+
+def _stream_json_article(model_chain, prompt, system_prompt, max_tokens, draft):
+    """JSON makaleyi akan modda üretir; kesilirse devam ettirir, olmazsa onarır.
+
+    Zincirdeki ilk içerik üreten model kullanılır. Yanıt max_tokens'ta ya da
+    bağlantı koptuğu için yarım kalırsa aynı modelden MAX_RESUMES kez devamı
+    istenir (baştan yeniden üretmek yerine). Hâlâ geçerli JSON değilse
+    repair_truncated_json ile eldeki kısım kurtarılır.
+
+    Döner: (dict | None, used_key, last_error)
+    """
+    text, used_key, last_error = '', None, None
+    complete, source = False, None
+    for svc, mdl in model_chain:
+        stream = None
+        try:
+            stream = stream_with_pool(prompt, service_name=svc, model_name=mdl,
+                                      system_prompt=system_prompt, max_tokens=max_tokens,
+                                      temperature=0.7)
+            for _part in stream:
+                if draft.due():
+                    draft.save(stream.text)
+            complete = not stream.truncated
+        except Exception as e:
+            last_error = e
+            logger.warning(f"JSON akış hatası ({svc}/{mdl}): {e}")
+        if stream is not None and stream.text:
+            text, used_key, source = stream.text, stream.used_key, (svc, mdl)
+            break
+    if not text:
+        return None, None, last_error
+
+    for attempt in range(MAX_RESUMES + 1):
+        if complete:
+            try:
+                return _parse_json(text), used_key, None
+            except ValueError:
+                break           # model bozuk JSON bitirdi: devam istemek anlamsız, onar
+        if attempt == MAX_RESUMES:
+            break
+        logger.info(f"JSON yanıtı yarım ({len(text)} karakter), devamı isteniyor "
+                    f"({attempt + 1}/{MAX_RESUMES})")
+        cont = None
+        try:
+            cont = stream_with_pool(_resume_prompt(prompt, text), service_name=source[0],
+                                    model_name=source[1], system_prompt=system_prompt,
+                                    max_tokens=max_tokens, temperature=0.7)
+            for _part in cont:
+                if draft.due():
+                    draft.save(_merge_continuation(text, cont.text))
+            complete = not cont.truncated
+        except Exception as e:
+            last_error = e
+            logger.warning(f"JSON devam akışı hatası ({source[0]}/{source[1]}): {e}")
+            complete = False
+        if cont is None or not cont.text:
+            break
+        text = _merge_continuation(text, cont.text)
+
+    try:
+        data = repair_truncated_json(text)
+        logger.info(f"Yarım JSON yanıtı onarıldı ({len(text)} karakter)")
+        return data, used_key, None
+    except ValueError as e:
+        return None, used_key, last_error or e
+
+
 def generate_article_task(
     user_id, request_text, interpreted_topic, word_count,
     selected_service, selected_model, lang
@@ -267,6 +411,7 @@ def generate_article_task(
     """
     Makale üretimini arka planda gerçekleştiren görev.
     """
+    draft = None
     try:
         user = User.objects.get(id=user_id)
         
@@ -359,19 +504,12 @@ def generate_article_task(
         last_error = None
         ai_data = None
 
-        # --- 1) ÖNCE JSON dene ---
-        for svc, mdl in model_chain:
-            try:
-                data, used_key = generate_json_with_pool(
-                    json_prompt, service_name=svc, model_name=mdl,
-                    system_prompt=json_system, max_tokens=max_tokens, temperature=0.7)
-                if isinstance(data, dict) and (data.get('content') or '').strip():
-                    ai_data = _normalize_json_article(data, real_sources)
-                    break
-            except Exception as e:
-                last_error = e
-                logger.warning(f"JSON üretim hatası ({svc}/{mdl}): {e}")
-                continue
+        # --- 1) ÖNCE JSON dene (akan mod: içerik geldikçe taslağa yazılır) ---
+        draft = _DraftWriter(user, request_text, interpreted_topic)
+        data, used_key, last_error = _stream_json_article(
+            model_chain, json_prompt, json_system, max_tokens, draft)
+        if isinstance(data, dict) and (str(data.get('content') or '')).strip():
+            ai_data = _normalize_json_article(data, real_sources)
 
         # --- 2) JSON başarısızsa: 8-bölüm formatına düş ---
         if not ai_data:
@@ -399,20 +537,22 @@ def generate_article_task(
                 abstract=(ai_data.get("turkish_abstract") or ai_data.get("english_abstract") or ""),
             )
 
-            new_article = GeneratedArticle.objects.create(
-                owner=user,
-                user_request=request_text,
-                title=ai_data.get("title"),
-                category=category_obj,
-                keywords=ai_data.get("keywords", ""),
-                english_abstract=ai_data.get("english_abstract"),
-                turkish_abstract=ai_data.get("turkish_abstract"),
-                full_content=ai_data.get("content"),
-                bibliography=ai_data.get("bibliography"),
-                structured_data=ai_data.get("structured_data"),
-                status='tamamlandi',
-                is_published=bool(user.is_superuser),
-            )
+            # Akış sırasında oluşan taslak varsa onu tamamla, yoksa yeni kayıt aç
+            new_article = (GeneratedArticle.objects.filter(pk=draft.article_id).first()
+                           if draft.article_id else None)
+            if new_article is None:
+                new_article = GeneratedArticle(owner=user, user_request=request_text)
+            new_article.title = ai_data.get("title")
+            new_article.category = category_obj
+            new_article.keywords = ai_data.get("keywords", "")
+            new_article.english_abstract = ai_data.get("english_abstract")
+            new_article.turkish_abstract = ai_data.get("turkish_abstract")
+            new_article.full_content = ai_data.get("content")
+            new_article.bibliography = ai_data.get("bibliography")
+            new_article.structured_data = ai_data.get("structured_data")
+            new_article.status = 'tamamlandi'
+            new_article.is_published = bool(user.is_superuser)
+            new_article.save()
 
             # --- 0) SARKAN ATIF NUMARALARINI DOĞRU KAYNAĞA BAĞLA ---
             # Kaynakçada karşılığı olmayan [N] atıflarını, cümlenin gerçekten hangi
@@ -476,6 +616,11 @@ def generate_article_task(
 
     except Exception as e:
         logger.error(f"Makale üretim görevinde hata oluştu (user_id: {user_id}, request: {request_text}): {e}", exc_info=True)
+        if draft is not None:
+            try:
+                draft.fail()
+            except Exception:
+                pass
         # Hata durumunda bildirim oluştur
         create_notification(
             category='makale_hatasi',
@@ -1,3 +1,214 @@
-from django.test import TestCase
+import json
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import response_cache, services
+from .key_scheduler import KeyScheduler
+from .models import APIKey, Provider
+
+
+@mock.patch.object(services, '_build_client', side_effect=lambda svc, key: object())
+class ClientRegistryTestCase(TestCase):
+    def setUp(self):
+        services.invalidate_clients()
+        provider = Provider.objects.create(service_name='OpenAI')
+        self.key = APIKey.objects.create(provider=provider, key='sk-test')
+
+    def test_client_reused_and_idle_evicted(self, build):
+        """Aynı (servis, anahtar) aynı istemciyi almalı; boşta kalan yeniden kurulmalı"""
+        first = services.get_client('OpenAI', 'sk-test')
+        self.assertIs(services.get_client('OpenAI', 'sk-test'), first)
+        self.assertIsNot(services.get_client('OpenAI', 'sk-other'), first)
+
+        with mock.patch.object(services, 'CLIENT_IDLE_SECONDS', -1):
+            self.assertIsNot(services.get_client('OpenAI', 'sk-test'), first)
+
+    def test_deactivated_key_drops_client(self, build):
+        """APIKey pasifleştirilince istemci yeniden kurulmalı, sayaç güncellemesi dokunmamalı"""
+        first = services.get_client('OpenAI', 'sk-test')
+        self.key.usage_count = 5
+        self.key.save(update_fields=['usage_count'])
+        self.assertIs(services.get_client('OpenAI', 'sk-test'), first)
+
+        self.key.is_active = False
+        self.key.save()
+        self.assertIsNot(services.get_client('OpenAI', 'sk-test'), first)
+
+
+class GenerateManyTestCase(SimpleTestCase):
+    def test_runs_concurrently_in_order_and_isolates_errors(self):
+        """Sonuçlar prompt sırasıyla dönmeli, hata tek elemanı etkilemeli"""
+        def fake_pool(prompt, service_name=None, model_name=None, **kwargs):
+            time.sleep(0.2 if prompt == 'p0' else 0.05)
+            if prompt == 'bad':
+                raise RuntimeError('kota')
+            return prompt.upper(), kwargs.get('max_tokens')
+
+        with mock.patch.object(services, 'generate_with_pool', side_effect=fake_pool):
+            start = time.monotonic()
+            out = services.generate_many(
+                ['p0', 'p1', 'bad', {'prompt': 'p3', 'max_tokens': 5}], max_tokens=10)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(out[0], ('P0', 10))
+        self.assertEqual(out[1], ('P1', 10))
+        self.assertIsInstance(out[2], RuntimeError)
+        self.assertEqual(out[3], ('P3', 5))
+        self.assertLess(elapsed, 0.35)
+
+
+class KeySchedulerTestCase(TestCase):
+    def setUp(self):
+        provider = Provider.objects.create(service_name='Google Gemini')
+        self.k1 = APIKey.objects.create(provider=provider, key='k1')
+        self.k2 = APIKey.objects.create(provider=provider, key='k2')
+        self.sched = KeyScheduler()
+
+    def test_rate_limited_key_cools_down_and_is_skipped(self):
+        """429 veren anahtar soğumaya alınmalı ve aday listesinden çıkmalı"""
+        keys = [self.k1, self.k2]
+        self.assertTrue(self.sched.try_acquire('Google Gemini', self.k1.id))
+        self.sched.release(self.k1.id, RuntimeError('429 RESOURCE_EXHAUSTED retryDelay: 12s'))
+        self.assertEqual(self.sched.candidates('Google Gemini', keys), [self.k2])
+        self.assertFalse(self.sched.try_acquire('Google Gemini', self.k1.id))
+        self.assertGreater(self.sched.wait_time('Google Gemini', self.k1.id), 10)
+
+        # Kota dışı hata soğumaya almaz
+        self.assertTrue(self.sched.try_acquire('Google Gemini', self.k2.id))
+        self.sched.release(self.k2.id, ValueError('model not found'))
+        self.assertEqual(self.sched.candidates('Google Gemini', keys), [self.k2])
+
+    @override_settings(AI_KEY_RATE_LIMITS={'Google Gemini': (60, 2)})
+    def test_token_bucket_and_batched_flush(self):
+        """Burst aşılınca jeton beklenmeli; kullanım DB'ye yalnız flush ile yazılmalı"""
+        ok = [self.sched.try_acquire('Google Gemini', self.k1.id) for _ in range(3)]
+        self.assertEqual(ok, [True, True, False])
+        self.sched.release(self.k1.id)
+        self.sched.release(self.k1.id)
+
+        self.k1.refresh_from_db()
+        self.assertEqual(self.k1.usage_count, 0)
+        self.assertEqual(self.sched.candidates('Google Gemini', [self.k1, self.k2]), [self.k2, self.k1])
+        self.sched.flush()
+        self.k1.refresh_from_db()
+        self.assertEqual(self.k1.usage_count, 2)
+        self.assertIsNotNone(self.k1.last_used)
+
+    def test_generate_with_pool_skips_cooling_key(self):
+        """429 alan anahtar bir sonraki çağrıda hiç denenmemeli"""
+        calls = []
+
+        def fake_call(service, model, api_key, *args):
+            calls.append(api_key)
+            if api_key == 'k1':
+                raise RuntimeError('429 Too Many Requests')
+            return 'ok'
+
+        with mock.patch.object(services, 'scheduler', self.sched), \
+                mock.patch.object(services, '_call_service', side_effect=fake_call):
+            self.assertEqual(services.generate_with_pool('p', model_name='m')[0], 'ok')
+            self.assertEqual(services.generate_with_pool('p', model_name='m')[0], 'ok')
+        self.assertEqual(calls, ['k1', 'k2', 'k2'])
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        provider = Provider.objects.create(service_name='Google Gemini')
+        APIKey.objects.create(provider=provider, key='k1')
+        services.scheduler.invalidate_pool()
+
+    def test_opt_in_cache_skips_second_call(self):
+        """cache=True ikinci çağrıyı önbellekten vermeli; parametre değişirse ıska olmalı"""
+        with mock.patch.object(services, '_call_service', return_value='yanıt') as call:
+            self.assertEqual(services.generate_with_pool('p', model_name='m', cache=True)[0], 'yanıt')
+            text, key = services.generate_with_pool('p', model_name='m', cache=True)
+            self.assertEqual((text, key), ('yanıt', None))
+            services.generate_with_pool('p', model_name='m', cache=True, temperature=0.1)
+            services.generate_with_pool('p', model_name='m')  # opt-in değil
+        self.assertEqual(call.call_count, 3)
+
+    def test_ttl_and_lru_eviction(self):
+        """Süresi dolan kayıt dönmemeli; sınır aşılınca en eski kullanılan silinmeli"""
+        response_cache.put('a', 'S', 'm', 'A')
+        response_cache.put('b', 'S', 'm', 'B')
+        response_cache.put('c', 'S', 'm', 'C', ttl=-1)
+        self.assertIsNone(response_cache.get('c'))
+        self.assertEqual(response_cache.get('a'), 'A')   # 'a' artık en yeni kullanılan
+
+        response_cache.prune(max_entries=1)
+        self.assertEqual(response_cache.get('a'), 'A')
+        self.assertIsNone(response_cache.get('b'))
+
+
+class StreamingTestCase(TestCase):
+    ARTICLE = json.dumps({'title': 'Başlık',
+                          'content': ' '.join(f'Cümle {i}.' for i in range(80)),
+                          'bibliography': '[1] Kaynak', 'structured_data': {}},
+                         ensure_ascii=False)
+
+    def setUp(self):
+        provider = Provider.objects.create(service_name='Google Gemini')
+        APIKey.objects.create(provider=provider, key='k1')
+        APIKey.objects.create(provider=provider, key='k2')
+        self.sched = KeyScheduler()
+
+    def test_repair_truncated_json_every_prefix(self):
+        """Her kesim noktasında onarım geçerli bir nesne ve içeriğin öneki vermeli"""
+        full = json.dumps({'title': 'T', 'content': 'a "b" \\ ç', 'n': [1, 2.5, True, None]})
+        for i in range(1, len(full) + 1):
+            data = services.repair_truncated_json(full[:i])
+            self.assertTrue(json.loads(full)['content'].startswith(data.get('content', '')))
+        self.assertEqual(services.repair_truncated_json('```json\n' + full + '\n```'),
+                         json.loads(full))
+        self.assertEqual(services.repair_truncated_json('{"a": "x", "ke'), {'a': 'x'})
+
+    def test_stream_fails_over_before_first_chunk(self):
+        """İlk parçadan önce düşen anahtar yerine sıradaki denenmeli; kesilme bildirilmeli"""
+        def fake_stream(service, model, api_key, *args):
+            if api_key == 'k1':
+                raise RuntimeError('bağlantı reddedildi')
+            yield 'mer'
+            yield 'haba'
+            return True
+
+        with mock.patch.object(services, 'scheduler', self.sched), \
+                mock.patch.object(services, '_stream_service', side_effect=fake_stream):
+            stream = services.stream_with_pool('p', model_name='m')
+            self.assertEqual(list(stream), ['mer', 'haba'])
+        self.assertEqual((stream.text, stream.used_key.key, stream.truncated),
+                         ('merhaba', 'k2', True))
+
+    def test_truncated_article_is_resumed_into_draft(self):
+        """Yarıda kesilen JSON devam ettirilmeli, taslak makale akış sırasında oluşmalı"""
+        from django.contrib.auth.models import User
+        from blog.models import GeneratedArticle
+        from . import tasks
+
+        cut = len(self.ARTICLE) // 2
+        prompts = []
+
+        def fake_stream(service, model, api_key, prompt, *args):
+            prompts.append(prompt)
+            if len(prompts) == 1:
+                yield self.ARTICLE[:cut // 2]
+                yield self.ARTICLE[cut // 2:cut]
+                return True
+            yield self.ARTICLE[cut - 20:]      # model son 20 karakteri tekrarlıyor
+            return False
+
+        user = User.objects.create(username='yazar')
+        draft = tasks._DraftWriter(user, 'istek', 'konu')
+        with mock.patch.object(services, 'scheduler', self.sched), \
+                mock.patch.object(services, '_stream_service', side_effect=fake_stream), \
+                mock.patch.object(tasks, 'DRAFT_SAVE_INTERVAL', 0):
+            data, key, err = tasks._stream_json_article(
+                [('Google Gemini', 'm')], 'makale yaz', 'sys', 1000, draft)
+
+        self.assertEqual(data, json.loads(self.ARTICLE))
+        self.assertEqual(len(prompts), 2)
+        self.assertIn(self.ARTICLE[cut - 50:cut], prompts[1])
+        article = GeneratedArticle.objects.get(pk=draft.article_id)
+        self.assertEqual((article.status, article.is_published, article.title),
+                         ('beklemede', False, 'Başlık'))
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import AnalysisJob, FastqUpload
+from .models import AnalysisJob, FastqUpload, QueuedJob
 
 
 @admin.register(AnalysisJob)
@@ -17,6 +17,7 @@ class AnalysisJobAdmin(admin.ModelAdmin):
             'RUNNING': 'blue',
             'DONE': 'green',
             'ERROR': 'red',
+            'CANCELLED': 'gray',
         }
         return format_html(
             '<span style="color: {}; font-weight: bold;">{}</span>',
@@ -76,4 +77,29 @@ class FastqUploadAdmin(admin.ModelAdmin):
             obj.get_status_display()
         )
 
-    colored_status.short_description = 'Durum'
\ No newline at end of file
+    colored_status.short_description = 'Durum'
+
+
+@admin.register(QueuedJob)
+class QueuedJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task_type', 'queue', 'colored_status', 'attempts',
+                    'worker', 'heartbeat_at', 'created_at']
+    list_filter = ['status', 'queue', 'task_type']
+    search_fields = ['ref_id', 'worker']
+    readonly_fields = ['created_at', 'started_at', 'completed_at', 'heartbeat_at']
+
+    def colored_status(self, obj):
+        colors = {
+            'PENDING': 'orange',
+            'RUNNING': 'blue',
+            'DONE': 'green',
+            'FAILED': 'red',
+            'CANCELLED': 'gray',
+        }
+        return format_html(
+            '<span style="color: {}; font-weight: bold;">{}</span>',
+            colors.get(obj.status, 'black'),
+            obj.get_status_display()
+        )
+
+    colored_status.short_description = 'Durum'
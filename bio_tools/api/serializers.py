@@ -8,7 +8,7 @@ class FastqUploadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = FastqUpload
-        fields = ['id', 'file', 'status', 'total_reads',
+        fields = ['id', 'file', 'status', 'total_reads', 'progress',
                   'created_at', 'download_url', 'file_size']
         read_only_fields = ['id', 'created_at']
 
@@ -1,11 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FastqUploadViewSet, AnalysisJobViewSet
+from .views import (FastqUploadViewSet, AnalysisJobViewSet, CrisprScoreView, CrisprBatchView,
+                    CrisprBatchStatusView, CrisprBatchDownloadView)
 
 router = DefaultRouter()
 router.register(r'uploads', FastqUploadViewSet, basename='fastq-upload')
 router.register(r'jobs', AnalysisJobViewSet, basename='analysis-job')
 
 urlpatterns = [
+    path('crispr/score/', CrisprScoreView.as_view(), name='crispr-score'),
+    path('crispr/batch/', CrisprBatchView.as_view(), name='crispr-batch'),
+    path('crispr/batch/<str:job_id>/', CrisprBatchStatusView.as_view(), name='crispr-batch-status'),
+    path('crispr/batch/<str:job_id>/download/', CrisprBatchDownloadView.as_view(),
+         name='crispr-batch-download'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -2,9 +2,10 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
 from ..models import FastqUpload, AnalysisJob
 from .serializers import FastqUploadSerializer, AnalysisJobSerializer
-from ..tasks import analyze_single_file, parallel_fastq_analysis  # Düzeltildi
+from ..job_queue import enqueue
 
 
 class FastqUploadViewSet(viewsets.ModelViewSet):
@@ -22,11 +23,11 @@ class FastqUploadViewSet(viewsets.ModelViewSet):
     def reanalyze(self, request, pk=None):
         """Analizi yeniden başlat"""
         upload = self.get_object()
-        import threading, uuid
+        import uuid
         task_id = str(uuid.uuid4())
-        thread = threading.Thread(
-            target=analyze_single_file, args=(str(upload.id),), daemon=True)
-        thread.start()
+        # İlerleme ve iptal (cancel_job_view) için iş kaydı
+        AnalysisJob.objects.create(job_id=task_id, file_name=str(upload))
+        enqueue('fastq_reanalyze', ref_id=task_id, file_id=str(upload.id), job_id=task_id)
         return Response({
             'task_id': task_id,
             'status': 'started',
@@ -35,7 +36,7 @@ class FastqUploadViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def batch_analyze(self, request):
-        """Birden fazla dosyayı paralel analiz et"""
+        """Birden fazla dosyayı süreç havuzunda paralel analiz et"""
         file_ids = request.data.get('file_ids', [])
 
         if not file_ids:
@@ -50,11 +51,11 @@ class FastqUploadViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        import threading, uuid
+        import uuid
         task_id = str(uuid.uuid4())
-        thread = threading.Thread(
-            target=parallel_fastq_analysis, args=(file_ids,), daemon=True)
-        thread.start()
+        # İlerleme ve iptal (cancel_job_view) için iş kaydı
+        AnalysisJob.objects.create(job_id=task_id, file_name=f'{len(file_ids)} dosya (batch)')
+        enqueue('fastq_batch', ref_id=task_id, file_ids=[str(f) for f in file_ids], job_id=task_id)
         return Response({
             'task_id': task_id,
             'status': 'started',
@@ -90,4 +91,148 @@ class AnalysisJobViewSet(viewsets.ReadOnlyModelViewSet):
             'progress': job.progress,
             'reads_processed': job.reads_processed,
             'error_message': job.error_message
-        })
\ No newline at end of file
+        })
+
+# Toplu skorlamada tek istekte kabul edilen en çok kılavuz (kütüphane taraması)
+CRISPR_BULK_MAX = 100000
+
+
+class CrisprScoreView(APIView):
+    """Kılavuz listesini toplu (vektörel) skorlar.
+
+    POST {"enzyme": "SpCas9", "guides": ["ACGT...", ...]}  (ya da satır satır metin)
+    Her giriş ya enzimin kılavuz uzunluğunda bir dizi ya da — yalnız SpCas9
+    için — 30-mer bağlamdır (4 nt + 20 nt kılavuz + 3 nt PAM + 3 nt); bağlam
+    verilirse Doench 2014 (RS1) skoru da hesaplanır.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        from dash_apps.crispr_engine import ENZYMES, doench_rs1_scores, gc_content, score_guides
+
+        enzyme = request.data.get('enzyme') or 'SpCas9'
+        enz = ENZYMES.get(enzyme)
+        if enz is None:
+            return Response({'error': f'Bilinmeyen enzim: {enzyme}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        guides = request.data.get('guides') or []
+        if isinstance(guides, str):
+            guides = guides.split()
+        if not isinstance(guides, list) or not guides:
+            return Response({'error': 'guides gerekli'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(guides) > CRISPR_BULK_MAX:
+            return Response({'error': f'Maksimum {CRISPR_BULK_MAX} kılavuz skorlanabilir'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        glen = enz['guide_len']
+        rs1_ok = enzyme == 'SpCas9'
+        entries, errors = [], []
+        for i, raw in enumerate(guides):
+            seq = str(raw).strip().upper()
+            if rs1_ok and len(seq) == 30:
+                guide, ctx = seq[4:4 + glen], seq
+            elif len(seq) == glen:
+                guide, ctx = seq, None
+            else:
+                errors.append({'index': i, 'input': str(raw)[:50], 'error': 'length'})
+                continue
+            if set(seq) - set('ACGT'):
+                errors.append({'index': i, 'input': str(raw)[:50], 'error': 'invalid_base'})
+                continue
+            entries.append((i, guide, ctx))
+
+        heuristic = score_guides([g for _i, g, _c in entries], enz['pam_side'])
+        with_ctx = [k for k, (_i, _g, ctx) in enumerate(entries) if ctx]
+        rs1 = dict(zip(with_ctx, doench_rs1_scores([entries[k][2] for k in with_ctx])))
+
+        results = []
+        for k, ((i, guide, _ctx), (score, reasons)) in enumerate(zip(entries, heuristic)):
+            row = {'index': i, 'guide': guide, 'gc': gc_content(guide),
+                   'score': score, 'score_type': 'heuristic', 'reasons': reasons}
+            if rs1.get(k) is not None:
+                row.update(score=round(rs1[k] * 100, 1), score_type='doench',
+                           rs1=round(rs1[k], 4))
+            results.append(row)
+        return Response({'enzyme': enzyme, 'count': len(results),
+                         'results': results, 'errors': errors})
+
+
+class CrisprBatchView(APIView):
+    """Gen paneli için toplu CRISPR tasarım işi başlatır.
+
+    POST {"genes": ["TP53", "BRCA1"] | "TP53, BRCA1", "fasta": ">x\\nACGT...",
+          "species": "homo_sapiens", "enzyme": "SpCas9", "top_n": 10}
+    İlerleme: GET crispr/batch/<job_id>/ ; sonuç: GET crispr/batch/<job_id>/download/
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        from dash_apps.crispr_batch import DEFAULT_TOP_N, MAX_GENES, parse_batch_input
+        from dash_apps.crispr_engine import ENZYMES
+        from dash_apps.ensembl_fetch import BLAST_ORGANISM
+
+        genes = request.data.get('genes') or []
+        fasta = request.data.get('fasta') or ''
+        species = request.data.get('species') or 'homo_sapiens'
+        enzyme = request.data.get('enzyme') or 'SpCas9'
+        try:
+            top_n = max(1, min(int(request.data.get('top_n') or DEFAULT_TOP_N), 100))
+        except (TypeError, ValueError):
+            return Response({'error': 'top_n sayı olmalı'}, status=status.HTTP_400_BAD_REQUEST)
+        if enzyme not in ENZYMES:
+            return Response({'error': f'Bilinmeyen enzim: {enzyme}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if species not in BLAST_ORGANISM:
+            return Response({'error': f'Desteklenmeyen tür: {species}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        items = parse_batch_input(genes, fasta)
+        if not items:
+            return Response({'error': 'genes veya fasta gerekli'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_GENES:
+            return Response({'error': f'Maksimum {MAX_GENES} gen tasarlanabilir'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        import uuid
+        job_id = str(uuid.uuid4())
+        AnalysisJob.objects.create(job_id=job_id, file_name=f'CRISPR: {len(items)} gen (batch)')
+        enqueue('crispr_batch', ref_id=job_id, job_id=job_id, genes=genes, fasta=fasta,
+                species=species, enzyme=enzyme, top_n=top_n)
+        return Response({'job_id': job_id, 'status': 'started', 'genes': len(items)},
+                        status=status.HTTP_202_ACCEPTED)
+
+
+class CrisprBatchStatusView(APIView):
+    """Toplu tasarımın ilerlemesi ve biten genlerin özetleri."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, job_id):
+        from ..tasks import crispr_batch_summaries
+        job = AnalysisJob.objects.filter(job_id=job_id).first()
+        if job is None:
+            return Response({'error': 'İş bulunamadı'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'job_id': job_id,
+            'status': job.status,
+            'progress': job.progress,
+            'genes_done': job.reads_processed,
+            'error_message': job.error_message,
+            'genes': crispr_batch_summaries(job_id),
+            'download_url': request.build_absolute_uri('download/'),
+        })
+
+
+class CrisprBatchDownloadView(APIView):
+    """Toplu tasarım TSV'si (iş sürerken o ana kadar biten genleri içerir)."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, job_id):
+        import os
+        from django.http import FileResponse
+        from ..tasks import crispr_batch_path
+        path = crispr_batch_path(job_id)
+        if not AnalysisJob.objects.filter(job_id=job_id).exists() or not os.path.exists(path):
+            return Response({'error': 'Sonuç dosyası yok'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(open(path, 'rb'), as_attachment=True,
+                            filename=f'crispr_batch_{job_id[:8]}.tsv',
+                            content_type='text/tab-separated-values')
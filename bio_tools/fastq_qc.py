@@ -0,0 +1,525 @@
+"""
+bio_tools.fastq_qc — NumPy tabanlı, blok okumalı FASTQ kalite kontrol motoru.
+
+tasks.compute_quality_means_streaming her kaydı 4 metin satırı olarak okuyup
+her kalite karakteri ve her baz için Python döngüsü çalıştırır. Bu modül ise
+dosyayı büyük ikili bloklar halinde okur, kayıt sınırlarını (satır sonları)
+tek seferde bulur ve bir bloktaki TÜM okumaların:
+
+  - pozisyon bazlı kalite toplamlarını / sayılarını,
+  - Phred skor histogramını,
+  - baz sayımlarını ve okuma başına GC yüzdesini
+
+NumPy dizi işlemleriyle hesaplar. Çıktı (update_cb payload'ı) eski döngüyle
+aynı şekildedir; process_fastq_file callback'leri değişmeden kullanılır.
+
+Çok çekirdek: analyze_files_parallel dosyaları bir süreç havuzunda eşzamanlı
+analiz eder; sıkıştırılmamış büyük bir dosyayı kayıt sınırlarına hizalanmış
+bayt aralıklarına (shard) böler, shard sonuçlarını FastqQCAccumulator.merge ile
+tek sonuçta birleştirir. Bu modül Django'ya bağımlı değildir; alt süreçler
+yalnızca burayı import eder.
+
+Not: Eski kod gibi katı 4 satırlı FASTQ varsayılır (çok satırlı kayıt yok).
+"""
+import gzip
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+TOP_N_SEQUENCES = 50
+OVERREP_SKETCH_SIZE = 2000        # Tekrarlayan dizi özetinin tutabileceği en fazla dizi
+GC_HISTOGRAM_BINS = 101           # %0..%100 GC, 1'er yüzdelik
+UPDATE_FREQUENCY_READS = 100_000  # Veritabanını güncelleme sıklığı
+BLOCK_SIZE = 4 * 1024 * 1024      # Tek seferde okunan ham blok (bayt)
+
+SHARD_MIN_BYTES = 16 * 1024 * 1024   # Bundan küçük dosyalar bölünmez
+SHARDS_PER_WORKER = 4                # İlerleme/yük dengesi için işçi başına shard
+
+PHRED_OFFSET = 33
+PHRED_MAX = 93                    # '!'..'~' aralığı → Q0..Q93
+
+# Baz kodlama tablosu: A/T/G/C/N (büyük-küçük harf) → 0..4, diğer her şey → 5
+_BASE_KEYS = ('A', 'T', 'G', 'C', 'N')
+_BASE_LUT = np.full(256, len(_BASE_KEYS), dtype=np.uint8)
+for _i, _b in enumerate(_BASE_KEYS):
+    _BASE_LUT[ord(_b)] = _i
+    _BASE_LUT[ord(_b.lower())] = _i
+_GC_CODES = (2, 3)
+
+_UPPER_TABLE = bytes.maketrans(b'abcdefghijklmnopqrstuvwxyz',
+                               b'ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+
+class AnalysisCancelled(Exception):
+    """cancel_cb True döndürdüğünde analiz bu istisnayla sonlandırılır."""
+
+
+def is_gzip_file(path: str) -> bool:
+    if path.endswith(".gz"): return True
+    try:
+        with open(path, "rb") as f:
+            return f.read(2) == b'\x1f\x8b'
+    except Exception:
+        return False
+
+
+def iter_fastq_blocks(path: str, block_size: int = BLOCK_SIZE,
+                      start: int = 0, end: Optional[int] = None):
+    """
+    Dosyayı ikili bloklar halinde okur ve YALNIZCA tam kayıtlardan oluşan
+    parçalar üretir. Bir bloğun sonunda yarım kalan kayıt bir sonraki bloğa
+    taşınır.
+
+    start/end: yalnızca [start, end) bayt aralığını okur (sıkıştırılmamış
+    dosyalarda; aralık kayıt sınırlarına hizalı olmalı — bkz. shard_ranges).
+
+    Yields: (block: bytes, newlines: np.ndarray, raw_pos: int)
+        newlines bloktaki satır sonu indeksleri (4'ün katı adet),
+        raw_pos diskteki (gzip ise sıkıştırılmış) okuma konumu — ilerleme için.
+    """
+    raw = open(path, "rb")
+    gzipped = is_gzip_file(path)
+    if gzipped and (start or end is not None):
+        raw.close()
+        raise ValueError("gzip dosyaları bayt aralıklarına bölünemez")
+    stream = gzip.GzipFile(fileobj=raw) if gzipped else raw
+    if start:
+        raw.seek(start)
+    try:
+        carry = b''
+        while True:
+            to_read = block_size if end is None else min(block_size, end - raw.tell())
+            chunk = stream.read(to_read) if to_read > 0 else b''
+            eof = not chunk
+            data = carry + chunk if carry else chunk
+            if eof and data and not data.endswith(b'\n'):
+                data += b'\n'  # Son kayıtta satır sonu eksik olabilir
+            if not data:
+                break
+
+            newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+            n_records = len(newlines) // 4
+            if n_records:
+                cut = int(newlines[4 * n_records - 1]) + 1
+                yield data[:cut], newlines[:4 * n_records], raw.tell()
+                carry = data[cut:]
+            else:
+                carry = data
+            if eof:
+                break  # Kalan yarım kayıt (4 satırdan az) yok sayılır
+    finally:
+        if stream is not raw:
+            stream.close()
+        raw.close()
+
+
+def _segments(starts: np.ndarray, lengths: np.ndarray):
+    """
+    Değişken uzunluklu segmentleri düzleştirir.
+    Döner: (flat_idx, pos) — her baytın bloktaki indeksi ve okuma içi pozisyonu.
+    """
+    total = int(lengths.sum())
+    seg_begin = np.cumsum(lengths) - lengths
+    pos = np.arange(total, dtype=np.int64) - np.repeat(seg_begin, lengths)
+    flat_idx = np.repeat(starts, lengths) + pos
+    return flat_idx, pos
+
+
+def _uniform_matrix(buf: np.ndarray, starts: np.ndarray, lengths: np.ndarray):
+    """
+    Bloktaki tüm segmentler aynı uzunluktaysa (sık durum) onları (n, L)
+    matrisi olarak döndürür; değilse None.
+    """
+    if lengths.min() != lengths.max():
+        return None
+    return buf[starts[:, None] + np.arange(int(lengths[0]))]
+
+
+class HeavyHitterSketch:
+    """
+    Sabit bellekli 'en sık diziler' özeti (Misra–Gries / Space-Saving ailesi).
+
+    Okumalar önce küçük bir tampon Counter'da toplanır; tampon dolunca özetle
+    birleştirilir ve özet 'capacity' diziye indirgenir: (capacity+1). en büyük
+    sayım t tüm sayımlardan düşülür, sıfıra inenler atılır. Böylece bellek
+    okuma sayısından bağımsızdır; bir dizinin raporlanan sayımı gerçek sayımın
+    en fazla N/(capacity+1) altındadır (N = toplam okuma). Özetler aynı
+    işlemle birleştirilebilir (merge).
+    """
+
+    def __init__(self, capacity: int = OVERREP_SKETCH_SIZE, buffer_size: Optional[int] = None):
+        self.capacity = max(1, int(capacity))
+        self.buffer_size = buffer_size or self.capacity * 4
+        self.counts: Dict = {}
+        self.pending = Counter()
+        self.total = 0
+
+    def update(self, items):
+        self.pending.update(items)
+        if len(self.pending) >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        self.total += sum(self.pending.values())
+        combined = Counter(self.counts)
+        combined.update(self.pending)
+        self.pending = Counter()
+        self.counts = self._shrink(combined)
+
+    def _shrink(self, combined) -> Dict:
+        if len(combined) <= self.capacity:
+            return dict(combined)
+        values = np.fromiter(combined.values(), dtype=np.int64, count=len(combined))
+        k = len(values) - self.capacity - 1
+        threshold = int(np.partition(values, k)[k])   # (capacity+1). en büyük sayım
+        return {item: c - threshold for item, c in combined.items() if c > threshold}
+
+    def merge(self, other: 'HeavyHitterSketch'):
+        """Başka bir özeti (ör. ayrı bir parçanın sonucu) bu özete katar."""
+        self._flush()
+        other._flush()
+        self.total += other.total
+        combined = Counter(self.counts)
+        combined.update(other.counts)
+        self.counts = self._shrink(combined)
+
+    def most_common(self, n: int):
+        self._flush()
+        return Counter(self.counts).most_common(n)
+
+
+class FastqQCAccumulator:
+    """
+    Blok blok beslenen QC istatistikleri. Aynı payload'ı üretir:
+    quality_df_data, gc_data, base_counts, overrep_sequences (+ phred_histogram).
+
+    Bellek okuma sayısından bağımsızdır: gc_data ham GC listesi yerine
+    GC_HISTOGRAM_BINS kutulu histogramdır (indeks = yuvarlanmış GC %'si),
+    tekrarlayan diziler HeavyHitterSketch ile sabit kapasitede tutulur.
+    """
+
+    def __init__(self, top_n: int = TOP_N_SEQUENCES, sketch_size: int = OVERREP_SKETCH_SIZE):
+        self.top_n = top_n
+        self.read_count = 0
+        self.sums = np.zeros(0, dtype=np.float64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.phred_hist = np.zeros(PHRED_MAX + 1, dtype=np.int64)
+        self.base_bins = np.zeros(len(_BASE_KEYS) + 1, dtype=np.int64)
+        self.gc_hist = np.zeros(GC_HISTOGRAM_BINS, dtype=np.int64)
+        self.sequence_counts = HeavyHitterSketch(sketch_size)
+
+    def _grow(self, length: int):
+        if len(self.sums) < length:
+            extra = length - len(self.sums)
+            self.sums = np.concatenate([self.sums, np.zeros(extra, dtype=np.float64)])
+            self.counts = np.concatenate([self.counts, np.zeros(extra, dtype=np.int64)])
+
+    def add_block(self, block: bytes, newlines: np.ndarray):
+        """Tam kayıtlardan oluşan bir bloğu işler; bloktaki okuma sayısını döndürür."""
+        buf = np.frombuffer(block, dtype=np.uint8)
+        starts = np.empty(len(newlines), dtype=np.int64)
+        starts[0] = 0
+        starts[1:] = newlines[:-1] + 1
+        ends = newlines.astype(np.int64)
+        # Windows satır sonu (\r\n) — '\r' karakterini dışarıda bırak
+        ends -= (ends > starts) & (buf[ends - 1] == 13)
+
+        n_reads = len(newlines) // 4
+        self.read_count += n_reads
+
+        # --- Kalite: pozisyon bazlı toplam/sayı + Phred histogramı ---
+        q_starts, q_lens = starts[3::4], ends[3::4] - starts[3::4]
+        max_len = int(q_lens.max())
+        if max_len > 0:
+            self._grow(max_len)
+            q_mat = _uniform_matrix(buf, q_starts, q_lens)
+            if q_mat is not None:
+                q_sum = q_mat.sum(axis=0, dtype=np.int64) - PHRED_OFFSET * n_reads
+                self.sums[:max_len] += q_sum
+                self.counts[:max_len] += n_reads
+                q = q_mat.ravel()
+            else:
+                flat, pos = _segments(q_starts, q_lens)
+                q = buf[flat]
+                self.sums[:max_len] += np.bincount(
+                    pos, weights=q, minlength=max_len) - PHRED_OFFSET * np.bincount(pos, minlength=max_len)
+                self.counts[:max_len] += np.bincount(pos, minlength=max_len)
+            # Ham ASCII histogramından Phred histogramına: ofseti kaydır, uçları kırp
+            ascii_hist = np.bincount(q, minlength=256)
+            self.phred_hist[0] += ascii_hist[:PHRED_OFFSET + 1].sum()
+            self.phred_hist[1:PHRED_MAX] += ascii_hist[PHRED_OFFSET + 1:PHRED_OFFSET + PHRED_MAX]
+            self.phred_hist[PHRED_MAX] += ascii_hist[PHRED_OFFSET + PHRED_MAX:].sum()
+
+        # --- Dizi: baz sayımı, okuma başına GC, tekrarlayan diziler ---
+        s_starts, s_ends = starts[1::4], ends[1::4]
+        s_lens = s_ends - s_starts
+        if s_lens.max() > 0:
+            s_mat = _uniform_matrix(buf, s_starts, s_lens)
+            if s_mat is not None:
+                codes = _BASE_LUT[s_mat]
+                gc_per_read = ((codes == _GC_CODES[0]) | (codes == _GC_CODES[1])).sum(axis=1)
+                codes = codes.ravel()
+            else:
+                flat, _pos = _segments(s_starts, s_lens)
+                codes = _BASE_LUT[buf[flat]]
+                is_gc = (codes == _GC_CODES[0]) | (codes == _GC_CODES[1])
+                read_idx = np.repeat(np.arange(n_reads), s_lens)
+                gc_per_read = np.bincount(read_idx, weights=is_gc, minlength=n_reads)
+            self.base_bins += np.bincount(codes, minlength=len(self.base_bins))
+
+            has_seq = s_lens > 0
+            gc_pct = gc_per_read[has_seq] / s_lens[has_seq] * 100
+            self.gc_hist += np.bincount(np.rint(gc_pct).astype(np.int64), minlength=GC_HISTOGRAM_BINS)
+
+            upper = block.translate(_UPPER_TABLE)
+            self.sequence_counts.update(
+                upper[s:e] for s, e in zip(s_starts.tolist(), s_ends.tolist()) if e > s)
+
+        return n_reads
+
+    def merge(self, other: 'FastqQCAccumulator'):
+        """Başka bir parçanın (shard) istatistiklerini bu sonuca katar."""
+        self.read_count += other.read_count
+        self._grow(len(other.sums))
+        self.sums[:len(other.sums)] += other.sums
+        self.counts[:len(other.counts)] += other.counts
+        self.phred_hist += other.phred_hist
+        self.base_bins += other.base_bins
+        self.gc_hist += other.gc_hist
+        self.sequence_counts.merge(other.sequence_counts)
+        return self
+
+    def payload(self) -> Dict:
+        means = np.divide(self.sums, self.counts,
+                          out=np.zeros_like(self.sums), where=self.counts > 0)
+        top_sequences = [(seq.decode('ascii', 'ignore'), count)
+                         for seq, count in self.sequence_counts.most_common(self.top_n)]
+        return {
+            "quality_df_data": {"Base Position": list(range(1, len(means) + 1)),
+                                "Average Quality Score": means.tolist()},
+            "gc_data": self.gc_hist.tolist(),
+            "base_counts": {b: int(self.base_bins[i]) for i, b in enumerate(_BASE_KEYS)},
+            "overrep_sequences": top_sequences,
+            "phred_histogram": self.phred_hist.tolist(),
+        }
+
+
+def compute_quality_means_vectorized(
+        path: str,
+        progress_cb: Optional[Callable[[int], None]] = None,
+        update_cb: Optional[Callable[[Dict], None]] = None,
+        read_count_cb: Optional[Callable[[int], None]] = None,
+        block_size: int = BLOCK_SIZE,
+        update_every: int = UPDATE_FREQUENCY_READS,
+        top_n: int = TOP_N_SEQUENCES,
+        sketch_size: int = OVERREP_SKETCH_SIZE,
+        cancel_cb: Optional[Callable[[], bool]] = None,
+):
+    """
+    compute_quality_means_streaming ile aynı imza ve callback sözleşmesi;
+    okumaları blok blok, vektörel olarak işler. Son istatistikleri
+    (FastqQCAccumulator) döndürür. cancel_cb True dönerse AnalysisCancelled.
+    """
+    total_size = os.path.getsize(path)
+
+    acc = FastqQCAccumulator(top_n=top_n, sketch_size=sketch_size)
+    next_update = update_every
+
+    for block, newlines, raw_pos in iter_fastq_blocks(path, block_size):
+        if cancel_cb and cancel_cb():
+            raise AnalysisCancelled(path)
+        acc.add_block(block, newlines)
+
+        if read_count_cb: read_count_cb(acc.read_count)
+        if total_size and progress_cb:
+            progress_cb(min(99, int(raw_pos / max(total_size, 1) * 100)))
+        if update_cb and acc.read_count >= next_update:
+            update_cb(acc.payload())
+            next_update = (acc.read_count // update_every + 1) * update_every
+
+    # Son bir güncelleme yap
+    if update_cb: update_cb(acc.payload())
+    if read_count_cb: read_count_cb(acc.read_count)
+    return acc
+
+
+# ------------------------------------------------------------------------------
+# Çok süreçli analiz
+# ------------------------------------------------------------------------------
+
+def _next_record_start(fh, offset: int, file_size: int) -> int:
+    """
+    offset'ten sonraki ilk FASTQ kaydının başlangıç baytını bulur.
+    Kalite satırları da '@' ile başlayabildiği için bir satır ancak iki satır
+    sonrası '+' ile başlıyorsa kayıt başı kabul edilir.
+    """
+    if offset <= 0:
+        return 0
+    fh.seek(offset - 1)
+    fh.readline()  # offset'in içinde bulunduğu satırın sonuna git
+    pos = fh.tell()
+    window = []
+    while pos < file_size:
+        line = fh.readline()
+        if not line:
+            break
+        window.append((pos, line))
+        pos += len(line)
+        if len(window) == 3:
+            head_pos, head = window[0]
+            if head.startswith(b'@') and window[2][1].startswith(b'+'):
+                return head_pos
+            window.pop(0)
+    return file_size
+
+
+def shard_ranges(path: str, n_shards: int, min_shard_bytes: int = SHARD_MIN_BYTES):
+    """
+    Sıkıştırılmamış bir FASTQ'yu kayıt sınırlarına hizalı [start, end) bayt
+    aralıklarına böler. gzip veya küçük dosyalar için tek aralık döner.
+    """
+    file_size = os.path.getsize(path)
+    if is_gzip_file(path):
+        return [(0, None)]
+    n_shards = max(1, min(n_shards, file_size // max(min_shard_bytes, 1)))
+    if n_shards == 1:
+        return [(0, file_size)]
+    with open(path, "rb") as fh:
+        cuts = sorted({_next_record_start(fh, file_size * i // n_shards, file_size)
+                       for i in range(n_shards)} | {file_size})
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def analyze_range(path: str, start: int = 0, end: Optional[int] = None,
+                  block_size: int = BLOCK_SIZE, top_n: int = TOP_N_SEQUENCES,
+                  sketch_size: int = OVERREP_SKETCH_SIZE) -> FastqQCAccumulator:
+    """Alt süreçte çalışan iş: bir dosyanın (ya da aralığının) istatistikleri."""
+    acc = FastqQCAccumulator(top_n=top_n, sketch_size=sketch_size)
+    for block, newlines, _pos in iter_fastq_blocks(path, block_size, start, end):
+        acc.add_block(block, newlines)
+    acc.sequence_counts._flush()  # Bekleyen tamponu küçültüp öyle gönder
+    return acc
+
+
+def analyze_files_parallel(
+        paths: Dict,
+        workers: int,
+        on_progress: Optional[Callable] = None,
+        on_done: Optional[Callable] = None,
+        cancel_cb: Optional[Callable[[], bool]] = None,
+        top_n: int = TOP_N_SEQUENCES,
+        sketch_size: int = OVERREP_SKETCH_SIZE,
+        poll_interval: float = 1.0,
+):
+    """
+    {anahtar: dosya_yolu} sözlüğündeki dosyaları bir süreç havuzunda analiz eder.
+
+    Büyük, sıkıştırılmamış dosyalar shard'lara bölünür; tüm dosyaların tüm
+    shard'ları aynı havuzu paylaşır. Callback'ler ana süreçte çağrılır:
+        on_progress(key, pct, reads)  — bir shard bittikçe (bayt oranına göre)
+        on_done(key, acc, error)      — dosyanın tüm shard'ları bitince
+        cancel_cb() -> bool           — True ise bekleyen shard'lar iptal edilir,
+                                        çalışanların bitmesi beklenir ve
+                                        AnalysisCancelled fırlatılır.
+
+    Döner: {anahtar: FastqQCAccumulator | Exception}
+    """
+    if cancel_cb and cancel_cb():
+        raise AnalysisCancelled(", ".join(str(k) for k in paths))
+    workers = max(1, int(workers))
+    results, errors, pending_shards, bytes_total, bytes_done = {}, {}, {}, {}, {}
+
+    plan = []  # (key, path, start, end, size)
+    for key, path in paths.items():
+        try:
+            ranges = shard_ranges(path, workers * SHARDS_PER_WORKER)
+            bytes_total[key] = max(os.path.getsize(path), 1)
+        except OSError as e:
+            errors[key] = e
+            if on_done: on_done(key, None, e)
+            continue
+        bytes_done[key] = 0
+        pending_shards[key] = len(ranges)
+        results[key] = FastqQCAccumulator(top_n=top_n, sketch_size=sketch_size)
+        for start, end in ranges:
+            size = (end if end is not None else bytes_total[key]) - start
+            plan.append((key, path, start, end, size))
+
+    if workers > 1 and len(plan) > 1:
+        # Web süreci thread'li olduğundan fork yerine spawn
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(plan)),
+                                   mp_context=multiprocessing.get_context("spawn"))
+    else:
+        # Tek iş için süreç başlatma maliyetine gerek yok; aynı akış tek thread'de
+        pool = ThreadPoolExecutor(max_workers=1)
+
+    with pool:
+        futures = {}
+        for key, path, start, end, size in plan:
+            fut = pool.submit(analyze_range, path, start, end,
+                              top_n=top_n, sketch_size=sketch_size)
+            futures[fut] = (key, size)
+
+        not_done = set(futures)
+        while not_done:
+            done, not_done = wait(not_done, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            if cancel_cb and cancel_cb():
+                for fut in not_done:
+                    fut.cancel()
+                pool.shutdown(wait=True, cancel_futures=True)
+                raise AnalysisCancelled(", ".join(str(k) for k in paths))
+
+            for fut in done:
+                key, size = futures[fut]
+                if key in errors:
+                    continue
+                try:
+                    results[key].merge(fut.result())
+                except Exception as e:
+                    errors[key] = e
+                    if on_done: on_done(key, None, e)
+                    continue
+                bytes_done[key] += size
+                pending_shards[key] -= 1
+                if on_progress:
+                    pct = min(99, int(bytes_done[key] / bytes_total[key] * 100))
+                    on_progress(key, pct, results[key].read_count)
+                if pending_shards[key] == 0 and on_done:
+                    on_done(key, results[key], None)
+
+    return {key: errors.get(key, results.get(key)) for key in paths}
+
+
+def compute_quality_means_parallel(
+        path: str,
+        workers: int,
+        progress_cb: Optional[Callable[[int], None]] = None,
+        update_cb: Optional[Callable[[Dict], None]] = None,
+        read_count_cb: Optional[Callable[[int], None]] = None,
+        cancel_cb: Optional[Callable[[], bool]] = None,
+        top_n: int = TOP_N_SEQUENCES,
+        sketch_size: int = OVERREP_SKETCH_SIZE,
+):
+    """
+    compute_quality_means_vectorized'ın çok süreçli karşılığı (tek dosya,
+    shard'lara bölünerek). Callback'ler her shard bittiğinde çağrılır.
+    """
+    def on_progress(_key, pct, reads):
+        if progress_cb: progress_cb(pct)
+        if read_count_cb: read_count_cb(reads)
+
+    result = analyze_files_parallel(
+        {path: path}, workers, on_progress=on_progress, cancel_cb=cancel_cb,
+        top_n=top_n, sketch_size=sketch_size)[path]
+    if isinstance(result, Exception):
+        raise result
+
+    if update_cb: update_cb(result.payload())
+    if read_count_cb: read_count_cb(result.read_count)
+    return result
@@ -0,0 +1,289 @@
+"""
+Veritabanı tabanlı kalıcı iş kuyruğu.
+
+Web isteği uzun işi (FASTQ analizi, makale üretimi) kendi thread'inde
+başlatmak yerine `enqueue` ile QueuedJob satırı ekler; `manage.py run_worker`
+ile başlatılan bir veya daha fazla işçi süreci (farklı çekirdek/sunucularda)
+işleri satır kilidiyle sahiplenir.
+
+- Sahiplenme: select_for_update(skip_locked) (destekleyen veritabanlarında) +
+  koşullu UPDATE; aynı iş iki işçiye asla verilmez.
+- Kuyruk başına eşzamanlılık sınırı: settings.JOB_QUEUE_CONCURRENCY (sayım ve
+  sahiplenme kuyruğun QueueLock satırı kilitliyken, tek transaction'da)
+- Yeniden deneme: üstel geri çekilme (JOB_QUEUE_RETRY_BACKOFF × 2^(deneme-1))
+- Kalp atışı: çalışan işler düzenli damgalanır; JOB_QUEUE_STALE_SECONDS
+  boyunca damgalanmayan iş (çöken işçi) yeniden kuyruğa alınır.
+"""
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnalysisJob, QueueLock, QueuedJob
+
+logger = logging.getLogger(__name__)
+
+# task_type → (çağrılacak fonksiyon, kuyruk, en fazla deneme)
+# Makale üretimi kredi düşer ve bildirim gönderir; yarıda kalan bir üretimi
+# tekrar çalıştırmak çift makale/çift ücret riski taşıdığı için tek denemelidir.
+TASKS = {
+    'fastq_analysis': ('bio_tools.tasks.process_fastq_file', 'fastq', 3),
+    'fastq_reanalyze': ('bio_tools.tasks.analyze_single_file', 'fastq', 3),
+    'fastq_batch': ('bio_tools.tasks.parallel_fastq_analysis', 'fastq', 3),
+    'article_generation': ('ai_engine.tasks.generate_article_task', 'article', 1),
+    'crispr_batch': ('bio_tools.tasks.crispr_batch_design', 'crispr', 2),
+}
+
+CONCURRENCY = getattr(settings, 'JOB_QUEUE_CONCURRENCY', {'fastq': 1, 'article': 2, 'crispr': 1})
+RETRY_BACKOFF = getattr(settings, 'JOB_QUEUE_RETRY_BACKOFF', 30)
+MAX_BACKOFF = 3600
+HEARTBEAT_INTERVAL = getattr(settings, 'JOB_QUEUE_HEARTBEAT_SECONDS', 15)
+STALE_SECONDS = getattr(settings, 'JOB_QUEUE_STALE_SECONDS', 120)
+
+
+def enqueue(task_type, ref_id='', **kwargs):
+    """İşi kuyruğa ekler ve QueuedJob kaydını döndürür.
+
+    settings.JOB_QUEUE_EAGER açıksa (ayrı işçi çalışmayan geliştirme ortamı)
+    iş hemen bu süreçte, aynı kayıt/deneme mantığıyla arka planda çalıştırılır.
+    """
+    if task_type not in TASKS:
+        raise ValueError(f"Bilinmeyen iş türü: {task_type}")
+    _path, queue, max_attempts = TASKS[task_type]
+    job = QueuedJob.objects.create(
+        task_type=task_type, queue=queue, kwargs=kwargs, ref_id=ref_id or '',
+        max_attempts=max_attempts)
+
+    if getattr(settings, 'JOB_QUEUE_EAGER', False):
+        if _claim(job.pk, f"eager:{os.getpid()}"):
+            job.refresh_from_db()
+            threading.Thread(target=_run_eager, args=(job,), daemon=True).start()
+    return job
+
+
+def cancel(ref_id):
+    """ref_id'ye bağlı, henüz başlamamış işleri iptal eder (çalışanı görev kendisi durdurur)."""
+    return QueuedJob.objects.filter(ref_id=ref_id, status='PENDING').update(
+        status='CANCELLED', completed_at=timezone.now())
+
+
+def _backoff(attempts):
+    return min(MAX_BACKOFF, RETRY_BACKOFF * (2 ** max(0, attempts - 1)))
+
+
+def _claim(pk, worker):
+    """Koşullu UPDATE ile tek bir işi sahiplenir; başka işçi kaptıysa False."""
+    now = timezone.now()
+    return QueuedJob.objects.filter(pk=pk, status='PENDING').update(
+        status='RUNNING', worker=worker, started_at=now, heartbeat_at=now,
+        attempts=F('attempts') + 1) == 1
+
+
+def _lock_queue(queue):
+    """
+    Kuyruğun semafor satırını günceller (transaction sonuna kadar satır kilidi).
+
+    UPDATE her veritabanında yazma kilidi aldığından aynı kuyruğa sahiplenmeye
+    çalışan ikinci işçi, ilki commit edene kadar bekler ve ardından onun
+    sahiplendiği işi RUNNING sayımında görür.
+    """
+    now = timezone.now()
+    if not QueueLock.objects.filter(name=queue).update(locked_at=now):
+        QueueLock.objects.get_or_create(name=queue, defaults={'locked_at': now})
+        QueueLock.objects.filter(name=queue).update(locked_at=now)
+
+
+def claim_next(worker, queues=None):
+    """
+    Çalıştırılabilir ilk işi kilitleyerek sahiplenir; yoksa None.
+
+    Sınırlı kuyrukta RUNNING sayımı ve sahiplenme aynı transaction'da, kuyruğun
+    semafor satırı kilitliyken yapılır; sınır doluysa o kuyruk atlanır.
+    """
+    blocked = set()
+    for _ in range(5 + len(CONCURRENCY)):  # yarışı kaybedersek / kuyruk doluysa başka aday dene
+        try:
+            with transaction.atomic():
+                qs = QueuedJob.objects.filter(status='PENDING', run_after__lte=timezone.now())
+                if queues:
+                    qs = qs.filter(queue__in=queues)
+                if blocked:
+                    qs = qs.exclude(queue__in=blocked)
+                if connection.features.has_select_for_update_skip_locked:
+                    qs = qs.select_for_update(skip_locked=True)
+                row = qs.order_by('run_after', 'id').values_list('pk', 'queue').first()
+                if row is None:
+                    return None
+                pk, queue = row
+                limit = CONCURRENCY.get(queue)
+                if limit:
+                    _lock_queue(queue)
+                    if QueuedJob.objects.filter(queue=queue, status='RUNNING').count() >= limit:
+                        blocked.add(queue)
+                        continue
+                if _claim(pk, worker):
+                    return QueuedJob.objects.get(pk=pk)
+        except OperationalError as e:
+            # SQLite: eşzamanlı yazma kilidi çakışması — başka işçi sahipleniyor
+            logger.debug(f"Sahiplenme yarışı: {e}")
+    return None
+
+
+def _owned(job):
+    """Bu işçinin bu denemesi: arada requeue_stale ile geri alınıp başka işçiye
+    (veya aynı işçiye yeni denemede) verilmiş işin durumu ezilmesin."""
+    return QueuedJob.objects.filter(pk=job.pk, status='RUNNING', worker=job.worker,
+                                    attempts=job.attempts)
+
+
+def _mark_failed(job, message):
+    if not _owned(job).update(status='FAILED', error_message=message, completed_at=timezone.now()):
+        return False
+    # Kullanıcının izlediği analiz kaydı hâlâ açıksa hatayı oraya da yaz
+    if job.ref_id:
+        AnalysisJob.objects.filter(job_id=job.ref_id, status__in=['PENDING', 'RUNNING']).update(
+            status='ERROR', error_message=message, completed_at=timezone.now())
+    return True
+
+
+def _retry_or_fail(job, message):
+    """Denemesi kalan işi geri çekilmeyle kuyruğa döndürür, yoksa FAILED yapar; iş artık
+    bu denemenin değilse (bkz. _owned) dokunmaz ve False döner."""
+    if job.attempts < job.max_attempts:
+        delay = _backoff(job.attempts)
+        if not _owned(job).update(status='PENDING', worker='', error_message=message,
+                                  run_after=timezone.now() + timedelta(seconds=delay)):
+            return False
+        logger.warning(f"İş {job.pk} ({job.task_type}) {delay}s sonra yeniden denenecek: {message}")
+    else:
+        if not _mark_failed(job, message):
+            return False
+        logger.error(f"İş {job.pk} ({job.task_type}) kalıcı olarak başarısız: {message}")
+    return True
+
+
+def execute(job):
+    """Sahiplenilmiş işi çalıştırır ve sonucu kuyruk kaydına yazar."""
+    path, _queue, _max = TASKS.get(job.task_type, (None, None, None))
+    try:
+        if path is None:
+            raise ValueError(f"Bilinmeyen iş türü: {job.task_type}")
+        module_name, func_name = path.rsplit('.', 1)
+        func = getattr(importlib.import_module(module_name), func_name)
+        func(**job.kwargs)
+    except Exception as e:
+        logger.error(f"İş {job.pk} ({job.task_type}) hata verdi: {e}", exc_info=True)
+        _retry_or_fail(job, str(e))
+    else:
+        if not _owned(job).update(status='DONE', progress=100, error_message=None,
+                                  completed_at=timezone.now()):
+            logger.warning(f"İş {job.pk} ({job.task_type}) bitti ama artık bu işçide değil; "
+                           f"durum değiştirilmedi")
+    finally:
+        close_old_connections()
+
+
+def _run_eager(job):
+    # Aynı veritabanını izleyen bir işçi bu işi "ölü" sanmasın diye kalp atışı
+    done = threading.Event()
+
+    def beat():
+        while not done.wait(HEARTBEAT_INTERVAL):
+            QueuedJob.objects.filter(pk=job.pk, status='RUNNING').update(heartbeat_at=timezone.now())
+        connection.close()
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        execute(job)
+    finally:
+        done.set()
+        connection.close()
+
+
+def requeue_stale(stale_seconds=None):
+    """Kalp atışı kesilmiş (işçisi ölmüş) işleri yeniden kuyruğa alır / düşürür."""
+    cutoff = timezone.now() - timedelta(seconds=stale_seconds or STALE_SECONDS)
+    count = 0
+    for job in QueuedJob.objects.filter(status='RUNNING', heartbeat_at__lt=cutoff):
+        count += _retry_or_fail(job, f"İşçi yanıt vermiyor ({job.worker})")
+    return count
+
+
+class Worker:
+    """
+    Kuyruktan iş çeken süreç. `concurrency` kadar işi aynı anda thread'lerde
+    çalıştırır (FASTQ işleri kendi süreç havuzunu ayrıca kullanır); arka plan
+    thread'i çalışan işlerin kalp atışını damgalar.
+    """
+
+    def __init__(self, concurrency=1, queues=None, poll_interval=2.0, name=None):
+        self.concurrency = max(1, concurrency)
+        self.queues = queues or None
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.active = {}
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def _heartbeat_loop(self):
+        while not self.stopping.wait(HEARTBEAT_INTERVAL):
+            with self.lock:
+                ids = list(self.active)
+            if ids:
+                try:
+                    QueuedJob.objects.filter(pk__in=ids, status='RUNNING').update(
+                        heartbeat_at=timezone.now())
+                except Exception as e:
+                    logger.warning(f"Kalp atışı yazılamadı: {e}")
+        connection.close()
+
+    def _run(self, job):
+        try:
+            execute(job)
+        finally:
+            with self.lock:
+                self.active.pop(job.pk, None)
+            connection.close()
+
+    def run(self, burst=False):
+        """Durdurulana kadar (burst=True ise kuyruk boşalana kadar) iş çeker."""
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        last_reap = 0.0
+        try:
+            while not self.stopping.is_set():
+                if time.time() - last_reap > HEARTBEAT_INTERVAL:
+                    requeue_stale()
+                    last_reap = time.time()
+
+                claimed = False
+                while len(self.active) < self.concurrency:
+                    job = claim_next(self.name, self.queues)
+                    if job is None:
+                        break
+                    claimed = True
+                    thread = threading.Thread(target=self._run, args=(job,), daemon=True)
+                    with self.lock:
+                        self.active[job.pk] = thread
+                    thread.start()
+
+                if burst and not claimed and not self.active:
+                    break
+                self.stopping.wait(self.poll_interval)
+        finally:
+            self.stopping.set()
+            with self.lock:
+                threads = list(self.active.values())
+            for thread in threads:
+                thread.join()
+
+    def stop(self):
+        self.stopping.set()
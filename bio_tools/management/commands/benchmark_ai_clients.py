@@ -0,0 +1,110 @@
+"""
+ai_engine istemci önbelleğinin çağrı başına kazandırdığı süreyi ölçer.
+Yerel bir sahte (stub) OpenAI/Anthropic HTTP sunucusu açar, aynı isteği
+önce her çağrıda yeni istemciyle (eski davranış), sonra önbellekteki
+istemciyle (get_client) gönderir. Gerçek API'ye istek gitmez.
+
+--connect-delay, sunucunun her YENİ bağlantıda bekleyeceği süredir (ms) —
+gerçek ortamdaki TCP+TLS el sıkışmasını taklit eder.
+
+Kullanım:
+    python manage.py benchmark_ai_clients
+    python manage.py benchmark_ai_clients --calls 200 --connect-delay 80
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from ai_engine import services
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+
+    def setup(self):
+        super().setup()
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.path.endswith('/messages'):
+            body = {"id": "msg_stub", "type": "message", "role": "assistant", "model": "stub",
+                    "content": [{"type": "text", "text": "ok"}], "stop_reason": "end_turn",
+                    "usage": {"input_tokens": 1, "output_tokens": 1}}
+        else:
+            body = {"id": "chatcmpl-stub", "object": "chat.completion", "created": 0,
+                    "model": "stub", "choices": [{"index": 0, "finish_reason": "stop",
+                                                  "message": {"role": "assistant", "content": "ok"}}],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'AI SDK istemci önbelleğini yerel sahte sunucuyla ölçer (yeni istemci vs önbellek)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=100, help='Servis başına çağrı sayısı')
+        parser.add_argument('--connect-delay', type=float, default=0.0,
+                            help='Yeni bağlantı başına yapay gecikme (ms), TLS el sıkışmasını taklit eder')
+
+    def handle(self, *args, **options):
+        _StubHandler.connect_delay = options['connect_delay'] / 1000.0
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        # SDK'lar taban adresi ortam değişkeninden okur
+        saved = {k: os.environ.get(k) for k in ('OPENAI_BASE_URL', 'ANTHROPIC_BASE_URL')}
+        os.environ['OPENAI_BASE_URL'] = base + '/v1'
+        os.environ['ANTHROPIC_BASE_URL'] = base
+        n = options['calls']
+        try:
+            for service in ('OpenAI', 'Anthropic'):
+                try:
+                    services._build_client(service, 'stub-key')
+                except RuntimeError as e:
+                    self.stdout.write(self.style.WARNING(f"{service}: atlandı ({e})"))
+                    continue
+
+                services.invalidate_clients()
+                start = time.perf_counter()
+                for _ in range(n):
+                    services.invalidate_clients()  # eski davranış: her çağrıda yeni istemci
+                    services._call_service(service, 'stub', 'stub-key', 'ping', max_tokens=5)
+                fresh = (time.perf_counter() - start) / n
+
+                services.invalidate_clients()
+                start = time.perf_counter()
+                for _ in range(n):
+                    services._call_service(service, 'stub', 'stub-key', 'ping', max_tokens=5)
+                pooled = (time.perf_counter() - start) / n
+                services.invalidate_clients()
+
+                self.stdout.write(
+                    f"  {service:<10} yeni istemci {fresh * 1000:7.2f} ms/çağrı | "
+                    f"önbellek {pooled * 1000:7.2f} ms/çağrı")
+                self.stdout.write(self.style.SUCCESS(
+                    f"  ✓ Çağrı başına kazanç: {(fresh - pooled) * 1000:.2f} ms "
+                    f"({fresh / max(pooled, 1e-9):.1f}×)"))
+        finally:
+            server.shutdown()
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
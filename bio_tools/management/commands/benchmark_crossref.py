@@ -0,0 +1,159 @@
+"""
+CrossRef kaynak doğrulamasının süresini yerel sahte (fake) CrossRef
+sunucusuyla ölçer. Gerçek api.crossref.org'a istek gitmez.
+
+Üç durum karşılaştırılır:
+  1) eski davranış: kaynaklar sırayla, her istekte yeni urlopen bağlantısı
+  2) blog.crossref istemcisi, boş önbellek (keep-alive + paralel, polite pool sınırlarıyla)
+  3) aynı istemci, dolu önbellek
+
+--latency sunucunun her istekte bekleyeceği süre, --connect-delay her YENİ
+bağlantıda ek bekleme (TCP+TLS el sıkışmasını taklit eder), ms cinsinden.
+
+Kullanım:
+    python manage.py benchmark_crossref
+    python manage.py benchmark_crossref --refs 25 --latency 300 --connect-delay 150
+"""
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from blog import crossref, reference_check
+
+
+class _FakeCrossRef(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+    latency = 0.0
+    connect_delay = 0.0
+    known_dois = set()
+
+    def setup(self):
+        super().setup()
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urllib.parse.urlparse(self.path)
+        if url.path.startswith('/works/'):
+            doi = urllib.parse.unquote(url.path[len('/works/'):])
+            if doi not in self.known_dois:
+                return self._send(404, {'status': 'error', 'message': 'Resource not found.'})
+            body = {'message': {'DOI': doi, 'title': [f'Work {doi}'],
+                                'abstract': '<jats:p>Stub abstract.</jats:p>'}}
+        else:
+            query = urllib.parse.parse_qs(url.query).get('query.bibliographic', [''])[0]
+            body = {'message': {'items': [{'DOI': '10.0000/q', 'title': [query]}]}}
+        self._send(200, body)
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _BenchClient(crossref.CrossRefClient):
+    """Gerçek önbelleği kirletmemek için kendi bellek içi önbelleğini kullanır."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache = LocMemCache('benchmark-crossref', {'OPTIONS': {'MAX_ENTRIES': 10000}})
+
+    @property
+    def cache(self):
+        return self._cache
+
+
+def _legacy_verify(base, ref_text, timeout=10):
+    """Eski verify_single_reference'ın ağ davranışı: her istekte yeni bağlantı."""
+    headers = {'User-Agent': crossref.USER_AGENT}
+    doi = reference_check._extract_doi(ref_text)
+    if doi:
+        try:
+            req = urllib.request.Request(f"{base}/{urllib.parse.quote(doi)}", headers=headers)
+            with urllib.request.urlopen(req, timeout=timeout) as r:
+                json.loads(r.read().decode())
+            return
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                return
+    params = urllib.parse.urlencode({'query.bibliographic': ref_text[:300], 'rows': 3})
+    req = urllib.request.Request(f"{base}?{params}", headers=headers)
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        json.loads(r.read().decode())
+
+
+class Command(BaseCommand):
+    help = 'CrossRef doğrulamasını sahte sunucuyla ölçer (sıralı urlopen vs havuz+paralel+önbellek)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refs', type=int, default=25, help='Kaynakçadaki kaynak sayısı')
+        parser.add_argument('--latency', type=float, default=300.0, help='İstek başına gecikme (ms)')
+        parser.add_argument('--connect-delay', type=float, default=150.0,
+                            help='Yeni bağlantı başına gecikme (ms)')
+
+    def handle(self, *args, **options):
+        n = options['refs']
+        _FakeCrossRef.latency = options['latency'] / 1000.0
+        _FakeCrossRef.connect_delay = options['connect_delay'] / 1000.0
+        # Kaynakların yarısı DOI'li (bir kısmı 404 → başlık araması), yarısı yalnız başlık
+        lines, known = [], set()
+        for i in range(1, n + 1):
+            title = f"Benchmark reference number {i} about gene regulation networks"
+            if i % 2:
+                doi = f"10.5555/bench.{i}"
+                if i % 3:
+                    known.add(doi)
+                lines.append(f"[{i}] Author A. ({2000 + i}). {title}. J Bench. https://doi.org/{doi}")
+            else:
+                lines.append(f"[{i}] Author B. ({2000 + i}). \"{title}\". J Bench.")
+        _FakeCrossRef.known_dois = known
+        bibliography = '\n'.join(lines)
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _FakeCrossRef)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/works"
+        saved = reference_check.crossref
+        try:
+            entries = reference_check._parse_bibliography(bibliography)
+            start = time.perf_counter()
+            for e in entries:
+                _legacy_verify(base, e['text'])
+            legacy = time.perf_counter() - start
+
+            reference_check.crossref = _BenchClient(base_url=base)
+            start = time.perf_counter()
+            result = reference_check.verify_bibliography(bibliography, max_refs=n)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            reference_check.verify_bibliography(bibliography, max_refs=n)
+            warm = time.perf_counter() - start
+        finally:
+            reference_check.crossref = saved
+            server.shutdown()
+
+        client = _BenchClient(base_url=base)
+        self.stdout.write(f"  {n} kaynak ({result['verified']} doğrulandı, "
+                          f"{result['not_found']} bulunamadı, {result['unreachable']} erişilemedi)")
+        self.stdout.write(f"  eşzamanlılık={client.concurrency}, "
+                          f"hız ≤ {1 / client.min_interval if client.min_interval else '∞'} istek/sn")
+        self.stdout.write(f"  eski (sıralı, yeni bağlantı) : {legacy:7.2f} s")
+        self.stdout.write(f"  istemci, boş önbellek        : {cold:7.2f} s")
+        self.stdout.write(f"  istemci, dolu önbellek       : {warm:7.2f} s")
+        self.stdout.write(self.style.SUCCESS(
+            f"  ✓ Hızlanma: {legacy / max(cold, 1e-9):.1f}× (soğuk), "
+            f"{legacy / max(warm, 1e-9):.0f}× (önbellekli)"))
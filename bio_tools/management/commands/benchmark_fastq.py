@@ -0,0 +1,98 @@
+"""
+FASTQ QC motorlarını sentetik veri üzerinde karşılaştırır:
+tasks.compute_quality_means_streaming (satır satır döngü),
+fastq_qc.compute_quality_means_vectorized (blok + NumPy) ve
+--workers verilirse fastq_qc.compute_quality_means_parallel (süreç havuzu).
+
+Kullanım:
+    python manage.py benchmark_fastq
+    python manage.py benchmark_fastq --reads 200000 --length 150 --gzip
+    python manage.py benchmark_fastq --workers 4
+"""
+import gzip
+import os
+import tempfile
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from bio_tools.fastq_qc import compute_quality_means_vectorized, compute_quality_means_parallel
+from bio_tools.tasks import compute_quality_means_streaming
+
+
+def write_synthetic_fastq(path, n_reads, read_len, use_gzip=False, seed=42, batch=50_000):
+    """n_reads adet sabit uzunluklu rastgele okuma içeren bir FASTQ yazar."""
+    rng = np.random.default_rng(seed)
+    bases = np.frombuffer(b'ACGTN', dtype=np.uint8)
+    base_p = [0.29, 0.21, 0.21, 0.29, 0.0]
+    base_p[4] = 1.0 - sum(base_p[:4])
+    opener = gzip.open if use_gzip else open
+    with opener(path, 'wb') as fh:
+        written = 0
+        while written < n_reads:
+            n = min(batch, n_reads - written)
+            seqs = bases[rng.choice(5, size=(n, read_len), p=base_p)]
+            quals = (rng.integers(2, 41, size=(n, read_len)) + 33).astype(np.uint8)
+            lines = []
+            for i in range(n):
+                lines.append(b'@read_%d\n%s\n+\n%s\n' % (
+                    written + i, seqs[i].tobytes(), quals[i].tobytes()))
+            fh.write(b''.join(lines))
+            written += n
+
+
+class Command(BaseCommand):
+    help = 'Eski FASTQ QC döngüsünü vektörel motorla sentetik dosyada karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reads', type=int, default=1_000_000, help='Okuma sayısı (varsayılan 1M)')
+        parser.add_argument('--length', type=int, default=100, help='Okuma uzunluğu')
+        parser.add_argument('--gzip', action='store_true', help='Dosyayı gzip ile sıkıştır')
+        parser.add_argument('--skip-loop', action='store_true',
+                            help='Yavaş eski döngüyü çalıştırma (yalnızca vektörel motor)')
+        parser.add_argument('--workers', type=int, default=0,
+                            help='Süreç havuzu motorunu da bu işçi sayısıyla ölç (0 = ölçme)')
+
+    def handle(self, *args, **options):
+        n_reads, read_len = options['reads'], options['length']
+        suffix = '.fastq.gz' if options['gzip'] else '.fastq'
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic' + suffix)
+            self.stdout.write(f"Sentetik dosya yazılıyor: {n_reads:,} okuma × {read_len} bp ...")
+            write_synthetic_fastq(path, n_reads, read_len, use_gzip=options['gzip'])
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            self.stdout.write(f"  Boyut: {size_mb:.1f} MB")
+
+            results = {}
+            engines = [('vektörel', compute_quality_means_vectorized)]
+            if not options['skip_loop']:
+                engines.insert(0, ('döngü', compute_quality_means_streaming))
+            if options['workers'] > 0:
+                workers = options['workers']
+                engines.append((f'havuz×{workers}', lambda p, **kw: compute_quality_means_parallel(
+                    p, workers, **kw)))
+
+            for name, engine in engines:
+                payloads, counts = [], []
+                start = time.perf_counter()
+                engine(path, update_cb=payloads.append, read_count_cb=counts.append)
+                elapsed = time.perf_counter() - start
+                results[name] = (elapsed, payloads[-1], counts[-1])
+                self.stdout.write(
+                    f"  {name:<9} {elapsed:8.2f} s  "
+                    f"({counts[-1] / max(elapsed, 1e-9):,.0f} okuma/s, {size_mb / max(elapsed, 1e-9):.1f} MB/s)")
+
+        if 'döngü' in results:
+            loop_t, loop_p, loop_n = results['döngü']
+            vec_t, vec_p, vec_n = results['vektörel']
+            same = (loop_n == vec_n
+                    and loop_p['base_counts'] == vec_p['base_counts']
+                    and np.allclose(loop_p['quality_df_data']['Average Quality Score'],
+                                    vec_p['quality_df_data']['Average Quality Score']))
+            self.stdout.write(self.style.SUCCESS(f"Hızlanma: {loop_t / max(vec_t, 1e-9):.1f}×"))
+            if same:
+                self.stdout.write(self.style.SUCCESS("✓ Sonuçlar eşleşiyor"))
+            else:
+                self.stdout.write(self.style.ERROR("⚠️ Sonuçlar eşleşmiyor"))
@@ -0,0 +1,108 @@
+"""
+NumPy ORF bulucuyu (dash_apps.orf_finder) eski kodon-kodon taramayla karşılaştırır.
+
+50-200 kb'lik sentetik yapılar (rastgele omurga + yerleştirilmiş uzun ORF'ler,
+biri orijinden geçen) üretilir ve her boy için:
+  1) eski yöntem (Bio.Seq dilimleyerek, ATG başına ileri tarama),
+  2) orf_finder.find_orfs (doğrusal),
+  3) orf_finder.find_orfs (dairesel, orijinden geçenler dahil)
+ölçülür; doğrusal sonuçların eskisiyle birebir aynı olduğu doğrulanır.
+--worst-case stop'suz, ATG'si bol bir dizide eski yöntemin karesel davranışını gösterir.
+
+Kullanım:
+    python manage.py benchmark_orfs
+    python manage.py benchmark_orfs --sizes 50 100 200 --min-len 300
+    python manage.py benchmark_orfs --worst-case --sizes 5 10 20
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from dash_apps.orf_finder import find_orfs
+
+STOPS = ('TAA', 'TAG', 'TGA')
+SENSE = [a + b + c for a in 'ACGT' for b in 'ACGT' for c in 'ACGT' if a + b + c not in STOPS]
+
+
+def _reference_orfs(sequence, min_len):
+    """Eski plasmid_map.find_orfs (sıralı, kesilmemiş) — karşılaştırma için."""
+    from Bio.Seq import Seq
+
+    seq = Seq(sequence)
+    seq_len = len(sequence)
+    orfs = []
+    for strand, nuc in [(1, seq), (-1, seq.reverse_complement())]:
+        for frame in range(3):
+            i = frame
+            while i < seq_len - 2:
+                if str(nuc[i:i + 3]) == 'ATG':
+                    j = i
+                    while j < seq_len - 2:
+                        if str(nuc[j:j + 3]) in STOPS:
+                            orf_len = j + 3 - i
+                            if orf_len >= min_len:
+                                start, end = (i, j + 3) if strand == 1 else (seq_len - (j + 3), seq_len - i)
+                                orfs.append({'start': start, 'end': end, 'strand': strand,
+                                             'length': orf_len, 'aa': orf_len // 3 - 1})
+                            i = j + 3
+                            break
+                        j += 3
+                    else:
+                        i += 3
+                else:
+                    i += 3
+    orfs.sort(key=lambda x: -x['length'])
+    return orfs
+
+
+def _construct(rng, size):
+    """Rastgele omurga; ~her 10 kb'de bir 1-3 kb'lik ORF, sonuncusu orijinden geçer."""
+    seq = [rng.choice('ACGT') for _ in range(size)]
+    for pos in range(2000, size - 4000, 10000):
+        orf = 'ATG' + ''.join(rng.choice(SENSE) for _ in range(rng.randrange(300, 1000))) + 'TAA'
+        seq[pos:pos + len(orf)] = orf
+    wrap = 'ATG' + ''.join(rng.choice(SENSE) for _ in range(600)) + 'TGA'
+    half = len(wrap) // 2
+    seq[-half:] = wrap[:half]
+    seq[:len(wrap) - half] = wrap[half:]
+    return ''.join(seq)[:size]
+
+
+class Command(BaseCommand):
+    help = 'NumPy ORF bulucuyu eski kodon-kodon taramayla 50-200 kb yapılarda karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200], help='Yapı boyları (kb)')
+        parser.add_argument('--min-len', type=int, default=60)
+        parser.add_argument('--worst-case', action='store_true',
+                            help='Stop kodonsuz, ATG yoğun dizi (eski yöntem karesel)')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        min_len = options['min_len']
+        for kb in options['sizes']:
+            size = kb * 1000
+            if options['worst_case']:
+                seq = ''.join(rng.choice(['ATG', 'GCC', 'CAT']) for _ in range(size // 3))
+            else:
+                seq = _construct(rng, size)
+
+            start = time.perf_counter()
+            ref = _reference_orfs(seq, min_len)
+            old = time.perf_counter() - start
+            start = time.perf_counter()
+            linear = find_orfs(seq, min_len)
+            new = time.perf_counter() - start
+            start = time.perf_counter()
+            circular = find_orfs(seq, min_len, circular=True)
+            circ = time.perf_counter() - start
+
+            wraps = sum(1 for o in circular if o['end'] < o['start'])
+            self.stdout.write(f"{kb} kb: eski {old:7.3f} s | numpy {new * 1000:7.1f} ms "
+                              f"({old / max(new, 1e-9):.0f}×) | dairesel {circ * 1000:7.1f} ms | "
+                              f"{len(linear)} ORF, orijinden geçen {wraps}")
+            if ref != linear:
+                self.stdout.write(self.style.ERROR("  ✗ Doğrusal sonuçlar eski yöntemden farklı!"))
+        self.stdout.write(self.style.SUCCESS("✓ Tamamlandı"))
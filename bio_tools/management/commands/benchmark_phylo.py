@@ -0,0 +1,101 @@
+"""
+NumPy filogeni motorunu (dash_apps.phylo_engine) Bio.Phylo.TreeConstruction ile karşılaştırır.
+
+Ortak bir atadan mutasyonla türetilmiş sentetik hizalamalar (50-1000 takson)
+üretilir ve her boy için:
+  1) Biopython DistanceCalculator + DistanceTreeConstructor (NJ ve UPGMA),
+  2) phylo_engine.distance_matrix + nj/upgma
+ölçülür; iki yolun Newick çıktısının birebir aynı olduğu doğrulanır.
+Biopython referansı yavaş olduğundan yalnız --reference-max takson sayısına
+kadar çalıştırılır; daha büyük boylarda yalnız NumPy süreleri yazılır.
+
+Kullanım:
+    python manage.py benchmark_phylo
+    python manage.py benchmark_phylo --taxa 50 200 1000 --length 1000
+    python manage.py benchmark_phylo --model k2p --reference-max 0
+"""
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from dash_apps import phylo_engine
+
+
+def _simulate(rng, n_taxa, length):
+    """Ortak atadan %0-30 arası rastgele değişim (boşluk dahil) ile n_taxa dizi."""
+    ancestor = [rng.choice('ACGT') for _ in range(length)]
+    seqs = []
+    for _ in range(n_taxa):
+        seq = ancestor[:]
+        for _ in range(rng.randrange(0, length * 3 // 10 + 1)):
+            seq[rng.randrange(length)] = rng.choice('ACGT-')
+        seqs.append(''.join(seq))
+    return seqs
+
+
+def _newick(tree):
+    from Bio import Phylo
+
+    handle = io.StringIO()
+    Phylo.write(tree, handle, 'newick')
+    return handle.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'NumPy NJ/UPGMA motorunu Bio.Phylo.TreeConstruction ile karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--taxa', type=int, nargs='+', default=[50, 200, 1000], help='Takson sayıları')
+        parser.add_argument('--length', type=int, default=1000, help='Hizalama uzunluğu')
+        parser.add_argument('--model', default='identity', choices=phylo_engine.DISTANCE_MODELS)
+        parser.add_argument('--reference-max', type=int, default=200,
+                            help='Biopython referansının çalıştırılacağı en büyük takson sayısı')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        model = options['model']
+        for n in options['taxa']:
+            seqs = _simulate(rng, n, options['length'])
+            names = [f"t{i}" for i in range(n)]
+
+            start = time.perf_counter()
+            dm = phylo_engine.distance_matrix(phylo_engine.encode_alignment(seqs), model=model)
+            t_dist = time.perf_counter() - start
+            start = time.perf_counter()
+            nj_tree = phylo_engine.nj(dm, names)
+            t_nj = time.perf_counter() - start
+            start = time.perf_counter()
+            upgma_tree = phylo_engine.upgma(dm, names)
+            t_upgma = time.perf_counter() - start
+            line = (f"{n} takson: numpy mesafe {t_dist * 1000:8.1f} ms | NJ {t_nj * 1000:8.1f} ms | "
+                    f"UPGMA {t_upgma * 1000:8.1f} ms")
+
+            if n > options['reference_max'] or model != 'identity':
+                self.stdout.write(line + " | referans atlandı")
+                continue
+
+            from Bio.Align import MultipleSeqAlignment
+            from Bio.Phylo.TreeConstruction import DistanceCalculator, DistanceTreeConstructor
+            from Bio.Seq import Seq
+            from Bio.SeqRecord import SeqRecord
+
+            aln = MultipleSeqAlignment([SeqRecord(Seq(s), id=name) for s, name in zip(seqs, names)])
+            start = time.perf_counter()
+            ref_dm = DistanceCalculator('identity').get_distance(aln)
+            r_dist = time.perf_counter() - start
+            constructor = DistanceTreeConstructor()
+            start = time.perf_counter()
+            ref_nj = constructor.nj(ref_dm)
+            r_nj = time.perf_counter() - start
+            start = time.perf_counter()
+            ref_upgma = constructor.upgma(ref_dm)
+            r_upgma = time.perf_counter() - start
+
+            total_old, total_new = r_dist + r_nj + r_upgma, t_dist + t_nj + t_upgma
+            self.stdout.write(line + f" | biopython {total_old:7.2f} s ({total_old / max(total_new, 1e-9):.0f}×)")
+            if _newick(ref_nj) != _newick(nj_tree) or _newick(ref_upgma) != _newick(upgma_tree):
+                self.stdout.write(self.style.ERROR("  ✗ Newick çıktısı Biopython'dan farklı!"))
+        self.stdout.write(self.style.SUCCESS("✓ Tamamlandı"))
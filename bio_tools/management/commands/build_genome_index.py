@@ -0,0 +1,63 @@
+"""
+Yerel off-target indeksini (dash_apps.genome_index) bir genom FASTA'sından kurar.
+
+İndeks settings.GENOME_INDEX_DIR/<tür>/<enzim>/ altına yazılır; CRISPR
+tasarımcısı o tür+enzim için indeks bulunca uzak NCBI BLAST yerine onu kullanır.
+Tür adı arayüzdeki Ensembl adlarıyla aynı olmalıdır (homo_sapiens, mus_musculus...).
+
+Kurulum tek seferliktir ama büyük genomlarda uzun sürer ve bellek ister
+(insan + SpCas9: ~390M site, birkaç GB RAM, ~15 GB disk).
+
+Kullanım:
+    python manage.py build_genome_index --fasta GRCh38.fa.gz --species homo_sapiens
+    python manage.py build_genome_index --fasta sacCer3.fa --species saccharomyces_cerevisiae \\
+        --enzyme SaCas9 --max-mismatches 3
+"""
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dash_apps.crispr_engine import ENZYMES
+from dash_apps.genome_index import DEFAULT_MAX_MISMATCHES, build_index
+
+
+class Command(BaseCommand):
+    help = 'Genom FASTA\'sından yerel off-target indeksi kurar (2-bit paketli, memmap)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fasta', required=True, help='Genom FASTA dosyası (.fa / .fa.gz)')
+        parser.add_argument('--species', required=True, help='Ensembl tür adı (örn. homo_sapiens)')
+        parser.add_argument('--enzyme', default='SpCas9', choices=sorted(ENZYMES))
+        parser.add_argument('--max-mismatches', type=int, default=DEFAULT_MAX_MISMATCHES,
+                            help='Sorgulanabilecek en çok uyumsuzluk (seed sayısı = bu + 1; '
+                                 'her seed ≤ 12 nt olacak kadar büyük olmalı)')
+        parser.add_argument('--out', help='Çıktı dizini (varsayılan: GENOME_INDEX_DIR/<tür>/<enzim>)')
+
+    def handle(self, *args, **options):
+        fasta = options['fasta']
+        if not os.path.exists(fasta):
+            raise CommandError(f"FASTA bulunamadı: {fasta}")
+        out = options['out'] or os.path.join(str(settings.GENOME_INDEX_DIR),
+                                             options['species'], options['enzyme'])
+        # Yarım kalmış kurulum mevcut indeksi bozmasın: geçici dizine kur, sonra taşı
+        tmp = out.rstrip(os.sep) + '.building'
+        shutil.rmtree(tmp, ignore_errors=True)
+
+        def progress(name, length, sites):
+            self.stdout.write(f"  {name}: {length:,} bp, {sites:,} site")
+
+        self.stdout.write(f"İndeks kuruluyor: {fasta} → {out}")
+        try:
+            meta = build_index(fasta, tmp, enzyme=options['enzyme'],
+                               max_mismatches=options['max_mismatches'], progress=progress)
+        except ValueError as e:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise CommandError(str(e))
+        shutil.rmtree(out, ignore_errors=True)
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        os.replace(tmp, out)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(meta['contigs'])} kontig, {meta['sites']:,} site, "
+            f"{meta['build_seconds']} sn"))
@@ -24,6 +24,7 @@ class Command(BaseCommand):
             for name in settings.CACHES.keys():
                 self._show_cache_stats(name)
                 self.stdout.write('')
+            self._show_ai_response_cache()
 
     def _show_cache_stats(self, cache_name):
         try:
@@ -47,5 +48,22 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(self.style.WARNING("  ⚠️ Okuma/Yazma başarısız"))
 
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"  Hata: {str(e)}"))
+
+    def _show_ai_response_cache(self):
+        from ai_engine import response_cache
+        from ai_engine.models import ResponseCache
+        from django.db.models import Sum
+
+        self.stdout.write(self.style.SUCCESS(f"\n{'=' * 50}"))
+        self.stdout.write(self.style.SUCCESS("  AI YANIT ÖNBELLEĞİ"))
+        self.stdout.write(self.style.SUCCESS(f"{'=' * 50}"))
+        try:
+            stats = response_cache.stats()
+            total_hits = ResponseCache.objects.aggregate(n=Sum('hits'))['n'] or 0
+            self.stdout.write(f"  Kayıt: {stats['entries']} / {response_cache.MAX_ENTRIES}")
+            self.stdout.write(f"  TTL: {response_cache.DEFAULT_TTL}s")
+            self.stdout.write(f"  Toplam isabet (tüm süreçler): {total_hits}")
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"  Hata: {str(e)}"))
\ No newline at end of file
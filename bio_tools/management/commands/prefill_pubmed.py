@@ -0,0 +1,66 @@
+"""
+Yerel PubMed/PMC deposunu (blog.pubmed_store) sorgu listesinden önceden doldurur.
+
+Her sorgu için makale üretimindeki adımlar aynen çalıştırılır: arama →
+özetler → toplu PMID→PMCID → (ticari-uygun lisanslı) PMC tam metni. Depoda
+olanlar ağa gitmez; ikinci çalıştırma neredeyse anında biter.
+
+Kullanım:
+    python manage.py prefill_pubmed "CRISPR off-target" "gut microbiome obesity"
+    python manage.py prefill_pubmed --file sorgular.txt --retmax 20
+    python manage.py prefill_pubmed --file sorgular.txt --no-fulltext
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'PubMed arama/özet/PMCID/tam metin deposunu sorgu listesinden doldurur'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', help='PubMed sorguları')
+        parser.add_argument('--file', help='Her satırda bir sorgu içeren dosya (# ile başlayanlar atlanır)')
+        parser.add_argument('--retmax', type=int, default=12, help='Sorgu başına PMID sayısı')
+        parser.add_argument('--recent-years', type=int, default=6)
+        parser.add_argument('--no-fulltext', action='store_true', help='PMCID ve PMC tam metni çekme')
+
+    def handle(self, *args, **options):
+        from blog import pubmed_sources as ps
+
+        queries = list(options['queries'])
+        if options['file']:
+            with open(options['file'], encoding='utf-8') as fh:
+                queries += [line.strip() for line in fh if line.strip() and not line.startswith('#')]
+        if not queries:
+            raise CommandError('En az bir sorgu veya --file verin')
+        if not ps._configure_entrez():
+            raise CommandError('Entrez yapılandırılamadı (NCBI_EMAIL / Biopython)')
+
+        totals = {'pmid': 0, 'summary': 0, 'pmc': 0, 'fulltext': 0}
+        start_all = time.perf_counter()
+        for query in queries:
+            start = time.perf_counter()
+            try:
+                pmids = ps._search_pmids(query, retmax=options['retmax'], recent_years=options['recent_years'])
+                summaries = ps._fetch_summaries(pmids)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"✗ {query}: {e}"))
+                continue
+            pmc = fulltexts = 0
+            if not options['no_fulltext']:
+                links = ps._pmids_to_pmcids(pmids)
+                pmc = len(links)
+                texts = ps._fetch_pmc_fulltexts(list(links.values()))
+                fulltexts = sum(text is not None for text, _ in texts.values())
+            totals['pmid'] += len(pmids)
+            totals['summary'] += len(summaries)
+            totals['pmc'] += pmc
+            totals['fulltext'] += fulltexts
+            self.stdout.write(f"  {query}: {len(pmids)} PMID, {len(summaries)} özet, {pmc} PMC, "
+                              f"{fulltexts} tam metin ({time.perf_counter() - start:.1f} s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(queries)} sorgu: {totals['pmid']} PMID, {totals['summary']} özet, "
+            f"{totals['pmc']} PMC, {totals['fulltext']} tam metin "
+            f"({time.perf_counter() - start_all:.1f} s)"))
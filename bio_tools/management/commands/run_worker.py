@@ -0,0 +1,45 @@
+"""
+Kalıcı iş kuyruğundaki (QueuedJob) işleri çalıştıran işçi süreci.
+Birden fazla işçi farklı çekirdek veya sunucularda aynı veritabanına
+bağlanarak çalıştırılabilir.
+
+Kullanım:
+    python manage.py run_worker
+    python manage.py run_worker --concurrency 2 --queues fastq
+    python manage.py run_worker --burst      # kuyruk boşalınca çık
+"""
+import signal
+
+from django.core.management.base import BaseCommand
+
+from bio_tools.job_queue import Worker
+
+
+class Command(BaseCommand):
+    help = 'Veritabanı iş kuyruğundan FASTQ analizi ve makale üretimi işlerini çalıştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Bu işçide aynı anda çalışacak iş sayısı')
+        parser.add_argument('--queues', default='',
+                            help='Yalnızca bu kuyruklar (virgülle, örn. fastq,article)')
+        parser.add_argument('--poll', type=float, default=2.0, help='Kuyruk yoklama aralığı (sn)')
+        parser.add_argument('--burst', action='store_true', help='Kuyruk boşalınca çık')
+
+    def handle(self, *args, **options):
+        queues = [q.strip() for q in options['queues'].split(',') if q.strip()]
+        worker = Worker(concurrency=options['concurrency'], queues=queues,
+                        poll_interval=options['poll'])
+
+        # SIGTERM/Ctrl+C: yeni iş alma, çalışanların bitmesini bekle
+        def _stop(signum, frame):
+            self.stdout.write("⏹ Durduruluyor, çalışan işler bekleniyor...")
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        self.stdout.write(f"👷 İşçi başladı: {worker.name} "
+                          f"(eşzamanlılık={worker.concurrency}, kuyruklar={queues or 'hepsi'})")
+        worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS("✓ İşçi durdu"))
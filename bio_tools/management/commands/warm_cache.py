@@ -3,6 +3,10 @@ Cache'i ön-ısıtır (popüler verileri önceden yükler)
 
 Kullanım:
     python manage.py warm_cache
+    python manage.py warm_cache --sequences   # + SEQUENCE_CACHE_PREWARM gen dizileri
+
+Dizi önbelleğinin tek ön-ısıtma yolu budur; günlük zamanlanmış görev olarak
+--sequences ile çalıştırın (web süreçleri açılışta ısıtma yapmaz).
 """
 from django.core.management.base import BaseCommand
 from django.core.cache import cache
@@ -12,6 +16,10 @@ from bio_tools.models import FastqUpload
 class Command(BaseCommand):
     help = 'Popüler verileri cache\'e yükler'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--sequences', action='store_true',
+                            help='SEQUENCE_CACHE_PREWARM listesindeki dizileri disk önbelleğine çek')
+
     def handle(self, *args, **options):
         self.stdout.write("🔥 Cache ısıtılıyor...")
 
@@ -29,4 +37,10 @@ class Command(BaseCommand):
 
         self.stdout.write(
             self.style.SUCCESS(f"✓ {len(recent_files)} dosya cache'lendi")
-        )
\ No newline at end of file
+        )
+
+        if options['sequences']:
+            from dash_apps.sequence_cache import prewarm
+            ok, failed = prewarm()
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {ok} dizi önbellekte" + (f" ({failed} çekilemedi)" if failed else "")))
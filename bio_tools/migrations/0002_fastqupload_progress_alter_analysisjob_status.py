@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bio_tools', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fastqupload',
+            name='progress',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='analysisjob',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Beklemede'), ('RUNNING', 'Çalışıyor'), ('DONE', 'Tamamlandı'), ('ERROR', 'Hata'), ('CANCELLED', 'İptal Edildi')], default='PENDING', max_length=10),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bio_tools', '0002_fastqupload_progress_alter_analysisjob_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_type', models.CharField(db_index=True, max_length=50)),
+                ('queue', models.CharField(db_index=True, default='default', max_length=30)),
+                ('kwargs', models.JSONField(blank=True, default=dict)),
+                ('ref_id', models.CharField(blank=True, db_index=True, default='', max_length=100)),
+                ('status', models.CharField(choices=[('PENDING', 'Beklemede'), ('RUNNING', 'Çalışıyor'), ('DONE', 'Tamamlandı'), ('FAILED', 'Başarısız'), ('CANCELLED', 'İptal Edildi')], default='PENDING', max_length=10)),
+                ('progress', models.IntegerField(default=0)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=3)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='bio_tools_q_status_618d2c_idx')],
+            },
+        ),
+    ]
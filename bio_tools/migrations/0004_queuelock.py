@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bio_tools', '0003_queuedjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueLock',
+            fields=[
+                ('name', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -17,6 +17,7 @@ class AnalysisJob(models.Model):
         ('RUNNING', 'Çalışıyor'),
         ('DONE', 'Tamamlandı'),
         ('ERROR', 'Hata'),
+        ('CANCELLED', 'İptal Edildi'),
     ]
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
 
@@ -54,6 +55,63 @@ class AnalysisJob(models.Model):
         return f"{self.file_name or 'N/A'} ({self.job_id}) - {self.status}"
 
 
+class QueuedJob(models.Model):
+    """
+    Veritabanı tabanlı kalıcı iş kuyruğu kaydı (Redis/Celery yok).
+    Web tarafı job_queue.enqueue ile satır ekler, `manage.py run_worker`
+    süreçleri satırı kilitleyerek sahiplenir ve çalıştırır. Süreç yeniden
+    başlasa da bekleyen işler kaybolmaz.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Beklemede'),
+        ('RUNNING', 'Çalışıyor'),
+        ('DONE', 'Tamamlandı'),
+        ('FAILED', 'Başarısız'),
+        ('CANCELLED', 'İptal Edildi'),
+    ]
+
+    task_type = models.CharField(max_length=50, db_index=True)
+    # Eşzamanlılık sınırının uygulandığı grup (örn. 'fastq', 'article')
+    queue = models.CharField(max_length=30, default='default', db_index=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    # İlgili kayıt (örn. AnalysisJob.job_id) — iptal ve kalıcı hata bildirimi için
+    ref_id = models.CharField(max_length=100, blank=True, default='', db_index=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    progress = models.IntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    # Yeniden deneme geri çekilmesi: bu zamandan önce sahiplenilmez
+    run_after = models.DateTimeField(default=timezone.now)
+    error_message = models.TextField(blank=True, null=True)
+
+    worker = models.CharField(max_length=100, blank=True, default='')
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.task_type} #{self.pk} - {self.status}"
+
+
+class QueueLock(models.Model):
+    """
+    Kuyruk başına semafor satırı: job_queue.claim_next, eşzamanlılık sınırlı bir
+    kuyruktan iş sahiplenmeden önce bu satırı günceller (satır kilidi), böylece
+    RUNNING sayımı ile sahiplenme işçiler arasında sıraya girer.
+    """
+    name = models.CharField(max_length=30, primary_key=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
+
+
 def fastq_file_upload_path(instance, filename):
     """
     Dosyayı MEDIA_ROOT/fastq_uploads/<instance.session_key>/<filename>
@@ -109,6 +167,8 @@ class FastqUpload(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploaded')
 
     total_reads = models.BigIntegerField(null=True, blank=True)
+    # Analiz ilerlemesi (%) — süreç havuzunda dosya bazlı güncellenir
+    progress = models.IntegerField(default=0)
     error_message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
 
@@ -4,29 +4,31 @@
 
 import os
 import gzip
+import json
 import time
-from collections import Counter
 from typing import Optional, Callable, Dict, List
 
+from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 from .models import FastqUpload, AnalysisJob
+from .fastq_qc import (
+    TOP_N_SEQUENCES, UPDATE_FREQUENCY_READS, OVERREP_SKETCH_SIZE, GC_HISTOGRAM_BINS,
+    SHARD_MIN_BYTES, AnalysisCancelled, HeavyHitterSketch, is_gzip_file,
+    compute_quality_means_vectorized, compute_quality_means_parallel, analyze_files_parallel,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
 # --- Eski Dash uygulamasından taşınan yardımcı fonksiyonlar (Değişiklik Yok) ---
+# Not: process_fastq_file artık fastq_qc.compute_quality_means_vectorized
+# kullanır; bu satır satır döngü referans/benchmark için korunur.
 
-TOP_N_SEQUENCES = 50
-UPDATE_FREQUENCY_READS = 100_000 # Veritabanını güncelleme sıklığı
-
-def is_gzip_file(path: str) -> bool:
-    if path.endswith(".gz"): return True
-    try:
-        with open(path, "rb") as f:
-            return f.read(2) == b'\x1f\x8b'
-    except Exception:
-        return False
+# Tekrarlayan dizi özetinin kapasitesi (bellek sınırı) — settings'ten ayarlanabilir
+SKETCH_SIZE = getattr(settings, 'FASTQ_OVERREP_SKETCH_SIZE', OVERREP_SKETCH_SIZE)
+# Süreç havuzundaki işçi sayısı (1 = havuz kullanma, tek süreçte analiz et)
+ANALYSIS_WORKERS = getattr(settings, 'FASTQ_ANALYSIS_WORKERS', 1)
 
 def compute_quality_means_streaming(
         path: str,
@@ -36,9 +38,9 @@ def compute_quality_means_streaming(
 ):
     opener = gzip.open if is_gzip_file(path) else open
     sums, counts = [], []
-    gc_contents: List[float] = []
+    gc_histogram: List[int] = [0] * GC_HISTOGRAM_BINS
     base_counts: Dict[str, int] = {'A': 0, 'T': 0, 'G': 0, 'C': 0, 'N': 0}
-    sequence_counts = Counter()
+    sequence_counts = HeavyHitterSketch(SKETCH_SIZE)
     total_size = os.path.getsize(path)
     bytes_read = 0
     read_count = 0
@@ -73,14 +75,14 @@ def compute_quality_means_streaming(
                 for base in sequence:
                     if base in base_counts: base_counts[base] += 1
                 gc_count = sequence.count('G') + sequence.count('C')
-                gc_contents.append((gc_count / L_seq) * 100)
+                gc_histogram[round((gc_count / L_seq) * 100)] += 1
 
             if update_cb and read_count % UPDATE_FREQUENCY_READS == 0:
                 means = [(s / c) if c else 0 for s, c in zip(sums, counts)]
                 top_sequences = sequence_counts.most_common(TOP_N_SEQUENCES)
                 update_payload = {
                     "quality_df_data": {"Base Position": list(range(1, len(means) + 1)), "Average Quality Score": means},
-                    "gc_data": gc_contents,
+                    "gc_data": gc_histogram,
                     "base_counts": base_counts,
                     "overrep_sequences": top_sequences,
                 }
@@ -92,7 +94,7 @@ def compute_quality_means_streaming(
         top_sequences = sequence_counts.most_common(TOP_N_SEQUENCES)
         final_payload = {
             "quality_df_data": {"Base Position": list(range(1, len(means) + 1)), "Average Quality Score": means},
-            "gc_data": gc_contents,
+            "gc_data": gc_histogram,
             "base_counts": base_counts,
             "overrep_sequences": top_sequences,
         }
@@ -102,12 +104,63 @@ def compute_quality_means_streaming(
 
 # --- FASTQ ANALİZ FONKSİYONU ---
 
+def _cancel_checker(job_id: Optional[str], interval: float = 2.0) -> Callable[[], bool]:
+    """
+    cancel_job_view işi CANCELLED yaptı mı? Veritabanını en fazla 'interval'
+    saniyede bir sorgulayan bir kontrol fonksiyonu döndürür.
+    """
+    last_check = 0.0
+    cancelled = False
+
+    def is_cancelled() -> bool:
+        nonlocal last_check, cancelled
+        if job_id and not cancelled and time.time() - last_check > interval:
+            last_check = time.time()
+            cancelled = AnalysisJob.objects.filter(job_id=job_id, status='CANCELLED').exists()
+        return cancelled
+
+    return is_cancelled
+
+
+def _set_done_unless_cancelled(job: AnalysisJob, duration: float) -> bool:
+    """
+    job.set_done'un iptale saygılı hali: son _cancel_checker yoklamasından sonra
+    gelen CANCELLED ezilmez. Tamamlandıysa True döner.
+    """
+    now = timezone.now()
+    done = AnalysisJob.objects.filter(job_id=job.job_id).exclude(status='CANCELLED').update(
+        status='DONE', progress=100, total_duration=duration, completed_at=now) == 1
+    if done:
+        job.status, job.progress, job.total_duration, job.completed_at = 'DONE', 100, duration, now
+    return done
+
+
+def _set_error_unless_cancelled(job: AnalysisJob, message: str, duration: float) -> bool:
+    """job.set_error'un iptale saygılı hali; iş iptal edilmişse False döner."""
+    now = timezone.now()
+    failed = AnalysisJob.objects.filter(job_id=job.job_id).exclude(status='CANCELLED').update(
+        status='ERROR', error_message=message, total_duration=duration, completed_at=now) == 1
+    if failed:
+        job.status, job.error_message, job.total_duration, job.completed_at = \
+            'ERROR', message, duration, now
+    return failed
+
+
+def _use_process_pool(file_path: str) -> bool:
+    """Havuz yalnızca shard'lara bölünebilecek kadar büyük düz dosyalarda değer."""
+    return (ANALYSIS_WORKERS > 1 and not is_gzip_file(file_path)
+            and os.path.getsize(file_path) >= 2 * SHARD_MIN_BYTES)
+
+
 def process_fastq_file(job_id: str, file_path: str):
     """
-    FASTQ dosyasını analiz eder. View katmanında threading ile arka planda çağrılır.
+    FASTQ dosyasını analiz eder. İş kuyruğu işçisi (run_worker) tarafından çağrılır.
     """
     try:
         job = AnalysisJob.objects.get(job_id=job_id)
+        # Kuyrukta beklerken iptal edildiyse hiç başlama
+        if job.status == 'CANCELLED':
+            return f"{job_id} ID'li iş iptal edilmiş."
         job.status = 'RUNNING'
         job.save()
     except AnalysisJob.DoesNotExist:
@@ -148,81 +201,80 @@ def process_fastq_file(job_id: str, file_path: str):
             ])
 
     try:
-        compute_quality_means_streaming(
-            path=file_path,
-            progress_cb=progress_cb,
-            update_cb=update_cb,
-            read_count_cb=read_count_cb
-        )
-        duration = time.time() - start_time
-        job.set_done(duration)
+        if _use_process_pool(file_path):
+            compute_quality_means_parallel(
+                path=file_path,
+                workers=ANALYSIS_WORKERS,
+                progress_cb=progress_cb,
+                update_cb=update_cb,
+                read_count_cb=read_count_cb,
+                cancel_cb=_cancel_checker(job_id),
+                sketch_size=SKETCH_SIZE,
+            )
+        else:
+            compute_quality_means_vectorized(
+                path=file_path,
+                progress_cb=progress_cb,
+                update_cb=update_cb,
+                read_count_cb=read_count_cb,
+                cancel_cb=_cancel_checker(job_id),
+                sketch_size=SKETCH_SIZE,
+            )
+        # Son sonuçlar (update_cb'nin kısılmış kayıtları) durumdan bağımsız yazılır
+        job.save(update_fields=[
+            'reads_processed', 'quality_scores_json', 'gc_histogram_data_json',
+            'base_composition_json', 'overrepresented_seqs_json',
+        ])
+        if not _set_done_unless_cancelled(job, time.time() - start_time):
+            return f"İş {job_id} iptal edildi."
+
+    except AnalysisCancelled:
+        # Durum cancel_job_view tarafından zaten CANCELLED yapıldı; üzerine yazma
+        job.total_duration = time.time() - start_time
+        job.completed_at = timezone.now()
+        job.save(update_fields=['total_duration', 'completed_at'])
+        return f"İş {job_id} iptal edildi."
 
     except Exception as e:
         duration = time.time() - start_time
         job.set_error(str(e), duration)
-        # Hatanın tekrar denenmemesi için yeniden raise etmiyoruz.
-        return f"İş {job_id} hata ile sonlandı: {e}"
+        # İş kuyruğu geri çekilmeyle yeniden denesin (deneme bitince FAILED)
+        raise
 
     return f"İş {job_id} başarıyla tamamlandı."
 
 
-def analyze_single_file(file_id):
+def analyze_single_file(file_id, job_id=None):
     """
-    Tek bir FASTQ dosyasını analiz eder.
+    Tek bir FASTQ dosyasını analiz eder (büyükse shard'lara bölünerek).
     
     Args:
         file_id: FastqUpload model ID'si (str veya UUID)
+        job_id: İlerleme/iptal takibi için AnalysisJob.job_id (opsiyonel)
     
     Returns:
         dict: Analiz sonuçları
     """
-    try:
-        upload = FastqUpload.objects.get(id=file_id)
-        
-        if not upload.absolute_file_path or not os.path.exists(upload.absolute_file_path):
-            raise FileNotFoundError(f"Dosya bulunamadı: {file_id}")
-        
-        upload.status = 'running'
-        upload.save()
-        
-        # Mevcut analyze_fastq_task fonksiyonunu kullan
-        # veya burada analiz kodunu çağır
-        from dash_apps.fastq_app import analyze_fastq
-        
-        quality_df, distributions, gc_data, base_counts, reads_processed, read_lengths = \
-            analyze_fastq(upload.absolute_file_path)
-        
-        # Sonuçları kaydet
-        upload.total_reads = reads_processed
-        upload.status = 'done'
-        upload.save()
-        
-        logger.info(f"Dosya {file_id} başarıyla analiz edildi. {reads_processed} okuma işlendi.")
-        
-        return {
-            'file_id': str(file_id),
-            'reads_processed': reads_processed,
-            'status': 'success'
-        }
-        
-    except FastqUpload.DoesNotExist:
-        logger.error(f"Dosya bulunamadı: {file_id}")
-        raise
-    except Exception as e:
-        logger.error(f"Dosya {file_id} analiz hatası: {str(e)}")
-        if 'upload' in locals():
-            upload.status = 'error'
-            upload.error_message = str(e)
-            upload.save()
-        raise
+    result = parallel_fastq_analysis([file_id], job_id=job_id)[0]
+    if result['status'] != 'success':
+        raise RuntimeError(result.get('error') or f"Dosya {file_id} analiz edilemedi")
+    return result
 
-def parallel_fastq_analysis(file_ids):
+
+def parallel_fastq_analysis(file_ids, job_id=None):
     """
-    Birden fazla FASTQ dosyasını sırayla analiz eder.
-    (Celery kaldırıldı — group/chord yerine ardışık işleme.)
+    Birden fazla FASTQ dosyasını süreç havuzunda eşzamanlı analiz eder.
+    Büyük, sıkıştırılmamış dosyalar kayıt sınırlarında shard'lara bölünür ve
+    shard sonuçları birleştirilir (bkz. fastq_qc.analyze_files_parallel).
+
+    Dosya bazlı ilerleme FastqUpload.progress'e, toplam ilerleme (verilmişse)
+    AnalysisJob'a yazılır. İş cancel_job_view ile CANCELLED yapılırsa bekleyen
+    shard'lar iptal edilir ve havuz düzgünce kapatılır. Havuz kurulamazsa hata
+    AnalysisJob'a yazılıp yükseltilir (iş kuyruğu yeniden dener).
 
     Args:
         file_ids: FastqUpload ID'lerinin listesi
+        job_id: AnalysisJob.job_id (opsiyonel)
 
     Returns:
         list: Her dosya için analiz sonuçları
@@ -230,19 +282,102 @@ def parallel_fastq_analysis(file_ids):
     if not file_ids:
         return []
 
-    logger.info(f"Analiz başlatılıyor: {len(file_ids)} dosya")
+    logger.info(f"Analiz başlatılıyor: {len(file_ids)} dosya, {ANALYSIS_WORKERS} işçi")
+    start_time = time.time()
+
+    job = AnalysisJob.objects.filter(job_id=job_id).first() if job_id else None
+    if job and job.status == 'PENDING':
+        job.status = 'RUNNING'
+        job.save(update_fields=['status'])
 
-    results = []
+    results, uploads = {}, {}
     for file_id in file_ids:
+        key = str(file_id)
         try:
-            results.append(analyze_single_file(file_id))
+            upload = FastqUpload.objects.get(id=file_id)
+            if not upload.absolute_file_path or not os.path.exists(upload.absolute_file_path):
+                raise FileNotFoundError(f"Dosya bulunamadı: {file_id}")
+            upload.status = 'running'
+            upload.progress = 0
+            upload.save(update_fields=['status', 'progress'])
+            uploads[key] = upload
         except Exception as e:
             logger.error(f"Dosya {file_id} analiz edilemedi: {e}")
-            results.append({'file_id': str(file_id), 'status': 'error',
-                            'error': str(e)})
+            results[key] = {'file_id': key, 'status': 'error', 'error': str(e)}
+
+    file_progress = {key: 0 for key in uploads}
+
+    def report_job_progress():
+        if job and file_progress:
+            job.progress = min(99, sum(file_progress.values()) // len(file_progress))
+            job.reads_processed = sum(u.total_reads or 0 for u in uploads.values())
+            job.save(update_fields=['progress', 'reads_processed'])
+
+    def on_progress(key, pct, reads):
+        upload = uploads[key]
+        upload.progress = pct
+        upload.total_reads = reads
+        upload.save(update_fields=['progress', 'total_reads'])
+        file_progress[key] = pct
+        report_job_progress()
+
+    def on_done(key, acc, error):
+        upload = uploads[key]
+        if error is not None:
+            logger.error(f"Dosya {key} analiz hatası: {error}")
+            upload.status = 'error'
+            upload.error_message = str(error)
+            upload.save(update_fields=['status', 'error_message'])
+            results[key] = {'file_id': key, 'status': 'error', 'error': str(error)}
+        else:
+            upload.status = 'done'
+            upload.progress = 100
+            upload.total_reads = acc.read_count
+            upload.save(update_fields=['status', 'progress', 'total_reads'])
+            logger.info(f"Dosya {key} başarıyla analiz edildi. {acc.read_count} okuma işlendi.")
+            results[key] = {'file_id': key, 'reads_processed': acc.read_count,
+                            'status': 'success'}
+        file_progress[key] = 100
+        report_job_progress()
+
+    try:
+        if uploads:
+            analyze_files_parallel(
+                {key: u.absolute_file_path for key, u in uploads.items()},
+                workers=ANALYSIS_WORKERS,
+                on_progress=on_progress,
+                on_done=on_done,
+                cancel_cb=_cancel_checker(job_id),
+                sketch_size=SKETCH_SIZE,
+            )
+    except AnalysisCancelled:
+        logger.info(f"Analiz iptal edildi: {job_id}")
+        for key, upload in uploads.items():
+            if key not in results:
+                upload.status = 'uploaded'
+                upload.error_message = 'Analiz iptal edildi'
+                upload.save(update_fields=['status', 'error_message'])
+                results[key] = {'file_id': key, 'status': 'cancelled'}
+        if job:
+            job.total_duration = time.time() - start_time
+            job.completed_at = timezone.now()
+            job.save(update_fields=['total_duration', 'completed_at'])
+        return [results[str(file_id)] for file_id in file_ids]
+    except Exception as e:
+        # Havuz kurulamadı vb. — kalan dosyaları hata olarak işaretle
+        logger.error(f"Süreç havuzu hatası: {e}", exc_info=True)
+        for key in uploads:
+            if key not in results:
+                on_done(key, None, e)
+        if job:
+            job.set_error(str(e), time.time() - start_time)
+        raise
+
+    if job and not _set_done_unless_cancelled(job, time.time() - start_time):
+        logger.info(f"Analiz bitti ama iş bu arada iptal edildi: {job_id}")
 
     logger.info(f"Analiz tamamlandı: {len(results)} dosya")
-    return results
+    return [results[str(file_id)] for file_id in file_ids]
 
 def scheduled_cleanup():
     """
@@ -291,4 +426,95 @@ def batch_analyze_and_compare(file_ids, comparison_name=None):
     }
     
     logger.info(f"Batch karşılaştırma tamamlandı: {comparison_name}")
-    return comparison_data
\ No newline at end of file
+    return comparison_data
+
+# --- TOPLU CRISPR TASARIMI ---
+
+CRISPR_BATCH_WORKERS = getattr(settings, 'CRISPR_BATCH_WORKERS', 1)
+
+
+def crispr_batch_path(job_id):
+    """Toplu tasarım TSV'sinin yolu (MEDIA_ROOT/crispr_batch/<job_id>.tsv)."""
+    return os.path.join(str(settings.MEDIA_ROOT), 'crispr_batch', f'{job_id}.tsv')
+
+
+def crispr_batch_summary_path(job_id):
+    """Gen özetleri TSV'nin yanında JSON olarak tutulur (işçi ve web süreci ortak okur)."""
+    return os.path.join(str(settings.MEDIA_ROOT), 'crispr_batch', f'{job_id}.json')
+
+
+def crispr_batch_summaries(job_id):
+    """O ana kadar biten genlerin özetleri (dosya yoksa / okunamazsa [])."""
+    try:
+        with open(crispr_batch_summary_path(job_id), encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return []
+
+
+def _write_crispr_batch_summaries(job_id, summaries):
+    # Yarım yazılmış dosya okunmasın diye geçici dosya + os.replace
+    path = crispr_batch_summary_path(job_id)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(summaries, fh)
+    os.replace(tmp, path)
+
+
+def crispr_batch_design(job_id, genes=None, fasta=None, species='homo_sapiens',
+                        enzyme='SpCas9', top_n=10):
+    """
+    Gen paneli için CRISPR kılavuz tasarımı (kuyruk işi: 'crispr_batch').
+
+    Diziler eşzamanlı çekilir (ilerlemenin ilk %20'si), her gen süreç
+    havuzunda tasarlanır; biten her genin ilk top_n kılavuzu hemen TSV'ye
+    yazılır (iş sürerken de indirilebilir), gen özeti yanındaki JSON'a eklenir ve
+    AnalysisJob.progress / reads_processed (biten gen sayısı) güncellenir.
+    """
+    from dash_apps.crispr_batch import (TSV_COLUMNS, design_many, fetch_sequences,
+                                        parse_batch_input, tsv_rows)
+
+    start_time = time.time()
+    job = AnalysisJob.objects.get(job_id=job_id)
+    if job.status == 'CANCELLED':
+        return
+    job.status = 'RUNNING'
+    job.progress = 0
+    job.save(update_fields=['status', 'progress'])
+
+    items = parse_batch_input(genes, fasta)
+    total = len(items)
+    summaries = []
+    path = crispr_batch_path(job_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        def on_fetched(done, count):
+            AnalysisJob.objects.filter(job_id=job_id).update(progress=int(20 * done / count))
+
+        fetch_sequences(items, species, on_fetched=on_fetched)
+
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write('\t'.join(TSV_COLUMNS) + '\n')
+            fh.flush()
+            for done, res in enumerate(design_many(items, enzyme, top_n,
+                                                   workers=CRISPR_BATCH_WORKERS,
+                                                   cancel_cb=_cancel_checker(job_id)), start=1):
+                for row in tsv_rows(res):
+                    fh.write(row + '\n')
+                fh.flush()
+                summaries.append({'gene': res['gene'], 'error': res.get('error'),
+                                  'length': res.get('length'), 'summary': res.get('summary'),
+                                  'best': res['guides'][0]['guide'] if res['guides'] else None})
+                _write_crispr_batch_summaries(job_id, summaries)
+                AnalysisJob.objects.filter(job_id=job_id).update(
+                    progress=min(99, 20 + int(80 * done / max(total, 1))), reads_processed=done)
+    except Exception as e:
+        logger.error(f"Toplu CRISPR tasarımı başarısız ({job_id}): {e}", exc_info=True)
+        if not _set_error_unless_cancelled(job, str(e), time.time() - start_time):
+            return  # iptal edilmiş işi yeniden denemeye gerek yok
+        raise
+
+    if not _set_done_unless_cancelled(job, time.time() - start_time):
+        logger.info(f"Toplu CRISPR tasarımı iptal edildi: {job_id}")
+        return
+    logger.info(f"Toplu CRISPR tasarımı tamamlandı: {total} gen, {job.total_duration:.1f} sn")
@@ -15,4 +15,22 @@ class FastqAPITestCase(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('total_files', response.data)
-        self.assertIn('completed', response.data)
\ No newline at end of file
+        self.assertIn('completed', response.data)
+
+class CrisprScoreAPITestCase(TestCase):
+    def test_bulk_score(self):
+        """Toplu skorlama: 30-mer'e RS1, 20-mer'e sezgisel skor; hatalı girişler ayrı listelenir"""
+        from rest_framework.test import APIRequestFactory
+        from dash_apps.crispr_engine import doench_rs1_score, score_guide
+        from ..api.views import CrisprScoreView
+        ctx = 'TGACGGTACCGTAGCATCGATCGAAGGTCA'
+        request = APIRequestFactory().post('/bio-tools/api/crispr/score/', {
+            'enzyme': 'SpCas9', 'guides': [ctx, ctx[4:24], 'ACGT', 'N' * 20]}, format='json')
+        response = CrisprScoreView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, second = response.data['results']
+        self.assertEqual(first['score'], round(doench_rs1_score(ctx) * 100, 1))
+        self.assertEqual(first['score_type'], 'doench')
+        self.assertEqual((second['score'], second['reasons']), score_guide(ctx[4:24]))
+        self.assertEqual([e['error'] for e in response.data['errors']], ['length', 'invalid_base'])
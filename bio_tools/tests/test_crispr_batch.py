@@ -0,0 +1,87 @@
+import random
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from dash_apps import crispr_batch
+from dash_apps.crispr_engine import find_guides
+from ..models import AnalysisJob
+from ..tasks import crispr_batch_design, crispr_batch_path, crispr_batch_summaries
+
+
+class CrisprBatchTestCase(TestCase):
+    def setUp(self):
+        rng = random.Random(2)
+        self.seqs = {name: ''.join(rng.choice('ACGT') for _ in range(n))
+                     for name, n in (('GENE1', 800), ('GENE2', 1200), ('GENE3', 500))}
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cache.clear()
+
+    def _fake_fetch(self, symbol, species, max_len):
+        if symbol not in self.seqs:
+            return None, None, 'not_found'
+        return self.seqs[symbol], {'id': f'ENSG_{symbol}'}, None
+
+    def test_parse_batch_input(self):
+        """Gen listesi tekrarsız okunmalı, multi-FASTA kayıtları diziyle eklenmeli"""
+        items = crispr_batch.parse_batch_input('TP53, brca1 TP53\nEGFR', '>a desc\nACGT\nacgt\n>b\nGG')
+        self.assertEqual([(i['name'], i['seq']) for i in items],
+                         [('TP53', None), ('brca1', None), ('EGFR', None),
+                          ('a', 'ACGTACGT'), ('b', 'GG')])
+
+    def test_batch_design_writes_tsv_and_progress(self):
+        """Her gen TSV'ye yazılmalı; bulunamayan gen hata satırı olmalı; iş DONE olmalı"""
+        AnalysisJob.objects.create(job_id='crispr-job')
+        fasta = '>PLASMID\n' + self.seqs['GENE3']
+        with override_settings(MEDIA_ROOT=self.tmp.name, SEQUENCE_CACHE_DIR=self.tmp.name), \
+                mock.patch('dash_apps.ensembl_fetch._fetch_gene_sequence_remote', self._fake_fetch):
+            crispr_batch_design('crispr-job', genes=['GENE1', 'GENE2', 'NOPE'], fasta=fasta, top_n=3)
+            # Aynı gen tekrar istenince dizi önbellekten gelmeli
+            with mock.patch('dash_apps.ensembl_fetch._fetch_gene_sequence_remote') as again:
+                crispr_batch.fetch_sequences([{'name': 'GENE1', 'seq': None}], 'homo_sapiens')
+                again.assert_not_called()
+            path = crispr_batch_path('crispr-job')
+            with open(path, encoding='utf-8') as fh:
+                rows = [line.rstrip('\n').split('\t') for line in fh]
+
+        self.assertEqual(rows[0], crispr_batch.TSV_COLUMNS)
+        by_gene = {}
+        for r in rows[1:]:
+            by_gene.setdefault(r[0], []).append(dict(zip(rows[0], r)))
+        self.assertEqual(set(by_gene), {'GENE1', 'GENE2', 'NOPE', 'PLASMID'})
+        self.assertEqual(by_gene['NOPE'][0]['status'], 'not_found')
+        expected, _err = find_guides(self.seqs['GENE2'])
+        self.assertEqual([r['guide'] for r in by_gene['GENE2']], [g['guide'] for g in expected[:3]])
+        self.assertEqual(by_gene['GENE1'][0]['source'], 'ENSG_GENE1')
+        self.assertEqual(by_gene['PLASMID'][0]['source'], 'fasta')
+
+        job = AnalysisJob.objects.get(job_id='crispr-job')
+        self.assertEqual((job.status, job.progress, job.reads_processed), ('DONE', 100, 4))
+        with override_settings(MEDIA_ROOT=self.tmp.name):
+            # Özetler süreçler arası paylaşılmalı: önbellekte değil, TSV'nin yanındaki JSON'da
+            cache.clear()
+            self.assertEqual({g['gene'] for g in crispr_batch_summaries('crispr-job')},
+                             {'GENE1', 'GENE2', 'NOPE', 'PLASMID'})
+
+    def test_cancel_after_last_gene_is_not_overwritten(self):
+        """Son iptal yoklamasından sonra gelen iptal DONE/ERROR ile ezilmemeli"""
+        def cancelled_design(fail):
+            def design_many(items, *args, **kwargs):
+                yield {'gene': 'PLASMID', 'guides': [], 'summary': None}
+                AnalysisJob.objects.filter(job_id='crispr-job').update(status='CANCELLED')
+                if fail:
+                    raise RuntimeError('havuz çöktü')
+            return design_many
+
+        for fail in (False, True):
+            AnalysisJob.objects.update_or_create(job_id='crispr-job', defaults={'status': 'PENDING'})
+            with override_settings(MEDIA_ROOT=self.tmp.name), \
+                    mock.patch.object(crispr_batch, 'design_many', cancelled_design(fail)), \
+                    mock.patch.object(crispr_batch, 'tsv_rows', return_value=[]):
+                crispr_batch_design('crispr-job', fasta='>PLASMID\nACGT')
+            job = AnalysisJob.objects.get(job_id='crispr-job')
+            self.assertEqual(job.status, 'CANCELLED')
+            self.assertEqual(job.error_message, None)
@@ -0,0 +1,73 @@
+import random
+import re
+
+from django.test import SimpleTestCase
+
+from dash_apps import crispr_engine as ce
+
+
+class CrisprEngineIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.seq = ''.join(rng.choice('ACGT') for _ in range(3000))
+
+    def test_vectorized_pam_scan_matches_regex(self):
+        """Vektörel PAM taraması örtüşenler dahil regex taramasıyla aynı konumları bulmalı"""
+        codes = ce._encode(self.seq + 'GGGG')
+        for enz in ce.ENZYMES.values():
+            pattern = re.compile(f"(?=({ce.pam_to_regex(enz['pam'])}))")
+            expected = [m.start() for m in pattern.finditer(self.seq + 'GGGG')]
+            self.assertEqual(ce.find_pam_sites(codes, enz['pam']).tolist(), expected)
+
+    def test_seed_index_counts_both_strands(self):
+        """Seed sayımı iki iplikteki (örtüşen) tüm geçişleri saymalı"""
+        seq = self.seq[:500] + 'A' * 14 + ce.reverse_complement(self.seq[100:112])
+        both = seq + 'N' + ce.reverse_complement(seq)
+        index = ce.SeedIndex(seq)
+        kmers = [seq[i:i + 12] for i in range(0, 514, 7)] + ['A' * 12, 'CCCCCCCCCCCC']
+        expected = [sum(both.startswith(k, i) for i in range(len(both))) for k in kmers]
+        self.assertEqual(index.count_many(kmers), expected)
+
+    def test_seed_index_empty_sequence(self):
+        """k'dan kısa ya da tamamen N dizide sayımlar 0 olmalı (eski str.count gibi)"""
+        self.assertEqual(ce.SeedIndex('N' * 19).count_many(['A' * 12, 'ACGTACGTACGT']), [0, 0])
+        self.assertEqual(ce.SeedIndex('').count('A' * 12), 0)
+        self.assertEqual(ce._uniqueness('ACGTACGTACGTACGTACGT', 'ACGTAC'), 0)
+
+    def test_find_guides_reports_seed_matches(self):
+        """Tekrarlanan hedef bölgedeki kılavuzların seed sayısı > 1 olmalı"""
+        repeat = self.seq[200:260]
+        guides, err = ce.find_guides(self.seq[:1000] + repeat + self.seq[1000:1200], max_results=10 ** 6)
+        self.assertIsNone(err)
+        in_repeat = [g for g in guides if g['strand'] == '+' and 201 <= g['start'] and g['end'] <= 260]
+        self.assertTrue(in_repeat)
+        self.assertTrue(all(g['uniqueness'] >= 2 for g in in_repeat))
+
+
+class CrisprEngineBatchScoringTestCase(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.rng = rng
+        self.guides = [''.join(rng.choice(alphabet) for _ in range(n))
+                       for alphabet in ('ACGT', 'AT', 'GC', 'ACGTN')
+                       for n in (20, 21, 23, 9, 3) for _ in range(60)]
+        self.guides += ['T' * 20, 'GGGGGCCCCCAAAAATTTTT', 'acgtTTTTacgtacgtacgt', '', None]
+
+    def test_score_guides_matches_scalar(self):
+        """Toplu sezgisel skor ve gerekçeler score_guide ile birebir aynı olmalı"""
+        for side in ('3prime', '5prime'):
+            self.assertEqual(ce.score_guides(self.guides, side),
+                             [ce.score_guide(g or '', side) for g in self.guides])
+
+    def test_doench_rs1_scores_matches_scalar(self):
+        """Toplu RS1 (one-hot × ağırlık vektörü) skaler doench_rs1_score ile aynı olmalı"""
+        mers = [''.join(self.rng.choice('ACGT') for _ in range(30)) for _ in range(500)]
+        mers += ['ACGN' + mers[0][4:], mers[1][:29], mers[2].lower(), None]
+        batch = ce.doench_rs1_scores(mers)
+        for m, got in zip(mers, batch):
+            expected = ce.doench_rs1_score(m)
+            if expected is None:
+                self.assertIsNone(got)
+            else:
+                self.assertAlmostEqual(got, expected, places=12)
+                self.assertEqual(round(got * 100, 1), round(expected * 100, 1))
@@ -0,0 +1,119 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from ..fastq_qc import (
+    FastqQCAccumulator, HeavyHitterSketch, analyze_range, compute_quality_means_vectorized,
+    shard_ranges,
+)
+from .. import tasks
+from ..models import AnalysisJob
+from ..tasks import compute_quality_means_streaming
+
+
+FASTQ = (
+    b"@r1\nACGTNacgt\n+\nIIIIIIIII\n"
+    b"@r2\nGGCC\n+\n#5?I\n"
+    b"@r3\nATATATATATAT\n+\n!!!!IIII5555\n"
+    b"@r4\nACGTNacgt\n+\nIIIII####\n"
+)
+
+
+class VectorizedFastqQCTestCase(SimpleTestCase):
+    def _run(self, engine, content, **kwargs):
+        fd, path = tempfile.mkstemp(suffix='.fastq')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(content)
+            payloads, counts = [], []
+            engine(path, update_cb=payloads.append, read_count_cb=counts.append, **kwargs)
+            return payloads[-1], counts[-1]
+        finally:
+            os.remove(path)
+
+    def test_matches_line_loop(self):
+        """Vektörel motor eski döngüyle aynı sonucu üretmeli (küçük bloklarla da)"""
+        loop, loop_n = self._run(compute_quality_means_streaming, FASTQ)
+        for block_size in (7, 1024):
+            vec, vec_n = self._run(compute_quality_means_vectorized, FASTQ, block_size=block_size)
+
+            self.assertEqual(vec_n, loop_n)
+            self.assertEqual(vec['base_counts'], loop['base_counts'])
+            self.assertEqual(vec['quality_df_data']['Base Position'],
+                             loop['quality_df_data']['Base Position'])
+            for a, b in zip(vec['quality_df_data']['Average Quality Score'],
+                            loop['quality_df_data']['Average Quality Score']):
+                self.assertAlmostEqual(a, b)
+            self.assertEqual(vec['gc_data'], loop['gc_data'])
+            self.assertEqual(dict(vec['overrep_sequences']), dict(loop['overrep_sequences']))
+
+    def test_shards_align_to_records_and_merge(self):
+        """Shard'lar kayıt başında bölünmeli ('@' ile başlayan kalite satırına rağmen)"""
+        content = b"".join(
+            b"@r%d\nACGTACGTAC\n+\n@@@@IIIII%c\n" % (i, 33 + i % 40) for i in range(300))
+        fd, path = tempfile.mkstemp(suffix='.fastq')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(content)
+            ranges = shard_ranges(path, 7, min_shard_bytes=64)
+            self.assertGreater(len(ranges), 1)
+            merged = FastqQCAccumulator()
+            for start, end in ranges:
+                self.assertTrue(content[start:].startswith(b"@r"))
+                merged.merge(analyze_range(path, start, end))
+            whole = analyze_range(path)
+            self.assertEqual(merged.read_count, 300)
+            self.assertEqual(merged.payload(), whole.payload())
+        finally:
+            os.remove(path)
+
+    def test_missing_trailing_newline_and_crlf(self):
+        """Son satır sonu eksikse ve \\r\\n kullanılıyorsa kayıtlar kaybolmamalı"""
+        content = FASTQ.replace(b"\n", b"\r\n").rstrip(b"\r\n")
+        vec, vec_n = self._run(compute_quality_means_vectorized, content)
+        self.assertEqual(vec_n, 4)
+        self.assertEqual(len(vec['quality_df_data']['Base Position']), 12)
+        self.assertEqual(sum(vec['phred_histogram']), 9 + 4 + 12 + 9)
+
+
+class HeavyHitterSketchTestCase(SimpleTestCase):
+    def test_memory_is_bounded_and_heavy_hitters_survive(self):
+        """Özet kapasiteyi aşmamalı, gerçekten sık diziler kaybolmamalı"""
+        sketch = HeavyHitterSketch(capacity=10, buffer_size=50)
+        for i in range(5000):
+            sketch.update([f"uniq{i}"])
+            if i % 10 == 0:
+                sketch.update(["ADAPTER"])
+            if i % 25 == 0:
+                sketch.update(["POLYA"])
+            self.assertLessEqual(len(sketch.counts), 10)
+            self.assertLess(len(sketch.pending), 50)
+
+        top = dict(sketch.most_common(2))
+        self.assertEqual(set(top), {"ADAPTER", "POLYA"})
+        # Hata sınırı: gerçek sayımın en fazla N/(k+1) altı
+        bound = sketch.total / 11
+        self.assertGreaterEqual(top["ADAPTER"], 500 - bound)
+        self.assertLessEqual(top["ADAPTER"], 500)
+
+
+class FastqTaskCancelTestCase(TestCase):
+    def test_late_cancel_is_not_overwritten_with_done(self):
+        """Son iptal yoklamasından sonra gelen CANCELLED, analiz bitince DONE ile ezilmemeli"""
+        AnalysisJob.objects.create(job_id='c1')
+
+        def engine(path, update_cb, read_count_cb, **kwargs):
+            compute_quality_means_vectorized(path, update_cb=update_cb, read_count_cb=read_count_cb)
+            AnalysisJob.objects.filter(job_id='c1').update(status='CANCELLED')
+
+        fd, path = tempfile.mkstemp(suffix='.fastq')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(FASTQ)
+        with mock.patch.object(tasks, 'compute_quality_means_vectorized', side_effect=engine):
+            tasks.process_fastq_file('c1', path)
+        job = AnalysisJob.objects.get(job_id='c1')
+        self.assertEqual(job.status, 'CANCELLED')
+        self.assertEqual(job.reads_processed, 4)
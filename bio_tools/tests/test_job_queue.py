@@ -0,0 +1,105 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import job_queue
+from ..models import AnalysisJob, QueuedJob
+
+CALLS = []
+
+
+def _record(**kwargs):
+    CALLS.append(kwargs)
+
+
+def _boom(**kwargs):
+    raise RuntimeError("patladı")
+
+
+TEST_TASKS = {
+    'ok': ('bio_tools.tests.test_job_queue._record', 'test', 2),
+    'boom': ('bio_tools.tests.test_job_queue._boom', 'test', 2),
+}
+
+
+@mock.patch.dict(job_queue.TASKS, TEST_TASKS)
+@mock.patch.object(job_queue, 'CONCURRENCY', {'test': 1})
+@mock.patch.object(job_queue.settings, 'JOB_QUEUE_EAGER', False, create=True)
+class JobQueueTestCase(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_claim_execute_and_concurrency_limit(self):
+        """İş bir kez sahiplenilmeli; kuyruk sınırı doluyken ikinci iş beklemeli"""
+        first = job_queue.enqueue('ok', x=1)
+        job_queue.enqueue('ok', x=2)
+
+        claimed = job_queue.claim_next('w1')
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(job_queue.claim_next('w2'))  # sınır: 1
+
+        job_queue.execute(claimed)
+        self.assertEqual(CALLS, [{'x': 1}])
+        self.assertEqual(QueuedJob.objects.get(pk=first.pk).status, 'DONE')
+        self.assertIsNotNone(job_queue.claim_next('w2'))
+
+    def test_retry_with_backoff_then_fail(self):
+        """Hata veren iş geri çekilmeyle yeniden denenmeli, sonra FAILED olmalı"""
+        AnalysisJob.objects.create(job_id='a1')
+        job = job_queue.enqueue('boom', ref_id='a1')
+
+        job_queue.execute(job_queue.claim_next('w1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'PENDING')
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=20))
+        self.assertIsNone(job_queue.claim_next('w1'))  # henüz zamanı gelmedi
+
+        QueuedJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        job_queue.execute(job_queue.claim_next('w1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(AnalysisJob.objects.get(job_id='a1').status, 'ERROR')
+
+    def test_failing_fastq_task_is_retried(self):
+        """Gerçek FASTQ görevi hata verince AnalysisJob ERROR olmalı, kuyruk işi geri çekilmeyle beklemeli"""
+        AnalysisJob.objects.create(job_id='f1')
+        job = job_queue.enqueue('fastq_analysis', ref_id='f1', job_id='f1', file_path='/yok/dosya.fastq')
+
+        job_queue.execute(job_queue.claim_next('w1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'PENDING')
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=20))
+        self.assertEqual(AnalysisJob.objects.get(job_id='f1').status, 'ERROR')
+
+    def test_stale_job_is_requeued_and_cancel(self):
+        """Kalp atışı kesilen iş yeniden kuyruğa alınmalı; bekleyen iş iptal edilebilmeli"""
+        job = job_queue.enqueue('ok', ref_id='r1')
+        job_queue.claim_next('dead-worker')
+        QueuedJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(job_queue.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'PENDING')
+
+        self.assertEqual(job_queue.cancel('r1'), 1)
+        self.assertEqual(QueuedJob.objects.get(pk=job.pk).status, 'CANCELLED')
+
+    def test_slow_worker_does_not_overwrite_requeued_job(self):
+        """Yeniden kuyruğa alınıp başka işçiye verilen işi, geç biten eski işçi DONE yapmamalı"""
+        job = job_queue.enqueue('ok')
+        slow = job_queue.claim_next('slow')
+        QueuedJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        job_queue.requeue_stale()
+        QueuedJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        fresh = job_queue.claim_next('fresh')
+
+        job_queue.execute(slow)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), ('RUNNING', 'fresh'))
+        job_queue.execute(fresh)
+        self.assertEqual(QueuedJob.objects.get(pk=job.pk).status, 'DONE')
@@ -0,0 +1,94 @@
+import random
+
+from django.test import SimpleTestCase
+
+from dash_apps import msa_engine
+from dash_apps.phylo_helper import build_phylo_tree
+
+
+def _gotoh_score(a, b, match=2.0, mismatch=-1.0, gap_open=-5.0, gap_ext=-1.0):
+    """Saf Python afin boşluklu global hizalama skoru (referans)."""
+    neg = float('-inf')
+    n, m = len(a), len(b)
+    H = [[neg] * (m + 1) for _ in range(n + 1)]
+    E = [[neg] * (m + 1) for _ in range(n + 1)]
+    F = [[neg] * (m + 1) for _ in range(n + 1)]
+    H[0][0] = 0.0
+    for j in range(1, m + 1):
+        E[0][j] = H[0][j] = gap_open + gap_ext * (j - 1)
+    for i in range(1, n + 1):
+        F[i][0] = H[i][0] = gap_open + gap_ext * (i - 1)
+        for j in range(1, m + 1):
+            E[i][j] = max(E[i][j - 1] + gap_ext, H[i][j - 1] + gap_open)
+            F[i][j] = max(F[i - 1][j] + gap_ext, H[i - 1][j] + gap_open)
+            s = match if a[i - 1] == b[j - 1] else mismatch
+            H[i][j] = max(H[i - 1][j - 1] + s, E[i][j], F[i][j])
+    return H[n][m]
+
+
+def _path_score(a, b, ia, ib, match=2.0, mismatch=-1.0, gap_open=-5.0, gap_ext=-1.0):
+    total, prev = 0.0, None
+    for x, y in zip(ia, ib):
+        state = 'd' if x >= 0 and y >= 0 else 'f' if x >= 0 else 'e'
+        if state == 'd':
+            total += match if a[x] == b[y] else mismatch
+        else:
+            total += gap_ext if prev == state else gap_open
+        prev = state
+    return total
+
+
+def _evolve(rng, seq, rate):
+    seq = list(seq)
+    for _ in range(int(len(seq) * rate)):
+        op, pos = rng.random(), rng.randrange(len(seq))
+        if op < 0.7:
+            seq[pos] = rng.choice('ACGT')
+        elif op < 0.85:
+            seq.insert(pos, rng.choice('ACGT'))
+        else:
+            del seq[pos]
+    return ''.join(seq)
+
+
+class MsaEngineTestCase(SimpleTestCase):
+    def test_profile_dp_is_optimal(self):
+        """Vektörel satır DP'si saf Python Gotoh ile aynı skoru vermeli; bant modu geçerli yol üretmeli"""
+        rng = random.Random(5)
+        alphabet, scores, gaps = msa_engine._scoring('dna')
+        scores = msa_engine.np.pad(scores, ((0, 1), (0, 1)))
+        for _ in range(60):
+            a = ''.join(rng.choice('ACGT') for _ in range(rng.randrange(1, 30)))
+            b = _evolve(rng, a, 0.3) or 'A'
+            ca, cb = msa_engine._encode([a, b], alphabet)
+            pa, pb = msa_engine._profile(ca[None, :], 5), msa_engine._profile(cb[None, :], 5)
+            for width in (None, 2):
+                ia, ib = msa_engine.align_profiles(pa, pb, scores, gaps, width=width)
+                self.assertEqual([x for x in ia.tolist() if x >= 0], list(range(len(a))))
+                self.assertEqual([y for y in ib.tolist() if y >= 0], list(range(len(b))))
+                if width is None:
+                    self.assertEqual(_path_score(a, b, ia.tolist(), ib.tolist()), _gotoh_score(a, b))
+
+    def test_alignment_feeds_tree_and_budget(self):
+        """Farklı uzunluktaki diziler hizalanıp ağaca girmeli; bütçe aşımında ValueError"""
+        from Bio.Phylo.TreeConstruction import DistanceCalculator
+        from Bio.Seq import Seq
+        from Bio.SeqRecord import SeqRecord
+
+        rng = random.Random(2)
+        ancestor = ''.join(rng.choice('ACGT') for _ in range(300))
+        seqs = [_evolve(rng, ancestor, 0.1) for _ in range(6)]
+        for band in ('auto', 32):
+            aligned = msa_engine.align_sequences(seqs, band=band)
+            self.assertEqual(len({len(s) for s in aligned}), 1)
+            self.assertEqual([s.replace('-', '') for s in aligned], seqs)
+        names = [f"s{i}" for i in range(6)]
+        DistanceCalculator('identity').get_distance(msa_engine.to_alignment(names, aligned))
+
+        result = build_phylo_tree([SeqRecord(Seq(s), id=n, description=n) for s, n in zip(seqs, names)])
+        self.assertTrue(result['success'])
+        self.assertEqual(result['alignment'], 'msa')
+        self.assertEqual(result['aln_length'], len(aligned[0]))
+
+        with self.assertRaises(ValueError):
+            msa_engine.align_sequences(seqs, max_residues=1000)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from dash_apps import mutation_predictor as mp
+
+RESIDUES = {
+    10: {'aa': 'A', 'ss': 'H', 'depth': 1.2},
+    11: {'aa': 'L', 'ss': 'E', 'depth': 6.5},
+    12: {'aa': 'G', 'ss': 'C', 'depth': 3.1},
+    13: {'aa': 'W', 'ss': 'H', 'depth': None},   # MSMS derinlik veremedi
+    14: {'aa': 'X', 'ss': 'C', 'depth': 2.0},    # standart dışı kalıntı
+}
+
+
+def _old_features(residues, mutation_str):
+    """Eski analyze_mutation_impact'in DSSP/derinlik sonrası özellik hesabı (referans)."""
+    original, position, new = mutation_str[0], int(mutation_str[1:-1]), mutation_str[-1]
+    residue = residues[position]
+    vol_change = abs(mp.AA_PROPERTIES.get(new, {'vol': 0})['vol'] - mp.AA_PROPERTIES.get(original, {'vol': 0})['vol'])
+    hyd_change = abs(mp.AA_PROPERTIES.get(new, {'hyd': 0})['hyd'] - mp.AA_PROPERTIES.get(original, {'hyd': 0})['hyd'])
+    return [vol_change, hyd_change, residue['depth'], {'H': 1, 'E': 2, 'C': 3}.get(residue['ss'], 3)]
+
+
+class MutationPredictorTestCase(SimpleTestCase):
+    def setUp(self):
+        mp._structure_cache.clear()
+        cache.clear()
+        patcher = mock.patch.object(mp, '_compute_structure_features', return_value=(RESIDUES, None))
+        self.compute = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_structure_features_computed_once(self):
+        """DSSP/MSMS aynı yapı için tekrar eden analizlerde bir kez çalışmalı; satırlar eski yolla aynı olmalı"""
+        mutations = ['A10V', 'L11P', 'G12W', 'A10L']
+        first = mp.analyze_mutations('PDB', mutations)
+        second = mp.analyze_mutations('PDB', ['W13A', 'A99G'])
+        self.compute.assert_called_once_with('PDB')
+
+        self.assertEqual([f for _m, f, _e in first], [_old_features(RESIDUES, m) for m in mutations])
+        self.assertTrue(all(e is None for _m, _f, e in first))
+        self.assertIn('Derinlik hesaplanamadı', second[0][2])
+        self.assertIn('(99)', second[1][2])
+
+    def test_saturation_scan_grid(self):
+        """Doygunluk taraması L×20 olmalı; NaN yalnız yabanıl tip hücrelerinde"""
+        scan, error = mp.saturation_scan('PDB')
+        self.assertIsNone(error)
+        self.assertEqual(scan['positions'], [10, 11, 12])
+        grid = scan['harmful_prob']
+        self.assertEqual(grid.shape, (3, 20))
+        wild = np.array([[aa == wt for aa in mp.AMINO_ACIDS] for wt in scan['wild_type']])
+        np.testing.assert_array_equal(np.isnan(grid), wild)
+        row = mp.mutation_features(RESIDUES, 'L11P')[0]
+        harmful = list(mp._CLASSIFIER.classes_).index(1)
+        self.assertAlmostEqual(grid[1, mp.AMINO_ACIDS.index('P')],
+                               mp._CLASSIFIER.predict_proba([row])[0, harmful])
+        self.compute.assert_called_once()
@@ -0,0 +1,109 @@
+import os
+import random
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from dash_apps import genome_index as gi
+from dash_apps import offtarget
+from dash_apps.crispr_engine import reverse_complement
+
+
+def _brute_force(contigs, guide, max_mm):
+    """Referans: her iki iplikte NGG'ye komşu tüm 20-mer'lerle doğrudan karşılaştırma."""
+    counts = [0] * (max_mm + 1)
+    for seq in contigs.values():
+        for strand_seq in (seq, reverse_complement(seq)):
+            for i in range(len(strand_seq) - 22):
+                if strand_seq[i + 21:i + 23] != 'GG' or 'N' in strand_seq[i:i + 21]:
+                    continue
+                mm = sum(a != b for a, b in zip(strand_seq[i:i + 20], guide))
+                if mm <= max_mm:
+                    counts[mm] += 1
+    return counts
+
+
+class GenomeIndexTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        rng = random.Random(3)
+        cls.guide = ''.join(rng.choice('ACGT') for _ in range(20))
+        contigs = {f'chr{i}': [rng.choice('ACGT') for _ in range(5000 + 37 * i)] for i in range(1, 4)}
+        contigs['chr2'][100:600] = 'N' * 500
+        # Hedef + 1-4 uyumsuzluklu kopyalar, bir kısmı ters iplikte
+        for name, pos, mm, rev in [('chr1', 50, 0, False), ('chr1', 2000, 1, True),
+                                   ('chr2', 700, 2, False), ('chr3', 4000, 3, True),
+                                   ('chr3', 10, 4, False)]:
+            site = list(cls.guide)
+            for i in rng.sample(range(20), mm):
+                site[i] = rng.choice([b for b in 'ACGT' if b != site[i]])
+            site = ''.join(site) + 'TGG'
+            if rev:
+                site = reverse_complement(site)
+            contigs[name][pos:pos + 23] = site
+        cls.contigs = {k: ''.join(v) for k, v in contigs.items()}
+        cls.tmp = tempfile.TemporaryDirectory()
+        fasta = os.path.join(cls.tmp.name, 'g.fa')
+        with open(fasta, 'w') as fh:
+            for name, seq in cls.contigs.items():
+                fh.write(f'>{name} test\n')
+                fh.write('\n'.join(seq[i:i + 60] for i in range(0, len(seq), 60)) + '\n')
+        cls.path = os.path.join(cls.tmp.name, 'homo_sapiens', 'SpCas9')
+        gi.build_index(fasta, cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def test_counts_match_brute_force(self):
+        """Seed-and-extend sayımları PAM'li sitelerle doğrudan karşılaştırmayla aynı olmalı"""
+        index = gi.GenomeIndex(self.path)
+        rng = random.Random(5)
+        guides = [self.guide] + [''.join(rng.choice('ACGT') for _ in range(20)) for _ in range(3)]
+        for guide in guides:
+            counts, _hits = index.search(guide, max_mismatches=4)
+            self.assertEqual(counts, _brute_force(self.contigs, guide, 4))
+        counts, _hits = index.search(self.guide, max_mismatches=4)
+        self.assertTrue(all(c >= 1 for c in counts))
+
+    def test_search_parallel_matches_serial(self):
+        """Süreç havuzlu tarama tek süreçli taramayla aynı sonucu aynı sırada vermeli"""
+        rng = random.Random(7)
+        guides = [self.guide] + [''.join(rng.choice('ACGT') for _ in range(20)) for _ in range(5)]
+        serial = gi.search_parallel(self.path, guides, max_mismatches=4, max_hits=5, workers=1)
+        pooled = gi.search_parallel(self.path, guides, max_mismatches=4, max_hits=5, workers=2,
+                                    chunk_size=2)
+        self.assertEqual(pooled, serial)
+
+    def test_hits_report_contig_strand_and_sequence(self):
+        """Hit kaydı kontig, 1-bazlı başlangıç, iplik ve iplikteki protospacer dizisini vermeli"""
+        index = gi.GenomeIndex(self.path)
+        _counts, hits = index.search(self.guide, max_mismatches=1, max_hits=5)
+        self.assertEqual(hits[0], {'contig': 'chr1', 'start': 51, 'strand': '+',
+                                   'sequence': self.guide, 'mm': 0})
+        rev = [h for h in hits if h['contig'] == 'chr1' and h['strand'] == '-']
+        self.assertEqual(rev[0]['mm'], 1)
+        self.assertEqual(index.fetch(index.contigs[1]['offset'] + 98, index.contigs[1]['offset'] + 102),
+                         self.contigs['chr2'][98:102])
+
+    def test_scan_offtargets_uses_local_index(self):
+        """Yerel indeks varsa blast_offtarget/scan_offtargets uzak BLAST'a gitmeden sonuç dönmeli"""
+        with override_settings(GENOME_INDEX_DIR=self.tmp.name):
+            results = offtarget.scan_offtargets([self.guide, 'ACGT', self.guide.lower()],
+                                                'homo_sapiens', workers=1)
+            single = offtarget.blast_offtarget(self.guide, species='homo_sapiens')
+        self.assertEqual(results[0]['mm'], dict(enumerate(_brute_force(self.contigs, self.guide, 3))))
+        self.assertEqual(results[0]['db'], 'local:homo_sapiens')
+        self.assertEqual(results[1], {'ok': False, 'error': 'guide_length'})
+        self.assertEqual(results[2]['mm'], results[0]['mm'])
+        self.assertEqual(single['mm'], results[0]['mm'])
+
+    def test_too_long_seed_part_is_rejected(self):
+        """max_mismatches=0 tek 20 nt'lik seed (4^20 sınır tablosu) demek; kurulum başlamadan reddedilmeli"""
+        out = os.path.join(self.tmp.name, 'mm0')
+        with self.assertRaises(ValueError):
+            gi.build_index(os.path.join(self.tmp.name, 'g.fa'), out, max_mismatches=0)
+        self.assertFalse(os.path.exists(out))
+        self.assertEqual(gi.seed_parts(20, 1), [(0, 10), (10, 20)])
@@ -0,0 +1,64 @@
+import random
+
+from django.test import SimpleTestCase
+
+from dash_apps.orf_finder import find_orfs
+
+STOPS = ('TAA', 'TAG', 'TGA')
+
+
+def _reference_orfs(sequence, min_len):
+    """Eski plasmid_map.find_orfs kodon-kodon taraması (karşılaştırma referansı)."""
+    from Bio.Seq import Seq
+
+    seq = Seq(sequence)
+    seq_len = len(sequence)
+    orfs = []
+    for strand, nuc in [(1, seq), (-1, seq.reverse_complement())]:
+        for frame in range(3):
+            i = frame
+            while i < seq_len - 2:
+                if str(nuc[i:i + 3]) == 'ATG':
+                    j = i
+                    while j < seq_len - 2:
+                        if str(nuc[j:j + 3]) in STOPS:
+                            orf_len = j + 3 - i
+                            if orf_len >= min_len:
+                                start, end = (i, j + 3) if strand == 1 else (seq_len - (j + 3), seq_len - i)
+                                orfs.append({'start': start, 'end': end, 'strand': strand,
+                                             'length': orf_len, 'aa': orf_len // 3 - 1})
+                            i = j + 3
+                            break
+                        j += 3
+                    else:
+                        i += 3
+                else:
+                    i += 3
+    orfs.sort(key=lambda x: -x['length'])
+    return orfs
+
+
+class OrfFinderTestCase(SimpleTestCase):
+    def test_linear_matches_codon_scan(self):
+        """Doğrusal sonuçlar eski kodon-kodon taramayla (sıra dahil) aynı olmalı"""
+        rng = random.Random(8)
+        for n in (2, 3, 40, 301, 1500):
+            for alphabet in ('ACGT', 'AATTGC'):
+                seq = ''.join(rng.choice(alphabet) for _ in range(n))
+                for min_len in (3, 60):
+                    self.assertEqual(find_orfs(seq, min_len), _reference_orfs(seq, min_len))
+
+    def test_circular_orf_across_origin(self):
+        """Dairesel dizide orijinden geçen ORF iki iplikte de bulunmalı (end < start)"""
+        orf = 'ATG' + 'GCC' * 40 + 'TAA'          # 126 nt
+        backbone = 'CCCC' + 'TTATTA' * 10 + 'GGG'  # ATG içermeyen omurga
+        seq = orf[60:] + backbone + orf[:60]
+        n = len(seq)
+        self.assertEqual([o for o in find_orfs(seq, 90) if o['strand'] == 1], [])
+        fwd = [o for o in find_orfs(seq, 90, circular=True) if o['strand'] == 1]
+        self.assertEqual(fwd, [{'start': n - 60, 'end': 66, 'strand': 1, 'length': 126, 'aa': 41}])
+
+        from Bio.Seq import Seq
+        rev = [o for o in find_orfs(str(Seq(seq).reverse_complement()), 90, circular=True)
+               if o['strand'] == -1]
+        self.assertEqual(rev, [{'start': n - 66, 'end': 60, 'strand': -1, 'length': 126, 'aa': 41}])
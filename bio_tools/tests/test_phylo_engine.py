@@ -0,0 +1,57 @@
+import io
+import random
+
+from django.test import SimpleTestCase
+
+from dash_apps import phylo_engine
+
+
+def _newick(tree):
+    from Bio import Phylo
+
+    handle = io.StringIO()
+    Phylo.write(tree, handle, 'newick')
+    return handle.getvalue()
+
+
+class PhyloEngineTestCase(SimpleTestCase):
+    def test_matches_biopython_trees(self):
+        """Mesafe matrisi ve NJ/UPGMA Newick çıktısı Biopython ile (eşitlikler dahil) aynı olmalı"""
+        from Bio.Align import MultipleSeqAlignment
+        from Bio.Phylo.TreeConstruction import DistanceCalculator, DistanceTreeConstructor
+        from Bio.Seq import Seq
+        from Bio.SeqRecord import SeqRecord
+
+        rng = random.Random(3)
+        constructor = DistanceTreeConstructor()
+        for n in (3, 4, 8, 20):
+            ancestor = [rng.choice('ACGT') for _ in range(60)]
+            seqs = []
+            for _ in range(n):
+                if seqs and rng.random() < 0.3:
+                    seqs.append(rng.choice(seqs))  # eşit mesafeler
+                    continue
+                seq = ancestor[:]
+                for _ in range(rng.randrange(0, 20)):
+                    seq[rng.randrange(60)] = rng.choice('ACGT-')
+                seqs.append(''.join(seq))
+            names = [f"t{i}" for i in range(n)]
+            aln = MultipleSeqAlignment([SeqRecord(Seq(s), id=name) for s, name in zip(seqs, names)])
+            ref = DistanceCalculator('identity').get_distance(aln)
+            dm = phylo_engine.distance_matrix(phylo_engine.encode_alignment(seqs), block_bytes=100)
+            self.assertEqual(dm.tolist(), [[ref[i, j] for j in range(n)] for i in range(n)])
+            self.assertEqual(_newick(phylo_engine.nj(dm, names)), _newick(constructor.nj(ref)))
+            self.assertEqual(_newick(phylo_engine.upgma(dm, names)), _newick(constructor.upgma(ref)))
+
+    def test_substitution_models(self):
+        """p/JC69/K2P boşlukları dışlamalı, geçişleri ayırmalı ve doygunlukta sınırlanmalı"""
+        codes = phylo_engine.encode_alignment(['AAAA', 'AGAA', 'ACA-', 'CTGC'])
+        p = phylo_engine.distance_matrix(codes, 'p')
+        self.assertAlmostEqual(p[0, 1], 0.25)
+        self.assertAlmostEqual(p[0, 2], 1 / 3)
+        self.assertAlmostEqual(phylo_engine.distance_matrix(codes, 'jc69')[0, 1], 0.3041, places=4)
+        k2p = phylo_engine.distance_matrix(codes, 'k2p')
+        self.assertAlmostEqual(k2p[0, 1], 0.3466, places=4)  # A↔G geçiş
+        self.assertEqual(k2p[0, 3], phylo_engine.SATURATED_DISTANCE)
+        with self.assertRaises(ValueError):
+            phylo_engine.distance_matrix(codes, 'lg')
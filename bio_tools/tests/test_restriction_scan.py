@@ -0,0 +1,43 @@
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dash_apps import restriction_scan
+from dash_apps.plasmid_map import find_single_cutters
+from dash_apps.restriction_analysis import analyze_restriction
+
+
+class RestrictionScanTestCase(SimpleTestCase):
+    def test_matches_biopython_analysis(self):
+        """Tek geçişli tarama Analysis.full() ile aynı kesimleri vermeli (doğrusal/dairesel, N, tüm enzimler)"""
+        from Bio.Restriction import AllEnzymes, Analysis, CommOnly
+        from Bio.Seq import Seq
+
+        rng = random.Random(11)
+        for batch, enzymes in ((CommOnly, None), (AllEnzymes, list(AllEnzymes))):
+            scanner = restriction_scan.get_scanner(enzymes)
+            for n in (12, 40, 700, 2500):
+                seq = list(rng.choice('ACGT') for _ in range(n))
+                seq[n // 3] = 'N'
+                seq = ''.join(seq)
+                for linear in (True, False):
+                    expected = {str(e): v for e, v in
+                                Analysis(batch, Seq(seq), linear=linear).full().items()}
+                    self.assertEqual(scanner.scan(seq, linear=linear), expected)
+
+    def test_tools_share_cached_scan(self):
+        """Plazmit aracı, restriksiyon aracının aynı dizi için yaptığı taramayı yeniden yapmamalı"""
+        rng = random.Random(4)
+        seq = ''.join(rng.choice('ACGT') for _ in range(1200))
+        scan = mock.Mock(wraps=restriction_scan.get_scanner().scan)
+        with mock.patch.object(restriction_scan.get_scanner(), 'scan', scan):
+            results, error = analyze_restriction(seq, is_linear=False)
+            single = find_single_cutters(seq)
+            analyze_restriction(seq.lower(), is_linear=False)
+        self.assertIsNone(error)
+        self.assertEqual(scan.call_count, 1)
+        once = {r['enzyme']: r['_positions_list'][0] for r in results if r['cuts'] == 1}
+        self.assertTrue(single)
+        for item in single:
+            self.assertEqual(once[item['name']], item['pos'])
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from dash_apps import ensembl_fetch
+from dash_apps import sequence_cache as sc
+
+
+class SequenceCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings_ctx = override_settings(SEQUENCE_CACHE_DIR=self.tmp.name,
+                                              SEQUENCE_CACHE_TTL=3600, SEQUENCE_CACHE_MAX_MB=1)
+        self.settings_ctx.enable()
+        self.addCleanup(self.settings_ctx.disable)
+
+    def test_hit_miss_ttl_and_errors(self):
+        """İkinci çağrı ağa gitmemeli; hata önbelleğe yazılmamalı; süresi dolan kayıt yeniden çekilmeli"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return 'ACGT' * 20, {'id': 'ENSG1'}, None
+
+        for _ in range(3):
+            seq, meta, err = sc.get_or_fetch('ensembl', 'homo_sapiens', 'tp53', None, loader)
+        self.assertEqual((seq, meta, err), ('ACGT' * 20, {'id': 'ENSG1'}, None))
+        self.assertEqual(len(calls), 1)
+        # Anahtar büyük/küçük harf ve boşluklara duyarsız, max_len'e duyarlı
+        sc.get_or_fetch('ensembl', 'Homo_Sapiens', ' TP53 ', None, loader)
+        self.assertEqual(len(calls), 1)
+        sc.get_or_fetch('ensembl', 'homo_sapiens', 'TP53', 1000, loader)
+        self.assertEqual(len(calls), 2)
+
+        failing = mock.Mock(return_value=(None, None, 'network'))
+        sc.get_or_fetch('ena', None, 'X1', None, failing)
+        sc.get_or_fetch('ena', None, 'X1', None, failing)
+        self.assertEqual(failing.call_count, 2)
+
+        with mock.patch.object(sc.time, 'time', return_value=time.time() + 7200):
+            sc.get_or_fetch('ensembl', 'homo_sapiens', 'TP53', None, loader)
+        self.assertEqual(len(calls), 3)
+
+    def test_concurrent_requests_share_one_fetch(self):
+        """Aynı anahtar için eşzamanlı istekler tek loader çağrısını beklemeli"""
+        calls, results = [], []
+        start = threading.Event()
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'GATTACA' * 10, {}, None
+
+        def worker():
+            start.wait()
+            results.append(sc.get_or_fetch('ena', None, 'L09137', None, loader)[0])
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for th in threads:
+            th.start()
+        start.set()
+        for th in threads:
+            th.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['GATTACA' * 10] * 6)
+
+    def test_lru_eviction_keeps_recently_used(self):
+        """Boyut sınırı aşılınca en uzun süredir erişilmeyen kayıtlar silinmeli"""
+        big = 'A' * 300_000
+        sc.get_or_fetch('ena', None, 'OLD', None, lambda: (big, {}, None))
+        sc.get_or_fetch('ena', None, 'HOT', None, lambda: (big, {}, None))
+        old_path = sc._path(self.tmp.name, sc.cache_key('ena', None, 'OLD', None))
+        hot_path = sc._path(self.tmp.name, sc.cache_key('ena', None, 'HOT', None))
+        past = time.time() - 100
+        os.utime(old_path, (past, past))
+        os.utime(hot_path, (past + 10, past + 10))
+        sc.get_or_fetch('ena', None, 'HOT', None, mock.Mock())  # isabet → mtime yenilenir
+        for i in range(2):  # 4 × 300 KB > 1 MB → yalnız en eski silinir
+            sc.get_or_fetch('ena', None, f'NEW{i}', None, lambda: (big, {}, None))
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(hot_path))
+        # Kilitler alt dizin başına: silinen kayıttan geriye anahtar başına .lock kalmamalı
+        leftovers = [f for _d, _s, files in os.walk(self.tmp.name) for f in files
+                     if f != '.lock' and not f.endswith('.json')]
+        self.assertEqual(leftovers, [])
+        self.assertTrue(all(len(k) == 2 for k in sc._locks))
+
+    def test_fetch_gene_sequence_uses_cache(self):
+        """ensembl_fetch.fetch_gene_sequence önbellekten dönmeli; use_cache=False her zaman çekmeli"""
+        remote = mock.Mock(return_value=('ACGT' * 30, {'id': 'ENSG1'}, None))
+        with mock.patch.object(ensembl_fetch, '_fetch_gene_sequence_remote', remote):
+            ensembl_fetch.fetch_gene_sequence('BRCA1', 'homo_sapiens')
+            seq, meta, err = ensembl_fetch.fetch_gene_sequence('BRCA1', 'homo_sapiens')
+            ensembl_fetch.fetch_gene_sequence('BRCA1', 'homo_sapiens', use_cache=False)
+        self.assertEqual((seq, err), ('ACGT' * 30, None))
+        self.assertEqual(remote.call_count, 2)
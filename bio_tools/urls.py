@@ -30,6 +30,8 @@ urlpatterns = [
 
     path('api/job-status/<str:job_id>/', views.get_job_status_view, name='get_job_status'),
 
+    path('api/cancel-job/<str:job_id>/', views.cancel_job_view, name='cancel_job'),
+
     path('fastq-analyzer/', views.fastq_analyzer_view, name='fastq_analyzer'),
 
     path('api/', include('bio_tools.api.urls')),
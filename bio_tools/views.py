@@ -328,7 +328,7 @@ def plasmid_map_view(request):
 @csrf_exempt
 def start_analysis_view(request: HttpRequest):
     """
-    FASTQ analiz işini başlatır (arka plan thread)
+    FASTQ analiz işini kalıcı iş kuyruğuna ekler (run_worker çalıştırır)
     """
     if request.method != 'POST':
         return JsonResponse(
@@ -431,18 +431,13 @@ def start_analysis_view(request: HttpRequest):
                 status=500
             )
 
-        # Analizi arka plan thread'inde başlat (Celery yerine)
+        # Analizi kalıcı iş kuyruğuna ekle — web süreci bloklanmaz,
+        # süreç yeniden başlasa da iş kaybolmaz (manage.py run_worker)
         try:
-            import threading
-            from bio_tools.tasks import process_fastq_file
-            thread = threading.Thread(
-                target=process_fastq_file,
-                kwargs={'job_id': job_id, 'file_path': file_path},
-                daemon=True,
-            )
-            thread.start()
+            from bio_tools.job_queue import enqueue
+            enqueue('fastq_analysis', ref_id=job_id, job_id=job_id, file_path=file_path)
         except Exception as e:
-            logger.error(f"Thread error for job {job_id}: {e}", exc_info=True)
+            logger.error(f"Queue error for job {job_id}: {e}", exc_info=True)
             job.status = 'FAILED'
             job.error_message = f'Failed to start analysis task: {str(e)}'
             job.save()
@@ -560,9 +555,10 @@ def cancel_job_view(request: HttpRequest, job_id: str):
                 'status': job.status
             }, status=400)
 
-        # Celery kaldırıldı — thread'i zorla durduramayız,
-        # job durumunu CANCELLED yap. Task bir sonraki progress
-        # güncellemesinde bu durumu kontrol edip sonlanabilir.
+        # Kuyrukta bekleyen iş hiç başlatılmaz; çalışan iş job durumunu
+        # periyodik kontrol edip (cancel_cb) kendisi sonlanır.
+        from bio_tools.job_queue import cancel as cancel_queued
+        cancel_queued(job_id)
 
         # Job durumunu güncelle
         job.status = 'CANCELLED'
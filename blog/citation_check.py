@@ -4,7 +4,8 @@ blog.citation_check — Atıf SADAKAT doğrulaması (admin/ikinci kontrol).
 Ne yapar:
   1) Makalenin kaynakçasını ayrıştırır ([N] -> DOI).
   2) Metinde her [N] atfının geçtiği cümleleri toplar.
-  3) O kaynağın metnini (PubMed ÖZET + PMC açık erişimde TAM METİN) çeker.
+  3) Atıf yapılan tüm kaynakların metnini (PubMed ÖZET + PMC açık erişimde
+     TAM METİN) iddialardan önce toplu çeker.
   4) AI'a sorar: "bu cümledeki iddia bu kaynakta gerçekten geçiyor mu?"
   5) Sonucu article.reference_check_result'a yazar ve sahibine e-posta atar.
 
@@ -99,95 +100,68 @@ def _collect_claims(content):
 # --------------------------------------------------------------------------- #
 # Kaynak metni çekme (PubMed özet + PMC tam metin)
 # --------------------------------------------------------------------------- #
-def _abstract_from_pubmed_xml(xml_bytes):
-    try:
-        from xml.etree import ElementTree as ET
-        root = ET.fromstring(xml_bytes)
-        parts = []
-        for ab in root.iter('AbstractText'):
-            if ab.text:
-                label = ab.attrib.get('Label')
-                parts.append((f"{label}: " if label else "") + ab.text)
-        return ' '.join(parts).strip() or None
-    except Exception:
-        return None
+def _fetch_source_text(doi):
+    """DOI -> (abstract|None, fulltext|None). PubMed özeti + PMC açık erişim tam metni."""
+    return _prefetch_source_texts([doi]).get(doi, (None, None))
 
 
-def _fetch_source_text(doi):
-    """DOI -> (abstract|None, fulltext|None). PubMed özeti + PMC açık erişim tam metni.
+def _prefetch_source_texts(dois):
+    """DOI listesi -> {doi: (abstract|None, fulltext|None)}; bulunamayanlar dönmez.
 
-    NCBI erişimi yoksa (None, None) döner (doğrulanamadı).
+    Tüm DOI'ler toplu çözülür: OR'lu ESearch ile DOI→PMID, tek EFetch'le
+    özetler, tek ELink'le PMCID'ler; PMC tam metinleri eşzamanlı partilerle
+    çekilir. Yanıtlar makale üretimiyle ortak yerel depodan gelir
+    (blog.pubmed_store); NCBI erişimi yoksa {} döner (doğrulanamadı).
     """
-    if not doi:
-        return None, None
+    dois = [d for d in dict.fromkeys(dois) if d]
+    if not dois:
+        return {}
     try:
         from blog.pubmed_sources import (
-            _configure_entrez, _pmid_to_pmcid, _fetch_pmc_fulltext,
-            Entrez, MAX_FULLTEXT_CHARS,
+            _configure_entrez, _dois_to_pmids, _fetch_summaries, _pmids_to_pmcids,
+            _fetch_pmc_fulltexts, Entrez,
         )
     except Exception:
-        return None, None
+        return {}
     if Entrez is None or not _configure_entrez():
-        return None, None
+        return {}
     try:
-        pmid = None
-        for field in ('AID', 'DOI'):
-            try:
-                h = Entrez.esearch(db='pubmed', term=f'{doi}[{field}]', retmax=1)
-                rec = Entrez.read(h)
-                h.close()
-                ids = rec.get('IdList', [])
-                if ids:
-                    pmid = ids[0]
-                    break
-            except Exception:
-                continue
-        if not pmid:
-            return None, None
-        abstract = None
-        try:
-            h = Entrez.efetch(db='pubmed', id=pmid, rettype='abstract', retmode='xml')
-            xml_bytes = h.read()
-            h.close()
-            abstract = _abstract_from_pubmed_xml(xml_bytes)
-        except Exception:
-            abstract = None
-        fulltext = None
+        pmids = _dois_to_pmids(dois)
+        if not pmids:
+            return {}
         try:
-            pmcid = _pmid_to_pmcid(pmid)
-            if pmcid:
-                ft, _lic = _fetch_pmc_fulltext(pmcid)
-                if ft:
-                    fulltext = ft[:MAX_FULLTEXT_CHARS]
+            summaries = _fetch_summaries(list(dict.fromkeys(pmids.values())))
         except Exception:
-            fulltext = None
-        return abstract, fulltext
+            summaries = {}
+        links = _pmids_to_pmcids(list(dict.fromkeys(pmids.values())))
+        texts = _fetch_pmc_fulltexts(list(dict.fromkeys(links.values())))
     except Exception:
-        return None, None
+        return {}
+    return {
+        doi: ((summaries.get(pmid) or {}).get('abstract') or None,
+              texts.get(links.get(pmid), (None, None))[0])
+        for doi, pmid in pmids.items()
+    }
 
 
 # --------------------------------------------------------------------------- #
 # AI ile sadakat (entailment) kontrolü
 # --------------------------------------------------------------------------- #
-def _ai_supported(claim, source_text):
-    """(supported: bool|None, note: str). None = AI kararı alınamadı."""
-    if not source_text:
-        return None, "kaynak metni yok"
+def _supported_prompt(claim, source_text):
+    return (
+        "Bir IDDIA ve bir KAYNAK METNI verilecek. Iddia, bu kaynak metninde "
+        "ACIKCA destekleniyor/ifade ediliyor mu? Kaynak metni yalnizca ozet ya "
+        "da kismi tam metin olabilir; iddia burada ACIKCA yer almiyorsa "
+        "'destekleniyor=false' ver. Kendi genel bilgini KULLANMA, sadece verilen "
+        "metne bak.\n\n"
+        f'IDDIA: "{claim}"\n\n'
+        f"KAYNAK METNI:\n{source_text[:SOURCE_TEXT_LIMIT]}\n\n"
+        'Yanit SADECE su JSON: {"destekleniyor": true veya false, "not": "<tek kisa cumle, Turkce>"}'
+    )
+
+
+def _parse_supported(text):
     try:
-        from ai_engine.services import generate_with_fallback
-        prompt = (
-            "Bir IDDIA ve bir KAYNAK METNI verilecek. Iddia, bu kaynak metninde "
-            "ACIKCA destekleniyor/ifade ediliyor mu? Kaynak metni yalnizca ozet ya "
-            "da kismi tam metin olabilir; iddia burada ACIKCA yer almiyorsa "
-            "'destekleniyor=false' ver. Kendi genel bilgini KULLANMA, sadece verilen "
-            "metne bak.\n\n"
-            f'IDDIA: "{claim}"\n\n'
-            f"KAYNAK METNI:\n{source_text[:SOURCE_TEXT_LIMIT]}\n\n"
-            'Yanit SADECE su JSON: {"destekleniyor": true veya false, "not": "<tek kisa cumle, Turkce>"}'
-        )
-        text, _k = generate_with_fallback(
-            prompt, service_name="Google Gemini", model_name="gemini-3.5-flash",
-            max_tokens=250, temperature=0.0)
         if not text:
             return None, "AI yaniti bos"
         m = re.search(r'\{.*\}', text, re.DOTALL)
@@ -199,6 +173,61 @@ def _ai_supported(claim, source_text):
         return None, f"AI hatasi: {e}"
 
 
+def _ai_supported(claim, source_text):
+    """(supported: bool|None, note: str). None = AI kararı alınamadı."""
+    return _ai_supported_many([(claim, source_text)])[0]
+
+
+def _ai_supported_many(pairs):
+    """[(iddia, kaynak metni), ...] çiftlerini EŞZAMANLI kontrol eder (generate_many,
+    model fallback'li); _ai_supported ile aynı (supported, note) sonuçlarını sırayla döndürür."""
+    results = [(None, "kaynak metni yok")] * len(pairs)
+    todo = [i for i, (_c, src) in enumerate(pairs) if src]
+    if not todo:
+        return results
+    try:
+        from ai_engine.services import generate_many
+        answers = generate_many(
+            [_supported_prompt(*pairs[i]) for i in todo],
+            service_name="Google Gemini", model_name="gemini-3.5-flash",
+            fallback=True, max_tokens=250, temperature=0.0, cache=True)
+    except Exception as e:
+        answers = [e] * len(todo)
+    for i, res in zip(todo, answers):
+        if isinstance(res, Exception):
+            results[i] = (None, f"AI hatasi: {res}")
+        else:
+            results[i] = _parse_supported(res[0])
+    return results
+
+
+def _judge_claims(claims, src_for):
+    """Her (iddia, [nums]) için atıf yapılan kaynakları tek partide AI'a sordurur.
+
+    src_for(num) -> kaynak metni (str|None). Döner:
+      [(verdicts, note_any, src_parts), ...] — claims ile aynı sırada.
+    """
+    pairs, owners = [], []
+    src_parts_all = []
+    for ci, (claim, nums) in enumerate(claims):
+        parts = []
+        for n in nums:
+            src_text = src_for(n)
+            if src_text:
+                parts.append(src_text)
+            pairs.append((claim, src_text))
+            owners.append(ci)
+        src_parts_all.append(parts)
+
+    verdicts_all = [[] for _ in claims]
+    notes = [""] * len(claims)
+    for ci, (sup, note) in zip(owners, _ai_supported_many(pairs)):
+        verdicts_all[ci].append(sup)
+        if note and not notes[ci]:
+            notes[ci] = note
+    return list(zip(verdicts_all, notes, src_parts_all))
+
+
 def _norm_doi(doi):
     return (doi or "").strip().lower().rstrip('.')
 
@@ -210,36 +239,54 @@ def _norm_txt(s):
     return re.sub(r'\s+', ' ', (s or '')).strip().lower()
 
 
+def _rewrite_prompt(claim, source_text):
+    return (
+        "Bir CUMLE, atif yaptigi KAYNAK METNI tarafindan desteklenmiyor. "
+        "Gorevin: cumleyi, SADECE kaynak metninde gercekten yer alan bilgiye "
+        "sadik kalacak sekilde yeniden yazmak. Kaynakta olmayan bir iddiayi "
+        "cikar ya da kaynagin soyledigiyle sinirli, olculu bir ifadeye cevir. "
+        "Kendi genel bilgini EKLEME. Ayni dilde yaz. Koseli parantezli atif "
+        "numarasi (ornegin [1]) EKLEME. SADECE duzeltilmis tek cumleyi dondur, "
+        "baska aciklama yazma.\n\n"
+        f'CUMLE: "{claim}"\n\n'
+        f"KAYNAK METNI:\n{source_text[:SOURCE_TEXT_LIMIT]}\n"
+    )
+
+
+def _clean_rewrite(text):
+    if not text:
+        return None
+    out = text.strip().strip('"').strip()
+    out = out.split('\n')[0].strip().strip('"').strip()
+    out = re.sub(r'\s*\[[\d\s,]+\]', '', out).strip()   # atıf işaretlerini at
+    return out or None
+
+
 def _ai_rewrite(claim, source_text):
     """Desteklenmeyen bir cümleyi, KAYNAK METNİ'ne sadık kalacak şekilde yeniden
     yazar. Yalnız düzeltilmiş cümleyi (atıf işareti olmadan) döndürür; başarısızsa None.
     """
-    if not source_text:
-        return None
+    return _ai_rewrite_many([(claim, source_text)])[0]
+
+
+def _ai_rewrite_many(pairs):
+    """_ai_rewrite'ın toplu/eşzamanlı sürümü; sonuçlar aynı sırada."""
+    results = [None] * len(pairs)
+    todo = [i for i, (_c, src) in enumerate(pairs) if src]
+    if not todo:
+        return results
     try:
-        from ai_engine.services import generate_with_fallback
-        prompt = (
-            "Bir CUMLE, atif yaptigi KAYNAK METNI tarafindan desteklenmiyor. "
-            "Gorevin: cumleyi, SADECE kaynak metninde gercekten yer alan bilgiye "
-            "sadik kalacak sekilde yeniden yazmak. Kaynakta olmayan bir iddiayi "
-            "cikar ya da kaynagin soyledigiyle sinirli, olculu bir ifadeye cevir. "
-            "Kendi genel bilgini EKLEME. Ayni dilde yaz. Koseli parantezli atif "
-            "numarasi (ornegin [1]) EKLEME. SADECE duzeltilmis tek cumleyi dondur, "
-            "baska aciklama yazma.\n\n"
-            f'CUMLE: "{claim}"\n\n'
-            f"KAYNAK METNI:\n{source_text[:SOURCE_TEXT_LIMIT]}\n"
-        )
-        text, _k = generate_with_fallback(
-            prompt, service_name="Google Gemini", model_name="gemini-3.5-flash",
-            max_tokens=400, temperature=0.2)
-        if not text:
-            return None
-        out = text.strip().strip('"').strip()
-        out = out.split('\n')[0].strip().strip('"').strip()
-        out = re.sub(r'\s*\[[\d\s,]+\]', '', out).strip()   # atıf işaretlerini at
-        return out or None
+        from ai_engine.services import generate_many
+        answers = generate_many(
+            [_rewrite_prompt(*pairs[i]) for i in todo],
+            service_name="Google Gemini", model_name="gemini-3.5-flash",
+            fallback=True, max_tokens=400, temperature=0.2)
     except Exception:
-        return None
+        return results
+    for i, res in zip(todo, answers):
+        if not isinstance(res, Exception):
+            results[i] = _clean_rewrite(res[0])
+    return results
 
 
 def _rewrite_in_content(content, claim, nums, new_sentence):
@@ -279,8 +326,9 @@ def _apply_corrections(article, candidates):
     if not content or not candidates:
         return []
     fixed = []
-    for claim, nums, src in candidates:
-        new_sentence = _ai_rewrite(claim, src)
+    # Yeniden yazımlar eşzamanlı alınır, içeriğe sırayla uygulanır
+    rewrites = _ai_rewrite_many([(claim, src) for claim, _nums, src in candidates])
+    for (claim, nums, src), new_sentence in zip(candidates, rewrites):
         if not new_sentence or _norm_txt(new_sentence) == _norm_txt(claim):
             continue
         new_content, ok = _rewrite_in_content(content, claim, nums, new_sentence)
@@ -347,16 +395,9 @@ def verify_with_sources(article, real_sources, max_claims=MAX_CLAIMS,
     checked = supported = unverifiable = 0
     unsupported_items = []
     fix_candidates = []
-    for claim, nums in claims:
-        verdicts, note_any, src_parts = [], "", []
-        for n in nums:
-            src_text = _src_for(n)
-            if src_text:
-                src_parts.append(src_text)
-            sup, note = _ai_supported(claim, src_text)
-            verdicts.append(sup)
-            if note and not note_any:
-                note_any = note
+    # Tüm iddia–kaynak çiftleri tek partide eşzamanlı değerlendirilir
+    for (claim, nums), (verdicts, note_any, src_parts) in zip(
+            claims, _judge_claims(claims, _src_for)):
         if all(v is None for v in verdicts):
             unverifiable += 1
             continue
@@ -532,17 +573,13 @@ def verify_article_citations(article, max_claims=MAX_CLAIMS, auto_fix=True):
     if max_claims:
         claims = claims[:max_claims]
 
-    # Kaynak metinlerini bir kez çek, cache'le
-    source_cache = {}   # num -> (abstract, fulltext)
+    # Atıf yapılan tüm kaynakların metnini iddialar değerlendirilmeden önce
+    # toplu çek (istek sayısı kaynak sayısıyla değil parti sayısıyla artar)
+    dois = {num: (biblio.get(num) or {}).get('doi') for _, nums in claims for num in nums}
+    texts = _prefetch_source_texts(dois.values())
 
     def _src(num):
-        if num in source_cache:
-            return source_cache[num]
-        entry = biblio.get(num)
-        doi = entry.get('doi') if entry else None
-        res = _fetch_source_text(doi)
-        source_cache[num] = res
-        return res
+        return texts.get(dois.get(num), (None, None))
 
     checked = 0
     supported = 0
@@ -550,20 +587,14 @@ def verify_article_citations(article, max_claims=MAX_CLAIMS, auto_fix=True):
     unverifiable = 0
     fix_candidates = []
 
-    for claim, nums in claims:
-        # Bir cümle birden çok kaynağa atıf yapabilir; HERHANGI biri destekliyorsa OK.
-        verdicts = []
-        note_any = ""
-        src_parts = []
-        for n in nums:
-            abstract, fulltext = _src(n)
-            src_text = "\n\n".join(t for t in (fulltext, abstract) if t)
-            if src_text:
-                src_parts.append(src_text)
-            sup, note = _ai_supported(claim, src_text)
-            verdicts.append(sup)
-            if note and not note_any:
-                note_any = note
+    def _src_text(num):
+        abstract, fulltext = _src(num)
+        return "\n\n".join(t for t in (fulltext, abstract) if t)
+
+    # Bir cümle birden çok kaynağa atıf yapabilir; HERHANGI biri destekliyorsa OK.
+    # AI kararları tüm iddialar için tek partide eşzamanlı alınır.
+    for (claim, nums), (verdicts, note_any, src_parts) in zip(
+            claims, _judge_claims(claims, _src_text)):
         if all(v is None for v in verdicts):
             unverifiable += 1
             continue
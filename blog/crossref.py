@@ -0,0 +1,227 @@
+"""
+blog.crossref — Paylaşımlı CrossRef istemcisi.
+
+reference_check ve ai_engine.tasks her DOI/sorgu için ayrı urlopen bağlantısı
+açıp kaynakları sırayla (10 sn timeout ile) doğruluyordu; 25 kaynaklık bir
+kaynakça dakikalar sürebiliyordu. Bu modül:
+
+  - Tek bir requests.Session ile keep-alive bağlantı havuzu kullanır
+    (TLS el sıkışması kaynak başına değil, bağlantı başına bir kez).
+  - DOI → metadata ve sorgu → sonuç yanıtlarını kalıcı önbellekte tutar
+    (settings.CACHES['crossref']; yoksa 'default'). Bulunamayan DOI de
+    (daha kısa süre) önbelleğe alınır.
+  - Eşzamanlılığı ve saniyedeki istek sayısını polite pool sınırlarında
+    tutar: CROSSREF_CONCURRENCY (varsayılan 3) ve CROSSREF_RATE_PER_SEC
+    (varsayılan 10). Sunucu X-Rate-Limit-* başlıkları gönderirse hız ona
+    göre düşürülür; 429'da Retry-After kadar beklenip bir kez yeniden denenir.
+  - map(fn, items): kaynakları bu sınırlar içinde paralel doğrular.
+
+Örnek:
+    from blog.crossref import client
+    msg = client.work("10.1038/nature12373")      # dict | None (404)
+    items = client.search({'query.bibliographic': '...', 'rows': 3})
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except Exception:
+    requests = None
+
+logger = logging.getLogger(__name__)
+
+CROSSREF_API = getattr(settings, 'CROSSREF_API_URL', "https://api.crossref.org/works")
+CONCURRENCY = getattr(settings, 'CROSSREF_CONCURRENCY', 3)
+RATE_PER_SEC = getattr(settings, 'CROSSREF_RATE_PER_SEC', 10)
+CACHE_TTL = getattr(settings, 'CROSSREF_CACHE_TTL', 30 * 24 * 3600)
+NOT_FOUND_TTL = 24 * 3600
+MAX_RETRY_AFTER = 10
+
+# Önbelleğe yalnızca kullanılan alanlar yazılır (CrossRef kaydındaki
+# 'reference' listesi vb. yüzlerce KB tutabilir)
+_KEEP_FIELDS = ('DOI', 'title', 'abstract', 'author', 'publisher', 'container-title',
+                'published-print', 'published-online', 'created', 'type')
+_MISSING = {'_missing': True}
+
+
+def _build_user_agent():
+    """CrossRef 'polite pool' için User-Agent'a site mailini ekler.
+    Mail settings'ten (EMAIL_HOST_USER) çekilir; yoksa mailsiz public pool.
+    """
+    email = getattr(settings, 'EMAIL_HOST_USER', None)
+    if email and '@' in email and 'example.com' not in email:
+        return f"AIBlog/1.0 (mailto:{email})"
+    return "AIBlog/1.0 (academic reference verification)"
+
+
+USER_AGENT = _build_user_agent()
+
+
+class CrossRefError(Exception):
+    """CrossRef'e ulaşılamadı veya 404 dışı bir HTTP hatası döndü."""
+
+
+def _slim(item):
+    return {k: item[k] for k in _KEEP_FIELDS if k in item}
+
+
+class CrossRefClient:
+    def __init__(self, base_url=None, user_agent=None, concurrency=None,
+                 rate_per_sec=None, cache_alias='crossref'):
+        self.base_url = (base_url or CROSSREF_API).rstrip('/')
+        self.user_agent = user_agent or USER_AGENT
+        self.concurrency = max(1, concurrency or CONCURRENCY)
+        rate = RATE_PER_SEC if rate_per_sec is None else rate_per_sec
+        self.min_interval = 1.0 / rate if rate else 0.0
+        self.cache_alias = cache_alias
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._rate_lock = threading.Lock()
+        self._next_at = 0.0
+
+    # --- altyapı --------------------------------------------------------------
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                if requests is None:
+                    raise CrossRefError("requests kurulu değil")
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+                s.mount('https://', adapter)
+                s.mount('http://', adapter)
+                s.headers.update({'User-Agent': self.user_agent,
+                                  'Accept': 'application/json'})
+                self._session = s
+            return self._session
+
+    @property
+    def cache(self):
+        if not self.cache_alias:
+            return None
+        from django.core.cache import caches
+        try:
+            return caches[self.cache_alias]
+        except Exception:
+            return caches['default']
+
+    def _cache_get(self, key):
+        try:
+            c = self.cache
+            return c.get(key) if c is not None else None
+        except Exception as e:
+            logger.warning(f"CrossRef önbelleği okunamadı: {e}")
+            return None
+
+    def _cache_set(self, key, value, ttl):
+        try:
+            c = self.cache
+            if c is not None:
+                c.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"CrossRef önbelleğine yazılamadı: {e}")
+
+    def _throttle(self):
+        """İstekleri en az min_interval aralıkla başlatır (süreç içi, thread'ler arası)."""
+        if not self.min_interval:
+            return
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_at)
+            self._next_at = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _observe_limits(self, response):
+        """X-Rate-Limit-Limit / -Interval başlıkları daha sıkı bir hız bildiriyorsa uy."""
+        try:
+            limit = int(response.headers.get('x-rate-limit-limit'))
+            interval = float(str(response.headers.get('x-rate-limit-interval')).rstrip('s'))
+        except (TypeError, ValueError):
+            return
+        if limit > 0:
+            self.min_interval = max(self.min_interval, interval / limit)
+
+    def _get(self, url, params=None, timeout=10):
+        """GET → (status_code, json | None). Ağ hatası ve 404 dışı 4xx/5xx CrossRefError."""
+        for attempt in range(2):
+            with self._slots:
+                self._throttle()
+                try:
+                    r = self.session.get(url, params=params, timeout=timeout)
+                except Exception as e:
+                    raise CrossRefError(str(e)) from e
+            self._observe_limits(r)
+            if r.status_code == 429 and attempt == 0:
+                try:
+                    wait = float(r.headers.get('retry-after') or 1)
+                except ValueError:
+                    wait = 1.0
+                time.sleep(min(wait, MAX_RETRY_AFTER))
+                continue
+            if r.status_code == 404:
+                return 404, None
+            if r.status_code != 200:
+                raise CrossRefError(f"HTTP {r.status_code}")
+            try:
+                return 200, r.json()
+            except ValueError as e:
+                raise CrossRefError(f"Geçersiz JSON: {e}") from e
+        raise CrossRefError("HTTP 429")
+
+    # --- sorgular -------------------------------------------------------------
+    def work(self, doi, timeout=10):
+        """DOI'nin CrossRef kaydı (sadeleştirilmiş dict); kayıt yoksa None."""
+        key = 'crossref:doi:' + hashlib.sha1(doi.lower().encode('utf-8')).hexdigest()
+        cached = self._cache_get(key)
+        if cached is not None:
+            return None if cached == _MISSING else cached
+        from urllib.parse import quote
+        status, data = self._get(f"{self.base_url}/{quote(doi)}", timeout=timeout)
+        if status == 404:
+            self._cache_set(key, _MISSING, NOT_FOUND_TTL)
+            return None
+        msg = _slim((data or {}).get('message') or {})
+        self._cache_set(key, msg, CACHE_TTL)
+        return msg
+
+    def search(self, params, timeout=10):
+        """/works?... araması; sadeleştirilmiş kayıt listesi döner."""
+        raw = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        key = 'crossref:q:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        status, data = self._get(self.base_url, params=params, timeout=timeout)
+        items = [] if status == 404 else [
+            _slim(it) for it in ((data or {}).get('message') or {}).get('items', [])]
+        self._cache_set(key, items, CACHE_TTL)
+        return items
+
+    def map(self, fn, items):
+        """fn'i items üzerinde eşzamanlılık sınırı içinde çalıştırır; sıra korunur."""
+        items = list(items)
+        if len(items) <= 1 or self.concurrency == 1:
+            return [fn(it) for it in items]
+        from concurrent.futures import ThreadPoolExecutor
+        from django.db import connections
+
+        def _one(it):
+            try:
+                return fn(it)
+            finally:
+                connections.close_all()  # DatabaseCache bağlantısı sızmasın
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items))) as pool:
+            return list(pool.map(_one, items))
+
+
+client = CrossRefClient()
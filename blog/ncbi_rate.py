@@ -0,0 +1,191 @@
+"""
+blog.ncbi_rate — Tüm Entrez çağrıları için süreçler arası paylaşımlı hız sınırlayıcı.
+
+pubmed_sources her Entrez çağrısından sonra sabit 0.12/0.34 sn uyuyordu: çağrılar
+seyrekken boşa bekliyor, aynı anda çalışan iki makale işi + citation_check ise
+birlikte NCBI'ın 3/sn (API anahtarıyla 10/sn) sınırını aşıp 429 alabiliyordu.
+Bu modül:
+
+  - Jeton kovası (token bucket): hız NCBI_RATE_PER_SEC (varsayılan anahtarla 10,
+    anahtarsız 3), kova kapasitesi NCBI_RATE_BURST (varsayılan 1: istek
+    başlangıçları tam 1/hız aralıklı). Jeton yoksa sıradaki boş yuva rezerve
+    edilir (eksi jeton) ve o ana kadar beklenir; böylece istekler uyumadan
+    tam izin verilen hızda akar.
+  - Durum küçük bir JSON dosyasındadır (NCBI_RATE_STATE_FILE); her okuma-yazma
+    POSIX flock altında yapılır, böylece tüm web/işçi süreçleri ve thread'ler
+    tek kovayı paylaşır. flock yoksa (Windows) süreç içi kilit kullanılır.
+  - Uyarlamalı geri çekilme: HTTP 429'da paylaşılan yavaşlatma katsayısı
+    ikiye katlanır (en çok MAX_BACKOFF) ve Retry-After kadar kimse istek
+    başlatmaz; katsayı RECOVER_SECONDS'ta bir yarıya inerek 1'e döner.
+
+Biopython Entrez 429'u beklemeden hemen yeniden denediği için çağrılar
+Entrez.max_tries = 1 ile yapılır; yeniden denemeler (429, 5xx, ağ hatası)
+burada, kovadan jeton alınarak yapılır.
+
+Örnek:
+    from blog.ncbi_rate import entrez_call
+    handle = entrez_call(Entrez.esearch, db='pubmed', term='...', retmax=10)
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kilit yok, süreç içi kilit yeterli
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 3
+DEFAULT_RATE_WITH_KEY = 10
+DEFAULT_BURST = 1
+MAX_BACKOFF = 16
+RECOVER_SECONDS = 30.0
+MAX_RETRIES = 3
+RETRY_DELAY = 2.0
+MAX_RETRY_AFTER = 30.0
+
+_thread_lock = threading.Lock()
+
+
+def _settings():
+    from django.conf import settings
+    path = getattr(settings, 'NCBI_RATE_STATE_FILE', None)
+    if path is None:
+        path = os.path.join(str(settings.BASE_DIR), '.cache', 'ncbi_rate.json')
+    rate = getattr(settings, 'NCBI_RATE_PER_SEC', None)
+    if not rate:
+        rate = DEFAULT_RATE_WITH_KEY if getattr(settings, 'NCBI_API_KEY', None) else DEFAULT_RATE
+    return str(path), float(rate), float(getattr(settings, 'NCBI_RATE_BURST', DEFAULT_BURST))
+
+
+class RateLimiter:
+    """Dosya üzerinden paylaşılan jeton kovası (aynı path'i kullanan tüm örnekler ortak)."""
+
+    def __init__(self, path, rate, burst=DEFAULT_BURST):
+        self.path = path
+        self.rate = rate
+        self.burst = max(1.0, burst)
+
+    def _update(self, change):
+        """Kilit altında durumu oku, change(state, now) ile değiştir, yaz; change'in dönüşünü döndür."""
+        with _thread_lock:
+            fh = None
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                fh = open(self.path, 'a+')
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_EX)
+                fh.seek(0)
+                try:
+                    state = json.loads(fh.read() or '{}')
+                except ValueError:
+                    state = {}
+                result = change(state, time.time())
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps(state))
+                fh.flush()
+                return result
+            except OSError as e:
+                # Durum dosyası kullanılamıyorsa süreç içi en az aralıkla devam et
+                logger.warning(f"NCBI hız durumu okunamadı: {e}")
+                return 1.0 / self.rate
+            finally:
+                if fh is not None:
+                    if fcntl is not None:
+                        fcntl.flock(fh, fcntl.LOCK_UN)
+                    fh.close()
+
+    def _backoff(self, state, now):
+        """Geçerli yavaşlatma katsayısı (son 429'dan beri RECOVER_SECONDS'ta bir yarılanır)."""
+        factor = state.get('factor', 1.0)
+        if factor <= 1.0:
+            return 1.0
+        return max(1.0, factor * 0.5 ** ((now - state.get('throttled_at', now)) / RECOVER_SECONDS))
+
+    def _reserve(self, state, now):
+        rate = self.rate / self._backoff(state, now)
+        last = state.get('stamp', now)
+        tokens = min(self.burst, state.get('tokens', self.burst) + max(0.0, now - last) * rate)
+        tokens -= 1.0
+        state['tokens'], state['stamp'] = tokens, now
+        wait = -tokens / rate if tokens < 0 else 0.0
+        return max(wait, state.get('blocked_until', 0.0) - now)
+
+    def acquire(self):
+        """Bir istek yuvası al; gerekirse yuvaya kadar bekler. Beklenen süreyi döner."""
+        wait = self._update(self._reserve)
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def throttled(self, retry_after=None):
+        """429 alındı: katsayıyı ikiye katla, herkesi retry_after (yoksa 1/hız) kadar durdur."""
+        def change(state, now):
+            state['factor'] = min(MAX_BACKOFF, self._backoff(state, now) * 2)
+            state['throttled_at'] = now
+            pause = min(retry_after or 0.0, MAX_RETRY_AFTER) or state['factor'] / self.rate
+            state['blocked_until'] = max(state.get('blocked_until', 0.0), now + pause)
+            # Birikmiş jetonlar geçersiz: yeni hızla sıfırdan doldurulur
+            state['tokens'] = min(state.get('tokens', 0.0), 0.0)
+            state['stamp'] = now + pause
+            return pause
+        pause = self._update(change)
+        logger.info(f"NCBI 429: {pause:.2f} sn beklenecek, hız katsayısı artırıldı")
+        return pause
+
+
+_limiter = None
+_limiter_guard = threading.Lock()
+
+
+def get_limiter():
+    """Ayarlardan kurulmuş süreç geneli sınırlayıcı."""
+    global _limiter
+    with _limiter_guard:
+        if _limiter is None:
+            _limiter = RateLimiter(*_settings())
+        return _limiter
+
+
+def _retry_after(exc):
+    try:
+        return float(exc.headers.get('Retry-After'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def entrez_call(func, *args, **kwargs):
+    """
+    Entrez fonksiyonunu (esearch, efetch, elink...) paylaşımlı hız sınırı içinde çağırır.
+
+    429'da uyarlamalı geri çekilip, 5xx ve ağ hatalarında RETRY_DELAY sonra
+    MAX_RETRIES kadar yeniden dener; diğer 4xx hataları olduğu gibi yükseltir.
+    """
+    from urllib.error import HTTPError, URLError
+
+    try:
+        from Bio import Entrez
+        Entrez.max_tries = 1  # yeniden denemeler burada, sınırlayıcı üzerinden
+    except Exception:
+        pass
+    limiter = get_limiter()
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except HTTPError as e:
+            if attempt == MAX_RETRIES or (e.code // 100 == 4 and e.code != 429):
+                raise
+            if e.code == 429:
+                limiter.throttled(_retry_after(e))
+            else:
+                time.sleep(RETRY_DELAY)
+        except URLError:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(RETRY_DELAY)
@@ -22,12 +22,16 @@ Dürüstlük notları:
   - Tam metin yalnızca PMC açık erişim alt kümesinde; paywall'lı makalede None.
   - Ticari kullanım için tam metin SADECE CC BY/CC0/public-domain lisanslılarda
     doldurulur (NC ve ND lisanslılar dışlanır).
+  - Arama, özet, PMID→PMCID, DOI→PMID ve tam metin yanıtları yerel depoda
+    (blog.pubmed_store) tutulur; tekrar eden üretim/doğrulamalar ağa gitmez.
+  - Tüm Entrez çağrıları blog.ncbi_rate.entrez_call üzerinden, süreçler arası
+    paylaşılan hız sınırı içinde yapılır (sabit uyku yok).
   - NCBI'a erişim yoksa (PythonAnywhere ücretsiz whitelist vb.) fonksiyon
     sessizce boş liste döner; çağıran taraf CrossRef'e düşebilir.
 """
 import os
 import re
-import time
+from concurrent.futures import ThreadPoolExecutor
 from xml.etree import ElementTree as ET
 
 try:
@@ -35,6 +39,9 @@ try:
 except Exception:
     Entrez = None
 
+from blog import pubmed_store
+from blog.ncbi_rate import entrez_call
+
 # --- Ayarlar: önce Django settings, sonra ortam değişkeni ------------------
 def _cfg(name, default=None):
     try:
@@ -61,6 +68,12 @@ _COMMERCIAL_NO = (
 
 # Tam metin token bütçesi (kaba: ~4 kar/token). Tek makale çok yer kaplamasın.
 MAX_FULLTEXT_CHARS = 6000
+# Tek EFetch'teki en çok PMCID; aday parçası buna sığar, böylece her parça tek istek olur.
+# Daha uzun listeler bu boyda partilere bölünüp en çok PMC_WORKERS eşzamanlı çekilir.
+PMC_BATCH_SIZE = 20
+PMC_WORKERS = 3
+# Toplu DOI→PMID aramasında tek ESearch'teki DOI sayısı
+DOI_BATCH_SIZE = 40
 
 
 def _configure_entrez():
@@ -81,10 +94,6 @@ def _configure_entrez():
     return True
 
 
-def _sleep():
-    time.sleep(0.12 if getattr(Entrez, 'api_key', None) else 0.34)
-
-
 def _txt(el):
     """Bir XML elemanının altındaki tüm metni boşlukla birleştir."""
     if el is None:
@@ -120,21 +129,26 @@ def _search_pmids(query, retmax=12, recent_years=6):
     from datetime import date
     min_year = date.today().year - recent_years
     term = f'{query} AND ("{min_year}"[Date - Publication] : "3000"[Date - Publication])'
-    h = Entrez.esearch(db='pubmed', term=term, retmax=retmax, sort='relevance')
-    rec = Entrez.read(h)
-    h.close()
-    _sleep()
-    return rec.get('IdList', [])
+
+    def load():
+        h = entrez_call(Entrez.esearch, db='pubmed', term=term, retmax=retmax, sort='relevance')
+        rec = Entrez.read(h)
+        h.close()
+        return [str(p) for p in rec.get('IdList', [])]
+    return pubmed_store.search(term, retmax, load)
 
 
 def _fetch_summaries(pmids):
-    """Birden çok PMID için başlık/özet/yazar/yıl/dergi/DOI çek (tek istek)."""
+    """Birden çok PMID için başlık/özet/yazar/yıl/dergi/DOI (depoda olmayanlar tek istekte)."""
     if not pmids:
         return {}
-    h = Entrez.efetch(db='pubmed', id=','.join(pmids), rettype='abstract', retmode='xml')
+    return pubmed_store.summaries([str(p) for p in pmids], _efetch_summaries)
+
+
+def _efetch_summaries(pmids):
+    h = entrez_call(Entrez.efetch, db='pubmed', id=','.join(pmids), rettype='abstract', retmode='xml')
     rec = Entrez.read(h)
     h.close()
-    _sleep()
 
     out = {}
     for art in rec.get('PubmedArticle', []):
@@ -167,12 +181,17 @@ def _fetch_summaries(pmids):
             # Dergi
             container = str(article.get('Journal', {}).get('Title', '')).strip()
 
-            # DOI (PubmedData/ArticleIdList içinde)
+            # DOI (PubmedData/ArticleIdList; yoksa Article/ELocationID içinde)
             doi = ''
             for aid in art.get('PubmedData', {}).get('ArticleIdList', []):
                 if aid.attributes.get('IdType') == 'doi':
                     doi = str(aid)
                     break
+            if not doi:
+                for eloc in article.get('ELocationID', []):
+                    if eloc.attributes.get('EIdType') == 'doi':
+                        doi = str(eloc)
+                        break
 
             out[pmid] = {
                 'pmid': pmid, 'title': title, 'authors': author_str,
@@ -181,23 +200,80 @@ def _fetch_summaries(pmids):
             }
         except Exception:
             continue
+    for pmid in pmids:
+        out.setdefault(pmid, None)  # yanıtta olmayan PMID: kayıt yok
     return out
 
 
 # --- PMC tam metin (yalnızca ticari-uygun lisans) --------------------------
 def _pmid_to_pmcid(pmid):
     """PMID -> PMCID (yoksa None)."""
+    return _pmids_to_pmcids([pmid]).get(str(pmid))
+
+
+def _pmids_to_pmcids(pmids):
+    """PMID listesi -> {pmid: PMCID} (PMC'de olmayanlar dönmez); depoda olmayanlar tek ELink'te."""
     try:
-        h = Entrez.elink(dbfrom='pubmed', db='pmc', id=pmid)
+        return pubmed_store.pmcids([str(p) for p in pmids], _elink_pmcids)
+    except Exception:
+        return {}
+
+
+def _elink_pmcids(pmids):
+    # id liste olarak verilince ELink her PMID için ayrı LinkSet döndürür (bire bir eşleme)
+    h = entrez_call(Entrez.elink, dbfrom='pubmed', db='pmc', linkname='pubmed_pmc', id=list(pmids))
+    rec = Entrez.read(h)
+    h.close()
+    out = {p: None for p in pmids}
+    for linkset in rec:
+        source = [str(i) for i in linkset.get('IdList', [])]
+        if len(source) != 1:
+            continue
+        for link_db in linkset.get('LinkSetDb', []):
+            if link_db.get('LinkName') == 'pubmed_pmc' and link_db.get('Link'):
+                out[source[0]] = 'PMC' + str(link_db['Link'][0]['Id'])
+    return out
+
+
+def _doi_to_pmid(doi):
+    """DOI -> PMID (yoksa None)."""
+    return _dois_to_pmids([doi]).get(doi)
+
+
+def _dois_to_pmids(dois):
+    """DOI listesi -> {doi: PMID} (PubMed'de olmayanlar dönmez); depoda olmayanlar toplu ESearch'le."""
+    try:
+        return pubmed_store.doi_pmids(list(dict.fromkeys(dois)), _esearch_dois)
+    except Exception:
+        return {}
+
+
+def _esearch_dois(dois):
+    """
+    DOI_BATCH_SIZE'lık OR'lu ESearch'ler (AID ve DOI alanı): bulunan PMID'lerin
+    özetleri çekilir (depoya da yazılır), DOI'ler özetteki DOI ile eşlenir.
+    Tek DOI'lik aramanın tek sonucu özet DOI'si tutmasa da kabul edilir (eski
+    tekil aramayla aynı). Eşlenemeyen DOI = PubMed'de yok; ağ hatası yükseltilir
+    ('yok' diye kaydedilmez).
+    """
+    pmids, single = [], {}
+    for i in range(0, len(dois), DOI_BATCH_SIZE):
+        batch = dois[i:i + DOI_BATCH_SIZE]
+        quoted = [d.replace('"', '') for d in batch]
+        term = ' OR '.join(f'"{d}"[{field}]' for d in quoted for field in ('AID', 'DOI'))
+        h = entrez_call(Entrez.esearch, db='pubmed', term=term, retmax=3 * len(batch))
         rec = Entrez.read(h)
         h.close()
-        _sleep()
-        links = rec[0].get('LinkSetDb', [])
-        if links and links[0].get('Link'):
-            return 'PMC' + str(links[0]['Link'][0]['Id'])
-    except Exception:
-        pass
-    return None
+        ids = [str(p) for p in rec.get('IdList', [])]
+        if len(batch) == 1 and len(ids) == 1:
+            single[batch[0]] = ids[0]
+        pmids += [p for p in ids if p not in pmids]
+    by_doi = {}
+    for pmid, summary in pubmed_store.summaries(pmids, _efetch_summaries).items():
+        doi = (summary.get('doi') or '').strip().lower()
+        if doi:
+            by_doi.setdefault(doi, pmid)
+    return {d: by_doi.get(d.strip().lower()) or single.get(d) for d in dois}
 
 
 def _license_commercial_ok(license_url):
@@ -215,52 +291,124 @@ def _fetch_pmc_fulltext(pmcid):
     PMC'den JATS XML çek. Döner: (fulltext|None, license_url|None).
     Tam metni SADECE lisans ticari kullanıma uygunsa döndürür.
     """
+    return _fetch_pmc_fulltexts([pmcid]).get(pmcid, (None, None))
+
+
+def _fetch_pmc_fulltexts(pmcids):
+    """PMCID listesi -> {pmcid: (fulltext|None, license_url|None)}; çekilemeyenler dönmez."""
     try:
-        num = pmcid.replace('PMC', '')
-        h = Entrez.efetch(db='pmc', id=num, rettype='full', retmode='xml')
-        xml = h.read()
-        h.close()
-        _sleep()
-        root = ET.fromstring(xml)
+        found = pubmed_store.fulltexts(list(pmcids), _download_pmc_fulltexts)
     except Exception:
-        return None, None
-
-    # Lisansı bul
-    license_url = None
-    for lic in root.iter():
-        tag = lic.tag.lower()
-        if tag.endswith('license'):
-            href = (lic.get('{http://www.w3.org/1999/xlink}href')
-                    or lic.get('href') or '')
-            if href:
-                license_url = href
-                break
-            inner = _txt(lic).lower()
-            m = re.search(r'creativecommons\.org/\S+', inner)
-            if m:
-                license_url = m.group(0)
-                break
+        return {}
+    return {k: ((text[:MAX_FULLTEXT_CHARS] if text else None), lic) for k, (text, lic) in found.items()}
+
+
+def _download_pmc_fulltexts(pmcids):
+    """
+    PMC_BATCH_SIZE'lık toplu EFetch'ler (en çok PMC_WORKERS eşzamanlı, hız sınırı içinde);
+    her partinin XML'i kendi thread'inde akış halinde ayrıştırılır. Başarısız partinin
+    PMCID'leri dönmez.
+    """
+    batches = [pmcids[i:i + PMC_BATCH_SIZE] for i in range(0, len(pmcids), PMC_BATCH_SIZE)]
+
+    def fetch(batch):
+        h = entrez_call(Entrez.efetch, db='pmc', id=','.join(p.replace('PMC', '') for p in batch),
+                        rettype='full', retmode='xml')
+        try:
+            got = {p: None for p in batch}  # yanıtta olmayan PMCID: kayıt yok
+            for pmcid, text, license_url in _iter_pmc_articles(h):
+                if pmcid in got:
+                    got[pmcid] = (text, license_url)
+            return got
+        finally:
+            h.close()
+
+    out = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(PMC_WORKERS, len(batches)))) as pool:
+        for future in [pool.submit(fetch, batch) for batch in batches]:
+            try:
+                out.update(future.result())
+            except Exception:
+                continue
+    return out
 
-    if not _license_commercial_ok(license_url):
-        return None, license_url  # ticari kullanıma uygun değil → tam metin verme
-
-    # Gövdeyi düz metne çevir (ref-list / tablo / şekil çöpü dışarıda)
-    body = root.find('.//body')
-    if body is None:
-        return None, license_url
-    for ref in body.findall('.//ref-list'):
-        for child in list(ref):
-            ref.remove(child)
-    parts = []
-    for el in body.iter():
-        if el.tag in ('p', 'title'):
-            t = _txt(el)
+
+_XLINK_HREF = '{http://www.w3.org/1999/xlink}href'
+_PMC_ID_TYPES = ('pmc', 'pmcid', 'pmcaid')
+
+
+def _license_url(el):
+    """<license> elemanı → lisans URL'i (xlink:href ya da metindeki creativecommons adresi)."""
+    href = el.get(_XLINK_HREF) or el.get('href') or ''
+    if href:
+        return href
+    m = re.search(r'creativecommons\.org/\S+', _txt(el).lower())
+    return m.group(0) if m else None
+
+
+def _iter_pmc_articles(source, limit=MAX_FULLTEXT_CHARS):
+    """
+    JATS akışı (tek <article> ya da <pmc-articleset>) → (pmcid, metin|None, license_url) üreteci.
+
+    Belge ağaç olarak kurulmaz, ET.iterparse ile artımlı okunur. Biten elemanlar
+    temizlenir; yalnız ön bölüm (front) ile açık paragraf/başlık/lisans
+    elemanları tamamlanana kadar tutulur. Gövde (body, ref-list hariç)
+    paragrafları en çok `limit` karakterlik tampona doğrudan yazılır. Ticari
+    kullanıma uygun olmayan lisans görülünce o makalenin gövdesi toplanmaz;
+    tek makalelik akışta okuma orada kesilir. Lisans hiç bulunmazsa metin None.
+    """
+    root = None
+    stack = []  # açık elemanların etiketleri
+    depth = None  # o anki <article>'ın stack derinliği
+    for event, el in ET.iterparse(source, events=('start', 'end')):
+        tag = el.tag
+        if event == 'start':
+            if root is None:
+                root = el
+            if tag == 'article' and depth is None:
+                depth = len(stack)
+                pmcid = license_url = None
+                rejected = False
+                parts, size = [], 0
+            stack.append(tag)
+            continue
+
+        stack.pop()
+        if depth is None:
+            continue
+        path = stack[depth + 1:]  # makale içindeki ataları (article hariç)
+
+        if tag == 'article' and len(stack) == depth:
+            text = '\n'.join(parts) if parts and not rejected and _license_commercial_ok(license_url) else None
+            yield pmcid, text, license_url
+            depth = None
+            el.clear()
+            if el is root:
+                return
+            root.clear()
+            continue
+
+        if (pmcid is None and tag == 'article-id' and path == ['front', 'article-meta']
+                and el.get('pub-id-type') in _PMC_ID_TYPES and el.text):
+            value = el.text.strip()
+            pmcid = value if value.upper().startswith('PMC') else 'PMC' + value
+        elif license_url is None and tag.lower().endswith('license'):
+            license_url = _license_url(el)
+            if license_url and not _license_commercial_ok(license_url):
+                rejected = True  # ticari kullanıma uygun değil → gövde toplanmaz
+                parts, size = [], 0
+                if root.tag == 'article':
+                    yield pmcid, None, license_url
+                    return
+        elif (tag in ('p', 'title') and not rejected and size < limit
+              and path[:1] == ['body'] and 'ref-list' not in path):
+            t = _txt(el)[:limit - size - (1 if parts else 0)]
             if t:
+                size += len(t) + (1 if parts else 0)
                 parts.append(t)
-    text = '\n'.join(parts).strip()
-    if not text:
-        return None, license_url
-    return text[:MAX_FULLTEXT_CHARS], license_url
+
+        if not any(a in ('front', 'p', 'title') or a.lower().endswith('license') for a in path):
+            el.clear()
 
 
 # --- Ana giriş noktası ------------------------------------------------------
@@ -324,19 +472,25 @@ def collect_pubmed_sources_for_topic(topic, target_count=8, lang='tr',
     records = list(collected.values())
 
     # 2) Tam metin (sadece birkaçı, sadece ticari-uygun lisans)
-    if want_fulltext:
+    #    PMID→PMCID tek toplu ELink; lisans ancak XML inince belli olduğundan
+    #    adaylar kayıt sırasıyla, kalan sınırın iki katı kadarlık parçalar halinde
+    #    (her parça tek EFetch) çekilir; fulltext_limit=8 için genelde ELink + 1 EFetch.
+    if want_fulltext and records:
+        links = _pmids_to_pmcids([rec['pmid'] for rec in records])
+        queue = [rec for rec in records if rec['pmid'] in links]
         added = 0
-        for rec in records:
-            if added >= fulltext_limit:
-                break
-            pmcid = _pmid_to_pmcid(rec['pmid'])
-            if not pmcid:
-                continue
-            rec['pmcid'] = pmcid
-            fulltext, lic = _fetch_pmc_fulltext(pmcid)
-            rec['license'] = lic
-            if fulltext:
-                rec['fulltext'] = fulltext
-                added += 1
+        while queue and added < fulltext_limit:
+            size = min(2 * (fulltext_limit - added), PMC_BATCH_SIZE)
+            chunk, queue = queue[:size], queue[size:]
+            texts = _fetch_pmc_fulltexts([links[rec['pmid']] for rec in chunk])
+            for rec in chunk:
+                if added >= fulltext_limit:
+                    break
+                rec['pmcid'] = links[rec['pmid']]
+                fulltext, lic = texts.get(rec['pmcid'], (None, None))
+                rec['license'] = lic
+                if fulltext:
+                    rec['fulltext'] = fulltext
+                    added += 1
 
     return records[:target_count]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+blog.pubmed_store — PubMed/PMC meta verisi ve tam metni için yerel kalıcı depo.
+
+Her makale üretimi aynı arama/özet/PMCID/tam metin isteklerini NCBI'a
+tekrarlıyor, citation_check de doğrulama için aynı özetleri ve PMC XML'ini
+yeniden indiriyordu. Bu modül pubmed_sources yardımcıları için okuma-içinden
+(read-through) önbellektir:
+
+  - sorgu        → PMID listesi          (SEARCH_TTL, kısa: sonuçlar değişir)
+  - PMID         → özet kaydı             (SUMMARY_TTL)
+  - PMID         → PMCID | yok            (LINK_TTL; 'yok' MISSING_TTL kadar)
+  - PMCID        → (tam metin, lisans)    (FULLTEXT_TTL; metin zlib ile sıkıştırılır)
+  - DOI          → PMID | yok             (LINK_TTL; 'yok' MISSING_TTL kadar)
+
+Depo settings.CACHES['pubmed']'dir (canlıda ana veritabanında DB tablosu:
+manage.py createcachetable; geliştirmede disk). Alias yoksa 'default'
+kullanılır. Yalnız başarılı yanıtlar yazılır; ağ hataları önbelleğe girmez.
+`manage.py prefill_pubmed` sorgu listesiyle depoyu önceden doldurur.
+"""
+import hashlib
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TTL = 24 * 3600
+SUMMARY_TTL = 30 * 24 * 3600
+LINK_TTL = 90 * 24 * 3600
+FULLTEXT_TTL = 90 * 24 * 3600
+MISSING_TTL = 7 * 24 * 3600
+
+_MISSING = {'_missing': True}
+
+
+def _cache():
+    from django.core.cache import caches
+    try:
+        return caches['pubmed']
+    except Exception:
+        return caches['default']
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _get_many(keys):
+    try:
+        return _cache().get_many(keys)
+    except Exception as e:
+        logger.warning(f"PubMed deposu okunamadı: {e}")
+        return {}
+
+
+def _set(key, value, ttl):
+    try:
+        _cache().set(key, value, ttl)
+    except Exception as e:
+        logger.warning(f"PubMed deposuna yazılamadı: {e}")
+
+
+def _read_through(key, loader, ttl, missing_ttl=MISSING_TTL):
+    """Tek anahtar: depoda varsa döner; yoksa loader() (None = kayıt yok) sonucu yazılır."""
+    cached = _get_many([key]).get(key)
+    if cached is not None:
+        return None if cached == _MISSING else cached
+    value = loader()
+    _set(key, _MISSING if value is None else value, missing_ttl if value is None else ttl)
+    return value
+
+
+def search(term, retmax, loader):
+    """Arama terimi → PMID listesi; loader() NCBI araması yapar."""
+    return _read_through(f'pubmed:search:{retmax}:{_hash(term)}', loader, SEARCH_TTL) or []
+
+
+def _read_through_many(prefix, ids, loader, ttl, missing_ttl=MISSING_TTL):
+    """
+    Çoklu anahtar: yalnız depoda olmayanlar loader(eksikler) ile tek seferde çekilir.
+
+    loader {id: değer} döner; değer None = kayıt yok (MISSING_TTL kadar saklanır),
+    dönüşte hiç olmayan id = bilinmiyor (ağ hatası; saklanmaz).
+    """
+    keys = {f'{prefix}{i}': i for i in ids}
+    found = _get_many(list(keys))
+    out = {keys[k]: v for k, v in found.items() if v != _MISSING}
+    missing = [i for k, i in keys.items() if k not in found]
+    if missing:
+        fetched = loader(missing)
+        for i in missing:
+            if i not in fetched:
+                continue
+            value = fetched[i]
+            _set(f'{prefix}{i}', _MISSING if value is None else value,
+                 missing_ttl if value is None else ttl)
+            if value is not None:
+                out[i] = value
+    return {i: out[i] for i in ids if i in out}
+
+
+def summaries(pmids, loader):
+    """PMID listesi → {pmid: özet kaydı}; loader(eksikler) → {pmid: kayıt | None}."""
+    return _read_through_many('pubmed:summary:', pmids, loader, SUMMARY_TTL)
+
+
+def pmcids(pmids, loader):
+    """PMID listesi → {pmid: PMCID} (PMC'de olmayanlar dönmez); loader(eksikler) toplu ELink yapar."""
+    return _read_through_many('pubmed:pmcid:', pmids, loader, LINK_TTL)
+
+
+def doi_pmids(dois, loader):
+    """DOI listesi → {doi: PMID} (PubMed'de olmayanlar dönmez); loader(eksikler) toplu ESearch yapar."""
+    by_hash = {_hash(d.strip().lower()): d for d in dois}
+
+    def load(hashes):
+        return {_hash(d.strip().lower()): pmid for d, pmid in loader([by_hash[h] for h in hashes]).items()}
+
+    found = _read_through_many('pubmed:doi:', list(by_hash), load, LINK_TTL)
+    return {by_hash[h]: pmid for h, pmid in found.items()}
+
+
+def _pack(result):
+    text, license_url = result
+    return {'z': zlib.compress(text.encode('utf-8')) if text else None, 'license': license_url}
+
+
+def _unpack(entry):
+    text = zlib.decompress(entry['z']).decode('utf-8') if entry.get('z') else None
+    return text, entry.get('license')
+
+
+def fulltexts(pmcid_list, loader):
+    """PMCID listesi → {pmcid: (tam metin | None, lisans | None)}; metin depoda zlib ile sıkıştırılır."""
+    def load(missing):
+        return {k: None if v is None else _pack(v) for k, v in loader(missing).items()}
+
+    return {k: _unpack(v) for k, v in
+            _read_through_many('pubmed:fulltext:', pmcid_list, load, FULLTEXT_TTL).items()}
+
@@ -13,30 +13,11 @@ AI'ın ürettiği kaynakçadaki her atfı CrossRef veritabanında arar:
     api.crossref.org erişilemezse fonksiyon nazikçe 'doğrulanamadı' döner.
 """
 import re
-import json
 import logging
-import urllib.request
-import urllib.parse
 
-logger = logging.getLogger(__name__)
+from blog.crossref import client as crossref
 
-CROSSREF_API = "https://api.crossref.org/works"
-def _build_user_agent():
-    """CrossRef 'polite pool' için User-Agent'a site mailini ekler.
-    Mail settings'ten (EMAIL_HOST_USER) çekilir; yoksa mailsiz public pool.
-    """
-    email = None
-    try:
-        from django.conf import settings
-        email = getattr(settings, 'EMAIL_HOST_USER', None)
-    except Exception:
-        email = None
-    if email and '@' in email and 'example.com' not in email:
-        return f"AIBlog/1.0 (mailto:{email})"
-    return "AIBlog/1.0 (academic reference verification)"
-
-
-USER_AGENT = _build_user_agent()
+logger = logging.getLogger(__name__)
 
 
 def _parse_bibliography(bibliography_text):
@@ -123,34 +104,21 @@ def verify_single_reference(ref_text, timeout=10):
     doi = _extract_doi(ref_text)
     if doi:
         try:
-            url = f"{CROSSREF_API}/{urllib.parse.quote(doi)}"
-            req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
-            with urllib.request.urlopen(req, timeout=timeout) as r:
-                data = json.loads(r.read().decode())
-            msg = data.get('message', {})
+            msg = crossref.work(doi, timeout=timeout)
+        except Exception:
+            return {'status': 'unreachable', 'doi': None, 'matched_title': None,
+                    'abstract': None}
+        if msg is not None:
             title = (msg.get('title') or ['?'])[0]
             abstract = _clean_abstract(msg.get('abstract'))
             return {'status': 'verified', 'doi': doi, 'matched_title': title,
                     'abstract': abstract}
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                pass  # DOI bulunamadı, başlıkla aramaya devam et
-            else:
-                return {'status': 'unreachable', 'doi': None, 'matched_title': None,
-                        'abstract': None}
-        except Exception:
-            return {'status': 'unreachable', 'doi': None, 'matched_title': None,
-                    'abstract': None}
+        # DOI bulunamadı (404), başlıkla aramaya devam et
 
     # Başlık/bibliyografik arama
     query = _extract_search_query(ref_text)
     try:
-        params = urllib.parse.urlencode({'query.bibliographic': query, 'rows': 3})
-        url = f"{CROSSREF_API}?{params}"
-        req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            data = json.loads(r.read().decode())
-        items = data.get('message', {}).get('items', [])
+        items = crossref.search({'query.bibliographic': query, 'rows': 3}, timeout=timeout)
         if not items:
             return {'status': 'not_found', 'doi': None, 'matched_title': None,
                     'abstract': None}
@@ -175,6 +143,12 @@ def verify_single_reference(ref_text, timeout=10):
                 'abstract': None}
 
 
+def verify_many(ref_texts, timeout=10):
+    """verify_single_reference'ı CrossRef eşzamanlılık sınırı içinde paralel çalıştırır.
+    Sonuçlar ref_texts sırasıyla döner."""
+    return crossref.map(lambda t: verify_single_reference(t, timeout=timeout), ref_texts)
+
+
 def _title_similarity(a, b):
     """İki başlık arasındaki basit kelime örtüşme oranı (0-1)."""
     if not a or not b:
@@ -207,8 +181,7 @@ def verify_bibliography(bibliography_text, max_refs=20):
     results = []
     counts = {'verified': 0, 'not_found': 0, 'unreachable': 0}
 
-    for entry in entries:
-        res = verify_single_reference(entry['text'])
+    for entry, res in zip(entries, verify_many([e['text'] for e in entries])):
         counts[res['status']] = counts.get(res['status'], 0) + 1
         results.append({
             'num': entry['num'],
@@ -394,17 +367,8 @@ def _extract_citation_context(full_content, citation_num):
     return None
 
 
-def check_citation_relevance_ai(sentence, abstract, lang='tr'):
-    """
-    AI'a sorar: bu cümle, bu kaynağın abstract'ıyla içerik olarak ilgili mi?
-    Türkçe cümle + İngilizce abstract sorununu AI çözer.
-
-    Döner: dict {'relevance': 'relevant'|'unrelated'|'uncertain', 'note': str}
-    """
-    if not sentence or not abstract:
-        return {'relevance': 'uncertain', 'note': 'Abstract bulunamadı.'}
-
-    prompt = (
+def _relevance_prompt(sentence, abstract):
+    return (
         "Aşağıda bir akademik makaleden bir CÜMLE ve bu cümlede atıf yapılan "
         "kaynağın ÖZETİ (abstract) var. Görevin: bu kaynağın özeti, cümledeki "
         "iddiayı/konuyu destekliyor mu yoksa alakasız mı belirlemek.\n\n"
@@ -416,22 +380,55 @@ def check_citation_relevance_ai(sentence, abstract, lang='tr'):
         "- BELIRSIZ (karar verilemiyor)\n"
     )
 
-    try:
-        from ai_engine.services import generate_with_pool
-        answer, _key = generate_with_pool(
-            prompt, service_name='Google Gemini', model_name='gemini-3.5-flash'
-        )
-        if not answer:
-            return {'relevance': 'uncertain', 'note': 'AI yanıt vermedi.'}
-        ans = answer.strip().upper()
-        if 'ALAKASIZ' in ans:
-            return {'relevance': 'unrelated', 'note': 'Kaynak özeti cümleyle alakasız görünüyor.'}
-        elif 'ILGILI' in ans or 'İLGİLİ' in ans:
-            return {'relevance': 'relevant', 'note': 'Kaynak konuyla ilgili görünüyor.'}
+
+def _parse_relevance(answer):
+    if not answer:
+        return {'relevance': 'uncertain', 'note': 'AI yanıt vermedi.'}
+    ans = answer.strip().upper()
+    if 'ALAKASIZ' in ans:
+        return {'relevance': 'unrelated', 'note': 'Kaynak özeti cümleyle alakasız görünüyor.'}
+    elif 'ILGILI' in ans or 'İLGİLİ' in ans:
+        return {'relevance': 'relevant', 'note': 'Kaynak konuyla ilgili görünüyor.'}
+    else:
+        return {'relevance': 'uncertain', 'note': 'İlgi durumu belirsiz.'}
+
+
+def check_citation_relevance_ai(sentence, abstract, lang='tr'):
+    """
+    AI'a sorar: bu cümle, bu kaynağın abstract'ıyla içerik olarak ilgili mi?
+    Türkçe cümle + İngilizce abstract sorununu AI çözer.
+
+    Döner: dict {'relevance': 'relevant'|'unrelated'|'uncertain', 'note': str}
+    """
+    return check_citation_relevance_many([(sentence, abstract)], lang=lang)[0]
+
+
+def check_citation_relevance_many(pairs, lang='tr'):
+    """check_citation_relevance_ai'nin toplu sürümü: [(cümle, özet), ...] çiftlerini
+    eşzamanlı kontrol eder (ai_engine.generate_many), sonuçları aynı sırayla döndürür."""
+    results = [None] * len(pairs)
+    todo = []
+    for i, (sentence, abstract) in enumerate(pairs):
+        if not sentence or not abstract:
+            results[i] = {'relevance': 'uncertain', 'note': 'Abstract bulunamadı.'}
         else:
-            return {'relevance': 'uncertain', 'note': 'İlgi durumu belirsiz.'}
+            todo.append(i)
+    if not todo:
+        return results
+
+    try:
+        from ai_engine.services import generate_many
+        answers = generate_many(
+            [_relevance_prompt(*pairs[i]) for i in todo],
+            service_name='Google Gemini', model_name='gemini-3.5-flash', cache=True)
     except Exception as e:
-        return {'relevance': 'uncertain', 'note': f'AI kontrolü yapılamadı: {e}'}
+        answers = [e] * len(todo)
+    for i, res in zip(todo, answers):
+        if isinstance(res, Exception):
+            results[i] = {'relevance': 'uncertain', 'note': f'AI kontrolü yapılamadı: {res}'}
+        else:
+            results[i] = _parse_relevance(res[0])
+    return results
 
 
 def check_article_references_with_content(article, max_ai_checks=8):
@@ -452,13 +449,11 @@ def check_article_references_with_content(article, max_ai_checks=8):
                        "whitelist'te olduğundan emin olun.")
 
     # Doğrulanan + abstract'ı olan kaynaklar için AI içerik kontrolü
-    ai_checks = 0
-    relevant_count = 0
-    unrelated_count = 0
+    to_check = []   # (ref, cümle, özet)
     for ref in result['results']:
         if ref['status'] != 'verified':
             continue
-        if ai_checks >= max_ai_checks:
+        if len(to_check) >= max_ai_checks:
             ref['content_relevance'] = 'skipped'
             continue
         abstract = ref.get('abstract')
@@ -469,10 +464,15 @@ def check_article_references_with_content(article, max_ai_checks=8):
         if not sentence:
             ref['content_relevance'] = 'no_context'
             continue
-        check = check_citation_relevance_ai(sentence, abstract)
+        to_check.append((ref, sentence, abstract))
+
+    # Tüm atıflar tek seferde, eşzamanlı kontrol edilir (toplam süre ≈ bir çağrı)
+    relevant_count = 0
+    unrelated_count = 0
+    checks = check_citation_relevance_many([(sent, ab) for _ref, sent, ab in to_check])
+    for (ref, _sent, _ab), check in zip(to_check, checks):
         ref['content_relevance'] = check['relevance']
         ref['content_note'] = check['note']
-        ai_checks += 1
         if check['relevance'] == 'relevant':
             relevant_count += 1
         elif check['relevance'] == 'unrelated':
@@ -755,12 +755,7 @@ def find_real_reference_for_sentence(sentence, timeout=10, lang='tr'):
     if not terms:
         return None
     try:
-        params = urllib.parse.urlencode({'query.bibliographic': terms, 'rows': 3})
-        url = f"{CROSSREF_API}?{params}"
-        req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            data = json.loads(r.read().decode())
-        items = data.get('message', {}).get('items', [])
+        items = crossref.search({'query.bibliographic': terms, 'rows': 3}, timeout=timeout)
         if not items:
             return None
         top = items[0]
@@ -830,7 +825,7 @@ def _ai_topic_to_keywords(topic, lang='tr'):
         answer = None
         for svc, mdl in get_fallback_models('Google Gemini', 'gemini-3.5-flash', cross_provider=True):
             try:
-                answer, _ = generate_with_pool(prompt, service_name=svc, model_name=mdl)
+                answer, _ = generate_with_pool(prompt, service_name=svc, model_name=mdl, cache=True)
                 if answer:
                     break
             except Exception:
@@ -931,11 +926,9 @@ def collect_real_sources_for_topic(topic, target_count=8, timeout=10, lang='tr')
     from_year = date.today().year - 6
     from_date = f"{from_year}-01-01"
 
-    for query in queries:
-        if len(collected) >= target_count:
-            break
+    def _search(query):
         try:
-            params = urllib.parse.urlencode({
+            return crossref.search({
                 'query.bibliographic': query,
                 'rows': 12,
                 # SADECE abstract'ı olan + güncel (son 6 yıl) yayınlar
@@ -943,16 +936,15 @@ def collect_real_sources_for_topic(topic, target_count=8, timeout=10, lang='tr')
                 # En çok atıf alan (etkili/okunabilirliği yüksek) önce
                 'sort': 'is-referenced-by-count',
                 'order': 'desc',
-            })
-            url = f"{CROSSREF_API}?{params}"
-            req = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
-            with urllib.request.urlopen(req, timeout=timeout) as r:
-                data = json.loads(r.read().decode())
+            }, timeout=timeout)
         except Exception:
-            continue  # bu sorgu başarısız, diğerine geç
+            return None  # bu sorgu başarısız, diğerine geç
 
-        items = data.get('message', {}).get('items', [])
-        for top in items:
+    # Sorgular paralel çekilir, sonuçlar yine sorgu sırasıyla işlenir
+    for items in crossref.map(_search, queries):
+        if len(collected) >= target_count:
+            break
+        for top in items or []:
             if len(collected) >= target_count:
                 break
             doi = top.get('DOI', '')
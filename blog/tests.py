@@ -1,3 +1,288 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+from urllib.error import HTTPError
 
-# Create your tests here.
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+
+from . import citation_check, crossref, ncbi_rate, pubmed_sources, pubmed_store, reference_check
+
+
+def _response(status, body=None, headers=None):
+    r = mock.Mock(status_code=status, headers=headers or {})
+    r.json.return_value = body or {}
+    return r
+
+
+class _Client(crossref.CrossRefClient):
+    def __init__(self, **kwargs):
+        super().__init__(base_url='https://crossref.test/works', rate_per_sec=0, **kwargs)
+        self._cache = LocMemCache('test-crossref', {})
+        self._cache.clear()
+        self._session = mock.Mock()
+
+    @property
+    def cache(self):
+        return self._cache
+
+
+class CrossRefClientTestCase(SimpleTestCase):
+    def test_work_and_search_are_cached_including_not_found(self):
+        """DOI/sorgu yanıtı ve 404 önbellekten dönmeli; ikinci çağrı ağa gitmemeli"""
+        client = _Client()
+        client.session.get.side_effect = [
+            _response(200, {'message': {'DOI': '10.1/a', 'title': ['A'], 'reference': [1] * 500}}),
+            _response(404),
+            _response(200, {'message': {'items': [{'DOI': '10.1/b', 'title': ['B']}]}}),
+        ]
+        for _ in range(2):
+            self.assertEqual(client.work('10.1/A'), {'DOI': '10.1/a', 'title': ['A']})
+            self.assertIsNone(client.work('10.1/missing'))
+            self.assertEqual(client.search({'query.bibliographic': 'b', 'rows': 3})[0]['DOI'], '10.1/b')
+        self.assertEqual(client.session.get.call_count, 3)
+
+    @mock.patch.object(crossref.time, 'sleep')
+    def test_rate_limit_retry_and_server_error(self, sleep):
+        """429'da Retry-After beklenip bir kez tekrar denenmeli; 5xx CrossRefError olmalı"""
+        client = _Client()
+        client.session.get.side_effect = [
+            _response(429, headers={'retry-after': '2'}),
+            _response(200, {'message': {'DOI': '10.1/a'}}),
+            _response(503),
+        ]
+        self.assertEqual(client.work('10.1/a'), {'DOI': '10.1/a'})
+        sleep.assert_called_once_with(2.0)
+        with self.assertRaises(crossref.CrossRefError):
+            client.work('10.1/b')
+
+    def test_verify_bibliography_runs_in_parallel_keeping_order(self):
+        """Kaynaklar paralel doğrulanmalı; sonuç sırası ve durumlar korunmalı"""
+        client = _Client(concurrency=3)
+
+        def fake_get(url, params=None, timeout=None):
+            if url.endswith('/10.1000/ok'):
+                return _response(200, {'message': {'DOI': '10.1000/ok', 'title': ['Ok']}})
+            if params:
+                return _response(200, {'message': {'items': [
+                    {'DOI': '10.1/t', 'title': ['Gene regulation networks in yeast']}]}})
+            raise OSError('bağlantı koptu')
+
+        client.session.get.side_effect = fake_get
+        bib = ('[1] A. (2020). Ok. https://doi.org/10.1000/ok\n'
+               '[2] B. (2021). "Gene regulation networks in yeast". J.\n'
+               '[3] C. (2022). Down. https://doi.org/10.1000/down')
+        with mock.patch.object(reference_check, 'crossref', client):
+            result = reference_check.verify_bibliography(bib)
+        self.assertEqual([r['status'] for r in result['results']],
+                         ['verified', 'verified', 'unreachable'])
+        self.assertEqual([r['num'] for r in result['results']], ['1', '2', '3'])
+        self.assertTrue(result['reachable'])
+
+
+class NcbiRateLimiterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'ncbi_rate.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shared_bucket_paces_all_callers(self):
+        """Aynı durum dosyasını kullanan sınırlayıcılar birlikte hızı aşmamalı"""
+        limiters = [ncbi_rate.RateLimiter(self.path, rate=50, burst=2) for _ in range(3)]
+        starts = []
+
+        def worker(limiter):
+            for _ in range(8):
+                limiter.acquire()
+                starts.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker, args=(lim,)) for lim in limiters]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        starts.sort()
+        # 24 istek, 2 jetonluk patlama: kalan 22 istek 50/sn → en az ~0.44 sn
+        self.assertGreaterEqual(starts[-1] - starts[0], 0.40)
+        self.assertLess(starts[-1] - starts[0], 1.5)
+
+    @mock.patch.object(ncbi_rate.time, 'sleep')
+    def test_429_backs_off_and_retries(self, sleep):
+        """429'da Retry-After kadar durulmalı, hız katsayısı artmalı ve çağrı yeniden denenmeli"""
+        limiter = ncbi_rate.RateLimiter(self.path, rate=10)
+        error = HTTPError('https://eutils.test', 429, 'Too Many Requests', {'Retry-After': '2'}, None)
+        func = mock.Mock(side_effect=[error, 'handle'])
+        with mock.patch.object(ncbi_rate, 'get_limiter', return_value=limiter):
+            self.assertEqual(ncbi_rate.entrez_call(func, db='pubmed'), 'handle')
+        self.assertEqual(func.call_count, 2)
+        self.assertGreaterEqual(max(c.args[0] for c in sleep.call_args_list), 1.9)
+        self.assertEqual(limiter._update(lambda state, now: state['factor']), 2.0)
+
+        bad = HTTPError('https://eutils.test', 400, 'Bad Request', {}, None)
+        with mock.patch.object(ncbi_rate, 'get_limiter', return_value=limiter):
+            with self.assertRaises(HTTPError):
+                ncbi_rate.entrez_call(mock.Mock(side_effect=bad))
+
+
+class PubMedStoreTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache = LocMemCache('test-pubmed', {})
+        self.cache.clear()
+        patcher = mock.patch.object(pubmed_store, '_cache', return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_through_with_negative_and_compressed_entries(self):
+        """Özet/PMCID/tam metin bir kez çekilmeli; 'yok' yanıtı da saklanmalı, tam metin sıkıştırılmalı"""
+        efetch = mock.Mock(side_effect=lambda pmids: {p: {'pmid': p, 'abstract': 'a' + p} if p != '3' else None
+                                                      for p in pmids})
+        for _ in range(2):
+            self.assertEqual(pubmed_store.summaries(['1', '2', '3'], efetch),
+                             {'1': {'pmid': '1', 'abstract': 'a1'}, '2': {'pmid': '2', 'abstract': 'a2'}})
+        efetch.assert_called_once_with(['1', '2', '3'])
+        pubmed_store.summaries(['2', '4'], efetch)
+        efetch.assert_called_with(['4'])
+
+        elink = mock.Mock(return_value={'3': None})
+        for _ in range(2):
+            self.assertEqual(pubmed_store.pmcids(['3'], elink), {})
+        elink.assert_called_once()
+
+        text = 'Gövde paragrafı. ' * 2000
+        download = mock.Mock(return_value={'PMC9': (text, 'https://creativecommons.org/licenses/by/4.0/')})
+        for _ in range(2):
+            self.assertEqual(pubmed_store.fulltexts(['PMC9'], download)['PMC9'][0], text)
+        download.assert_called_once()
+        self.assertLess(len(self.cache.get('pubmed:fulltext:PMC9')['z']), len(text) // 10)
+
+    def test_citation_check_reuses_generation_lookups(self):
+        """Üretimde çekilen özet ve tam metin doğrulamada ağa gitmeden kullanılmalı; ağ hatası saklanmamalı"""
+        pubmed_store._set('pubmed:summary:42', {'pmid': '42', 'abstract': 'Kayıtlı özet'}, 60)
+        pubmed_store._set('pubmed:pmcid:42', 'PMC7', 60)
+        pubmed_store.fulltexts(['PMC7'], lambda missing: {'PMC7': ('Tam metin', None)})
+        entrez = mock.Mock()
+        entrez.esearch.side_effect = OSError('ağ yok')
+        with mock.patch.object(pubmed_sources, 'Entrez', entrez), \
+                mock.patch.object(pubmed_sources, '_configure_entrez', return_value=True), \
+                mock.patch.object(pubmed_sources, 'entrez_call', side_effect=lambda f, **kw: f(**kw)):
+            self.assertEqual(citation_check._fetch_source_text('10.1/x'), (None, None))
+            self.assertIsNone(self.cache.get('pubmed:doi:' + pubmed_store._hash('10.1/x')))
+            pubmed_store._set('pubmed:doi:' + pubmed_store._hash('10.1/x'), '42', 60)
+            self.assertEqual(citation_check._fetch_source_text('10.1/X'), ('Kayıtlı özet', 'Tam metin'))
+        entrez.efetch.assert_not_called()
+        entrez.elink.assert_not_called()
+
+    def test_fulltext_step_batches_elink_and_efetch(self):
+        """8 kayıt için tek ELink + tek EFetch; lisansa uymayan atlanıp sınır dolmalı"""
+        records = {str(p): {'pmid': str(p), 'title': f'T{p}', 'authors': 'A', 'year': '2024',
+                            'container': 'J', 'doi': None, 'abstract': 'x' * 100} for p in range(1, 9)}
+
+        def elink(**kw):
+            return mock.Mock(linksets=[
+                {'IdList': [p], 'LinkSetDb': [{'LinkName': 'pubmed_pmc', 'Link': [{'Id': '10' + p}]}]}
+                for p in kw['id'] if p != '5'])
+
+        def article(num):
+            lic = 'by-nc' if num == '102' else 'by'
+            return (f'<article><front><article-meta><article-id pub-id-type="pmc">{num}</article-id>'
+                    f'<permissions><license xlink:href="https://creativecommons.org/licenses/{lic}/4.0/" '
+                    f'xmlns:xlink="http://www.w3.org/1999/xlink"/></permissions></article-meta></front>'
+                    f'<body><p>Metin {num}</p></body></article>')
+
+        def efetch(**kw):
+            return io.StringIO('<pmc-articleset>' + ''.join(
+                article(num) for num in kw['id'].split(',')) + '</pmc-articleset>')
+
+        entrez = mock.Mock()
+        entrez.elink.side_effect = elink
+        entrez.read.side_effect = lambda h: h.linksets
+        entrez.efetch.side_effect = efetch
+        with mock.patch.object(pubmed_sources, 'Entrez', entrez), \
+                mock.patch.object(pubmed_sources, '_configure_entrez', return_value=True), \
+                mock.patch.object(pubmed_sources, '_keywords', return_value=['q']), \
+                mock.patch.object(pubmed_sources, '_relevant', return_value=True), \
+                mock.patch.object(pubmed_sources, '_search_pmids', return_value=list(records)), \
+                mock.patch.object(pubmed_sources, '_fetch_summaries', return_value=records), \
+                mock.patch.object(pubmed_sources, 'entrez_call', side_effect=lambda f, **kw: f(**kw)):
+            out = pubmed_sources.collect_pubmed_sources_for_topic('konu', fulltext_limit=4)
+        self.assertEqual(entrez.elink.call_count, 1)
+        self.assertEqual(entrez.efetch.call_count, 1)
+        self.assertEqual([r['pmid'] for r in out if r['fulltext']], ['1', '3', '4', '6'])
+        self.assertEqual(out[4]['pmcid'], None)
+        self.assertEqual(out[1]['fulltext'], None)
+
+    def test_streaming_jats_parser_rejects_early_and_caps_text(self):
+        """NC lisansında gövde okunmadan durulmalı; ref-list atlanmalı, metin sınırda kesilmeli"""
+        def doc(lic, body):
+            return io.BytesIO((
+                '<article><front><article-meta><article-id pub-id-type="pmc">55</article-id>'
+                f'<permissions><license><license-p>creativecommons.org/licenses/{lic}/4.0/</license-p>'
+                f'</license></permissions></article-meta></front><body>{body}</body></article>').encode())
+
+        paragraphs = '<sec><title>Giriş</title>' + '<p>Uzun paragraf metni.</p>' * 50 + '</sec>'
+        arts = list(pubmed_sources._iter_pmc_articles(
+            doc('by', paragraphs + '<ref-list><p>Kaynak</p></ref-list>'), limit=100))
+        self.assertEqual(len(arts), 1)
+        pmcid, text, lic = arts[0]
+        self.assertEqual((pmcid, lic), ('PMC55', 'creativecommons.org/licenses/by/4.0/'))
+        self.assertTrue(text.startswith('Giriş\nUzun paragraf metni.'))
+        self.assertEqual(len(text), 100)
+        self.assertNotIn('Kaynak', text)
+
+        stream = doc('by-nc', paragraphs)
+        self.assertEqual(list(pubmed_sources._iter_pmc_articles(stream)),
+                         [('PMC55', None, 'creativecommons.org/licenses/by-nc/4.0/')])
+
+    def test_citation_sources_prefetched_in_batches(self):
+        """3 DOI: tek ESearch, tek özet EFetch'i, tek ELink, tek PMC EFetch'i; bulunamayan DOI dönmemeli"""
+        summaries = {p: {'pmid': p, 'doi': f'10.1/D{p}', 'abstract': f'Özet {p}'} for p in ('11', '12')}
+        efetch_summaries = mock.Mock(side_effect=lambda pmids: {p: summaries.get(p) for p in pmids})
+        entrez = mock.Mock()
+        entrez.read.side_effect = lambda h: h.parsed
+        entrez.esearch.return_value = mock.Mock(parsed={'IdList': ['11', '12']})
+        entrez.elink.return_value = mock.Mock(parsed=[
+            {'IdList': ['11'], 'LinkSetDb': [{'LinkName': 'pubmed_pmc', 'Link': [{'Id': '711'}]}]}])
+        entrez.efetch.side_effect = lambda **kw: io.StringIO(
+            '<article><front><article-meta><article-id pub-id-type="pmc">711</article-id><license '
+            'xmlns:xlink="http://www.w3.org/1999/xlink" xlink:href="https://creativecommons.org/licenses/by/4.0/"/>'
+            '</article-meta></front><body><p>Tam metin 11</p></body></article>')
+        with mock.patch.object(pubmed_sources, 'Entrez', entrez), \
+                mock.patch.object(pubmed_sources, '_configure_entrez', return_value=True), \
+                mock.patch.object(pubmed_sources, '_efetch_summaries', efetch_summaries), \
+                mock.patch.object(pubmed_sources, 'entrez_call', side_effect=lambda f, **kw: f(**kw)):
+            texts = citation_check._prefetch_source_texts(['10.1/d11', '10.1/D12', '10.1/yok', None])
+        self.assertEqual(texts, {'10.1/d11': ('Özet 11', 'Tam metin 11'), '10.1/D12': ('Özet 12', None)})
+        self.assertEqual((entrez.esearch.call_count, efetch_summaries.call_count,
+                          entrez.elink.call_count, entrez.efetch.call_count), (1, 1, 1, 1))
+        self.assertIn('"10.1/yok"[AID]', entrez.esearch.call_args.kwargs['term'])
+        self.assertEqual(self.cache.get('pubmed:doi:' + pubmed_store._hash('10.1/yok')), pubmed_store._MISSING)
+
+    def test_doi_only_in_elocation_id_is_resolved(self):
+        """Özette DOI yalnız ELocationID'deyse toplu arama eşlemeli; tek DOI'lik aramanın tek sonucu kabul edilmeli"""
+        from Bio import Entrez as real_entrez
+        xml = (
+            '<?xml version="1.0"?>\n<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, 1st January 2019//EN" '
+            '"https://dtd.nlm.nih.gov/ncbi/pubmed/out/pubmed_190101.dtd">\n<PubmedArticleSet>' + ''.join(
+                f'<PubmedArticle><MedlineCitation Status="MEDLINE" Owner="NLM"><PMID Version="1">{pmid}</PMID>'
+                f'<Article PubModel="Print"><Journal><JournalIssue CitedMedium="Print"><PubDate><Year>2020</Year>'
+                f'</PubDate></JournalIssue><Title>J</Title></Journal><ArticleTitle>T{pmid}</ArticleTitle>{eloc}'
+                f'<Abstract><AbstractText>Özet {pmid}</AbstractText></Abstract></Article></MedlineCitation>'
+                f'<PubmedData><ArticleIdList><ArticleId IdType="pubmed">{pmid}</ArticleId></ArticleIdList>'
+                f'</PubmedData></PubmedArticle>'
+                for pmid, eloc in (('11', '<ELocationID EIdType="doi" ValidYN="Y">10.1/ELOC</ELocationID>'),
+                                   ('12', ''))) + '</PubmedArticleSet>').encode()
+        entrez = mock.Mock()
+        entrez.read.side_effect = lambda h: h.parsed if hasattr(h, 'parsed') else real_entrez.read(h)
+        entrez.esearch.side_effect = [mock.Mock(parsed={'IdList': ['11', '12']}),
+                                      mock.Mock(parsed={'IdList': ['12']})]
+        entrez.efetch.side_effect = lambda **kw: io.BytesIO(xml)
+        with mock.patch.object(pubmed_sources, 'Entrez', entrez), \
+                mock.patch.object(pubmed_sources, 'entrez_call', side_effect=lambda f, **kw: f(**kw)):
+            self.assertEqual(pubmed_sources._dois_to_pmids(['10.1/eloc', '10.1/yok']), {'10.1/eloc': '11'})
+            self.assertEqual(pubmed_sources._doi_to_pmid('10.1/eski'), '12')
+        self.assertEqual(self.cache.get('pubmed:summary:11')['doi'], '10.1/ELOC')
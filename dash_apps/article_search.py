@@ -3,6 +3,8 @@ from dash import dcc, html, Input, Output, State, dash_table
 from django_plotly_dash import DjangoDash
 from Bio import Entrez
 
+from blog.ncbi_rate import entrez_call
+
 
 # --- ÇEVİRİ FONKSİYONU ---
 def translate_to_english(text_to_translate):
@@ -31,7 +33,7 @@ def search_and_fetch_pubmed(query, max_results=10, email="your_email@example.com
 
     try:
         # Arama yap ve ID listesini al
-        handle_search = Entrez.esearch(db="pubmed", term=query, retmax=max_results, sort="relevance")
+        handle_search = entrez_call(Entrez.esearch, db="pubmed", term=query, retmax=max_results, sort="relevance")
         record_search = Entrez.read(handle_search)
         handle_search.close()
         id_list = record_search.get("IdList", [])
@@ -40,7 +42,7 @@ def search_and_fetch_pubmed(query, max_results=10, email="your_email@example.com
             return []
 
         # Detayları çek
-        handle_fetch = Entrez.efetch(db="pubmed", id=id_list, rettype="medline", retmode="xml")
+        handle_fetch = entrez_call(Entrez.efetch, db="pubmed", id=id_list, rettype="medline", retmode="xml")
         records_fetch = Entrez.read(handle_fetch)
         handle_fetch.close()
 
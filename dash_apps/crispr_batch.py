@@ -0,0 +1,152 @@
+"""
+dash_apps.crispr_batch — Gen paneli için toplu CRISPR kılavuz tasarımı.
+
+crispr_designer tek tıkla tek dizi işler. Bu modül bir gen listesi (ve/veya
+multi-FASTA) için aynı tasarımı tek bir işte yapar:
+
+  1) Gen adlarının dizileri Ensembl'den eşzamanlı çekilir (ensembl_fetch,
+     ağ-bağımlı → thread havuzu; Ensembl REST'in 15 istek/sn sınırı için
+     FETCH_CONCURRENCY). Yanıtlar paylaşımlı dizi önbelleğinden gelir
+     (dash_apps.sequence_cache); aynı panel tekrar çalıştırılınca ağa gidilmez.
+  2) find_guides her gen için süreç havuzunda (spawn) çalışır — CPU-bağımlı
+     iş tüm çekirdeklere dağılır.
+  3) Sonuçlar bittikçe (sıra gözetmeden) üretilir; çağıran her geni hemen
+     TSV'ye yazar ve ilerlemeyi raporlar (bkz. bio_tools.tasks.crispr_batch_design).
+
+İşçi süreçleri yalnız saf crispr_engine çalıştırır.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed, wait)
+
+from dash_apps.crispr_engine import clean_sequence, find_guides, summarize
+from dash_apps.ensembl_fetch import fetch_gene_sequence
+
+logger = logging.getLogger(__name__)
+
+MAX_GENES = 200
+DEFAULT_TOP_N = 10
+FETCH_CONCURRENCY = 4
+
+TSV_COLUMNS = ['gene', 'source', 'length', 'rank', 'guide', 'pam', 'strand', 'start', 'end',
+               'gc', 'score', 'score_type', 'uniqueness', 'status']
+
+
+def parse_batch_input(genes=None, fasta=None):
+    """Gen adı listesi/metni ve multi-FASTA → [{'name', 'seq' (FASTA'dan) | None}].
+
+    Gen adları virgül, boşluk veya satırla ayrılabilir; tekrarlar atılır.
+    """
+    items, seen = [], set()
+    if isinstance(genes, str):
+        genes = genes.replace(',', ' ').split()
+    for g in genes or []:
+        name = str(g).strip()
+        if name and name.upper() not in seen:
+            seen.add(name.upper())
+            items.append({'name': name, 'seq': None})
+    name, chunks = None, []
+    for line in (fasta or '').splitlines() + ['>']:
+        line = line.strip()
+        if line.startswith('>'):
+            if name is not None:
+                items.append({'name': name, 'seq': clean_sequence(''.join(chunks))})
+            name = line[1:].split()[0] if line[1:].strip() else f'seq{len(items) + 1}'
+            chunks = []
+        elif name is not None:
+            chunks.append(line)
+    return items
+
+
+def fetch_sequences(items, species, concurrency=FETCH_CONCURRENCY, on_fetched=None):
+    """Dizisi olmayan kalemleri eşzamanlı çeker; her kaleme 'seq' veya 'error' yazar.
+
+    on_fetched(kaç_bitti, toplam) her çekimden sonra çağrılır.
+    """
+    todo = [it for it in items if it.get('seq') is None]
+    if not todo:
+        return items
+
+    def one(it):
+        try:
+            seq, meta, err = fetch_gene_sequence(it['name'], species)
+        except Exception as e:
+            seq, meta, err = None, None, str(e)
+        finally:
+            from django.db import connections
+            connections.close_all()  # DatabaseCache bağlantısı sızmasın
+        it['seq'], it['error'] = (seq, None) if seq else (None, err or 'no_seq')
+        it['meta'] = meta or {}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(todo)))) as pool:
+        futures = [pool.submit(one, it) for it in todo]
+        for done, fut in enumerate(as_completed(futures), start=1):
+            fut.result()
+            if on_fetched:
+                on_fetched(done, len(todo))
+    return items
+
+
+def design_gene(name, seq, enzyme='SpCas9', top_n=DEFAULT_TOP_N):
+    """Tek gen için tasarım (süreç havuzunda çalışır; modül düzeyinde olmalı)."""
+    guides, error = find_guides(seq, enzyme, max_results=10 ** 6)
+    if error:
+        return {'gene': name, 'guides': [], 'summary': None, 'error': error.get('code', 'error')}
+    return {'gene': name, 'guides': guides[:top_n], 'summary': summarize(guides), 'error': None}
+
+
+def design_many(items, enzyme='SpCas9', top_n=DEFAULT_TOP_N, workers=1, cancel_cb=None,
+                poll_interval=1.0):
+    """Dizisi olan kalemleri süreç havuzunda tasarlar; sonuçları BİTTİKÇE üretir.
+
+    Dizisi alınamayan kalemler hemen {'error': ...} sonucu olarak üretilir.
+    cancel_cb() True dönerse bekleyen genler iptal edilip döngü biter.
+    """
+    ready = []
+    for it in items:
+        if it.get('seq'):
+            ready.append(it)
+        else:
+            yield {'gene': it['name'], 'guides': [], 'summary': None,
+                   'error': it.get('error') or 'no_seq'}
+    if not ready:
+        return
+
+    workers = max(1, int(workers))
+    if workers > 1 and len(ready) > 1:
+        # Web/işçi süreci thread'li olduğundan fork yerine spawn
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(ready)),
+                                   mp_context=multiprocessing.get_context('spawn'))
+    else:
+        pool = ThreadPoolExecutor(max_workers=1)
+    with pool:
+        pending = {pool.submit(design_gene, it['name'], it['seq'], enzyme, top_n): it
+                   for it in ready}
+        while pending:
+            done, _rest = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            if cancel_cb and cancel_cb():
+                pool.shutdown(wait=True, cancel_futures=True)
+                return
+            for fut in done:
+                it = pending.pop(fut)
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    logger.error(f"CRISPR tasarımı başarısız ({it['name']}): {e}")
+                    res = {'gene': it['name'], 'guides': [], 'summary': None, 'error': str(e)}
+                res['length'] = len(it['seq'])
+                res['source'] = (it.get('meta') or {}).get('id') or 'fasta'
+                yield res
+
+
+def tsv_rows(result):
+    """Bir gen sonucunu TSV satırlarına (sekmeyle ayrılmış str listesi) çevirir."""
+    base = [result['gene'], result.get('source', ''), str(result.get('length', ''))]
+    if result.get('error') or not result['guides']:
+        status = result.get('error') or 'no_guides'
+        return ['\t'.join(base + [''] * 10 + [status])]
+    return ['\t'.join(base + [str(g[k]) for k in ('rank', 'guide', 'pam', 'strand', 'start',
+                                                  'end', 'gc', 'score', 'score_type',
+                                                  'uniqueness')] + ['ok'])
+            for g in result['guides']]
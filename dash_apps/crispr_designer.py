@@ -166,17 +166,19 @@ def create_crispr_layout(lang='en'):
                          L("Off-target taraması", "Off-target scan")]),
                 dbc.Button(
                     [html.I(className="fas fa-crosshairs me-2"),
-                     L("En iyi 3 guide için off-target tara",
-                       "Scan off-targets for top 3 guides")],
+                     L("En iyi guide'lar için off-target tara",
+                       "Scan off-targets for top guides")],
                     id='crispr-offtarget-btn', color="warning", outline=True,
                     className="w-100",
                 ),
                 html.Small(
-                    L("NCBI'nin genomik kayıtlarına BLAST hizalaması; guide başına ~30-90 sn "
-                      "sürebilir. MM0/MM1/MM2/MM3 = 0/1/2/3 uyumsuzlukla eşleşen genomik bölge "
+                    L("Tür için yerel genom indeksi kuruluysa tüm adaylar saniyeler içinde "
+                      "taranır; değilse NCBI'nin genomik kayıtlarına BLAST hizalaması yapılır "
+                      "(guide başına ~30-90 sn). MM0/MM1/MM2/MM3 = 0/1/2/3 uyumsuzlukla eşleşen genomik bölge "
                       "sayısı. MM0 hedefin kendisini de içerir (beklenen ≥1). Tarama sürerken "
                       "üstteki tablo ve grafik yerinde kalır.",
-                      "BLAST alignment to NCBI genomic records; may take ~30-90 s per guide. "
+                      "With a local genome index for the species all candidates are scanned in "
+                      "seconds; otherwise BLAST against NCBI genomic records (~30-90 s per guide). "
                       "MM0/MM1/MM2/MM3 = number of genomic sites matching with 0/1/2/3 mismatches. "
                       "MM0 includes the intended target itself (≥1 expected). The table and chart "
                       "above stay in place while scanning."),
@@ -283,17 +285,26 @@ def run_offtarget(n_clicks, store_data, lang):
     if not n_clicks or not store_data:
         return no_update
 
-    from dash_apps.offtarget import blast_offtarget, risk_label
+    from dash_apps.offtarget import blast_offtarget, local_index_path, risk_label, scan_offtargets
     species = store_data.get('species', 'homo_sapiens')
+    enzyme = store_data.get('enzyme') or 'SpCas9'
     organism = BLAST_ORGANISM.get(species, 'Homo sapiens')
-    guides = (store_data.get('guides') or [])[:3]
+    guides = store_data.get('guides') or []
     if not guides:
         return dbc.Alert(L("Taranacak guide yok.", "No guides to scan."), color="info")
 
+    # Yerel indeks varsa saklanan tüm adaylar tek partide; yoksa ilk 3 guide uzak BLAST'la.
+    # Web callback'inde süreç havuzu yok: ≤200 guide tek süreçte havuz kurulumundan
+    # hızlıdır ve uWSGI altında spawn güvenilir değildir (havuz toplu iş/komut için).
+    if local_index_path(species, enzyme):
+        results = scan_offtargets([g['guide'] for g in guides], species, enzyme, workers=1)
+    else:
+        guides = guides[:3]
+        results = [blast_offtarget(g['guide'], organism=organism) for g in guides]
+
     rows = []
     any_ok = False
-    for g in guides:
-        res = blast_offtarget(g['guide'], organism=organism)
+    for g, res in zip(guides, results):
         if res.get('ok'):
             any_ok = True
             mm = res['mm']
@@ -494,7 +505,7 @@ def ai_comment(n_clicks, store_data, lang, **kwargs):
     try:
         from ai_engine.services import generate_with_fallback as generate_with_pool
         comment, _key = generate_with_pool(
-            prompt, service_name='Google Gemini', model_name='gemini-3.5-flash')
+            prompt, service_name='Google Gemini', model_name='gemini-3.5-flash', cache=True)
         return dcc.Markdown(comment)
     except Exception as e:
         return dbc.Alert(f"{t('crispr_ai_error', lang)}: {e}", color="danger")
@@ -6,8 +6,10 @@ test edilebilir. Görevleri:
   - DNA dizisini temizleme
   - Seçilen Cas enzimine göre PAM bulma (her iki iplikte)
   - Aday sgRNA (kılavuz RNA) dizilerini çıkarma
-  - Her adaya verim/uygunluk skoru hesaplama (GC + homopolimer + uç bölge)
-  - Basit benzersizlik (off-target göstergesi) hesaplama
+  - Her adaya verim/uygunluk skoru hesaplama (GC + homopolimer + uç bölge);
+    score_guides / doench_rs1_scores tüm adayları tek partide, vektörel skorlar
+  - Basit benzersizlik (off-target göstergesi) hesaplama: istek başına her iki
+    ipliğin tüm seed k-mer'lerinden BİR KEZ kurulan SeedIndex ile
 
 ÖNEMLİ: Buradaki skorlama EĞİTİM ve ÖN-TASARIM amaçlı sezgisel bir
 modeldir (Doench/Rule Set 2 gibi eğitilmiş bir model değildir). Gerçek
@@ -15,6 +17,8 @@ deney öncesi genom çapında off-target analizi (CRISPOR, Benchling) şarttır.
 """
 import re
 
+import numpy as np
+
 # ---------------------------------------------------------------------------
 # Cas enzimi tanımları
 # ---------------------------------------------------------------------------
@@ -54,6 +58,14 @@ _IUPAC = {
 
 _COMPLEMENT = str.maketrans("ACGTacgt", "TGCAtgca")
 
+# Seed (PAM'e yakın bölge) uzunluğu — benzersizlik bu k-mer üzerinden sayılır
+SEED_LEN = 12
+
+# Baz → 2-bit kod (A=0, C=1, G=2, T=3); diğer her karakter 4 (geçersiz)
+_BASE_CODE = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate("ACGT"):
+    _BASE_CODE[ord(_b)] = _BASE_CODE[ord(_b.lower())] = _i
+
 
 def clean_sequence(sequence):
     """Diziden ATGC dışındaki karakterleri (FASTA başlığı, boşluk, sayı) temizler."""
@@ -74,6 +86,84 @@ def pam_to_regex(pam):
     return "".join(_IUPAC.get(base, base) for base in pam.upper())
 
 
+def _encode(seq):
+    """DNA dizisini 2-bit kod dizisine (uint8, geçersiz baz = 4) çevirir."""
+    return _BASE_CODE[np.frombuffer(seq.encode("ascii", "replace"), dtype=np.uint8)]
+
+
+def _iupac_allowed(base):
+    """IUPAC kodunun kabul ettiği bazlar için 5 elemanlı maske (son eleman: geçersiz)."""
+    allowed = np.zeros(5, dtype=bool)
+    for b in _IUPAC.get(base, base).strip("[]"):
+        allowed[_BASE_CODE[ord(b)]] = True
+    allowed[4] = False
+    return allowed
+
+
+def find_pam_sites(codes, pam):
+    """PAM motifinin başladığı TÜM konumlar (örtüşenler dahil), vektörel tek geçiş.
+
+    codes: _encode() çıktısı. Her PAM pozisyonu için izin verilen bazlar
+    maskesi tüm diziye bir kerede uygulanır; Python düzeyinde konum döngüsü yok.
+    """
+    p = len(pam)
+    n = len(codes) - p + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    hit = np.ones(n, dtype=bool)
+    for k, base in enumerate(pam.upper()):
+        hit &= _iupac_allowed(base)[codes[k:k + n]]
+    return np.flatnonzero(hit)
+
+
+def _kmer_values(codes, k):
+    """Her pencere için 2k-bitlik k-mer değeri; geçersiz baz içeren pencereler atılır."""
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint64)
+    vals = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        vals = (vals << np.uint64(2)) | (codes[j:j + n] & 3).astype(np.uint64)
+    bad = np.concatenate(([0], np.cumsum(codes == 4)))
+    return vals[(bad[k:k + n] - bad[:n]) == 0]
+
+
+class SeedIndex:
+    """Bir dizinin İKİ ipliğindeki tüm k-mer'lerin sayım tablosu.
+
+    find_guides istek başına bir kez kurar; her aday kılavuzun seed'i
+    (PAM'e yakın k nt) tabloda ikili aramayla sayılır. Sayım örtüşen
+    eşleşmeleri de içerir (her olası bağlanma konumu ayrı sayılır).
+    """
+
+    def __init__(self, seq, k=SEED_LEN):
+        if not 1 <= k <= 32:
+            raise ValueError("k 1-32 arasında olmalı")
+        self.k = k
+        fwd = _encode(seq)
+        rev = _encode(reverse_complement(seq))
+        self.keys, self.counts = np.unique(
+            np.concatenate([_kmer_values(fwd, k), _kmer_values(rev, k)]), return_counts=True)
+
+    def count_many(self, kmers):
+        """k uzunluğundaki dizilerin her iki iplikteki geçiş sayıları (liste)."""
+        if not kmers:
+            return []
+        if len(self.keys) == 0:  # dizi k'dan kısa ya da tamamen N
+            return [0] * len(kmers)
+        codes = _encode("".join(kmers)).reshape(len(kmers), self.k)
+        vals = np.zeros(len(kmers), dtype=np.uint64)
+        for j in range(self.k):
+            vals = (vals << np.uint64(2)) | (codes[:, j] & 3).astype(np.uint64)
+        pos = np.searchsorted(self.keys, vals)
+        pos_c = np.minimum(pos, len(self.keys) - 1)
+        found = (self.keys[pos_c] == vals) & (codes != 4).all(axis=1)
+        return np.where(found, self.counts[pos_c], 0).tolist()
+
+    def count(self, kmer):
+        return self.count_many([kmer])[0]
+
+
 def gc_content(seq):
     """GC yüzdesi (0-100)."""
     if not seq:
@@ -156,17 +246,107 @@ def score_guide(guide, pam_side="3prime"):
     return max(0.0, min(100.0, round(score, 1))), reasons
 
 
-def _uniqueness(guide, full_seq, pam_side="3prime"):
+def _windows_all(mask, k):
+    """Her satırda k uzunluğunda tamamı True olan bir pencere var mı (k ≥ 1)."""
+    n = mask.shape[1] - k + 1
+    if n <= 0:
+        return np.zeros(mask.shape[0], dtype=bool)
+    hit = mask[:, :n].copy()
+    for j in range(1, k):
+        hit &= mask[:, j:j + n]
+    return hit.any(axis=1)
+
+
+def _gc_table(n):
+    """GC sayısı → gc_content() ile birebir aynı yuvarlanmış yüzde."""
+    return np.array([round(100.0 * k / n, 1) for k in range(n + 1)]) if n else np.zeros(1)
+
+
+def _score_guides_same_length(guides, pam_side):
+    n = len(guides[0])
+    m = np.frombuffer("".join(guides).encode("ascii"), dtype=np.uint8).reshape(len(guides), n)
+    is_gc = (m == ord("G")) | (m == ord("C"))
+    gc = _gc_table(n)[is_gc.sum(axis=1)]
+    seed_cols = is_gc[:, -10:] if pam_side == "3prime" else is_gc[:, :10]
+    seed_gc = _gc_table(seed_cols.shape[1])[seed_cols.sum(axis=1)]
+    poly_t = _windows_all(m == ord("T"), 4)
+    same = m[:, 1:] == m[:, :-1]
+    homo5 = _windows_all(same, 4)
+    homo4 = ~homo5 & _windows_all(same, 3)
+    srt = np.sort(m, axis=1)
+    low_complexity = (1 + (srt[:, 1:] != srt[:, :-1]).sum(axis=1)) <= 2
+
+    gc_ideal = (gc >= 40) & (gc <= 60)
+    gc_border = ((gc >= 30) & (gc < 40)) | ((gc > 60) & (gc <= 70))
+    seed_low, seed_high = seed_gc < 20, seed_gc > 80
+    penalty = (np.where(gc_ideal, 0, np.where(gc_border, 12, 28)) + 25 * poly_t
+               + 15 * homo5 + 8 * homo4 + np.where(seed_low, 10, np.where(seed_high, 6, 0))
+               + 20 * low_complexity)
+    scores = np.clip(100.0 - penalty, 0.0, 100.0).tolist()
+
+    # Gerekçe listeleri bayrak kombinasyonu başına bir kez kurulur (az sayıda kombinasyon)
+    flags = np.stack([gc_ideal, gc_border, poly_t, homo5, homo4, seed_low, seed_high,
+                      low_complexity], axis=1)
+    keys = flags.astype(np.uint16) @ (1 << np.arange(flags.shape[1], dtype=np.uint16))
+    uniq, first = np.unique(keys, return_index=True)
+    templates = {}
+    for key, (ideal, border, pt, h5, h4, sl, sh, lc) in zip(uniq.tolist(), flags[first].tolist()):
+        reasons = ["gc_ideal" if ideal else "gc_borderline" if border else "gc_extreme"]
+        if pt:
+            reasons.append("poly_t")
+        if h5:
+            reasons.append("homopolymer5")
+        elif h4:
+            reasons.append("homopolymer4")
+        reasons.append("seed_low_gc" if sl else "seed_high_gc" if sh else "seed_ok")
+        if lc:
+            reasons.append("low_complexity")
+        templates[key] = reasons
+    return [(score, list(templates[key])) for score, key in zip(scores, keys.tolist())]
+
+
+def score_guides(guides, pam_side="3prime"):
+    """score_guide'ın toplu (vektörel) sürümü; sonuçlar birebir aynıdır.
+
+    Aynı uzunluktaki kılavuzlar tek bir bayt matrisinde işlenir: GC, poli-T,
+    homopolimer, seed GC ve çeşitlilik özellikleri dizi işlemleriyle hesaplanır.
+    Dönüş: [(score, reasons), ...] (girdi sırasıyla)
+    """
+    upper = [(g or "").upper() for g in guides]
+    lengths = {len(g) for g in upper}
+    if len(lengths) == 1 and upper[0] and "".join(upper).isascii():
+        return _score_guides_same_length(upper, pam_side)  # tipik durum: tek enzim, tek uzunluk
+
+    results = [None] * len(upper)
+    groups = {}
+    for i, g in enumerate(upper):
+        if not g or not g.isascii():
+            results[i] = score_guide(g, pam_side)
+        else:
+            groups.setdefault(len(g), []).append(i)
+    for idx in groups.values():
+        for i, res in zip(idx, _score_guides_same_length([upper[i] for i in idx], pam_side)):
+            results[i] = res
+    return results
+
+
+def _seed(guide, pam_side="3prime"):
+    """Kılavuzun PAM'e yakın SEED_LEN nt'lik seed bölgesi."""
+    seed = guide[-SEED_LEN:] if pam_side == "3prime" else guide[:SEED_LEN]
+    return seed if len(seed) == SEED_LEN else guide
+
+
+def _uniqueness(guide, full_seq, pam_side="3prime", index=None):
     """
     Basit off-target göstergesi: kılavuzun seed bölgesinin (PAM'e yakın 12 nt)
     verilen dizide (her iki iplik) kaç kez geçtiğini sayar. 1 = benzersiz (iyi).
     NOT: gerçek off-target genom çapında aranır; bu sadece girdiyle sınırlıdır.
+    Çok sayıda kılavuz için index (SeedIndex) bir kez kurulup verilmelidir.
     """
-    seed = guide[-12:] if pam_side == "3prime" else guide[:12]
-    if len(seed) < 12:
-        seed = guide
-    both = full_seq + "N" + reverse_complement(full_seq)
-    return both.count(seed)
+    seed = _seed(guide, pam_side)
+    if index is None or index.k != len(seed):
+        index = SeedIndex(full_seq, k=len(seed))
+    return index.count(seed)
 
 
 # ---------------------------------------------------------------------------
@@ -222,6 +402,56 @@ def doench_rs1_score(thirty_mer):
     return 1.0 / (1.0 + math.exp(-score))
 
 
+def _rs1_weight_vector():
+    """_RS1_PARAMS → one-hot özellik uzayında ağırlık vektörü.
+
+    Özellikler: 30 konum × 4 baz (tekli) + 29 konum × 16 baz çifti (ikili).
+    """
+    w = np.zeros(30 * 4 + 29 * 16)
+    for pos, model_seq, weight in _RS1_PARAMS:
+        codes = [int(_BASE_CODE[ord(b)]) for b in model_seq]
+        if len(codes) == 1:
+            w[pos * 4 + codes[0]] += weight
+        else:
+            w[120 + pos * 16 + codes[0] * 4 + codes[1]] += weight
+    return w
+
+
+_RS1_WEIGHTS = _rs1_weight_vector()
+_RS1_CHUNK = 8192  # one-hot matris parçası (satır); bellek ~ 8192 × 584 × 8 B
+
+
+def doench_rs1_scores(thirty_mers):
+    """doench_rs1_score'un toplu sürümü: [0-1 | None] (girdi sırasıyla).
+
+    Geçerli 30-mer'ler one-hot matrise (tekli + ikili nükleotid özellikleri)
+    kodlanır ve model tek bir matris-vektör çarpımıyla hesaplanır.
+    """
+    seqs = [(s or "").upper() for s in thirty_mers]
+    out = [None] * len(seqs)
+    valid = [i for i, s in enumerate(seqs) if len(s) == 30 and s.isascii()]
+    if not valid:
+        return out
+    codes = _encode("".join(seqs[i] for i in valid)).reshape(len(valid), 30)
+    ok = (codes != 4).all(axis=1)
+    valid = np.asarray(valid)[ok]
+    codes = codes[ok].astype(np.intp)
+    mono_cols = np.arange(30) * 4 + codes
+    di_cols = 120 + np.arange(29) * 16 + codes[:, :-1] * 4 + codes[:, 1:]
+    gc = ((codes[:, 4:24] == 1) | (codes[:, 4:24] == 2)).sum(axis=1)
+    score = _RS1_INTERCEPT + np.abs(10 - gc) * np.where(gc <= 10, _RS1_GC_LOW, _RS1_GC_HIGH)
+    for lo in range(0, len(codes), _RS1_CHUNK):
+        hi = min(lo + _RS1_CHUNK, len(codes))
+        onehot = np.zeros((hi - lo, _RS1_WEIGHTS.size))
+        rows = np.arange(hi - lo)[:, None]
+        onehot[rows, mono_cols[lo:hi]] = 1.0
+        onehot[rows, di_cols[lo:hi]] = 1.0
+        score[lo:hi] += onehot @ _RS1_WEIGHTS
+    for i, p in zip(valid.tolist(), (1.0 / (1.0 + np.exp(-score))).tolist()):
+        out[i] = p
+    return out
+
+
 def find_guides(sequence, enzyme="SpCas9", max_results=200):
     """
     Verilen dizide seçilen enzime göre aday sgRNA'ları bulur (her iki iplik).
@@ -240,7 +470,6 @@ def find_guides(sequence, enzyme="SpCas9", max_results=200):
     glen = enz["guide_len"]
     plen = len(enz["pam"])
     side = enz["pam_side"]
-    pam_re = re.compile(pam_to_regex(enz["pam"]))
 
     min_len = glen + plen
     if len(seq) < min_len:
@@ -251,8 +480,8 @@ def find_guides(sequence, enzyme="SpCas9", max_results=200):
 
     def scan(strand_seq, strand):
         # strand_seq üzerinde PAM ara; konumları ileri iplik koordinatına çevir.
-        for m in _iter_overlapping(pam_re, strand_seq):
-            i = m.start()  # PAM başlangıcı (strand_seq üzerinde)
+        for i in find_pam_sites(_encode(strand_seq), enz["pam"]).tolist():
+            # i: PAM başlangıcı (strand_seq üzerinde)
             if side == "3prime":
                 gstart = i - glen
                 gend = i  # PAM kılavuzun hemen sağında
@@ -283,20 +512,15 @@ def find_guides(sequence, enzyme="SpCas9", max_results=200):
                 disp_start = L - span[1] + 1
                 disp_end = L - span[0]
 
-            sc, reasons = score_guide(guide, side)
-            uniq = _uniqueness(guide, seq, side)
-
             # Doench 2014 (RS1) yalnızca standart SpCas9 (NGG, 20nt kılavuz, 3nt PAM)
             # için ve yeterli yan-dizi bağlamı (30-mer) olduğunda geçerlidir.
-            score_type = "heuristic"
+            ctx = None
             if enzyme == "SpCas9" and side == "3prime":
                 ctx_start = i - glen - 4   # kılavuzun 4 nt yukarısı
                 ctx_end = i + plen + 3     # PAM'in 3 nt aşağısı
                 if ctx_start >= 0 and ctx_end <= len(strand_seq):
-                    rs1 = doench_rs1_score(strand_seq[ctx_start:ctx_end])
-                    if rs1 is not None:
-                        sc = round(rs1 * 100, 1)
-                        score_type = "doench"
+                    ctx = strand_seq[ctx_start:ctx_end]
+            contexts.append(ctx)
 
             results.append({
                 "guide": guide,
@@ -305,18 +529,34 @@ def find_guides(sequence, enzyme="SpCas9", max_results=200):
                 "start": disp_start,
                 "end": disp_end,
                 "gc": gc_content(guide),
-                "score": sc,
-                "score_type": score_type,
-                "uniqueness": uniq,
-                "reasons": reasons,
+                "score": 0.0,
+                "score_type": "heuristic",
+                "uniqueness": 0,
+                "reasons": [],
             })
 
+    contexts = []
     scan(seq, "+")
     scan(reverse_complement(seq), "-")
 
     if not results:
         return [], None
 
+    # Skorlar tüm adaylar için toplu: sezgisel model + (bağlam varsa) RS1
+    with_ctx = [k for k, ctx in enumerate(contexts) if ctx is not None]
+    rs1 = dict(zip(with_ctx, doench_rs1_scores([contexts[k] for k in with_ctx])))
+    for k, (g, (sc, reasons)) in enumerate(zip(results, score_guides([g["guide"] for g in results], side))):
+        g["score"], g["reasons"] = sc, reasons
+        if rs1.get(k) is not None:
+            g["score"] = round(rs1[k] * 100, 1)
+            g["score_type"] = "doench"
+
+    # Seed eşleşme sayıları: iki ipliğin k-mer indeksi bir kez kurulur, tüm
+    # adaylar tek partide sorgulanır
+    index = SeedIndex(seq, k=min(SEED_LEN, glen))
+    for g, n in zip(results, index.count_many([_seed(g["guide"], side) for g in results])):
+        g["uniqueness"] = n
+
     # Önce skor tipine göre (gerçek RS1 modeli, sezgisel/uç bölgenin üstünde),
     # sonra skora göre (yüksek→düşük), eşitlikte benzersizliğe göre sırala.
     # Tek-tip (örn. SpCas9 dışı tüm sezgisel) listelerde tip etkisizdir.
@@ -330,18 +570,6 @@ def find_guides(sequence, enzyme="SpCas9", max_results=200):
     return results[:max_results], None
 
 
-def _iter_overlapping(compiled_re, text):
-    """Örtüşen eşleşmeleri de bulur (PAM'ler örtüşebilir)."""
-    pos = 0
-    while pos <= len(text):
-        m = compiled_re.match(text, pos)
-        if m:
-            yield m
-            pos += 1
-        else:
-            pos += 1
-
-
 def summarize(guides):
     """Aday listesi için özet metrikler döndürür."""
     if not guides:
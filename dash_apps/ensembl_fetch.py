@@ -5,8 +5,13 @@ Kullanıcı bir gen adı (ör. TP53) yazınca, Ensembl'in halka açık REST
 servisinden (rest.ensembl.org) o genin Ensembl kimliğini ve GENOMİK dizisini
 çeker. Böylece kullanıcı diziyi elle yapıştırmak zorunda kalmaz.
 
+Aynı modülde ENA (EMBL-EBI) accession → nükleotid dizisi çekimi de vardır
+(fetch_ena_sequence; primer ve plazmid araçları kullanır).
+
 Notlar / dürüstlük:
   - Yalnız stdlib (urllib) kullanır; yeni bağımlılık yok.
+  - Başarılı sonuçlar paylaşımlı disk önbelleğinde tutulur (dash_apps.sequence_cache):
+    popüler genler her tıkta yeniden indirilmez.
   - Genomik dizi intronları da içerir; çok uzun genlerde GENOMIC_MAX ile kırpılır.
   - Ağ erişimi yoksa / gen bulunamazsa nazikçe hata kodu döner, çökmemez.
   - Bu adım yalnız 'diziyi getirir'; off-target taraması AYRI bir iştir
@@ -14,6 +19,7 @@ Notlar / dürüstlük:
 """
 import json
 import logging
+import re
 import urllib.error
 import urllib.parse
 import urllib.request
@@ -21,7 +27,11 @@ import urllib.request
 logger = logging.getLogger(__name__)
 
 ENSEMBL_REST = "https://rest.ensembl.org"
-GENOMIC_MAX = 25000          # aşırı uzun dizileri kırp (tarayıcı + hesap yükü)
+ENA_FASTA = "https://www.ebi.ac.uk/ena/browser/api/fasta"
+# Aşırı uzun dizileri kırp (tarayıcı + hesap yükü). find_guides PAM taramasını
+# vektörel, seed sayımını tek k-mer indeksiyle yaptığı için gen lokusu boyutları
+# (yüzlerce kb) rahatça işlenir.
+GENOMIC_MAX = 250000
 _TIMEOUT = 20
 
 # Arayüzde sunulan türler: (ensembl_species, blast_organism, etiket_tr, etiket_en)
@@ -49,7 +59,7 @@ def _get_json(path):
         return json.loads(resp.read().decode("utf-8"))
 
 
-def fetch_gene_sequence(symbol, species="homo_sapiens", max_len=GENOMIC_MAX):
+def fetch_gene_sequence(symbol, species="homo_sapiens", max_len=GENOMIC_MAX, use_cache=True):
     """Gen adı -> (seq, meta, error).
 
     Başarılıysa: (dizi_str, meta_dict, None)
@@ -60,7 +70,14 @@ def fetch_gene_sequence(symbol, species="homo_sapiens", max_len=GENOMIC_MAX):
     if not symbol:
         return None, None, "empty"
     species = (species or "homo_sapiens").strip()
+    if not use_cache:
+        return _fetch_gene_sequence_remote(symbol, species, max_len)
+    from dash_apps.sequence_cache import get_or_fetch
+    return get_or_fetch("ensembl", species, symbol, max_len,
+                        lambda: _fetch_gene_sequence_remote(symbol, species, max_len))
+
 
+def _fetch_gene_sequence_remote(symbol, species, max_len):
     try:
         # 1) Gen adı -> Ensembl gen kimliği + koordinatlar
         look = _get_json(
@@ -108,3 +125,47 @@ def fetch_gene_sequence(symbol, species="homo_sapiens", max_len=GENOMIC_MAX):
     except Exception as e:
         logger.warning(f"Ensembl fetch error: {e}")
         return None, None, "error"
+
+
+def fetch_ena_sequence(accession, max_len=None, use_cache=True):
+    """ENA accession (örn. NM_000546, L09137) -> (seq, meta, error).
+
+    Hata kodları: 'empty' | 'no_seq' | 'not_found' | 'http_<kod>' | 'network' | 'error'
+    """
+    acc = (accession or "").strip()
+    if not acc:
+        return None, None, "empty"
+    if not use_cache:
+        return _fetch_ena_remote(acc, max_len)
+    from dash_apps.sequence_cache import get_or_fetch
+    return get_or_fetch("ena", "", acc, max_len, lambda: _fetch_ena_remote(acc, max_len))
+
+
+def _fetch_ena_remote(acc, max_len):
+    url = f"{ENA_FASTA}/{urllib.parse.quote(acc)}"
+    try:
+        req = urllib.request.Request(url, headers={"User-Agent": "AIBlog-PrimerTool"})
+        with urllib.request.urlopen(req, timeout=_TIMEOUT) as r:
+            data = r.read().decode("utf-8", errors="ignore")
+    except urllib.error.HTTPError as e:
+        if e.code in (400, 404):
+            return None, None, "not_found"
+        logger.warning(f"ENA HTTP {e.code} for {acc}")
+        return None, None, f"http_{e.code}"
+    except urllib.error.URLError as e:
+        logger.warning(f"ENA network error: {e}")
+        return None, None, "network"
+    except Exception as e:
+        logger.warning(f"ENA fetch error: {e}")
+        return None, None, "error"
+
+    header = next((ln[1:].strip() for ln in data.splitlines() if ln.startswith(">")), "")
+    seq = re.sub(r"[^ATGCatgc]", "", "".join(
+        ln for ln in data.splitlines() if not ln.strip().startswith(">"))).upper()
+    if not seq:
+        return None, None, "no_seq"
+    truncated = bool(max_len and len(seq) > max_len)
+    if truncated:
+        seq = seq[:max_len]
+    return seq, {"id": acc, "description": header, "length": len(seq),
+                 "truncated": truncated}, None
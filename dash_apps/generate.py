@@ -733,7 +733,7 @@ def resolve_category(ai_category_name, title="", abstract=""):
                 try:
                     result, _key = generate_with_pool(
                         prompt, service_name=svc, model_name=mdl,
-                        max_tokens=256, temperature=0.2)
+                        max_tokens=256, temperature=0.2, cache=True)
                     if result:
                         break
                 except Exception:
@@ -807,16 +807,13 @@ def handle_form_submission(n_clicks, request_text, user_data, selected_value, ar
     except User.DoesNotExist:
         return dbc.Alert(t('gen_invalid_user', lang), color="danger"), no_update
 
-    # Uretimi ARKA PLANDA calistir — uzun AI cagrisi sunucuyu/istegi BLOKLAMAZ.
-    # Boylece uretim surerken baska kullanicilar ve sayfalar normal calisir.
-    import threading
-    from ai_engine.tasks import generate_article_task
-    threading.Thread(
-        target=generate_article_task,
-        args=(user.id, request_text, interpreted_topic, article_length or 1500,
-              selected_service, selected_model, lang),
-        daemon=True,
-    ).start()
+    # Uretimi kalici is kuyruguna ekle — uzun AI cagrisi sunucuyu/istegi BLOKLAMAZ,
+    # ayri isci sureci (manage.py run_worker) calistirir; yeniden baslatmada kaybolmaz.
+    from bio_tools.job_queue import enqueue
+    enqueue('article_generation',
+            user_id=user.id, request_text=request_text, interpreted_topic=interpreted_topic,
+            word_count=article_length or 1500, selected_service=selected_service,
+            selected_model=selected_model, lang=lang)
 
     return dbc.Alert(
         ("Makaleniz arka planda hazirlaniyor. Birkac dakika surebilir; tamamlaninca "
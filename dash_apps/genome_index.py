@@ -0,0 +1,358 @@
+"""
+dash_apps.genome_index — Yerel, uyumsuzluğa toleranslı off-target arama motoru.
+
+offtarget.blast_offtarget her guide'ı NCBI'nin uzak BLAST kuyruğuna
+gönderiyordu (guide başına dakikalar). Bu modül operatörün verdiği genom
+FASTA'sından BİR KEZ disk üzerinde bir indeks kurar ve sorguları yerelde,
+milisaniyeler mertebesinde yanıtlar:
+
+  - genome.2bit      : genom, baz başına 2 bit (4 baz/bayt) paketli; N'ler
+                       ayrıca nruns.i64'te. Hit dizilerini göstermek için okunur.
+  - sites.code.u64   : enzimin PAM'ine komşu HER protospacer (iki iplik),
+                       2-bit paketli tek bir tamsayı olarak (guide_len ≤ 32).
+  - sites.pos.i64    : protospacer'ın ileri iplikteki global başlangıcı << 1 | iplik.
+  - seed<i>.*        : protospacer max_mismatches+1 ayrık parçaya (seed) bölünür;
+                       her parça için siteler parça değerine göre sıralanır
+                       (order.u32) ve kova sınırları tutulur (bounds.i64).
+
+Arama (seed-and-extend): ≤ m uyumsuzluklu her hit, güvercin yuvası ilkesiyle
+m+1 parçadan en az birinde TAM eşleşir. Guide'ın her parçasının kovası
+aday sitelerini verir (seed); adayların tam uyumsuzluk sayısı 2-bit kodların
+XOR'u + popcount ile vektörel hesaplanır (extend). Tüm dosyalar np.memmap
+ile açılır; aynı indeksi kullanan süreçler işletim sisteminin sayfa
+önbelleğini paylaşır.
+
+Boyut: insan genomu + SpCas9 (NGG) için ~390M site, ~40 bayt/site (~15 GB).
+İndeks `manage.py build_genome_index` ile kurulur.
+
+Notlar:
+  - Uyumsuzluk guide boyunca sayılır; PAM'in enzim motifine uyması şarttır
+    (PAM'siz bölgeler Cas tarafından kesilmez). Boşluklu (bulge) hizalama yoktur.
+  - MM0 hedefin KENDİSİNİ de içerir (genomdaysa).
+"""
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from dash_apps.crispr_engine import ENZYMES, _BASE_CODE, find_pam_sites, reverse_complement
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+DEFAULT_MAX_MISMATCHES = 4
+# Seed parçası başına sınır tablosu 4^uzunluk+1 girdi (12 nt ≈ 128 MB); daha uzunu kurulamaz
+MAX_SEED_LEN = 12
+_META = "meta.json"
+
+# Her baytın 2-bit çiftlerindeki uyumsuzluk bitleri için maske (0b01 tekrarları)
+_LOW_BITS = np.uint64(0x5555555555555555)
+
+
+def _popcount(x):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    return table[x.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+
+def mismatch_counts(codes, query):
+    """2-bit paketli diziler (codes) ile sorgu kodu arasındaki baz uyumsuzluğu sayıları."""
+    x = np.bitwise_xor(codes, np.uint64(query))
+    x = (x | (x >> np.uint64(1))) & _LOW_BITS
+    return _popcount(x)
+
+
+def seed_parts(guide_len, max_mismatches):
+    """guide_len'i max_mismatches+1 ardışık, neredeyse eşit parçaya böler: [(başlangıç, bitiş)].
+
+    En uzun parça MAX_SEED_LEN'i aşıyorsa (max_mismatches çok küçük) ValueError.
+    """
+    n = max_mismatches + 1
+    if not 0 <= max_mismatches < guide_len:
+        raise ValueError("max_mismatches 0 ile guide_len-1 arasında olmalı")
+    if -(-guide_len // n) > MAX_SEED_LEN:
+        raise ValueError(f"{guide_len} nt guide için max_mismatches en az "
+                         f"{-(-guide_len // MAX_SEED_LEN) - 1} olmalı "
+                         f"(seed parçası ≤ {MAX_SEED_LEN} nt)")
+    base, extra = divmod(guide_len, n)
+    parts, start = [], 0
+    for i in range(n):
+        end = start + base + (1 if i < extra else 0)
+        parts.append((start, end))
+        start = end
+    return parts
+
+
+def _pack_codes(codes):
+    """uint8 kod dizisi (0-3) → uint64 2-bit paket (ilk baz en anlamlı bitlerde)."""
+    codes = np.asarray(codes)
+    value = np.zeros(codes.shape[:-1], dtype=np.uint64)
+    for j in range(codes.shape[-1]):
+        value = (value << np.uint64(2)) | (codes[..., j] & 3).astype(np.uint64)
+    return value
+
+
+def encode_guide(guide):
+    """Guide dizisi → (2-bit kod, geçerli mi). A/C/G/T dışı baz varsa geçersiz."""
+    codes = _BASE_CODE[np.frombuffer(guide.upper().encode("ascii", "replace"), dtype=np.uint8)]
+    return int(_pack_codes(codes)), bool((codes != 4).all())
+
+
+def _part_value(code, guide_len, part):
+    start, end = part
+    shift = np.uint64(2 * (guide_len - end))
+    mask = np.uint64((1 << (2 * (end - start))) - 1)
+    return (np.asarray(code, dtype=np.uint64) >> shift) & mask
+
+
+def iter_fasta(path):
+    """(kayıt_adı, bytes dizi) üretir; .gz dosyaları da okunur."""
+    import gzip
+    opener = gzip.open if str(path).endswith(".gz") else open
+    name, chunks = None, []
+    with opener(path, "rb") as fh:
+        for line in fh:
+            if line.startswith(b">"):
+                if name is not None:
+                    yield name, b"".join(chunks)
+                name = line[1:].split()[0].decode("utf-8", "replace") if line[1:].strip() else "seq"
+                chunks = []
+            else:
+                chunks.append(line.strip())
+    if name is not None:
+        yield name, b"".join(chunks)
+
+
+def _contig_sites(codes, pam, pam_side, glen):
+    """Bir kontigin iki ipliğindeki protospacer'lar → (code u64, ileri-iplik başlangıcı, iplik)."""
+    n = len(codes)
+    plen = len(pam)
+    out = []
+    for strand, strand_codes in ((0, codes), (1, np.where(codes == 4, 4, 3 - codes)[::-1])):
+        sites = find_pam_sites(strand_codes, pam)
+        starts = sites - glen if pam_side == "3prime" else sites + plen
+        starts = starts[(starts >= 0) & (starts + glen <= n)]
+        if not len(starts):
+            continue
+        window = strand_codes[starts[:, None] + np.arange(glen)]
+        ok = (window != 4).all(axis=1)
+        starts, window = starts[ok], window[ok]
+        fwd = starts if strand == 0 else n - starts - glen
+        out.append((_pack_codes(window), fwd.astype(np.int64), strand))
+    return out
+
+
+def build_index(fasta_path, out_dir, enzyme="SpCas9", max_mismatches=DEFAULT_MAX_MISMATCHES,
+                progress=None):
+    """FASTA'dan off-target indeksi kurar; meta sözlüğünü döner.
+
+    progress(kontig_adı, uzunluk, site_sayısı) her kontigden sonra çağrılır.
+    """
+    enz = ENZYMES.get(enzyme)
+    if enz is None:
+        raise ValueError(f"Bilinmeyen enzim: {enzyme}")
+    glen = enz["guide_len"]
+    if glen > 32:
+        raise ValueError("guide_len > 32 desteklenmiyor")
+    parts = seed_parts(glen, max_mismatches)
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.monotonic()
+
+    contigs, offset, total_sites = [], 0, 0
+    with open(os.path.join(out_dir, "genome.2bit"), "wb") as g2, \
+            open(os.path.join(out_dir, "nruns.i64"), "wb") as nr, \
+            open(os.path.join(out_dir, "sites.code.u64"), "wb") as sc, \
+            open(os.path.join(out_dir, "sites.pos.i64"), "wb") as sp:
+        for name, raw in iter_fasta(fasta_path):
+            codes = _BASE_CODE[np.frombuffer(raw, dtype=np.uint8)]
+            n = len(codes)
+            # 2-bit paket: kontig başlangıcı 4'ün katına hizalanır
+            padded = np.zeros(-(-n // 4) * 4, dtype=np.uint8)
+            padded[:n] = codes & 3
+            quads = padded.reshape(-1, 4)
+            ((quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]).astype(
+                np.uint8).tofile(g2)
+            # N (geçersiz baz) blokları: [başlangıç, bitiş) global koordinat çiftleri
+            is_n = np.concatenate(([False], codes == 4, [False]))
+            edges = np.flatnonzero(is_n[1:] != is_n[:-1])
+            (edges.astype(np.int64) + offset).tofile(nr)
+
+            count = 0
+            for code, fwd, strand in _contig_sites(codes, enz["pam"], enz["pam_side"], glen):
+                code.tofile(sc)
+                (((fwd + offset) << 1) | strand).tofile(sp)
+                count += len(code)
+            contigs.append({"name": name, "offset": offset, "length": n})
+            total_sites += count
+            offset += len(padded)
+            if progress:
+                progress(name, n, count)
+
+    if total_sites >= 2 ** 32:
+        raise ValueError("Site sayısı uint32 sınırını aşıyor")
+    codes = np.memmap(os.path.join(out_dir, "sites.code.u64"), dtype=np.uint64, mode="r") \
+        if total_sites else np.empty(0, dtype=np.uint64)
+    for i, part in enumerate(parts):
+        values = _part_value(codes, glen, part)
+        order = np.argsort(values, kind="stable").astype(np.uint32)
+        bounds = np.searchsorted(values[order], np.arange(4 ** (part[1] - part[0]) + 1,
+                                                           dtype=np.uint64))
+        order.tofile(os.path.join(out_dir, f"seed{i}.order.u32"))
+        bounds.astype(np.int64).tofile(os.path.join(out_dir, f"seed{i}.bounds.i64"))
+        del values, order
+
+    meta = {
+        "version": INDEX_VERSION, "enzyme": enzyme, "pam": enz["pam"],
+        "pam_side": enz["pam_side"], "guide_len": glen,
+        "max_mismatches": max_mismatches, "parts": parts,
+        "sites": total_sites, "contigs": contigs,
+        "fasta": os.path.abspath(str(fasta_path)),
+        "build_seconds": round(time.monotonic() - started, 1),
+    }
+    with open(os.path.join(out_dir, _META), "w") as fh:
+        json.dump(meta, fh)
+    return meta
+
+
+def _memmap(path, dtype):
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+class GenomeIndex:
+    """build_index çıktısını np.memmap ile açar ve guide sorgularını yanıtlar."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(os.path.join(self.path, _META)) as fh:
+            self.meta = json.load(fh)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Desteklenmeyen indeks sürümü: {self.meta.get('version')}")
+        self.enzyme = self.meta["enzyme"]
+        self.guide_len = self.meta["guide_len"]
+        self.max_mismatches = self.meta["max_mismatches"]
+        self.parts = [tuple(p) for p in self.meta["parts"]]
+        self.contigs = self.meta["contigs"]
+        self._offsets = np.array([c["offset"] for c in self.contigs], dtype=np.int64)
+        self.genome = _memmap(os.path.join(self.path, "genome.2bit"), np.uint8)
+        self.nruns = _memmap(os.path.join(self.path, "nruns.i64"), np.int64).reshape(-1, 2)
+        self.codes = _memmap(os.path.join(self.path, "sites.code.u64"), np.uint64)
+        self.pos = _memmap(os.path.join(self.path, "sites.pos.i64"), np.int64)
+        self.seeds = [
+            (_memmap(os.path.join(self.path, f"seed{i}.order.u32"), np.uint32),
+             _memmap(os.path.join(self.path, f"seed{i}.bounds.i64"), np.int64))
+            for i in range(len(self.parts))
+        ]
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(str(path), _META))
+
+    def candidates(self, code):
+        """Seed aşaması: guide ile en az bir parçada tam eşleşen sitelerin indeksleri."""
+        found = []
+        for part, (order, bounds) in zip(self.parts, self.seeds):
+            v = int(_part_value(code, self.guide_len, part))
+            lo, hi = int(bounds[v]), int(bounds[v + 1])
+            if hi > lo:
+                found.append(order[lo:hi])
+        if not found:
+            return np.empty(0, dtype=np.uint32)
+        return np.concatenate(found)
+
+    def search(self, guide, max_mismatches=3, max_hits=0):
+        """Bir guide için ≤ max_mismatches uyumsuzluklu PAM'li siteler.
+
+        Döner: (counts: list[int] (uzunluk max_mismatches+1), hits: list[dict])
+        hits en az uyumsuzluktan başlayarak en çok max_hits kayıt içerir.
+        """
+        guide = (guide or "").strip().upper()
+        if len(guide) != self.guide_len:
+            raise ValueError(f"guide uzunluğu {self.guide_len} olmalı")
+        if not 0 <= max_mismatches <= self.max_mismatches:
+            raise ValueError(f"İndeks en çok {self.max_mismatches} uyumsuzluk için kuruldu")
+        code, valid = encode_guide(guide)
+        counts = [0] * (max_mismatches + 1)
+        if not valid:
+            return counts, []
+        cand = self.candidates(code)
+        mm = mismatch_counts(self.codes[cand], code)
+        keep = mm <= max_mismatches
+        # Bir site birden çok parçada eşleşebilir; tekilleştirme süzülmüş küçük kümede
+        sites, first = np.unique(cand[keep], return_index=True)
+        mm = mm[keep][first]
+        for k, n in enumerate(np.bincount(mm, minlength=max_mismatches + 1).tolist()):
+            counts[k] = n
+        hits = []
+        if max_hits:
+            for i in np.argsort(mm, kind="stable")[:max_hits]:
+                hits.append(self.describe(int(sites[i]), int(mm[i])))
+        return counts, hits
+
+    def search_many(self, guides, max_mismatches=3, max_hits=0):
+        return [self.search(g, max_mismatches, max_hits) for g in guides]
+
+    def describe(self, site, mismatches):
+        """Site indeksi → {'contig', 'start' (1-bazlı), 'strand', 'sequence', 'mm'}."""
+        packed = int(self.pos[site])
+        gpos, strand = packed >> 1, packed & 1
+        c = int(np.searchsorted(self._offsets, gpos, side="right")) - 1
+        contig = self.contigs[c]
+        seq = self.fetch(gpos, gpos + self.guide_len)
+        if strand:
+            seq = reverse_complement(seq)
+        return {"contig": contig["name"], "start": gpos - contig["offset"] + 1,
+                "strand": "-" if strand else "+", "sequence": seq, "mm": mismatches}
+
+    def fetch(self, start, end):
+        """Global [start, end) aralığının dizisi (paketli genom + N blokları)."""
+        b0, b1 = start // 4, -(-end // 4)
+        block = self.genome[b0:b1]
+        codes = np.stack([(block >> s) & 3 for s in (6, 4, 2, 0)], axis=1).ravel()
+        codes = codes[start - 4 * b0:end - 4 * b0]
+        # Aralıkla örtüşen N blokları (bloklar sıralı ve ayrık)
+        first = int(np.searchsorted(self.nruns[:, 1], start, side="right"))
+        for run_start, run_end in self.nruns[first:].tolist():
+            if run_start >= end:
+                break
+            codes[max(run_start, start) - start:min(run_end, end) - start] = 4
+        return np.frombuffer(b"ACGTN", dtype=np.uint8)[codes].tobytes().decode()
+
+
+# --- Süreç havuzu işçileri (spawn ile başlatılır; modül düzeyinde olmalı) ------
+_worker_index = None
+
+
+def _worker_init(path):
+    global _worker_index
+    _worker_index = GenomeIndex(path)
+
+
+def _worker_search(guides, max_mismatches, max_hits):
+    return _worker_index.search_many(guides, max_mismatches, max_hits)
+
+
+def search_parallel(path, guides, max_mismatches=3, max_hits=0, workers=1, chunk_size=None):
+    """Guide listesini süreç havuzunda tek partide tarar; sıra korunur.
+
+    Her işçi indeksi bir kez açar (memmap → sayfa önbelleği süreçler arasında
+    ortaktır); guide'lar işçi başına eşit parçalara bölünür.
+    """
+    guides = list(guides)
+    workers = max(1, int(workers or 1))
+    if workers == 1 or len(guides) < 2:
+        return GenomeIndex(path).search_many(guides, max_mismatches, max_hits)
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    chunk_size = chunk_size or max(1, -(-len(guides) // (workers * 4)))
+    chunks = [guides[i:i + chunk_size] for i in range(0, len(guides), chunk_size)]
+    # Çağıran (işçi/komut) thread'li olabileceğinden fork yerine spawn
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_worker_init, initargs=(str(path),)) as pool:
+        futures = [pool.submit(_worker_search, c, max_mismatches, max_hits) for c in chunks]
+        return [r for f in futures for r in f.result()]
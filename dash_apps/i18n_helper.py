@@ -154,11 +154,18 @@ TRANSLATIONS = {
     'ph_or_paste': {'tr': 'veya FASTA Yapıştır', 'en': 'or Paste FASTA'},
     'ph_method': {'tr': 'Ağaç Yöntemi', 'en': 'Tree Method'},
     'ph_method_hint': {'tr': 'NJ: hızlı ve yaygın. UPGMA: moleküler saat varsayımı.', 'en': 'NJ: fast and common. UPGMA: molecular clock assumption.'},
+    'ph_model': {'tr': 'Mesafe Modeli', 'en': 'Distance Model'},
+    'ph_model_hint': {'tr': 'JC69/K2P yalnız DNA için; çoklu değişimleri düzeltir. Protein için Özdeşlik veya p-mesafesi.', 'en': 'JC69/K2P are DNA-only and correct for multiple substitutions. Use Identity or p-distance for proteins.'},
+    'ph_model_identity': {'tr': 'Özdeşlik (1 − özdeş oran)', 'en': 'Identity (1 − identical fraction)'},
+    'ph_model_p': {'tr': 'p-mesafesi (boşluklar hariç)', 'en': 'p-distance (gaps excluded)'},
     'ph_build': {'tr': 'Ağaç Oluştur', 'en': 'Build Tree'},
     'ph_results': {'tr': 'Sonuçlar', 'en': 'Results'},
     'ph_placeholder': {'tr': 'FASTA yükleyip "Ağaç Oluştur"a tıklayın. En az 3 dizi gerekir.', 'en': 'Upload FASTA and click "Build Tree". At least 3 sequences required.'},
     'ph_taxa': {'tr': 'takson', 'en': 'taxa'},
     'ph_positions': {'tr': 'pozisyon', 'en': 'positions'},
+    'ph_aligned_msa': {'tr': 'Diziler sunucuda çoklu hizalandı (k-mer kılavuz ağacı + ilerlemeli profil hizalama).', 'en': 'Sequences were aligned on the server (k-mer guide tree + progressive profile alignment).'},
+    'ph_aligned_trimmed': {'tr': 'Hizalama bütçesi aşıldı; diziler en kısa ortak uzunluğa kırpıldı', 'en': 'Alignment budget exceeded; sequences were trimmed to the shortest common length'},
+    'ph_alignment_title': {'tr': 'Çoklu Hizalama', 'en': 'Multiple Alignment'},
     'ph_branch_title': {'tr': 'Dal Uzunlukları', 'en': 'Branch Lengths'},
     'ph_branch_desc': {'tr': 'Her taksonun terminal dal uzunluğu. Kısa dal = diğerlerine yakın/benzer; uzun dal = daha ayrık/farklılaşmış.', 'en': 'Terminal branch length of each taxon. Short branch = close/similar to others; long branch = more divergent.'},
     'ph_branch_len': {'tr': 'Dal Uzunluğu', 'en': 'Branch Length'},
@@ -235,6 +242,11 @@ TRANSLATIONS = {
     'sal_select_file': {'tr': 'Dosya Seç', 'en': 'Select File'},
     'sal_paste_placeholder': {'tr': '...veya hizalanmış veriyi buraya yapıştırın.',
                               'en': '...or paste the aligned data here.'},
+    'sal_align_btn': {'tr': 'Sunucuda Hizala', 'en': 'Align on Server'},
+    'sal_align_hint': {'tr': 'Hizalanmamış FASTA girdiyseniz diziler burada çoklu hizalanır ve kutuya yazılır.', 'en': 'If you entered unaligned FASTA, the sequences are aligned here and written back into the box.'},
+    'sal_align_done': {'tr': 'dizi hizalandı', 'en': 'sequences aligned'},
+    'sal_align_need2': {'tr': 'Hizalama için en az 2 FASTA dizisi gerekir.', 'en': 'At least 2 FASTA sequences are required for alignment.'},
+    'sal_align_error': {'tr': 'Hizalama yapılamadı', 'en': 'Alignment failed'},
     'sal_graph_settings': {'tr': 'Grafik Ayarları', 'en': 'Graph Settings'},
     'sal_color_scale': {'tr': 'Renk Skalası', 'en': 'Color Scale'},
     'sal_preview_type': {'tr': 'Önizleme Tipi', 'en': 'Preview Type'},
@@ -351,6 +363,16 @@ TRANSLATIONS = {
                          'en': 'No mutation could be successfully analyzed.'},
     'mp_errors_warnings': {'tr': 'Hatalar ve Uyarılar', 'en': 'Errors and Warnings'},
     'mp_select_mol_first': {'tr': 'Lütfen önce bir molekül seçin.', 'en': 'Please select a molecule first.'},
+    'mp_saturation_scan': {'tr': 'Doygunluk taraması (her kalıntı × 19 ikame)',
+                           'en': 'Saturation scan (every residue × 19 substitutions)'},
+    'mp_saturation_note': {'tr': 'İşaretlenirse girilen mutasyonlar yerine tüm olası tek ikameler puanlanır.',
+                           'en': 'When checked, all possible single substitutions are scored instead of the entered mutations.'},
+    'mp_saturation_results': {'tr': 'Doygunluk Taraması', 'en': 'Saturation Scan'},
+    'mp_residue': {'tr': 'Kalıntı', 'en': 'Residue'},
+    'mp_substitution': {'tr': 'İkame', 'en': 'Substitution'},
+    'mp_harmful_prob': {'tr': 'Zararlı olasılığı', 'en': 'Harmful probability'},
+    'mp_harmful_subs': {'tr': 'Zararlı ikame', 'en': 'Harmful substitutions'},
+    'mp_most_sensitive': {'tr': 'En Hassas Kalıntılar', 'en': 'Most Sensitive Residues'},
 
     # ---- Bakteri Tasarımcısı ----
     'bd_title': {'tr': 'Bakteri Tasarım', 'en': 'Bacteria Designer'},
@@ -537,6 +559,11 @@ TRANSLATIONS = {
     'pm_seq_label': {'tr': 'Plazmit DNA Dizisi', 'en': 'Plasmid DNA Sequence'},
     'pm_seq_placeholder': {'tr': 'DNA dizisini buraya yapıştırın (ATGC...)', 'en': 'Paste DNA sequence here (ATGC...)'},
     'pm_load_example': {'tr': 'Örnek Plazmit Yükle', 'en': 'Load Example Plasmid'},
+    'pm_acc_label': {'tr': 'veya ENA accession (örn. L09137)', 'en': 'or ENA accession (e.g. L09137)'},
+    'pm_fetch_btn': {'tr': 'Diziyi Çek', 'en': 'Fetch Sequence'},
+    'pm_acc_empty': {'tr': 'Lütfen bir accession girin.', 'en': 'Please enter an accession.'},
+    'pm_fetched': {'tr': 'Dizi çekildi', 'en': 'Sequence fetched'},
+    'pm_fetch_error': {'tr': 'Dizi çekilemedi:', 'en': 'Could not fetch sequence:'},
     'pm_draw': {'tr': 'Haritayı Çiz', 'en': 'Draw Map'},
     'pm_note': {'tr': 'ORF\'ler (gen adayları) ve tek kesim yapan enzimler otomatik bulunup haritaya yerleştirilir.',
                 'en': 'ORFs (gene candidates) and single-cutter enzymes are automatically detected and placed on the map.'},
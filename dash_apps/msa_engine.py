@@ -0,0 +1,334 @@
+"""
+dash_apps.msa_engine — sunucu tarafı çoklu dizi hizalama (MSA).
+
+Filogenetik ağaç aracı dizileri en kısa uzunluğa kırpıyor, hizalama
+görüntüleyici ise yalnız önceden hizalanmış girdi kabul ediyordu. Burada
+MUSCLE/Clustal tarzı basit bir ilerlemeli hizalama yapılır:
+
+  1) k-mer mesafesi: her dizi için k-mer sayım vektörü; ortak k-mer oranı
+     (Edgar 2004) tüm çiftler için NumPy ile blok halinde hesaplanır.
+  2) Kılavuz ağaç: bu mesafelerle UPGMA (phylo_engine.upgma).
+  3) İlerlemeli profil hizalama: ağaçta yapraktan köke her birleşmede iki
+     profil (sütun başına kalıntı frekansları) afin boşluklu Needleman-Wunsch
+     ile hizalanır. DP satır satır vektörel hesaplanır; yatay boşluk
+     bağımlılığı np.maximum.accumulate ile tek geçişte çözülür.
+  4) Uzun ve benzer dizilerde bant modu: her satırda yalnız köşegen
+     çevresindeki 2w+1 hücre hesaplanır (bellek ve süre O(L·w)).
+
+Boyut (dizi sayısı, toplam kalıntı, DP hücresi) ve süre bütçesi aşılırsa
+ValueError yükseltilir. Çıktı eşit uzunlukta hizalı dizilerdir; to_alignment
+DistanceCalculator'a, to_fasta dash_bio.AlignmentChart'a doğrudan verilir.
+"""
+import time
+
+import numpy as np
+
+from dash_apps import phylo_engine
+
+GAP = '-'
+MAX_SEQUENCES = 500
+MAX_TOTAL_RESIDUES = 2_000_000
+# DP hücre sınırları (geri izleme hücre başına 4 bayt): üstünde bant modu / hata
+FULL_DP_CELLS = 8_000_000
+MAX_DP_CELLS = 32_000_000
+BAND_MIN_WIDTH = 64
+BAND_MAX_WIDTH = 512
+DEFAULT_TIME_BUDGET = 30.0
+
+# Puanlama: DNA için basit eşleşme/uyumsuzluk, protein için BLOSUM62
+DNA_ALPHABET = 'ACGT'
+PROTEIN_ALPHABET = 'ARNDCQEGHILKMFPSTWYV'
+DNA_SCORES = (2.0, -1.0)
+DNA_GAPS = (-5.0, -1.0)
+PROTEIN_GAPS = (-11.0, -1.0)
+KMER_SIZE = {'dna': 4, 'protein': 2}
+
+_NEG = -1e18
+# Geri izleme durumları: H (köşegen), F (dikey boşluk), E (yatay boşluk)
+_SRC_F, _SRC_E = 1, 2
+
+
+def detect_kind(sequences):
+    """Kalıntıların ≥ %90'ı ACGTUN ise 'dna', değilse 'protein'."""
+    text = ''.join(sequences).upper().replace(GAP, '')
+    if not text:
+        return 'dna'
+    nuc = sum(text.count(b) for b in 'ACGTUN')
+    return 'dna' if nuc / len(text) >= 0.9 else 'protein'
+
+
+def _scoring(kind):
+    """(alfabe, K×K puan matrisi, (açma, uzatma)) — alfabe dışı harf sıfır puanlı ek sütundur."""
+    if kind == 'dna':
+        match, mismatch = DNA_SCORES
+        k = len(DNA_ALPHABET)
+        scores = np.full((k, k), mismatch)
+        np.fill_diagonal(scores, match)
+        return DNA_ALPHABET, scores, DNA_GAPS
+    from Bio.Align import substitution_matrices
+
+    blosum = substitution_matrices.load('BLOSUM62')
+    scores = np.array([[blosum[a][b] for b in PROTEIN_ALPHABET] for a in PROTEIN_ALPHABET], dtype=np.float64)
+    return PROTEIN_ALPHABET, scores, PROTEIN_GAPS
+
+
+def _encode(sequences, alphabet):
+    """Dizi → alfabe indeksi (uint8); alfabe dışı = len(alphabet)."""
+    table = np.full(256, len(alphabet), dtype=np.uint8)
+    for i, ch in enumerate(alphabet):
+        table[ord(ch)] = table[ord(ch.lower())] = i
+    if alphabet == DNA_ALPHABET:
+        table[ord('U')] = table[ord('u')] = alphabet.index('T')
+    return [table[np.frombuffer(s.encode('ascii', 'replace'), dtype=np.uint8)] for s in sequences]
+
+
+def kmer_distances(codes, alphabet_size, k):
+    """
+    Ortak k-mer oranına dayalı (n, n) mesafe: d = 1 - Σ min(c_x, c_y) / (min(L) - k + 1).
+    Alfabe dışı harf içeren k-mer'ler sayılmaz.
+    """
+    n = len(codes)
+    dims = alphabet_size ** k
+    counts = np.zeros((n, dims), dtype=np.float32)
+    lengths = np.array([max(1, len(c) - k + 1) for c in codes], dtype=np.float64)
+    for i, c in enumerate(codes):
+        m = len(c) - k + 1
+        if m <= 0:
+            continue
+        vals = np.zeros(m, dtype=np.int64)
+        bad = np.zeros(m, dtype=bool)
+        for j in range(k):
+            window = c[j:j + m].astype(np.int64)
+            bad |= window >= alphabet_size
+            vals = vals * alphabet_size + np.minimum(window, alphabet_size - 1)
+        counts[i] = np.bincount(vals[~bad], minlength=dims)
+    shared = np.zeros((n, n), dtype=np.float64)
+    rows = max(1, phylo_engine.BLOCK_BYTES // max(1, n * dims * 4))
+    for i0 in range(0, n, rows):
+        shared[i0:i0 + rows] = np.minimum(counts[i0:i0 + rows, None, :], counts[None, :, :]).sum(axis=2)
+    dist = 1 - shared / np.minimum(lengths[:, None], lengths[None, :])
+    np.fill_diagonal(dist, 0.0)
+    return np.clip(dist, 0.0, 1.0)
+
+
+def _guide_order(dist):
+    """UPGMA kılavuz ağacından birleştirme listesi [(sol, sağ)] (son-sıra; yapraklar int)."""
+    tree = phylo_engine.upgma(dist, [str(i) for i in range(len(dist))])
+    merges = []
+
+    def walk(clade):
+        if clade.is_terminal():
+            return int(clade.name)
+        left, right = (walk(c) for c in clade.clades)
+        merges.append((left, right))
+        return ('node', len(merges) - 1)
+
+    walk(tree.root)
+    return merges
+
+
+def _profile(group, alphabet_size):
+    """(n_seq, L) kod matrisi (boşluk = 255) → (L, K) kalıntı frekansları (boşluk sayılmaz)."""
+    n_seq, length = group.shape
+    prof = np.zeros((length, alphabet_size), dtype=np.float64)
+    cols = np.broadcast_to(np.arange(length), group.shape)
+    ok = group != 255
+    np.add.at(prof, (cols[ok], group[ok].astype(np.intp)), 1.0)
+    return prof / n_seq
+
+
+def _band_limits(n, m, width):
+    """Her satır i için [lo, hi] sütun aralığı (köşegen i·m/n çevresinde)."""
+    if width is None:
+        return np.zeros(n + 1, dtype=np.int64), np.full(n + 1, m, dtype=np.int64)
+    centre = np.rint(np.arange(n + 1) * (m / max(n, 1))).astype(np.int64)
+    lo = np.clip(centre - width, 0, m)
+    hi = np.clip(centre + width, 0, m)
+    lo[0], hi[-1] = 0, m
+    # Ardışık satırlar bağlı kalmalı: satır i'nin ilk hücresine köşegenden ulaşılabilsin
+    lo[1:] = np.minimum(lo[1:], hi[:-1] + 1)
+    return lo, hi
+
+
+def align_profiles(prof_a, prof_b, scores, gaps, width=None, deadline=None):
+    """
+    İki profili afin boşluklu global hizalar.
+
+    width verilirse bantlı DP. Döner: (ia, ib) — hizalı sütun başına A ve B'nin
+    sütun indeksi (boşlukta -1).
+    """
+    if len(prof_a) > len(prof_b):
+        # Satır başına sabit maliyet baskın: kısa profil satır olsun
+        ib, ia = align_profiles(prof_b, prof_a, scores, gaps, width, deadline)
+        return ia, ib
+    gap_open, gap_ext = gaps
+    n, m = len(prof_a), len(prof_b)
+    lo, hi = _band_limits(n, m, width)
+    span = int((hi - lo).max()) + 1
+    # Geri izleme: H kaynağı dikey/yatay mı, F/E boşluğu uzatma mı (bant içi sütun)
+    from_f = np.zeros((n + 1, span), dtype=bool)
+    from_e = np.zeros((n + 1, span), dtype=bool)
+    f_extends = np.zeros((n + 1, span), dtype=bool)
+    e_extends = np.zeros((n + 1, span), dtype=bool)
+    weighted = prof_a @ scores  # (n, K): hücre puanı = weighted[i] · prof_b[j]
+    prof_b = np.vstack((np.zeros((1, prof_b.shape[1])), prof_b))  # sütun j → prof_b[j]
+
+    col_pen = gap_ext * np.arange(m + 1, dtype=np.float64)
+    # H ve F tamponları bir kaydırmalı: buf[k + 1] = sütun k, buf[0] = _NEG
+    prev_h = np.full(m + 2, _NEG)
+    prev_f = np.full(m + 2, _NEG)
+    prev_h[1] = 0.0
+    prev_h[2:hi[0] + 2] = gap_open - gap_ext + col_pen[1:hi[0] + 1]  # satır 0: yalnız yatay boşluk
+    from_e[0, 1:hi[0] + 1] = True
+    e_extends[0, 2:hi[0] + 1] = True
+    cur_h = np.full(m + 2, _NEG)
+    cur_f = np.full(m + 2, _NEG)
+    # Tamponlardaki yazılı aralıklar (bant dışı hücreler _NEG kalmalı)
+    prev_band, stale_band = (0, int(hi[0])), (0, -1)
+
+    for i in range(1, n + 1):
+        if deadline is not None and i % 256 == 0 and time.perf_counter() > deadline:
+            raise ValueError('Hizalama süre bütçesi aşıldı')
+        a, b = int(lo[i]), int(hi[i])
+        w = b - a + 1
+        # Dikey boşluk (A'dan kalıntı, B'de boşluk)
+        f_ext = prev_f[a + 1:b + 2] + gap_ext
+        f_open = prev_h[a + 1:b + 2] + gap_open
+        f = np.maximum(f_ext, f_open)
+        # Köşegen (sütun 0'da yok)
+        diag = prev_h[a:b + 1] + weighted[i - 1] @ prof_b[a:b + 1].T
+        if a == 0:
+            diag[0] = _NEG
+        t = np.maximum(diag, f)
+        # Yatay boşluk: E[j] = max_{k<j} (T[k] + açma + uzatma·(j-1-k))
+        e = np.full(w, _NEG)
+        if w > 1:
+            e[1:] = np.maximum.accumulate(t[:-1] - col_pen[a:b]) + (gap_open - gap_ext) + col_pen[a + 1:b + 1]
+            e_extends[i, 1:w] = e[:-1] - t[:-1] >= gap_open - gap_ext
+        h = np.maximum(t, e)
+        from_e[i, :w] = e > t
+        from_f[i, :w] = f > diag
+        f_extends[i, :w] = f_ext >= f_open
+
+        cur_h[stale_band[0] + 1:stale_band[1] + 2] = _NEG
+        cur_f[stale_band[0] + 1:stale_band[1] + 2] = _NEG
+        cur_h[a + 1:b + 2] = h
+        cur_f[a + 1:b + 2] = f
+        prev_h, cur_h = cur_h, prev_h
+        prev_f, cur_f = cur_f, prev_f
+        stale_band, prev_band = prev_band, (a, b)
+
+    # Geri izleme (H'de eşitlikte köşegen > dikey > yatay)
+    ia, ib = [], []
+    i, j, state = n, m, 0
+    while i > 0 or j > 0:
+        k = j - lo[i]
+        if i == 0:
+            state = _SRC_E
+        elif j == 0:
+            state = _SRC_F
+        elif state == 0:
+            state = _SRC_E if from_e[i, k] else _SRC_F if from_f[i, k] else 0
+            if state == 0:
+                ia.append(i - 1)
+                ib.append(j - 1)
+                i, j = i - 1, j - 1
+                continue
+        if state == _SRC_F:
+            ia.append(i - 1)
+            ib.append(-1)
+            state = _SRC_F if f_extends[i, k] else 0
+            i -= 1
+        else:
+            ia.append(-1)
+            ib.append(j - 1)
+            state = _SRC_E if e_extends[i, k] else 0
+            j -= 1
+    return np.array(ia[::-1], dtype=np.int64), np.array(ib[::-1], dtype=np.int64)
+
+
+def _band_width(n, m, band):
+    """band: 'auto' (hücre sınırını aşınca bant), None/False (tam DP) veya int (yarı genişlik)."""
+    if band == 'auto':
+        if n * m <= FULL_DP_CELLS:
+            return None
+        width = max(n, m) // 50
+    elif not band:
+        return None
+    else:
+        width = int(band)
+    return max(BAND_MIN_WIDTH, min(width, BAND_MAX_WIDTH))
+
+
+def _merge(group_a, group_b, ia, ib):
+    """Hizalı sütun indekslerine göre iki grubu tek kod matrisinde birleştirir."""
+    out_a = np.where(ia >= 0, group_a[:, np.maximum(ia, 0)], 255).astype(np.uint8)
+    out_b = np.where(ib >= 0, group_b[:, np.maximum(ib, 0)], 255).astype(np.uint8)
+    return np.vstack((out_a, out_b))
+
+
+def align_sequences(sequences, kind=None, band='auto', time_budget=DEFAULT_TIME_BUDGET,
+                    max_sequences=MAX_SEQUENCES, max_residues=MAX_TOTAL_RESIDUES):
+    """
+    Dizi listesini çoklu hizalar; girdiyle aynı sırada eşit uzunlukta hizalı diziler döner.
+
+    kind: 'dna' / 'protein' (None ise otomatik). Mevcut boşluk karakterleri
+    atılıp yeniden hizalanır. Bütçe aşımında ValueError.
+    """
+    raw = [str(s).replace(GAP, '').replace('.', '').upper() for s in sequences]
+    if len(raw) < 2:
+        raise ValueError('Hizalama için en az 2 dizi gerekir')
+    if any(not s for s in raw):
+        raise ValueError('Boş dizi hizalanamaz')
+    if len(raw) > max_sequences:
+        raise ValueError(f'En çok {max_sequences} dizi hizalanabilir')
+    if sum(len(s) for s in raw) > max_residues:
+        raise ValueError(f'Toplam uzunluk {max_residues:,} kalıntıyı aşamaz')
+    deadline = time.perf_counter() + time_budget if time_budget else None
+
+    kind = kind or detect_kind(raw)
+    alphabet, scores, gaps = _scoring(kind)
+    codes = _encode(raw, alphabet)
+    size = len(alphabet)
+    # Alfabe dışı harf (N, X...) profile sıfır puanla katılır
+    scores = np.pad(scores, ((0, 1), (0, 1)))
+
+    dist = kmer_distances(codes, size, KMER_SIZE[kind])
+    groups = {i: (c[None, :], [i]) for i, c in enumerate(codes)}
+    nodes = []
+    for left, right in _guide_order(dist):
+        (ga, ma), (gb, mb) = (groups.pop(x) if isinstance(x, int) else nodes[x[1]] for x in (left, right))
+        n, m = ga.shape[1], gb.shape[1]
+        width = _band_width(n, m, band)
+        cells = (min(n, m) + 1) * (2 * width + 1 if width else max(n, m) + 1)
+        if cells > MAX_DP_CELLS:
+            raise ValueError('Diziler hizalama bütçesi için çok uzun (bant modunu deneyin)')
+        ia, ib = align_profiles(_profile(ga, size + 1), _profile(gb, size + 1), scores, gaps,
+                                width=width, deadline=deadline)
+        nodes.append((_merge(ga, gb, ia, ib), ma + mb))
+        if deadline is not None and time.perf_counter() > deadline:
+            raise ValueError('Hizalama süre bütçesi aşıldı')
+
+    merged, members = nodes[-1]
+    # Kodlardan değil özgün harflerden yaz (N, X gibi harfler korunsun)
+    aligned = [None] * len(raw)
+    for row, idx in zip(merged, members):
+        out = np.full(len(row), ord(GAP), dtype=np.uint8)
+        out[row != 255] = np.frombuffer(raw[idx].encode('ascii', 'replace'), dtype=np.uint8)
+        aligned[idx] = out.tobytes().decode('ascii')
+    return aligned
+
+
+def to_alignment(names, aligned):
+    """Hizalı diziler → Bio.Align.MultipleSeqAlignment (DistanceCalculator girdisi)."""
+    from Bio.Align import MultipleSeqAlignment
+    from Bio.Seq import Seq
+    from Bio.SeqRecord import SeqRecord
+
+    return MultipleSeqAlignment([SeqRecord(Seq(s), id=name, description='')
+                                 for name, s in zip(names, aligned)])
+
+
+def to_fasta(names, aligned):
+    """Hizalı diziler → FASTA metni (dash_bio.AlignmentChart data girdisi)."""
+    return ''.join(f">{name}\n{s}\n" for name, s in zip(names, aligned))
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 import base64
+import hashlib
 import os
 import re
 import tempfile
+import threading
 import platform
 import zlib
+from collections import OrderedDict
 
 
 import dash
@@ -15,8 +18,10 @@ import numpy as np
 import mdtraj as md
 
 import dash_bootstrap_components as dbc
+import plotly.graph_objects as go
 from dash import dcc, html, Input, Output, State
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import reverse
 from django_plotly_dash import DjangoDash
 
@@ -24,6 +29,7 @@ from django_plotly_dash import DjangoDash
 from Bio.PDB import PDBParser, PDBIO, Select
 
 from Bio.PDB.ResidueDepth import ResidueDepth
+from Bio.SeqUtils import seq1
 from sklearn.tree import DecisionTreeClassifier, export_text
 from billing.dash_helpers import build_confirm_modal
 
@@ -94,10 +100,47 @@ def get_uploaded_data(contents, filenames):
     return data_dict, messages
 
 
-def analyze_mutation_impact(pdb_content, mutation_str):
+# --- YAPI ÖZELLİK ÖNBELLEĞİ ---
+# DSSP ve MSMS (ResidueDepth) bir yapı için bir kez hesaplanır; kalıntı başına
+# özellikler PDB içeriğinin SHA-256 özetiyle önbelleğe alınır. Aynı yapı için
+# gelen her mutasyon (ve doygunluk taraması) bu önbellekten okunur.
+FEATURE_CACHE_TTL = 7 * 24 * 3600
+_STRUCTURE_CACHE_SIZE = 16
+_structure_cache = OrderedDict()      # süreç içi LRU: özet -> kalıntı özellikleri
+_structure_cache_lock = threading.Lock()
+
+AA_PROPERTIES = {
+    'A': {'vol': 88.6, 'hyd': 1.8}, 'R': {'vol': 173.4, 'hyd': -4.5},
+    'N': {'vol': 114.1, 'hyd': -3.5}, 'D': {'vol': 111.1, 'hyd': -3.5},
+    'C': {'vol': 108.5, 'hyd': 2.5}, 'E': {'vol': 138.4, 'hyd': -3.5},
+    'Q': {'vol': 143.8, 'hyd': -3.5}, 'G': {'vol': 60.1, 'hyd': -0.4},
+    'H': {'vol': 153.2, 'hyd': -3.2}, 'I': {'vol': 166.7, 'hyd': 4.5},
+    'L': {'vol': 166.7, 'hyd': 3.8}, 'K': {'vol': 168.6, 'hyd': -3.9},
+    'M': {'vol': 162.9, 'hyd': 1.9}, 'F': {'vol': 189.9, 'hyd': 2.8},
+    'P': {'vol': 112.7, 'hyd': -1.6}, 'S': {'vol': 89.0, 'hyd': -0.8},
+    'T': {'vol': 116.1, 'hyd': -0.7}, 'W': {'vol': 227.8, 'hyd': -0.9},
+    'Y': {'vol': 193.6, 'hyd': -1.3}, 'V': {'vol': 140.0, 'hyd': 4.2}
+}
+AMINO_ACIDS = sorted(AA_PROPERTIES)
+FEATURE_NAMES = ['Hacim Değişimi', 'Hidrofobiklik Değişimi', 'Derinlik (Å)', 'İkincil Yapı Tipi']
+SS_MAP = {'H': 1, 'E': 2, 'C': 3}  # Helix, Strand (Sheet), Coil (Diğerleri)
+
+
+def _msms_executable():
+    if platform.system() == "Windows":
+        return os.path.join(settings.BASE_DIR, "programs", "msms.exe")
+    elif platform.system() == "Linux":
+        home_dir = os.path.expanduser('~')
+        programs_dir = os.path.join(home_dir, 'bin')
+        return os.path.join(programs_dir, 'msms_linux')
+    return "msms"
+
+
+def _compute_structure_features(pdb_content):
+    """DSSP + MSMS'i bir kez çalıştırır.
+    Döner: ({resSeq: {'aa', 'ss', 'depth'}}, None) veya (None, hata mesajı)."""
     tmp = tempfile.NamedTemporaryFile(mode='w+', suffix='.pdb', delete=False)
     windows_pdb_filepath = tmp.name
-
     try:
         tmp.write(pdb_content)
         tmp.close()
@@ -108,89 +151,194 @@ def analyze_mutation_impact(pdb_content, mutation_str):
         except Exception as e:
             return None, f"MDTraj ile PDB dosyası işlenemedi. Dosya formatını kontrol edin. Hata: {e}"
 
-        if platform.system() == "Windows":
-            msms_executable_path = os.path.join(settings.BASE_DIR, "programs", "msms.exe")
-        elif platform.system() == "Linux":
-            home_dir = os.path.expanduser('~')
-            programs_dir = os.path.join(home_dir, 'bin')
-            msms_executable_path = os.path.join(programs_dir, 'msms_linux')
-        else:
-            msms_executable_path = "msms"
-
-        match = re.match(r"([A-Z])([0-9]+)([A-Z])", mutation_str.upper())
-        if not match: return None, "Geçersiz mutasyon formatı. Örnek: A123G"
-        original_aa_one, position, new_aa_one = match.groups()
-        position = int(position)
+        msms_executable_path = _msms_executable()
         parser = PDBParser(QUIET=True)
         structure = parser.get_structure("protein", windows_pdb_filepath)
         model = structure[0]
-
         try:
             rd = ResidueDepth(model=model, msms_exec=msms_executable_path)
         except Exception as e:
             return None, f"MSMS programı çalıştırılamadı: '{msms_executable_path}'. Hata: {e}"
 
-        target_residue_md = next((r for r in traj.topology.residues if r.resSeq == position), None)
-        if not target_residue_md:
-            return None, f"Belirtilen pozisyonda ({position}) kalıntı bulunamadı (yapıda eksik olabilir)."
-
-        target_residue_bio = next(
-            (r for r in model.get_residues() if r.get_id()[1] == position and r.get_id()[0] == ' '), None)
-        if not target_residue_bio:
-            return None, f"Derinlik hesaplaması için {position} pozisyonunda kalıntı bulunamadı."
-
-        ss_code = dssp_codes[target_residue_md.index]
-        ss_map = {'H': 1, 'E': 2, 'C': 3}  # Helix, Strand (Sheet), Coil (Diğerleri)
-        ss_feature = ss_map.get(ss_code, 3)
-
-        residue_key = target_residue_bio.get_full_id()[2:]
-        try:
-            depth = rd[residue_key][0]
-        except KeyError:
-            return None, f"Derinlik hesaplanamadı. {position} pozisyonu yüzeyde veya MSMS tarafından işlenemedi."
-
-        aa_properties = {
-            'A': {'vol': 88.6, 'hyd': 1.8}, 'R': {'vol': 173.4, 'hyd': -4.5},
-            'N': {'vol': 114.1, 'hyd': -3.5}, 'D': {'vol': 111.1, 'hyd': -3.5},
-            'C': {'vol': 108.5, 'hyd': 2.5}, 'E': {'vol': 138.4, 'hyd': -3.5},
-            'Q': {'vol': 143.8, 'hyd': -3.5}, 'G': {'vol': 60.1, 'hyd': -0.4},
-            'H': {'vol': 153.2, 'hyd': -3.2}, 'I': {'vol': 166.7, 'hyd': 4.5},
-            'L': {'vol': 166.7, 'hyd': 3.8}, 'K': {'vol': 168.6, 'hyd': -3.9},
-            'M': {'vol': 162.9, 'hyd': 1.9}, 'F': {'vol': 189.9, 'hyd': 2.8},
-            'P': {'vol': 112.7, 'hyd': -1.6}, 'S': {'vol': 89.0, 'hyd': -0.8},
-            'T': {'vol': 116.1, 'hyd': -0.7}, 'W': {'vol': 227.8, 'hyd': -0.9},
-            'Y': {'vol': 193.6, 'hyd': -1.3}, 'V': {'vol': 140.0, 'hyd': 4.2}
-        }
-        vol_change = abs(
-            aa_properties.get(new_aa_one, {'vol': 0})['vol'] - aa_properties.get(original_aa_one, {'vol': 0})['vol'])
-        hyd_change = abs(
-            aa_properties.get(new_aa_one, {'hyd': 0})['hyd'] - aa_properties.get(original_aa_one, {'hyd': 0})['hyd'])
-
-        features = [vol_change, hyd_change, depth, ss_feature]
-        feature_names = ['Hacim Değişimi', 'Hidrofobiklik Değişimi', 'Derinlik (Å)', 'İkincil Yapı Tipi']
-
-        return features, feature_names
-
+        # Aynı numara birden çok zincirde varsa ilk görülen kullanılır (tekil analizle aynı)
+        ss_by_pos = {}
+        for r in traj.topology.residues:
+            ss_by_pos.setdefault(r.resSeq, str(dssp_codes[r.index]))
+        residues = {}
+        for r in model.get_residues():
+            het, pos, _icode = r.get_id()
+            if het != ' ' or pos in residues or pos not in ss_by_pos:
+                continue
+            try:
+                depth = float(rd[r.get_full_id()[2:]][0])
+            except KeyError:
+                depth = None
+            residues[pos] = {'aa': seq1(r.get_resname()), 'ss': ss_by_pos[pos], 'depth': depth}
+        return residues, None
     except Exception as e:
-        return None, f"Mutasyon analizi sırasında genel hata: {e}"
+        return None, f"Yapı özellikleri hesaplanırken genel hata: {e}"
     finally:
         if os.path.exists(windows_pdb_filepath):
             os.unlink(windows_pdb_filepath)
 
 
-def train_and_predict_mutation_effect(features):
+def get_structure_features(pdb_content):
+    """Kalıntı özelliklerini (DSSP, derinlik) içerik özetiyle önbellekten verir.
+    Önce süreç içi LRU, sonra Django cache (süreçler arası); yoksa hesaplar."""
+    digest = hashlib.sha256(pdb_content.encode('utf-8')).hexdigest()
+    with _structure_cache_lock:
+        if digest in _structure_cache:
+            _structure_cache.move_to_end(digest)
+            return _structure_cache[digest], None
+    cache_key = f"mp_features:{digest}"
+    residues = cache.get(cache_key)
+    if residues is None:
+        residues, error = _compute_structure_features(pdb_content)
+        if residues is None:
+            return None, error
+        cache.set(cache_key, residues, FEATURE_CACHE_TTL)
+    with _structure_cache_lock:
+        _structure_cache[digest] = residues
+        while len(_structure_cache) > _STRUCTURE_CACHE_SIZE:
+            _structure_cache.popitem(last=False)
+    return residues, None
+
+
+def _feature_row(original_aa_one, new_aa_one, depth, ss_code):
+    vol_change = abs(
+        AA_PROPERTIES.get(new_aa_one, {'vol': 0})['vol'] - AA_PROPERTIES.get(original_aa_one, {'vol': 0})['vol'])
+    hyd_change = abs(
+        AA_PROPERTIES.get(new_aa_one, {'hyd': 0})['hyd'] - AA_PROPERTIES.get(original_aa_one, {'hyd': 0})['hyd'])
+    return [vol_change, hyd_change, depth, SS_MAP.get(ss_code, 3)]
+
+
+def mutation_features(residues, mutation_str):
+    """Önbellekteki kalıntı özelliklerinden tek mutasyonun özellik vektörü.
+    Döner: (features, FEATURE_NAMES) veya (None, hata mesajı)."""
+    match = re.match(r"([A-Z])([0-9]+)([A-Z])", mutation_str.upper())
+    if not match: return None, "Geçersiz mutasyon formatı. Örnek: A123G"
+    original_aa_one, position, new_aa_one = match.groups()
+    position = int(position)
+    residue = residues.get(position)
+    if residue is None:
+        return None, f"Belirtilen pozisyonda ({position}) kalıntı bulunamadı (yapıda eksik olabilir)."
+    if residue['depth'] is None:
+        return None, f"Derinlik hesaplanamadı. {position} pozisyonu yüzeyde veya MSMS tarafından işlenemedi."
+    return _feature_row(original_aa_one, new_aa_one, residue['depth'], residue['ss']), FEATURE_NAMES
+
+
+def analyze_mutation_impact(pdb_content, mutation_str):
+    if not re.match(r"([A-Z])([0-9]+)([A-Z])", (mutation_str or '').upper()):
+        return None, "Geçersiz mutasyon formatı. Örnek: A123G"
+    residues, error = get_structure_features(pdb_content)
+    if residues is None:
+        return None, error
+    return mutation_features(residues, mutation_str)
+
+
+def analyze_mutations(pdb_content, mutations):
+    """Birden çok mutasyonu tek yapı hesabıyla değerlendirir.
+    Döner: [(mutasyon, features | None, hata | None), ...] ve tahminler tek partide."""
+    residues, error = get_structure_features(pdb_content)
+    results = []
+    for mutation in mutations:
+        if residues is None:
+            results.append((mutation, None, error))
+            continue
+        features, info = mutation_features(residues, mutation)
+        results.append((mutation, features, None if features else info))
+    return results
+
+
+def saturation_scan(pdb_content):
+    """Her kalıntı için 19 olası ikameyi tek partide puanlar.
+    Döner: ({'positions', 'wild_type', 'amino_acids', 'harmful_prob' (L×20, yabanıl tip NaN)}, None)
+    veya (None, hata mesajı). Derinliği hesaplanamayan kalıntılar atlanır."""
+    residues, error = get_structure_features(pdb_content)
+    if residues is None:
+        return None, error
+    positions = [p for p in sorted(residues)
+                 if residues[p]['depth'] is not None and residues[p]['aa'] in AA_PROPERTIES]
+    if not positions:
+        return None, "Derinliği hesaplanabilen standart kalıntı bulunamadı."
+    rows, cells = [], []
+    for i, pos in enumerate(positions):
+        res = residues[pos]
+        for j, aa in enumerate(AMINO_ACIDS):
+            if aa != res['aa']:
+                rows.append(_feature_row(res['aa'], aa, res['depth'], res['ss']))
+                cells.append((i, j))
+    probs = _CLASSIFIER.predict_proba(np.array(rows))[:, list(_CLASSIFIER.classes_).index(1)]
+    grid = np.full((len(positions), len(AMINO_ACIDS)), np.nan)
+    idx = np.array(cells)
+    grid[idx[:, 0], idx[:, 1]] = probs
+    return {'positions': positions, 'wild_type': [residues[p]['aa'] for p in positions],
+            'amino_acids': AMINO_ACIDS, 'harmful_prob': grid}, None
+
+
+def _fit_classifier():
     X_train = np.array([
         [100, 5.0, 0.5, 0], [130, 0.5, 1.2, 1], [20, 6.0, 4.0, 0], [80, 2.0, 0.8, 2],
         [90, -4.0, 2.0, 1], [140, 1.0, 0.3, 0], [10, 1.0, 5.0, 0], [5, 0.2, 6.0, 2],
         [15, 0.1, 8.0, 3], [2, 0.5, 7.5, 0], [20, 0.3, 4.5, 1],
     ])
     y_train = np.array([1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0])
-    feature_names = ['Hacim Değişimi', 'Hidrofobiklik Değişimi', 'Derinlik (Å)', 'İkincil Yapı Tipi']
     model = DecisionTreeClassifier(random_state=42, max_depth=3)
     model.fit(X_train, y_train)
-    prediction = model.predict(np.array(features).reshape(1, -1))
-    tree_rules = export_text(model, feature_names=feature_names)
-    return "Muhtemelen ZARARLI" if prediction[0] == 1 else "Muhtemelen ZARARSİZ", tree_rules
+    return model
+
+
+# Eğitim verisi sabit: model modül yüklenirken bir kez eğitilir
+_CLASSIFIER = _fit_classifier()
+_TREE_RULES = export_text(_CLASSIFIER, feature_names=FEATURE_NAMES)
+
+
+def predict_mutation_effects(feature_rows):
+    """Özellik satırlarını tek partide sınıflandırır; [True (zararlı) / False, ...]."""
+    if not feature_rows:
+        return []
+    return [bool(p == 1) for p in _CLASSIFIER.predict(np.array(feature_rows))]
+
+
+def train_and_predict_mutation_effect(features):
+    harmful = predict_mutation_effects([features])[0]
+    return "Muhtemelen ZARARLI" if harmful else "Muhtemelen ZARARSİZ", _TREE_RULES
+
+
+def _saturation_layout(pdb_content, mol_id, lang):
+    """Doygunluk taraması sonucunu ısı haritası + en hassas kalıntılar tablosu olarak çizer."""
+    from dash_apps.i18n_helper import t
+    scan, error_msg = saturation_scan(pdb_content)
+    if scan is None:
+        return dbc.Alert(error_msg, color="warning")
+
+    grid = scan['harmful_prob']
+    labels = [f"{aa}{pos}" for aa, pos in zip(scan['wild_type'], scan['positions'])]
+    fig = go.Figure(go.Heatmap(
+        z=grid.T, x=labels, y=scan['amino_acids'], colorscale='RdYlGn_r', zmin=0, zmax=1,
+        colorbar={'title': t('mp_harmful_prob', lang)},
+        hovertemplate='%{x} → %{y}: %{z:.2f}<extra></extra>'))
+    fig.update_layout(height=520, margin={'l': 40, 'r': 20, 't': 30, 'b': 40},
+                      xaxis={'title': t('mp_residue', lang)}, yaxis={'title': t('mp_substitution', lang)})
+
+    harmful_counts = np.nansum(grid >= 0.5, axis=1).astype(int)
+    top = np.argsort(-np.nanmean(grid, axis=1), kind='stable')[:15]
+    rows = [html.Tr([html.Td(labels[i]), html.Td(f"{harmful_counts[i]}/19"),
+                     html.Td(f"{np.nanmean(grid[i]):.2f}")]) for i in top]
+    table = dbc.Table([html.Thead(html.Tr([html.Th(t('mp_residue', lang)),
+                                           html.Th(t('mp_harmful_subs', lang)),
+                                           html.Th(t('mp_harmful_prob', lang))])),
+                       html.Tbody(rows)], bordered=True, striped=True, hover=True, size="sm")
+
+    return html.Div([
+        html.H4(f"{t('mp_saturation_results', lang)} — {mol_id}"),
+        html.P(f"{len(labels)} × 19 = {len(labels) * 19} {t('mp_mutation', lang).lower()}",
+               className="text-muted"),
+        html.Hr(),
+        dcc.Graph(figure=fig),
+        html.H5(t('mp_most_sensitive', lang), className="mt-4"),
+        table,
+    ])
 
 
 def mutation_create_layout(lang='en'):
@@ -228,6 +376,9 @@ def mutation_create_layout(lang='en'):
                             placeholder="A123G\nC45D\nW117A\n...",
                             style={'width': '100%', 'height': 100},
                         ),
+                        dbc.Checkbox(id='mp-saturation-toggle', value=False, className="mt-2",
+                                     label=t('mp_saturation_scan', lang)),
+                        html.Small(t('mp_saturation_note', lang), className="text-muted d-block"),
                         html.Hr(),
                         dbc.Label(t('mp_method_select', lang), className="fw-bold"),
                         dbc.Row([
@@ -347,12 +498,13 @@ def update_molecule_selector(all_mols):
     Input('mp-ai-modal-confirm', 'n_clicks'),
     State('mutation-mol-selector', 'value'),
     State('mutation-input', 'value'),
+    State('mp-saturation-toggle', 'value'),
     State('molecules-store', 'data'),
     State('button-clicks-store', 'data'),
     State('mp-lang-store', 'data'),
     prevent_initial_call=True
 )
-def master_results_callback(calc_clicks, ai_clicks, selected_mol_id, mutation_str, all_mols, prev_clicks, lang=None, **kwargs):
+def master_results_callback(calc_clicks, ai_clicks, selected_mol_id, mutation_str, saturation, all_mols, prev_clicks, lang=None, **kwargs):
     from dash_apps.i18n_helper import t
     lang = lang or 'en'
     calc_clicks = calc_clicks or 0
@@ -382,7 +534,7 @@ def master_results_callback(calc_clicks, ai_clicks, selected_mol_id, mutation_st
 
     if triggered_button == 'calculate':
         initial_outputs = (None, {'display': 'none'})
-        if not selected_mol_id or not mutation_str:
+        if not selected_mol_id or not (mutation_str or saturation):
             alert = dbc.Alert("Lütfen bir molekül seçin ve analiz edilecek mutasyonları girin.", color="warning")
             return alert, *initial_outputs, current_clicks
 
@@ -393,6 +545,9 @@ def master_results_callback(calc_clicks, ai_clicks, selected_mol_id, mutation_st
 
         pdb_content = molecule_data['content']
 
+        if saturation:
+            return _saturation_layout(pdb_content, selected_mol_id, lang), *initial_outputs, current_clicks
+
         mutations_to_process = [m.strip() for m in mutation_str.strip().split('\n') if m.strip()]
 
         if not mutations_to_process:
@@ -403,11 +558,13 @@ def master_results_callback(calc_clicks, ai_clicks, selected_mol_id, mutation_st
         failed_results = []
         feature_names_for_header = ['Hacim Değişimi', 'Hidrofobiklik Değişimi', 'Derinlik (Å)', 'İkincil Yapı Tipi']
 
-        for mutation in mutations_to_process:
-            features, error_msg = analyze_mutation_impact(pdb_content, mutation)
+        # Yapı özellikleri bir kez hesaplanır (önbellek), tüm mutasyonlar tek partide sınıflanır
+        analyzed = analyze_mutations(pdb_content, mutations_to_process)
+        verdicts = iter(predict_mutation_effects([f for _m, f, _e in analyzed if f]))
 
+        for mutation, features, error_msg in analyzed:
             if features:
-                prediction, tree_rules = train_and_predict_mutation_effect(features)
+                prediction = "Muhtemelen ZARARLI" if next(verdicts) else "Muhtemelen ZARARSİZ"
                 result_color = "danger" if "ZARARLI" in prediction else "success"
 
                 table_rows.append(html.Tr([
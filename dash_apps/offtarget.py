@@ -1,19 +1,23 @@
 """
-dash_apps.offtarget — Genom çapında off-target taraması (NCBI BLAST).
+dash_apps.offtarget — Genom çapında off-target taraması.
 
 CHOPCHOP gibi: guide'ı REFERANS GENOMA hizalar ve off-target'ları uyumsuzluk
-sayısına göre MM0/MM1/MM2/MM3 olarak raporlar. Genom barındırmadan, hizalamayı
-NCBI'nin uzak BLAST servisine yaptırırız (Biopython).
+sayısına göre MM0/MM1/MM2/MM3 olarak raporlar. İki motor vardır:
+
+  1) Yerel indeks (dash_apps.genome_index) — operatör `manage.py
+     build_genome_index` ile tür+enzim için indeks kurduysa kullanılır.
+     Milisaniyeler sürer; tüm guide listesi tek partide süreç havuzunda
+     taranır (scan_offtargets). Yalnız enzimin PAM'ine komşu siteler sayılır.
+  2) NCBI uzak BLAST (Biopython) — indeks yoksa yedek. Yavaştır (NCBI
+     kuyruğu): guide başına ~30-90 sn; bu yüzden yalnız birkaç guide.
 
 Önemli:
-  - Veritabanı 'refseq_genomic' (RefSeq referans genomları) + organizma filtresi.
-    'nt'nin aksine mRNA/EST/patent/çoklu assembly tekrarı YOKtur; sayılar temizdir.
   - Uyumsuzluk, guide'ın 20 bp'lik hedef bölgesi üzerinden sayılır (Hsu 2013 yöntemi).
   - MM0 (tam eşleşme) hedefin KENDİSİNİ de içerir (beklenen ≥1).
-  - Yavaştır (NCBI kuyruğu): guide başına ~30-90 sn; bu yüzden yalnız birkaç guide.
   - Ağ/servis erişilemezse nazikçe hata döner, çökmemez.
 """
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +27,56 @@ HITLIST = 100
 MIN_COVER_SLACK = 3
 
 
-def blast_offtarget(guide, organism="Homo sapiens", hitlist=HITLIST):
+# Yerel taramada hit başına ayrıntı (kontig/konum/dizi) döndürülecek kayıt sayısı
+LOCAL_MAX_HITS = 20
+
+
+def local_index_path(species, enzyme="SpCas9"):
+    """Tür+enzim için yerel indeks dizini; kurulmamışsa None."""
+    from django.conf import settings
+    from dash_apps.genome_index import GenomeIndex
+    base = getattr(settings, "GENOME_INDEX_DIR", None)
+    if not base or not species:
+        return None
+    path = os.path.join(str(base), species, enzyme)
+    return path if GenomeIndex.exists(path) else None
+
+
+def scan_offtargets(guides, species, enzyme="SpCas9", max_mismatches=3,
+                    max_hits=LOCAL_MAX_HITS, workers=None):
+    """Guide listesinin TAMAMINI yerel indekste tek partide tarar (sıra korunur).
+
+    Döner: guide başına blast_offtarget ile aynı biçimde dict listesi;
+      {'ok': True, 'mm': {0..max_mismatches: int}, 'db': 'local:<tür>', 'hits': [...]}
+    İndeks yoksa her guide için {'ok': False, 'error': 'no_local_index'}.
+    """
+    guides = [(g or "").strip().upper() for g in guides]
+    path = local_index_path(species, enzyme)
+    if path is None:
+        return [{"ok": False, "error": "no_local_index"} for _ in guides]
+
+    from django.conf import settings
+    from dash_apps.genome_index import GenomeIndex, search_parallel
+    index = GenomeIndex(path)
+    valid = [i for i, g in enumerate(guides) if len(g) == index.guide_len]
+    if workers is None:
+        workers = getattr(settings, "OFFTARGET_WORKERS", 1)
+    found = search_parallel(path, [guides[i] for i in valid], max_mismatches=max_mismatches,
+                            max_hits=max_hits, workers=workers)
+    results = [{"ok": False, "error": "guide_length"} for _ in guides]
+    for i, (counts, hits) in zip(valid, found):
+        results[i] = {"ok": True, "mm": dict(enumerate(counts)),
+                      "db": f"local:{species}", "hits": hits}
+    return results
+
+
+def blast_offtarget(guide, organism="Homo sapiens", hitlist=HITLIST,
+                    species=None, enzyme="SpCas9"):
     """Bir guide için genom çapında off-target taraması.
 
+    species verilmişse ve o tür+enzim için yerel indeks varsa uzak BLAST
+    yerine yerel indeks kullanılır (bkz. scan_offtargets).
+
     Döner: dict
       {'ok': True, 'mm': {0:int, 1:int, 2:int, 3:int}}
       {'ok': False, 'error': '<kod>'}   ('biopython_missing' | 'blast_error' |
@@ -35,6 +86,11 @@ def blast_offtarget(guide, organism="Homo sapiens", hitlist=HITLIST):
     if len(guide) < 15:
         return {"ok": False, "error": "guide_too_short"}
 
+    if species and local_index_path(species, enzyme):
+        res = scan_offtargets([guide], species, enzyme, workers=1)[0]
+        if res.get("ok"):
+            return res
+
     try:
         from Bio.Blast import NCBIWWW, NCBIXML
     except Exception:
@@ -0,0 +1,99 @@
+"""
+dash_apps.orf_finder — NumPy tabanlı altı çerçeveli ORF (açık okuma çerçevesi) bulucu.
+
+Eski plasmid_map.find_orfs her ATG'den itibaren Bio.Seq dilimleyerek kodon
+kodon ilerliyordu (en kötü durumda karesel, kodon başına yeni str). Burada:
+
+  - Dizi bir kez uint8'e çevrilir; stop (TAA/TAG/TGA) ve ATG konumları her
+    iplik için tek vektörel karşılaştırmayla bulunur.
+  - Her stop kodonu, aynı çerçevedeki bir önceki stop'tan sonraki ilk ATG ile
+    eşleştirilir (np.searchsorted) — eski taramayla aynı kural, O(n).
+  - Dairesel dizilerde (plazmit) orijinden geçen ORF'ler de bulunur: dizi üç
+    kez ardışık yazılır ve ortadaki kopyadaki stop'lar için en çok bir tur
+    (dizi boyu) geriye bakılır. Orijini aşan ORF'de end < start olur.
+
+Dönüş sözlükleri plasmid_map'in beklediği biçimdedir:
+{'start', 'end', 'strand', 'length', 'aa'} (0 tabanlı, end hariç).
+"""
+import numpy as np
+
+_A, _C, _G, _T = (ord(b) for b in 'ACGT')
+_COMPLEMENT = str.maketrans('ACGTUN', 'TGCAAN')
+
+
+def _codon_masks(codes):
+    """Her konumdan başlayan kodon için (stop, ATG) boolean dizileri."""
+    c0, c1, c2 = codes[:-2], codes[1:-1], codes[2:]
+    stop = (c0 == _T) & (((c1 == _A) & ((c2 == _A) | (c2 == _G))) | ((c1 == _G) & (c2 == _A)))
+    atg = (c0 == _A) & (c1 == _T) & (c2 == _G)
+    return np.flatnonzero(stop), np.flatnonzero(atg)
+
+
+def _strand_orfs(seq, min_len, circular):
+    """Tek iplik → [(ATG konumu, uzunluk, çerçeve)] (konum, ipliğin kendi koordinatında)."""
+    n = len(seq)
+    text = seq * 3 + seq[:2] if circular else seq
+    codes = np.frombuffer(text.encode('ascii', 'replace'), dtype=np.uint8)
+    stops, atgs = _codon_masks(codes)
+    out = []
+    for frame in range(3):
+        s = stops[stops % 3 == frame]
+        a = atgs[atgs % 3 == frame]
+        if not len(s) or not len(a):
+            continue
+        # Bir önceki stop'un bitişi (ilk stop için çerçeve başı)
+        prev_end = np.empty_like(s)
+        prev_end[0] = frame
+        prev_end[1:] = s[:-1] + 3
+        if circular:
+            # Yalnız ortadaki kopyadaki stop'lar; ORF en çok bir tur uzunluğunda
+            keep = (s >= n) & (s < 2 * n)
+            s, prev_end = s[keep], np.maximum(prev_end[keep], s[keep] + 3 - n)
+        k = np.searchsorted(a, prev_end)
+        has = k < len(a)
+        k = np.minimum(k, len(a) - 1)
+        first = a[k]
+        ok = has & (first < s)
+        lengths = s + 3 - first
+        ok &= lengths >= min_len
+        for start, length in zip(first[ok].tolist(), lengths[ok].tolist()):
+            out.append((start % n if circular else start, length, frame))
+    return out
+
+
+def find_orfs(sequence, min_len=60, circular=False, max_orfs=None):
+    """
+    Dizideki ORF'leri (ATG → stop, her iki iplik, 3'er çerçeve) bulur.
+
+    circular=True ise orijinden geçen ORF'ler de döner (end < start).
+    Sonuç uzunluğa göre azalan sıradadır (eşitlikte ileri iplik, çerçeve, konum);
+    max_orfs verilirse ilk max_orfs kadarı döner.
+    """
+    seq = (sequence or '').upper().replace('U', 'T')
+    n = len(seq)
+    if n < 3:
+        return []
+    orfs = []
+    for strand, nuc in ((1, seq), (-1, seq.translate(_COMPLEMENT)[::-1])):
+        found = _strand_orfs(nuc, min_len, circular)
+        found.sort(key=lambda x: (x[2], x[0]))
+        for pos, length, _frame in found:
+            if strand == 1:
+                start = pos
+            else:
+                start = n - pos - length
+                if start < 0:
+                    start += n
+            end = start + length
+            if circular and end > n:
+                end -= n
+            orfs.append({
+                'start': start,
+                'end': end,
+                'strand': strand,
+                'length': length,
+                'aa': length // 3 - 1,
+            })
+    # Uzunluğa göre sırala, en uzun ORF'ler önce
+    orfs.sort(key=lambda x: -x['length'])
+    return orfs[:max_orfs] if max_orfs else orfs
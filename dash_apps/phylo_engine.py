@@ -0,0 +1,185 @@
+"""
+dash_apps.phylo_engine — NumPy mesafe matrisi ve NJ/UPGMA ağaç kurucu.
+
+Bio.Phylo.TreeConstruction saf Python'dur: DistanceCalculator O(n²·L),
+DistanceTreeConstructor O(n³) yorumlanan döngüyle çalışır; birkaç yüz takson
+pratik değildir. Burada:
+
+  - Hizalama bir kez (n, L) uint8 matrise çevrilir; tüm ikili mesafeler satır
+    blokları halinde yayınlama (broadcasting) ile hesaplanır (BLOCK_BYTES
+    bellek sınırı). Modeller: 'identity' (Biopython ile aynı: uyumsuz / L),
+    'p' (boşluksuz pozisyonlarda p-mesafesi), 'jc69', 'k2p'.
+  - NJ ve UPGMA aynı mesafe matrisinde vektörel çalışır; en küçük çift seçimi,
+    eşitlik kırma ve kayan nokta işlem sırası Biopython'unkiyle aynıdır, bu
+    yüzden Newick çıktısı birebir aynıdır. Ağaçlar Bio.Phylo Clade nesneleridir
+    (tree_to_plotly ve Newick yazımı değişmeden çalışır).
+"""
+import numpy as np
+
+DISTANCE_MODELS = ('identity', 'p', 'jc69', 'k2p')
+BLOCK_BYTES = 64 * 1024 * 1024
+# JC69/K2P doygunluğu (log argümanı ≤ 0) veya ortak pozisyon yoksa kullanılan mesafe
+SATURATED_DISTANCE = 5.0
+
+# Baz sınıfları: A=0, G=1 (pürin), C=2, T/U=3 (pirimidin), 4 = diğer harf, 5 = boşluk
+_CLASS = np.full(256, 4, dtype=np.uint8)
+for _ch, _cls in (('A', 0), ('G', 1), ('C', 2), ('T', 3), ('U', 3)):
+    _CLASS[ord(_ch)] = _CLASS[ord(_ch.lower())] = _cls
+for _ch in '-.*':
+    _CLASS[ord(_ch)] = 5
+
+
+def encode_alignment(sequences):
+    """Eşit uzunlukta dizi listesi → (n, L) uint8 matris (ASCII)."""
+    length = len(sequences[0])
+    if any(len(s) != length for s in sequences):
+        raise ValueError('Hizalamadaki diziler eşit uzunlukta olmalı')
+    return np.frombuffer(''.join(sequences).encode('ascii', 'replace'),
+                         dtype=np.uint8).reshape(len(sequences), length)
+
+
+def distance_matrix(codes, model='identity', block_bytes=BLOCK_BYTES):
+    """(n, L) kod matrisi → (n, n) float64 mesafe matrisi."""
+    if model not in DISTANCE_MODELS:
+        raise ValueError(f"Bilinmeyen mesafe modeli: {model}")
+    n, length = codes.shape
+    out = np.zeros((n, n), dtype=np.float64)
+    if model != 'identity':
+        codes = _CLASS[codes]
+    rows = max(1, block_bytes // max(1, n * length * 4))
+    for i0 in range(0, n, rows):
+        a = codes[i0:i0 + rows, None, :]
+        b = codes[None, :, :]
+        if model == 'identity':
+            # Biopython 'identity': 1 - eşleşen / L (boşluk dahil her pozisyon)
+            out[i0:i0 + rows] = 1 - (a == b).sum(axis=2) / length
+            continue
+        diff = a != b
+        if model == 'p':
+            valid = (a != 5) & (b != 5)
+            sites = valid.sum(axis=2)
+            mism = (diff & valid).sum(axis=2)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[i0:i0 + rows] = np.where(sites > 0, mism / sites, 1.0)
+            continue
+        valid = (a < 4) & (b < 4)
+        sites = valid.sum(axis=2)
+        mism = diff & valid
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if model == 'jc69':
+                p = mism.sum(axis=2) / sites
+                arg = 1 - 4 / 3 * p
+                d = -0.75 * np.log(arg)
+                bad = (sites == 0) | (arg <= 0)
+            else:
+                transitions = (mism & ((a >> 1) == (b >> 1))).sum(axis=2)
+                P = transitions / sites
+                Q = (mism.sum(axis=2) - transitions) / sites
+                arg1, arg2 = 1 - 2 * P - Q, 1 - 2 * Q
+                d = -0.5 * np.log(arg1) - 0.25 * np.log(arg2)
+                bad = (sites == 0) | (arg1 <= 0) | (arg2 <= 0)
+        out[i0:i0 + rows] = np.where(bad, SATURATED_DISTANCE, np.abs(d))
+    np.fill_diagonal(out, 0.0)
+    return out
+
+
+def _row_sums(d):
+    """Satır toplamları soldan sağa sıralı (Biopython'un Python döngüsüyle aynı yuvarlama)."""
+    return np.cumsum(d, axis=1)[:, -1]
+
+
+def nj(dist, names):
+    """Neighbor-Joining → Bio.Phylo Tree (köksüz); DistanceTreeConstructor.nj ile aynı."""
+    from Bio.Phylo import BaseTree
+
+    d = np.array(dist, dtype=np.float64)
+    clades = [BaseTree.Clade(None, name) for name in names]
+    m = len(clades)
+    if m == 1:
+        return BaseTree.Tree(clades[0], rooted=False)
+    if m == 2:
+        clades[1].branch_length = float(d[1, 0] / 2.0)
+        clades[0].branch_length = float(d[1, 0] - clades[1].branch_length)
+        inner = BaseTree.Clade(None, 'Inner')
+        inner.clades.extend([clades[1], clades[0]])
+        return BaseTree.Tree(inner, rooted=False)
+
+    lower = np.tril(np.ones((m, m), dtype=bool), -1)
+    inner_count = 0
+    inner = None
+    while m > 2:
+        node_dist = _row_sums(d) / (m - 2)
+        q = d - node_dist[:, None] - node_dist[None, :]
+        q[~lower[:m, :m]] = np.inf
+        flat = int(np.argmin(q))  # satır-öncelikli ilk en küçük (Biopython: katı '>')
+        min_i, min_j = divmod(flat, m)
+        if (min_i, min_j) == (1, 0):
+            min_i, min_j = 0, 1  # Biopython başlangıç değeri (0, 1) yenilmezse korunur
+
+        clade1, clade2 = clades[min_i], clades[min_j]
+        inner_count += 1
+        inner = BaseTree.Clade(None, f"Inner{inner_count}")
+        inner.clades.extend([clade1, clade2])
+        dij = d[min_i, min_j]
+        clade1.branch_length = float((dij + node_dist[min_i] - node_dist[min_j]) / 2.0)
+        clade2.branch_length = float(dij - clade1.branch_length)
+
+        clades[min_j] = inner
+        del clades[min_i]
+        new = (d[min_i] + d[min_j] - dij) / 2.0
+        new[[min_i, min_j]] = d[min_j, [min_i, min_j]]
+        d[min_j, :] = new
+        d[:, min_j] = new
+        d = np.delete(np.delete(d, min_i, axis=0), min_i, axis=1)
+        m -= 1
+
+    if clades[0] is inner:
+        clades[0].branch_length = 0
+        clades[1].branch_length = float(d[1, 0])
+        clades[0].clades.append(clades[1])
+        root = clades[0]
+    else:
+        clades[0].branch_length = float(d[1, 0])
+        clades[1].branch_length = 0
+        clades[1].clades.append(clades[0])
+        root = clades[1]
+    return BaseTree.Tree(root, rooted=False)
+
+
+def upgma(dist, names):
+    """UPGMA → Bio.Phylo Tree (köklü); DistanceTreeConstructor.upgma ile aynı."""
+    from Bio.Phylo import BaseTree
+
+    d = np.array(dist, dtype=np.float64)
+    clades = [BaseTree.Clade(None, name) for name in names]
+    heights = [0.0] * len(clades)
+    m = len(clades)
+    lower = np.tril(np.ones((m, m), dtype=bool), -1)
+    inner_count = 0
+    inner = None
+    while m > 1:
+        sub = np.where(lower[:m, :m], d, np.inf)
+        # Biopython '>=' ile tarar: satır-öncelikli sıradaki SON en küçük
+        flat = sub.size - 1 - int(np.argmin(sub.ravel()[::-1]))
+        min_i, min_j = divmod(flat, m)
+        min_dist = float(d[min_i, min_j])
+
+        clade1, clade2 = clades[min_i], clades[min_j]
+        inner_count += 1
+        inner = BaseTree.Clade(None, f"Inner{inner_count}")
+        inner.clades.extend([clade1, clade2])
+        clade1.branch_length = min_dist * 1.0 / 2 - heights[min_i]
+        clade2.branch_length = min_dist * 1.0 / 2 - heights[min_j]
+        heights[min_j] = max(heights[min_i] + clade1.branch_length,
+                             heights[min_j] + clade2.branch_length)
+
+        clades[min_j] = inner
+        del clades[min_i], heights[min_i]
+        new = (d[min_i] + d[min_j]) / 2
+        new[[min_i, min_j]] = d[min_j, [min_i, min_j]]
+        d[min_j, :] = new
+        d[:, min_j] = new
+        d = np.delete(np.delete(d, min_i, axis=0), min_i, axis=1)
+        m -= 1
+    inner.branch_length = 0
+    return BaseTree.Tree(inner)
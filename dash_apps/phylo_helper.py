@@ -2,18 +2,25 @@
 Filogenetik ağaç ortak motoru.
 Hem sekans analizinde (çoklu dizi) hem ayrı Filogenetik Ağaç aracında kullanılır.
 
-Akış: çoklu dizi → basit hizalama → mesafe matrisi → NJ/UPGMA ağacı →
+Akış: çoklu dizi → çoklu hizalama → mesafe matrisi → NJ/UPGMA ağacı →
       Plotly görseli + Newick metni + (opsiyonel) AI evrimsel yorum.
+Mesafe ve ağaç kurulumu NumPy ile yapılır (dash_apps.phylo_engine); sonuçlar
+Bio.Phylo DistanceCalculator('identity') + DistanceTreeConstructor ile aynıdır.
 
-NOT: Tam MSA (ClustalW/MUSCLE) için harici araç gerekir; burada diziler
-en kısa ortak uzunluğa kırpılarak basit bir hizalama yapılır. Aynı gen/bölgeye
-ait benzer diziler için (örn. ortolog gen dizileri) bu pratik bir yaklaşımdır.
+Uzunlukları farklı diziler sunucuda hizalanır (dash_apps.msa_engine); eşit
+uzunluktaki girdi hazır hizalama kabul edilir. Hizalama bütçesi aşılırsa
+eski davranışa dönülür: diziler en kısa ortak uzunluğa kırpılır.
 """
 import io
 import warnings
 
+import numpy as np
+
 warnings.filterwarnings('ignore')
 
+# Bu sayıya kadar takson için kare mesafe matrisi de döner (arayüz tablosu)
+DISTANCE_MATRIX_MAX_TAXA = 50
+
 
 def _clean_taxon_name(record):
     """SeqRecord'dan okunabilir bir takson (tür) adı çıkarır."""
@@ -34,12 +41,13 @@ def _clean_taxon_name(record):
     return name.replace(' ', '_').replace(':', '_').replace(',', '_')[:30]
 
 
-def build_phylo_tree(records, method='nj'):
+def build_phylo_tree(records, method='nj', model='identity'):
     """
     SeqRecord listesinden filogenetik ağaç kurar.
 
     records: Bio.SeqRecord listesi (en az 3 dizi gerekir)
     method: 'nj' (Neighbor-Joining) veya 'upgma'
+    model: mesafe modeli — 'identity' (varsayılan), 'p', 'jc69' veya 'k2p'
 
     Döner: dict {
         'success': bool,
@@ -50,26 +58,27 @@ def build_phylo_tree(records, method='nj'):
         'method': kullanılan yöntem,
         'n_taxa': dizi sayısı,
         'aln_length': hizalama uzunluğu,
+        'alignment': 'input' (hazır), 'msa' (sunucuda hizalandı) veya 'trimmed' (kırpıldı),
+        'alignment_note': bütçe aşımında kırpma nedeni (str) veya None,
+        'aligned_fasta': hizalı diziler (FASTA metni),
         'distance_summary': mesafe matrisi özeti (str),
+        'branch_lengths', 'pairwise_distances',
+        'distance_matrix': kare matris (en çok DISTANCE_MATRIX_MAX_TAXA takson) veya None,
     }
     """
-    from Bio.Seq import Seq
-    from Bio.SeqRecord import SeqRecord
-    from Bio.Align import MultipleSeqAlignment
-    from Bio.Phylo.TreeConstruction import DistanceCalculator, DistanceTreeConstructor
+    from dash_apps import msa_engine, phylo_engine
 
     if not records or len(records) < 3:
         return {'success': False,
                 'error': 'Filogenetik ağaç için en az 3 dizi gerekir.'}
 
     try:
-        # Basit hizalama: en kısa ortak uzunluğa kırp
-        min_len = min(len(r.seq) for r in records)
+        min_len = min(len(str(r.seq).replace('-', '')) for r in records)
         if min_len < 20:
             return {'success': False, 'error': 'Diziler ağaç için çok kısa.'}
 
         seen_names = {}
-        aln_records = []
+        taxa, aligned = [], []
         for r in records:
             name = _clean_taxon_name(r)
             # Aynı isim tekrarını engelle
@@ -78,22 +87,30 @@ def build_phylo_tree(records, method='nj'):
                 name = f"{name}_{seen_names[name]}"
             else:
                 seen_names[name] = 0
-            aln_records.append(SeqRecord(Seq(str(r.seq)[:min_len].upper()), id=name))
-
-        alignment = MultipleSeqAlignment(aln_records)
-        taxa = [rec.id for rec in aln_records]
+            taxa.append(name)
+            aligned.append(str(r.seq).upper())
 
-        # Mesafe matrisi (identity = paylaşılan pozisyon oranı)
-        calc = DistanceCalculator('identity')
-        dm = calc.get_distance(alignment)
+        alignment, alignment_note = 'input', None
+        if len({len(s) for s in aligned}) > 1:
+            try:
+                aligned = msa_engine.align_sequences(aligned)
+                alignment = 'msa'
+            except ValueError as e:
+                # Bütçe aşımı: en kısa ortak uzunluğa kırp
+                shortest = min(len(s) for s in aligned)
+                aligned = [s[:shortest] for s in aligned]
+                alignment, alignment_note = 'trimmed', str(e)
+
+        # Mesafe matrisi (identity = 1 - paylaşılan pozisyon oranı)
+        model = (model or 'identity').lower()
+        dm = phylo_engine.distance_matrix(phylo_engine.encode_alignment(aligned), model=model)
 
-        constructor = DistanceTreeConstructor()
         method = (method or 'nj').lower()
         if method == 'upgma':
-            tree = constructor.upgma(dm)
+            tree = phylo_engine.upgma(dm, taxa)
         else:
             method = 'nj'
-            tree = constructor.nj(dm)
+            tree = phylo_engine.nj(dm, taxa)
 
         # İç düğüm adlarını temizle (Inner1, Inner2 görselde gürültü yapar)
         for clade in tree.find_clades():
@@ -118,17 +135,15 @@ def build_phylo_tree(records, method='nj'):
         branch_lengths.sort(key=lambda x: x['branch_length'])
 
         # İkili mesafe tablosu (taksonlar arası tüm uzaklıklar)
-        pairwise = []
-        for i in range(len(taxa)):
-            for j in range(i + 1, len(taxa)):
-                try:
-                    d = dm[taxa[i], taxa[j]]
-                    pairwise.append({'a': taxa[i], 'b': taxa[j],
-                                     'distance': round(d, 4)})
-                except Exception:
-                    pass
+        iu, ju = np.triu_indices(len(taxa), k=1)
+        pairwise = [{'a': taxa[i], 'b': taxa[j], 'distance': round(d, 4)}
+                    for i, j, d in zip(iu.tolist(), ju.tolist(), dm[iu, ju].tolist())]
         pairwise.sort(key=lambda x: x['distance'])
 
+        matrix = None
+        if len(taxa) <= DISTANCE_MATRIX_MAX_TAXA:
+            matrix = [[round(v, 4) for v in row] for row in dm.tolist()]
+
         return {
             'success': True,
             'tree': tree,
@@ -136,27 +151,32 @@ def build_phylo_tree(records, method='nj'):
             'taxa': taxa,
             'method': 'Neighbor-Joining (NJ)' if method == 'nj' else 'UPGMA',
             'n_taxa': len(taxa),
-            'aln_length': min_len,
+            'aln_length': len(aligned[0]),
+            'alignment': alignment,
+            'alignment_note': alignment_note,
+            'aligned_fasta': msa_engine.to_fasta(taxa, aligned),
             'distance_summary': dist_summary,
             'branch_lengths': branch_lengths,
             'pairwise_distances': pairwise,
+            'distance_matrix': matrix,
+            'distance_model': model,
         }
     except Exception as e:
         return {'success': False, 'error': f'Ağaç oluşturulamadı: {e}'}
 
 
 def _distance_summary(dm, taxa):
-    """Mesafe matrisinden en yakın ve en uzak tür çiftlerini özetler."""
+    """Mesafe matrisinden (n×n numpy) en yakın ve en uzak tür çiftlerini özetler."""
     try:
-        pairs = []
-        for i in range(len(taxa)):
-            for j in range(i + 1, len(taxa)):
-                pairs.append((dm[taxa[i], taxa[j]], taxa[i], taxa[j]))
-        if not pairs:
+        if len(taxa) < 2:
             return ""
-        pairs.sort()
-        closest = pairs[0]
-        farthest = pairs[-1]
+        iu, ju = np.triu_indices(len(taxa), k=1)
+        vals = dm[iu, ju]
+        # Eşit mesafede ad sırası (eski tuple sıralamasıyla aynı seçim)
+        order = np.lexsort((np.array(taxa)[ju], np.array(taxa)[iu], vals))
+        lo, hi = order[0], order[-1]
+        closest = (float(vals[lo]), taxa[iu[lo]], taxa[ju[lo]])
+        farthest = (float(vals[hi]), taxa[iu[hi]], taxa[ju[hi]])
         return (f"En yakın çift: {closest[1]} ↔ {closest[2]} (mesafe {closest[0]:.4f}); "
                 f"En uzak çift: {farthest[1]} ↔ {farthest[2]} (mesafe {farthest[0]:.4f})")
     except Exception:
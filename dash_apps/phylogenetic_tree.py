@@ -57,6 +57,18 @@ def create_phylo_layout(lang='tr'):
             ], value='nj'),
         html.Small(t('ph_method_hint', lang), className="text-muted d-block mt-1"),
 
+        dbc.Label(t('ph_model', lang), className="fw-bold mt-3"),
+        dbc.Select(
+            id='ph-model',
+            options=[
+                {'label': t('ph_model_identity', lang), 'value': 'identity'},
+                {'label': t('ph_model_p', lang), 'value': 'p'},
+                {'label': 'Jukes-Cantor (JC69)', 'value': 'jc69'},
+                {'label': 'Kimura 2-parametre (K2P)' if lang == 'tr' else 'Kimura 2-parameter (K2P)',
+                 'value': 'k2p'},
+            ], value='identity'),
+        html.Small(t('ph_model_hint', lang), className="text-muted d-block mt-1"),
+
         dbc.Button(
             [html.I(className="fas fa-project-diagram me-2"), t('ph_build', lang)],
             id='ph-build-btn', color='success', className='w-100 mt-3'),
@@ -174,10 +186,11 @@ def toggle_tree_modal(open_click, cancel_click, confirm_click, stored_fasta, pas
     State('ph-fasta-store', 'data'),
     State('ph-paste', 'value'),
     State('ph-method', 'value'),
+    State('ph-model', 'value'),
     State('ph-lang-store', 'data'),
     prevent_initial_call=True
 )
-def build_tree(n_clicks, stored_fasta, paste_text, method, lang, **kwargs):
+def build_tree(n_clicks, stored_fasta, paste_text, method, model, lang, **kwargs):
     from dash_apps.i18n_helper import t
     lang = lang or 'tr'
     if not n_clicks:
@@ -202,7 +215,7 @@ def build_tree(n_clicks, stored_fasta, paste_text, method, lang, **kwargs):
 
     try:
         from dash_apps.phylo_helper import build_phylo_tree, tree_to_plotly
-        tree_result = build_phylo_tree(records, method=method or 'nj')
+        tree_result = build_phylo_tree(records, method=method or 'nj', model=model or 'identity')
         if not tree_result.get('success'):
             return dbc.Alert(tree_result.get('error', t('ph_error', lang)),
                              color="danger"), no_update
@@ -214,6 +227,12 @@ def build_tree(n_clicks, stored_fasta, paste_text, method, lang, **kwargs):
                 color="success"),
         ]
 
+        if tree_result.get('alignment') == 'msa':
+            children.append(html.P(t('ph_aligned_msa', lang), className="text-muted small"))
+        elif tree_result.get('alignment') == 'trimmed':
+            children.append(dbc.Alert(f"{t('ph_aligned_trimmed', lang)} ({tree_result['alignment_note']})",
+                                      color="warning", className="small py-2"))
+
         fig = tree_to_plotly(tree_result)
         if fig is not None:
             children.append(dcc.Graph(figure=fig, config={'displayModeBar': True}))
@@ -293,6 +312,15 @@ def build_tree(n_clicks, stored_fasta, paste_text, method, lang, **kwargs):
             ], open=True, className="mb-2"))
 
         # Newick (katlanabilir)
+        # Sunucuda hizalandıysa hizalamayı göster (AlignmentChart FASTA'yı doğrudan alır)
+        if tree_result.get('alignment') == 'msa':
+            import dash_bio
+            children.append(html.Details([
+                html.Summary(t('ph_alignment_title', lang), className="text-muted"),
+                dash_bio.AlignmentChart(id='ph-alignment-chart', data=tree_result['aligned_fasta'],
+                                        showconservation=True, showgap=False, height=400),
+            ], className="mt-3"))
+
         children.append(html.Details([
             html.Summary("Newick", className="text-muted"),
             html.Code(tree_result['newick'],
@@ -3,10 +3,11 @@ Plazmit Harita Görselleştirici (Plotly interaktif dairesel harita).
 
 Özellikler:
   - DNA dizisi yapıştırma ile dairesel plazmit haritası
-  - Otomatik ORF (gen adayı) tespiti — 6 çerçevede start→stop
+  - Otomatik ORF (gen adayı) tespiti — 6 çerçevede start→stop (orijinden geçenler dahil)
   - Restriksiyon kesim bölgeleri (tek-kesim yapanlar haritada)
   - İnteraktif Plotly dairesel harita (hover, zoom)
   - Örnek plazmit (pUC19 benzeri)
+  - ENA accession ile dizi çekme (paylaşımlı dizi önbelleği üzerinden)
   - Opsiyonel AI yorumu (5 kredi)
 """
 import re
@@ -43,69 +44,26 @@ def clean_sequence(seq_text):
     return re.sub(r'[^A-Za-z]', '', seq).upper()
 
 
-def find_orfs(sequence, min_len=60):
+def find_orfs(sequence, min_len=60, circular=True):
     """
     Dizide ORF (Açık Okuma Çerçevesi) bulur — ATG'den stop kodona.
     Her iki yön (ileri/geri), 3 çerçeve. min_len = minimum nükleotid uzunluğu.
+    Plazmit dairesel kabul edilir: orijinden geçen ORF'ler de bulunur (end < start).
     """
-    from Bio.Seq import Seq
-
-    seq = Seq(sequence)
-    seq_len = len(sequence)
-    orfs = []
-    stop_codons = {'TAA', 'TAG', 'TGA'}
-
-    for strand, nuc in [(1, seq), (-1, seq.reverse_complement())]:
-        for frame in range(3):
-            i = frame
-            while i < seq_len - 2:
-                codon = str(nuc[i:i + 3])
-                if codon == 'ATG':
-                    # stop ara
-                    j = i
-                    while j < seq_len - 2:
-                        c = str(nuc[j:j + 3])
-                        if c in stop_codons:
-                            orf_len = j + 3 - i
-                            if orf_len >= min_len:
-                                if strand == 1:
-                                    start, end = i, j + 3
-                                else:
-                                    start = seq_len - (j + 3)
-                                    end = seq_len - i
-                                orfs.append({
-                                    'start': start,
-                                    'end': end,
-                                    'strand': strand,
-                                    'length': orf_len,
-                                    'aa': orf_len // 3 - 1,
-                                })
-                            i = j + 3
-                            break
-                        j += 3
-                    else:
-                        i += 3
-                else:
-                    i += 3
-
-    # Uzunluğa göre sırala, en uzun ORF'ler önce
-    orfs.sort(key=lambda x: -x['length'])
-    return orfs[:10]  # en fazla 10 ORF
+    from dash_apps.orf_finder import find_orfs as _find_orfs
+    return _find_orfs(sequence, min_len=min_len, circular=circular, max_orfs=10)  # en fazla 10 ORF
 
 
 def find_single_cutters(sequence):
-    """Tek kesim yapan restriksiyon enzimlerini bulur (haritada gösterilecek)."""
-    from Bio.Seq import Seq
-    from Bio.Restriction import Analysis, CommOnly
-
+    """Tek kesim yapan restriksiyon enzimlerini bulur (haritada gösterilecek).
+    Tarama sonucu restriksiyon aracıyla ortak önbellekten gelir (restriction_scan)."""
     try:
-        seq = Seq(sequence)
-        ana = Analysis(CommOnly, seq, linear=False)
-        full = ana.full()
+        from dash_apps.restriction_scan import scan_sequence
+        full = scan_sequence(sequence, linear=False)
         single = []
         for enzyme, positions in full.items():
             if len(positions) == 1:
-                single.append({'name': str(enzyme), 'pos': positions[0]})
+                single.append({'name': enzyme, 'pos': positions[0]})
         single.sort(key=lambda x: x['pos'])
         return single[:12]  # en fazla 12 (görsel netlik)
     except Exception:
@@ -144,7 +102,9 @@ def create_plasmid_figure(total_length, orfs, cutters, lang='en'):
         color = orf_colors[i % len(orf_colors)]
         r = 1.12 if orf['strand'] == 1 else 1.20
         a_start = _pos_to_angle(orf['start'], total_length)
-        a_end = _pos_to_angle(orf['end'], total_length)
+        # Orijinden geçen ORF (end < start): yay saat yönünde devam etsin
+        a_end = _pos_to_angle(orf['end'] + (total_length if orf['end'] < orf['start'] else 0),
+                              total_length)
         # Yay noktaları
         steps = max(int(abs(a_start - a_end) / 2), 2)
         angles = [a_start + (a_end - a_start) * k / steps for k in range(steps + 1)]
@@ -218,6 +178,13 @@ def create_plasmid_layout(lang='en'):
                 [html.I(className="fas fa-flask me-2"), t('pm_load_example', lang)],
                 id='pm-example-btn', color="secondary", outline=True, className="w-100 mb-2"
             ),
+            dbc.Label(t('pm_acc_label', lang), className="small text-muted mb-1"),
+            dbc.InputGroup([
+                dbc.Input(id='pm-acc-input', placeholder="L09137"),
+                dbc.Button(t('pm_fetch_btn', lang), id='pm-fetch-btn', color="secondary",
+                           outline=True),
+            ], className="mb-2"),
+            html.Div(id='pm-fetch-status'),
             dbc.Button(
                 [html.I(className="fas fa-circle-notch me-2"),
                  f"{t('pm_draw', lang)} {credit_label('bio_plasmid_map', lang)}"],
@@ -268,14 +235,33 @@ app.layout = create_plasmid_layout()
 # ----------------------------- Callbacks -----------------------------
 
 @app.callback(
-    Output('pm-sequence-input', 'value'),
-    Input('pm-example-btn', 'n_clicks'),
+    [Output('pm-sequence-input', 'value'),
+     Output('pm-fetch-status', 'children')],
+    [Input('pm-example-btn', 'n_clicks'),
+     Input('pm-fetch-btn', 'n_clicks')],
+    [State('pm-acc-input', 'value'),
+     State('pm-lang-store', 'data')],
     prevent_initial_call=True
 )
-def load_example(n_clicks):
-    if not n_clicks:
-        return no_update
-    return EXAMPLE_PLASMID
+def load_sequence(example_clicks, fetch_clicks, accession, lang):
+    from dash import callback_context
+    from dash_apps.i18n_helper import t
+    lang = lang or 'en'
+    if not callback_context.triggered:
+        return no_update, no_update
+    if callback_context.triggered[0]['prop_id'].split('.')[0] == 'pm-example-btn':
+        return EXAMPLE_PLASMID, None
+
+    acc = (accession or '').strip()
+    if not acc:
+        return no_update, dbc.Alert(t('pm_acc_empty', lang), color="warning", className="py-1 small")
+    from dash_apps.ensembl_fetch import fetch_ena_sequence
+    seq, _meta, err = fetch_ena_sequence(acc)
+    if err:
+        return no_update, dbc.Alert(f"{t('pm_fetch_error', lang)} {acc} ({err})",
+                                    color="danger", className="py-1 small")
+    return seq, dbc.Alert(f"✓ {t('pm_fetched', lang)} ({len(seq)} bp)",
+                          color="success", className="py-1 small")
 
 
 @app.callback(
@@ -423,7 +409,7 @@ def ai_comment(n_clicks, store_data, lang, **kwargs):
     try:
         from ai_engine.services import generate_with_fallback as generate_with_pool
         comment, _key = generate_with_pool(
-            prompt, service_name='Google Gemini', model_name='gemini-3.5-flash'
+            prompt, service_name='Google Gemini', model_name='gemini-3.5-flash', cache=True
         )
         if not comment:
             return dbc.Alert(t('pm_ai_error', lang), color="warning")
@@ -83,22 +83,18 @@ def fetch_sequence_from_ebi(accession):
     """
     EBI ENA'dan accession/gen ID ile nükleotid dizisi çeker (FASTA).
     PythonAnywhere whitelist'inde .ebi.ac.uk var. Başarısızsa None döner.
+    Sonuçlar paylaşımlı dizi önbelleğinden gelir (bkz. ensembl_fetch.fetch_ena_sequence).
     """
-    import urllib.request
-    acc = accession.strip()
+    from dash_apps.ensembl_fetch import fetch_ena_sequence
+    acc = (accession or '').strip()
     if not acc:
         return None, "Accession boş."
-    url = f"https://www.ebi.ac.uk/ena/browser/api/fasta/{acc}"
-    try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'AIBlog-PrimerTool'})
-        with urllib.request.urlopen(req, timeout=20) as r:
-            data = r.read().decode('utf-8', errors='ignore')
-        seq = clean_sequence(data)
-        if len(seq) < 50:
-            return None, f"'{acc}' için yeterli dizi bulunamadı."
-        return seq, None
-    except Exception as e:
-        return None, f"Dizi çekilemedi ({acc}): {e}. Lütfen diziyi elle yapıştırın."
+    seq, _meta, err = fetch_ena_sequence(acc)
+    if err in ('no_seq', 'not_found') or (seq and len(seq) < 50):
+        return None, f"'{acc}' için yeterli dizi bulunamadı."
+    if err:
+        return None, f"Dizi çekilemedi ({acc}): {err}. Lütfen diziyi elle yapıştırın."
+    return seq, None
 
 
 # ----------------------------- Layout -----------------------------
@@ -369,7 +365,7 @@ def ai_comment(n_clicks, pairs, seq, lang, **kwargs):
         from ai_engine.services import generate_with_fallback as generate_with_pool
         text, _key = generate_with_pool(
             prompt, service_name="Google Gemini", model_name="gemini-3.5-flash",
-            max_tokens=2500, temperature=0.5)
+            max_tokens=2500, temperature=0.5, cache=True)
     except Exception as e:
         return dbc.Alert(f"{t('primer_ai_failed', lang)}: {e}", color="warning")
 
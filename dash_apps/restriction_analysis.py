@@ -4,6 +4,7 @@ Restriksiyon Enzim Analizi (Kesim Haritası) Aracı.
 Özellikler:
   - DNA dizisi yapıştırma ile restriksiyon enzim analizi
   - Yaygın enzimleri (CommOnly) veya seçili enzimleri tarama
+    (tek geçişli tarayıcı + sonuç önbelleği: dash_apps.restriction_scan)
   - Her enzim için: tanıma dizisi, kesim pozisyonları, kesim sayısı
   - Doğrusal/dairesel (plazmit) DNA desteği
   - Kesim haritası görselleştirmesi (Plotly)
@@ -51,14 +52,12 @@ def analyze_restriction(sequence, is_linear=True, enzyme_names=None):
         return None, "Lütfen en az 10 bazlık geçerli bir DNA dizisi girin."
 
     try:
-        from Bio.Seq import Seq
-        from Bio.Restriction import Analysis, RestrictionBatch, CommOnly
+        from Bio.Restriction import CommOnly
         from Bio import Restriction
+        from dash_apps.restriction_scan import scan_sequence
     except ImportError:
         return None, "Biopython kurulu değil (Bio.Restriction gerekli)."
 
-    seq = Seq(seq_clean)
-
     # Enzim seti
     if enzyme_names:
         enzymes = []
@@ -68,22 +67,22 @@ def analyze_restriction(sequence, is_linear=True, enzyme_names=None):
                 enzymes.append(enz)
         if not enzymes:
             return None, "Geçerli enzim seçilmedi."
-        rb = RestrictionBatch(enzymes)
     else:
-        rb = CommOnly  # yaygın ticari enzimler
+        enzymes = None  # yaygın ticari enzimler (CommOnly)
 
+    # Tek geçişli tarama; sonuç dizi özetiyle önbellekte (plazmit aracıyla ortak)
     try:
-        analysis = Analysis(rb, seq, linear=is_linear)
-        full = analysis.full()
+        full = scan_sequence(seq_clean, linear=is_linear, enzymes=enzymes)
     except Exception as e:
         return None, f"Analiz hatası: {e}"
 
+    by_name = {str(e): e for e in (enzymes or CommOnly)}
     results = []
-    for enzyme, sites in full.items():
+    for name, sites in full.items():
         if sites:  # sadece kesen enzimleri göster
             results.append({
-                'enzyme': str(enzyme),
-                'site': str(enzyme.site),
+                'enzyme': name,
+                'site': str(by_name[name].site),
                 'cuts': len(sites),
                 'positions': ', '.join(str(p) for p in sites),
                 '_positions_list': sites,
@@ -378,7 +377,7 @@ def ai_comment(n_clicks, store_data, lang, **kwargs):
     try:
         from ai_engine.services import generate_with_fallback as generate_with_pool
         comment, _key = generate_with_pool(
-            prompt, service_name='Google Gemini', model_name='gemini-3.5-flash'
+            prompt, service_name='Google Gemini', model_name='gemini-3.5-flash', cache=True
         )
         return dcc.Markdown(comment)
     except Exception as e:
@@ -0,0 +1,262 @@
+"""
+dash_apps.restriction_scan — Tek geçişli çoklu enzim restriksiyon tarayıcısı.
+
+Bio.Restriction.Analysis(CommOnly, ...) ~600 enzimin her birini ayrı bir
+regex ile diziden geçirir; plazmit aracı da aynı dizi için bu işi restriksiyon
+aracının hemen ardından tekrar yapıyordu. Bu modül:
+
+  - Tüm tanıma dizilerini (her iki iplik: ileri + ters tümleyen; IUPAC dejenere
+    bazlar dahil) tek bir Aho-Corasick otomatına derler. Her desen için en
+    seçici pencere (en çok ANCHOR_MAX_VARIANTS açılım) "çapa" olarak otomata
+    eklenir.
+  - Doğrusal/dairesel dizi tek geçişte taranır; çapa isabetleri Biopython'un
+    kendi derlenmiş site regex'iyle (enzyme.compsite) o konumda doğrulanır.
+  - Kesim konumları Biopython'un _modify/_rev_modify/_drop kurallarıyla aynen
+    hesaplanır; sonuç Analysis.full() ile aynıdır ({enzim adı: [konumlar]}).
+  - Sonuçlar dizi özeti (sha256) + topoloji + enzim seti ile önce süreç içi
+    LRU'da, sonra Django cache'te tutulur; restriksiyon ve plazmit araçları
+    aynı diziyi tekrar taramaz.
+"""
+import hashlib
+import itertools
+import logging
+import re
+import threading
+from collections import OrderedDict, deque
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+ANCHOR_MAX_VARIANTS = 256
+RESULT_CACHE_TTL = 7 * 24 * 3600
+_RESULT_CACHE_SIZE = 64
+
+# Otomat alfabesi: A, C, G, T ve X (diğer harfler: N vb.); yalnız '.' X'i kabul eder
+_BASES = 'ACGTX'
+_CODE_TABLE = bytes(_BASES.index(chr(i)) if chr(i) in 'ACGT' else 4 for i in range(256))
+_TOKEN_RE = re.compile(r'\[[A-Z]+\]|.')
+_SITE_RE = re.compile(r'\(\?=\(\?P<(\w+)>(.*)\)\)')
+
+_scanners = {}
+_scanners_lock = threading.Lock()
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _site_patterns(enzyme):
+    """enzyme.compsite → [(ters_mi, derlenmiş regex, izinli baz kümeleri)]."""
+    out = []
+    for part in enzyme.compsite.pattern.split('|'):
+        group, body = _SITE_RE.fullmatch(part).groups()
+        tokens = [_BASES if t == '.' else t.strip('[]') for t in _TOKEN_RE.findall(body)]
+        out.append((group.endswith('_as'), re.compile(body), tokens))
+    return out
+
+
+def _anchor(tokens):
+    """Açılım sayısı sınırı içinde beklenen isabet sıklığı en düşük pencere.
+
+    Sıklık = açılım / 4^uzunluk; N ve dejenere bazlar da açılarak pencereye
+    girebilir (GCNGC gibi kısa sitelerde tüm site çapa olur).
+    """
+    best = None  # (sıklık, açılım, başlangıç, uzunluk)
+    for i in range(len(tokens)):
+        variants = 1
+        for j in range(i, len(tokens)):
+            variants *= len(tokens[j])
+            if variants > ANCHOR_MAX_VARIANTS:
+                break
+            cand = (variants / 4 ** (j - i + 1), variants, i, j - i + 1)
+            if best is None or cand[:2] < best[:2]:
+                best = cand
+    _freq, _variants, start, length = best
+    return start, [''.join(p) for p in itertools.product(*tokens[start:start + length])]
+
+
+class RestrictionScanner:
+    """Bir enzim seti için derlenmiş Aho-Corasick otomatı.
+
+    Geçişler düz bir listede tutulur (durum * 5 + baz kodu; kod 4 = A/C/G/T
+    dışı harf) — taramada durum başına tek liste erişimi.
+    """
+
+    def __init__(self, enzymes):
+        from Bio.Restriction.Restriction import NotDefined, OneCut, Palindromic, TwoCuts
+
+        self.enzymes = list(enzymes)
+        self.max_size = max((e.size for e in self.enzymes), default=1)
+        self.patterns = []  # (enzim sırası, ters_mi, regex | None (çapa = tüm site), uzunluk)
+        self.rules = []     # enzim başına (palindromik, ileri, ters kaymalar, ovhg, NotDefined)
+        self._goto, self._out = [[None] * 5], [[]]
+        for ei, enz in enumerate(self.enzymes):
+            if issubclass(enz, TwoCuts):
+                fwd, rev = (enz.fst5, enz.scd5), (-enz.fst3, -enz.scd3)
+            elif issubclass(enz, OneCut):
+                fwd, rev = (enz.fst5,), (-enz.fst3,)
+            else:  # NoCut: eşleşme konumu
+                fwd, rev = (0,), (0,)
+            self.rules.append((issubclass(enz, Palindromic), fwd, rev, enz.ovhg,
+                               issubclass(enz, NotDefined)))
+            for is_rev, regex, tokens in _site_patterns(enz):
+                offset, words = _anchor(tokens)
+                exact = len(words[0]) == len(tokens)
+                self.patterns.append((ei, is_rev, None if exact else regex, len(tokens)))
+                for w in words:
+                    self._add(w, len(self.patterns) - 1, offset + len(w) - 1)
+        self._compile()
+
+    # -- otomat kurulumu --
+    def _add(self, word, pid, back):
+        state = 0
+        for ch in word:
+            code = _BASES.index(ch)
+            nxt = self._goto[state][code]
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][code] = nxt
+                self._goto.append([None] * 5)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((pid, back))
+
+    def _compile(self):
+        goto, out = self._goto, self._out
+        n = len(goto)
+        fail = [0] * n
+        delta = [0] * (n * 5)
+        queue = deque()
+        for c in range(5):
+            s = goto[0][c]
+            if s is not None:
+                delta[c] = s
+                queue.append(s)
+        while queue:
+            r = queue.popleft()
+            out[r] = out[r] + out[fail[r]]
+            for c in range(5):
+                s = goto[r][c]
+                if s is None:
+                    delta[r * 5 + c] = delta[fail[r] * 5 + c]
+                else:
+                    fail[s] = delta[fail[r] * 5 + c]
+                    delta[r * 5 + c] = s
+                    queue.append(s)
+        self.delta = delta
+        self.out = [tuple(o) or None for o in out]
+        del self._goto, self._out
+        self.states = n
+
+    # -- tarama --
+    def scan(self, sequence, linear=True):
+        """Tek geçiş → {enzim adı: kesim konumları} (Analysis.full() ile aynı)."""
+        seq = sequence.upper()
+        n = len(seq)
+        text = seq if linear else seq + seq[:self.max_size - 1]
+        starts = [[] for _ in self.patterns]
+        delta, out = self.delta, self.out
+        state = 0
+        for end, code in enumerate(text.encode('ascii', 'replace').translate(_CODE_TABLE)):
+            state = delta[state * 5 + code]
+            hits = out[state]
+            if hits:
+                for pid, back in hits:
+                    starts[pid].append(end - back)
+
+        fwd_starts = [[] for _ in self.enzymes]
+        rev_starts = [[] for _ in self.enzymes]
+        for pid, found in enumerate(starts):
+            if not found:
+                continue
+            ei, is_rev, regex, length = self.patterns[pid]
+            limit = n if linear else n + min(self.enzymes[ei].size - 1, n)
+            if regex is None:
+                ok = [s + 1 for s in found if s >= 0 and s + length <= limit]
+            else:
+                ok = [s + 1 for s in found
+                      if s >= 0 and s + length <= limit and regex.match(text, s)]
+            (rev_starts if is_rev else fwd_starts)[ei].extend(ok)
+
+        results = {}
+        for ei, enz in enumerate(self.enzymes):
+            palindromic, fwd, rev, ovhg, not_defined = self.rules[ei]
+            fwd_hits = sorted(set(fwd_starts[ei]))
+            if palindromic:
+                # Palindromik sitede iplik ayrımı yok: konum başına tek eşleşme
+                fwd_hits = sorted(set(fwd_hits) | set(rev_starts[ei]))
+                cuts = [loc + d for loc in fwd_hits for d in fwd]
+            else:
+                # Aynı konumda iki iplik de eşleşirse Biopython yalnız ileri eşleşmeyi sayar
+                taken = set(fwd_hits)
+                cuts = [loc + d for loc in fwd_hits for d in fwd]
+                cuts += [loc + d for loc in sorted(set(rev_starts[ei])) if loc not in taken
+                         for d in rev]
+                cuts.sort()
+            if cuts:
+                cuts = _drop(cuts, n, linear, ovhg, not_defined)
+            results[str(enz)] = cuts
+        return results
+
+
+def _drop(cuts, n, linear, ovhg, not_defined):
+    """AbstractCut._drop / NotDefined._drop ile aynı kurallar."""
+    if linear:
+        if not_defined:
+            return cuts
+        return [c for c in cuts if 1 < c <= n and 1 < c - ovhg <= n]
+    for i, loc in enumerate(cuts):
+        if loc < 1:
+            cuts[i] += n
+        else:
+            break
+    for i in range(len(cuts) - 1, -1, -1):
+        if cuts[i] > n:
+            cuts[i] -= n
+        else:
+            break
+    return cuts
+
+
+def _enzyme_set(enzymes):
+    """(anahtar, enzim listesi). None → CommOnly."""
+    from Bio.Restriction import CommOnly
+    if enzymes is None:
+        return 'CommOnly', sorted(CommOnly, key=str)
+    enzymes = sorted(set(enzymes), key=str)
+    names = ','.join(str(e) for e in enzymes)
+    return hashlib.sha1(names.encode('ascii')).hexdigest()[:16], enzymes
+
+
+def get_scanner(enzymes=None):
+    """Enzim seti için derlenmiş tarayıcı (süreç başına bir kez kurulur)."""
+    key, enzymes = _enzyme_set(enzymes)
+    with _scanners_lock:
+        scanner = _scanners.get(key)
+        if scanner is None:
+            scanner = RestrictionScanner(enzymes)
+            _scanners[key] = scanner
+    return scanner
+
+
+def scan_sequence(sequence, linear=True, enzymes=None):
+    """Diziyi tarar: {enzim adı: kesim konumları}; sonuçlar dizi özetiyle önbellekte.
+
+    enzymes: Bio.Restriction enzim sınıfları (None → CommOnly).
+    """
+    seq = sequence.upper()
+    set_key, _enzymes = _enzyme_set(enzymes)
+    digest = hashlib.sha256(seq.encode('ascii', 'replace')).hexdigest()
+    key = f"re_scan:{set_key}:{'L' if linear else 'C'}:{digest}"
+    with _result_cache_lock:
+        if key in _result_cache:
+            _result_cache.move_to_end(key)
+            return _result_cache[key]
+    results = cache.get(key)
+    if results is None:
+        results = get_scanner(enzymes).scan(seq, linear=linear)
+        cache.set(key, results, RESULT_CACHE_TTL)
+    with _result_cache_lock:
+        _result_cache[key] = results
+        while len(_result_cache) > _RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return results
@@ -106,6 +106,10 @@ def create_sequence_alignment_layout(lang='en'):
                                   'margin': '10px 0'}),
                 dcc.Textarea(id="alignment-data-textarea", placeholder=t('sal_paste_placeholder', lang),
                              style={'width': '100%', 'height': 300}, className="form-control mb-3 font-monospace"),
+                dbc.Button([html.I(className="fas fa-align-left me-2"), t('sal_align_btn', lang)],
+                           id="alignment-align-btn", color="primary", outline=True, size="sm"),
+                dbc.FormText(t('sal_align_hint', lang), className="d-block text-muted mt-1"),
+                dcc.Loading(html.Div(id="alignment-align-status", className="small mt-2")),
             ])),
             dcc.Tab(label=t('sal_graph_settings', lang), value='graph-tab',
                     children=html.Div(className='control-tab p-3', style={'maxHeight': '65vh', 'overflowY': 'auto'},
@@ -190,14 +194,46 @@ def create_sequence_alignment_layout(lang='en'):
 
 # --- Callback'ler ---
 
+def align_fasta_text(text):
+    """Hizalanmamış FASTA metnini sunucuda hizalar → (hizalı FASTA, dizi sayısı)."""
+    import io
+    from Bio import SeqIO
+    from dash_apps import msa_engine
+
+    records = list(SeqIO.parse(io.StringIO(text or ''), 'fasta'))
+    if len(records) < 2:
+        raise ValueError('En az 2 dizi gerekir')
+    aligned = msa_engine.align_sequences([str(r.seq) for r in records])
+    return msa_engine.to_fasta([r.id for r in records], aligned), len(records)
+
+
 @app.callback(
     Output("alignment-data-textarea", "value"),
-    Input("upload-alignment-data", "contents")
+    Output("alignment-align-status", "children"),
+    Input("upload-alignment-data", "contents"),
+    Input("alignment-align-btn", "n_clicks"),
+    State("alignment-data-textarea", "value"),
+    State('sal-lang-store', 'data'),
+    prevent_initial_call=True
 )
-def update_textarea_from_upload(contents):
-    if contents:
-        return parse_upload_content(contents)
-    return no_update
+def update_textarea(contents, align_clicks, text, lang):
+    """Yüklenen dosyayı kutuya yazar veya kutudaki FASTA'yı sunucuda hizalar."""
+    import dash
+    from dash_apps.i18n_helper import t
+    lang = lang or 'en'
+    triggered = dash.callback_context.triggered
+    trig_id = triggered[0]['prop_id'].split('.')[0] if triggered else ''
+    if trig_id == 'upload-alignment-data':
+        return (parse_upload_content(contents), None) if contents else (no_update, no_update)
+    if not align_clicks:
+        return no_update, no_update
+    if not text or text.count('>') < 2:
+        return no_update, dbc.Alert(t('sal_align_need2', lang), color="warning", className="py-2 mb-0")
+    try:
+        fasta, count = align_fasta_text(text)
+    except Exception as e:
+        return no_update, dbc.Alert(f"{t('sal_align_error', lang)}: {e}", color="danger", className="py-2 mb-0")
+    return fasta, html.Span(f"✓ {count} {t('sal_align_done', lang)}", className="text-success")
 
 
 @app.callback(
@@ -11,11 +11,16 @@ from Bio.SeqUtils import gc_fraction
 from Bio.SeqUtils.ProtParam import ProteinAnalysis
 from Bio import SeqIO
 from billing.dash_helpers import build_confirm_modal
+from dash_apps.orf_finder import find_orfs
 
 app = DjangoDash('SequenceAnalyzerApp', external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.FONT_AWESOME])
 
+# DNA/RNA kayıtlarında listelenecek ORF'ler: en az 30 aa (93 nt, stop dahil), en uzun 10 tanesi
+ORF_MIN_LEN = 93
+ORF_MAX_SHOWN = 10
 
-# --- Arka Plan Analiz Fonksiyonu (Değişiklik Yok) ---
+
+# --- Arka Plan Analiz Fonksiyonu (ORF taraması dahil) ---
 def _analyze_single_record(record, seq_type, lang='en'):
     """Tek bir SeqIO kaydını analiz eder, sonuç dict'i döner ('error' içerebilir)."""
     from dash_apps.i18n_helper import t
@@ -40,6 +45,7 @@ def _analyze_single_record(record, seq_type, lang='en'):
                     results['protein_translation'] = str(dna_seq[:usable_len].translate())
             except Exception:
                 pass
+            results['orfs'] = find_orfs(sequence, min_len=ORF_MIN_LEN, max_orfs=ORF_MAX_SHOWN)
 
         elif seq_type == 'rna':
             rna_seq = Seq(sequence)
@@ -52,6 +58,7 @@ def _analyze_single_record(record, seq_type, lang='en'):
                     results['protein_translation'] = str(rna_seq[:usable_len].translate())
             except Exception:
                 pass
+            results['orfs'] = find_orfs(sequence, min_len=ORF_MIN_LEN, max_orfs=ORF_MAX_SHOWN)
 
         elif seq_type == 'protein':
             if 'U' in sequence:
@@ -231,6 +238,19 @@ def _render_record_detail(r, lang='en'):
             dbc.Alert([html.I(className="fas fa-info-circle me-2"), stop_note],
                       color="secondary", className="py-2 small mb-3"),
         ])
+    if r.get('orfs'):
+        head = ["#", "Başlangıç" if lang == 'tr' else "Start", "Bitiş" if lang == 'tr' else "End",
+                "Yön" if lang == 'tr' else "Strand", "Uzunluk (nt)" if lang == 'tr' else "Length (nt)", "aa"]
+        # find_orfs 0 tabanlı ve end hariç verir; tabloda 1 tabanlı, bitiş dahil
+        rows = [html.Tr([html.Td(i + 1), html.Td(o['start'] + 1), html.Td(o['end']),
+                         html.Td('+' if o['strand'] == 1 else '−'), html.Td(o['length']), html.Td(o['aa'])])
+                for i, o in enumerate(r['orfs'])]
+        body.extend([
+            html.H6("Açık okuma çerçeveleri (ORF, 6 çerçeve)" if lang == 'tr'
+                    else "Open reading frames (ORFs, 6 frames)", className="mt-4"),
+            dbc.Table([html.Thead(html.Tr([html.Th(h) for h in head])), html.Tbody(rows)],
+                      bordered=True, striped=True, hover=True, size="sm", className="mb-3"),
+        ])
     if 'amino_acid_percent' in r:
         aa_table_header = [html.Thead(html.Tr([html.Th(t('sa_amino_acid', lang)), html.Th(t('sa_percent', lang))]))]
         aa_table_body = [html.Tbody([
@@ -0,0 +1,201 @@
+"""
+dash_apps.sequence_cache — Ensembl/ENA dizileri için paylaşımlı disk önbelleği.
+
+ensembl_fetch.fetch_gene_sequence her tıkta iki REST isteği (sembol → kimlik,
+kimlik → dizi), ENA çekimi de bir istek yapıyordu; TP53/BRCA1 gibi popüler
+genler tekrar tekrar indiriliyordu. Bu modül:
+
+  - Anahtar: (kaynak, tür, sembol/accession, max_len). Her kayıt
+    SEQUENCE_CACHE_DIR altında tek bir JSON dosyası; yazma atomiktir
+    (geçici dosya + os.replace), böylece tüm web/işçi süreçleri paylaşır.
+  - TTL: SEQUENCE_CACHE_TTL (kayıt içindeki çekim zamanına göre).
+  - LRU boyut sınırı: isabette dosyanın mtime'ı güncellenir; toplam boyut
+    SEQUENCE_CACHE_MAX_MB'yi aşınca en eski erişilenler silinir.
+  - İstek birleştirme: aynı anahtar için eşzamanlı istekler tek çekimi bekler.
+    Kilitler anahtar başına değil, 256 alt dizin (anahtarın ilk iki hanesi)
+    başınadır; böylece kilit sözlüğü ve .lock dosyaları sınırsız büyümez
+    (süreç içinde threading.Lock; POSIX'te alt dizindeki .lock üzerinde flock).
+  - Ön-ısıtma: SEQUENCE_CACHE_PREWARM listesi `manage.py warm_cache --sequences`
+    ile (zamanlanmış görev olarak) yüklenir; web süreçleri açılışta thread başlatmaz
+    (uWSGI enable-threads olmadan çalışmazdı).
+
+Yalnız başarılı sonuçlar önbelleğe alınır; ağ hataları bir sonraki istekte
+yeniden denenir.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası birleştirme yok, süreç içi kilit yeterli
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_MB = 512
+
+_locks = {}
+_locks_guard = threading.Lock()
+_evict_guard = threading.Lock()
+
+
+def _settings():
+    from django.conf import settings
+    base = getattr(settings, 'SEQUENCE_CACHE_DIR', None)
+    if base is None:
+        base = os.path.join(str(settings.BASE_DIR), '.cache', 'sequences')
+    return (str(base), getattr(settings, 'SEQUENCE_CACHE_TTL', DEFAULT_TTL),
+            getattr(settings, 'SEQUENCE_CACHE_MAX_MB', DEFAULT_MAX_MB) * 1024 * 1024)
+
+
+def cache_key(source, species, ident, max_len):
+    raw = json.dumps([source, (species or '').lower(), (ident or '').strip().upper(), max_len])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _path(base, key):
+    return os.path.join(base, key[:2], key + '.json')
+
+
+def _shard_lock(key):
+    with _locks_guard:
+        return _locks.setdefault(key[:2], threading.Lock())
+
+
+def _read(path, ttl):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            entry = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if ttl and time.time() - entry.get('fetched_at', 0) > ttl:
+        return None
+    try:
+        os.utime(path)  # LRU: son erişim
+    except OSError:
+        pass
+    return entry
+
+
+def _write(base, path, entry, max_bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(entry, fh)
+    os.replace(tmp, path)
+    _evict(base, max_bytes)
+
+
+def _evict(base, max_bytes):
+    """Toplam boyut sınırı aşıldıysa en eski erişilen kayıtları %90'a inene dek siler."""
+    if not max_bytes or not _evict_guard.acquire(blocking=False):
+        return
+    try:
+        files, total = [], 0
+        for sub in os.scandir(base):
+            if not sub.is_dir():
+                continue
+            for f in os.scandir(sub.path):
+                if f.name.endswith('.json'):
+                    st = f.stat()
+                    files.append((st.st_mtime, st.st_size, f.path))
+                    total += st.st_size
+        if total <= max_bytes:
+            return
+        for _mtime, size, path in sorted(files):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= max_bytes * 0.9:
+                break
+    except OSError as e:
+        logger.warning(f"Dizi önbelleği temizlenemedi: {e}")
+    finally:
+        _evict_guard.release()
+
+
+class _FileLock:
+    """Alt dizin başına süreçler arası kilit (POSIX flock); yoksa etkisiz."""
+
+    def __init__(self, base, key):
+        self.path = os.path.join(base, key[:2], '.lock')
+        self.fh = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.fh = open(self.path, 'a')
+                fcntl.flock(self.fh, fcntl.LOCK_EX)
+            except OSError:
+                self.fh = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.fh is not None:
+            fcntl.flock(self.fh, fcntl.LOCK_UN)
+            self.fh.close()
+
+
+def get_or_fetch(source, species, ident, max_len, loader):
+    """Önbellekten (seq, meta, None) döner; yoksa loader() çağrılır.
+
+    loader() → (seq, meta, error). error None ise sonuç önbelleğe yazılır.
+    Aynı anahtar için eşzamanlı çağrılar tek loader çağrısını paylaşır.
+    """
+    try:
+        base, ttl, max_bytes = _settings()
+    except Exception:
+        return loader()
+    key = cache_key(source, species, ident, max_len)
+    path = _path(base, key)
+    entry = _read(path, ttl)
+    if entry is not None:
+        return entry['seq'], entry['meta'], None
+
+    with _shard_lock(key), _FileLock(base, key):
+        # Kilidi beklerken başka bir istek çekmiş olabilir
+        entry = _read(path, ttl)
+        if entry is not None:
+            return entry['seq'], entry['meta'], None
+        seq, meta, err = loader()
+        if err is None and seq:
+            try:
+                _write(base, path, {'source': source, 'species': species, 'ident': ident,
+                                    'max_len': max_len, 'fetched_at': time.time(),
+                                    'seq': seq, 'meta': meta}, max_bytes)
+            except OSError as e:
+                logger.warning(f"Dizi önbelleğe yazılamadı ({source}:{ident}): {e}")
+        return seq, meta, err
+
+
+def prewarm(entries=None):
+    """SEQUENCE_CACHE_PREWARM (veya verilen) listesini önbelleğe yükler.
+
+    Girdi biçimi: ('ensembl', tür, sembol) veya ('ena', accession).
+    Dönüş: (başarılı, başarısız) sayıları.
+    """
+    from django.conf import settings
+    from dash_apps import ensembl_fetch
+
+    if entries is None:
+        entries = getattr(settings, 'SEQUENCE_CACHE_PREWARM', [])
+    ok = failed = 0
+    for entry in entries:
+        if entry[0] == 'ena':
+            _seq, _meta, err = ensembl_fetch.fetch_ena_sequence(entry[1])
+        else:
+            _seq, _meta, err = ensembl_fetch.fetch_gene_sequence(entry[2], entry[1])
+        if err:
+            failed += 1
+            logger.info(f"Ön-ısıtma başarısız: {entry} ({err})")
+        else:
+            ok += 1
+    return ok, failed